@@ -0,0 +1,99 @@
+""" Benchmarks of reading and decoding of gwy files
+
+    Wall time is measured by time_* methods and peak RSS of the
+    benchmark process by peakmem_* methods.
+
+"""
+import os
+
+from pygwyfile.gwycontainer import GwyContainer
+from pygwyfile.gwyfile import Gwyfile
+
+from .common import make_container, write_gwyfile
+
+
+class ReadGwyfile:
+    """Parse gwy file by libgwyfile"""
+
+    params = ([1, 16], [256, 1024])
+    param_names = ['nchannels', 'size']
+
+    def setup(self, nchannels, size):
+        self.filename = write_gwyfile(make_container(nchannels, size))
+
+    def teardown(self, nchannels, size):
+        os.remove(self.filename)
+
+    def time_Gwyfile_from_gwy(self, nchannels, size):
+        Gwyfile.from_gwy(self.filename).close()
+
+    def peakmem_Gwyfile_from_gwy(self, nchannels, size):
+        Gwyfile.from_gwy(self.filename).close()
+
+
+class DecodeChannels:
+    """Decode channels of parsed gwy file"""
+
+    params = ([1, 16], [256, 1024], [True, False])
+    param_names = ['nchannels', 'size', 'copy']
+
+    def setup(self, nchannels, size, copy):
+        filename = write_gwyfile(make_container(nchannels, size))
+        try:
+            self.gwyfile = Gwyfile.from_gwy(filename)
+        finally:
+            os.remove(filename)
+
+    def teardown(self, nchannels, size, copy):
+        self.gwyfile.close()
+
+    def time_GwyContainer_from_gwy(self, nchannels, size, copy):
+        GwyContainer.from_gwy(self.gwyfile, copy=copy)
+
+    def peakmem_GwyContainer_from_gwy(self, nchannels, size, copy):
+        GwyContainer.from_gwy(self.gwyfile, copy=copy)
+
+
+class DecodeGraphs:
+    """Decode graphs of parsed gwy file"""
+
+    params = ([1, 100], [1, 100], [1000])
+    param_names = ['ngraphs', 'ncurves', 'npoints']
+
+    def setup(self, ngraphs, ncurves, npoints):
+        container = make_container(0, 0, ngraphs, ncurves, npoints)
+        filename = write_gwyfile(container)
+        try:
+            self.gwyfile = Gwyfile.from_gwy(filename)
+        finally:
+            os.remove(filename)
+
+    def teardown(self, ngraphs, ncurves, npoints):
+        self.gwyfile.close()
+
+    def time_GwyContainer_from_gwy(self, ngraphs, ncurves, npoints):
+        GwyContainer.from_gwy(self.gwyfile)
+
+    def peakmem_GwyContainer_from_gwy(self, ngraphs, ncurves, npoints):
+        GwyContainer.from_gwy(self.gwyfile)
+
+
+class DecodeSelections:
+    """Decode channels with selections of parsed gwy file"""
+
+    params = [10, 1000]
+    param_names = ['nselections']
+
+    def setup(self, nselections):
+        container = make_container(1, 16, nselections=nselections)
+        filename = write_gwyfile(container)
+        try:
+            self.gwyfile = Gwyfile.from_gwy(filename)
+        finally:
+            os.remove(filename)
+
+    def teardown(self, nselections):
+        self.gwyfile.close()
+
+    def time_GwyContainer_from_gwy(self, nselections):
+        GwyContainer.from_gwy(self.gwyfile, components=('selections',))
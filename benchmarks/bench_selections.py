@@ -0,0 +1,27 @@
+""" Benchmarks of selection round trips
+
+"""
+from pygwyfile.gwyfile import _own_gwyobject
+
+from .common import SELECTION_CLASSES, make_selection
+
+
+class SelectionRoundTrip:
+    """Convert selection to C object and back"""
+
+    params = (sorted(SELECTION_CLASSES), [10, 1000, 100000])
+    param_names = ['kind', 'nselections']
+
+    def setup(self, kind, nselections):
+        self.selection = make_selection(kind, nselections)
+        self.gwysel = _own_gwyobject(self.selection.to_gwy())
+
+    def time_to_gwy(self, kind, nselections):
+        _own_gwyobject(self.selection.to_gwy())
+
+    def time_from_gwy(self, kind, nselections):
+        SELECTION_CLASSES[kind].from_gwy(self.gwysel)
+
+    def time_round_trip(self, kind, nselections):
+        gwysel = _own_gwyobject(self.selection.to_gwy())
+        SELECTION_CLASSES[kind].from_gwy(gwysel)
@@ -0,0 +1,69 @@
+""" Benchmarks of encoding and writing of gwy files
+
+    Wall time is measured by time_* methods and peak RSS of the
+    benchmark process by peakmem_* methods.
+
+"""
+import os
+import tempfile
+
+from pygwyfile.gwyfile import new_gwycontainer, _own_gwyobject
+
+from .common import make_channel, make_graph, make_container
+
+
+class EncodeChannel:
+    """Create C objects of a channel"""
+
+    params = ([256, 1024], [0, 1000])
+    param_names = ['size', 'nselections']
+
+    def setup(self, size, nselections):
+        self.channel = make_channel(size, nselections)
+
+    def time_GwyChannel_to_gwy(self, size, nselections):
+        self.channel.to_gwy(new_gwycontainer(), 0)
+
+    def peakmem_GwyChannel_to_gwy(self, size, nselections):
+        self.channel.to_gwy(new_gwycontainer(), 0)
+
+
+class EncodeGraph:
+    """Create C objects of a graph"""
+
+    params = ([1, 100, 1000], [1000])
+    param_names = ['ncurves', 'npoints']
+
+    def setup(self, ncurves, npoints):
+        self.graph = make_graph(ncurves, npoints)
+
+    def time_GwyGraphModel_to_gwy(self, ncurves, npoints):
+        _own_gwyobject(self.graph.to_gwy())
+
+    def peakmem_GwyGraphModel_to_gwy(self, ncurves, npoints):
+        _own_gwyobject(self.graph.to_gwy())
+
+
+class WriteGwyfile:
+    """Encode container and write it to gwy file"""
+
+    params = ([1, 16], [256, 1024])
+    param_names = ['nchannels', 'size']
+
+    def setup(self, nchannels, size):
+        self.container = make_container(nchannels, size,
+                                        ngraphs=1, ncurves=10, npoints=1000)
+        fd, self.filename = tempfile.mkstemp(suffix='.gwy')
+        os.close(fd)
+
+    def teardown(self, nchannels, size):
+        os.remove(self.filename)
+
+    def time_to_gwyfile(self, nchannels, size):
+        self.container.to_gwyfile(self.filename)
+
+    def peakmem_to_gwyfile(self, nchannels, size):
+        self.container.to_gwyfile(self.filename)
+
+    def time_to_bytes(self, nchannels, size):
+        self.container.to_bytes()
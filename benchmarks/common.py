@@ -0,0 +1,154 @@
+""" Synthetic inputs for the benchmarks
+
+    Functions:
+        make_datafield(size): Create square GwyDataField
+        make_channel(size, nselections=0): Create channel with data,
+                                           mask, presentation and
+                                           selections
+        make_graph(ncurves, npoints): Create graph with ncurves curves
+        make_container(nchannels, size, ngraphs=0, ncurves=0,
+                       npoints=0, nselections=0): Create container
+        make_selection(kind, nselections): Create selection
+        write_gwyfile(container): Write container to temporary file
+
+"""
+import os
+import tempfile
+
+import numpy as np
+
+from pygwyfile.gwychannel import GwyChannel
+from pygwyfile.gwycontainer import GwyContainer
+from pygwyfile.gwydatafield import GwyDataField
+from pygwyfile.gwygraph import GwyGraphModel
+from pygwyfile.gwygraphcurve import GwyGraphCurve
+from pygwyfile.gwyselection import (GwyPointSelection,
+                                    GwyPointerSelection,
+                                    GwyLineSelection,
+                                    GwyRectangleSelection,
+                                    GwyEllipseSelection)
+
+# Selection classes by kind, as named in GwyChannel attributes
+SELECTION_CLASSES = {'point': GwyPointSelection,
+                     'pointer': GwyPointerSelection,
+                     'line': GwyLineSelection,
+                     'rectangle': GwyRectangleSelection,
+                     'ellipse': GwyEllipseSelection}
+
+# Seed of the random generator, the inputs are the same in every run
+_SEED = 0
+
+
+def make_datafield(size):
+    """Create square GwyDataField
+
+    Args:
+        size (int): xres and yres of the data field
+
+    Returns:
+        GwyDataField with random data
+    """
+    rng = np.random.default_rng(_SEED)
+    return GwyDataField(rng.random((size, size)),
+                        meta={'xreal': 1e-6, 'yreal': 1e-6,
+                              'si_unit_xy': 'm', 'si_unit_z': 'm'})
+
+
+def make_selection(kind, nselections):
+    """Create selection
+
+    Args:
+        kind (string): 'point', 'pointer', 'line', 'rectangle'
+                       or 'ellipse'
+        nselections (int): number of selections
+
+    Returns:
+        instance of GwySelection subclass
+    """
+    rng = np.random.default_rng(_SEED)
+    points = rng.random((nselections, 2))
+    if kind in ('point', 'pointer'):
+        return SELECTION_CLASSES[kind](points)
+    else:
+        pairs = np.stack((points, points[::-1]), axis=1)
+        return SELECTION_CLASSES[kind](pairs)
+
+
+def make_channel(size, nselections=0):
+    """Create channel with data, mask, presentation and selections
+
+    Args:
+        size (int): xres and yres of the data fields
+        nselections (int): number of selections of each kind,
+                           no selections are added if zero
+
+    Returns:
+        GwyChannel
+    """
+    datafield = make_datafield(size)
+    selections = {}
+    if nselections:
+        selections = {kind + '_sel': make_selection(kind, nselections)
+                      for kind in SELECTION_CLASSES}
+    return GwyChannel('Topography', datafield,
+                      palette='Gray',
+                      mask=datafield,
+                      show=datafield,
+                      **selections)
+
+
+def make_graph(ncurves, npoints):
+    """Create graph
+
+    Args:
+        ncurves (int): number of curves
+        npoints (int): number of points in each curve
+
+    Returns:
+        GwyGraphModel
+    """
+    rng = np.random.default_rng(_SEED)
+    curves = [GwyGraphCurve(rng.random((2, npoints)),
+                            meta={'description': 'curve {:d}'.format(i)})
+              for i in range(ncurves)]
+    return GwyGraphModel(curves, meta={'title': 'Profiles'})
+
+
+def make_container(nchannels, size, ngraphs=0, ncurves=0, npoints=0,
+                   nselections=0):
+    """Create container
+
+    Args:
+        nchannels (int): number of channels
+        size (int): xres and yres of the data fields
+        ngraphs (int): number of graphs
+        ncurves (int): number of curves in each graph
+        npoints (int): number of points in each curve
+        nselections (int): number of selections of each kind
+                           in each channel
+
+    Returns:
+        GwyContainer
+    """
+    channels = []
+    if nchannels:
+        channels = [make_channel(size, nselections)] * nchannels
+    graphs = []
+    if ngraphs:
+        graphs = [make_graph(ncurves, npoints)] * ngraphs
+    return GwyContainer(channels=channels, graphs=graphs)
+
+
+def write_gwyfile(container):
+    """Write container to temporary file
+
+    Args:
+        container (GwyContainer): container to write
+
+    Returns:
+        filename (string): name of the file, the caller removes it
+    """
+    fd, filename = tempfile.mkstemp(suffix='.gwy')
+    os.close(fd)
+    container.to_gwyfile(filename)
+    return filename
@@ -0,0 +1,75 @@
+""" Running of blocking gwy file operations from asyncio code
+
+    Parsing and serialization of gwy files and file I/O are offloaded
+    to an executor, so they do not block the event loop. Number of
+    operations running at the same time in each event loop is limited
+    by a semaphore.
+
+    Functions:
+        configure(executor=None, max_concurrency=None):
+                  Set executor and concurrency limit
+        run_blocking(func, *args, **kwargs):
+                  Run blocking function in the executor
+
+"""
+import asyncio
+import functools
+import weakref
+
+# Executor for blocking calls, None for the default executor of the loop
+_executor = None
+
+# Maximum number of blocking calls running at the same time
+_max_concurrency = None
+
+# Semaphores limiting concurrency, one per event loop
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def configure(executor=None, max_concurrency=None):
+    """Set executor and concurrency limit of blocking calls
+
+    Args:
+        executor (concurrent.futures.Executor): executor running blocking
+                 calls or None for the default executor of the event loop
+        max_concurrency (int): maximum number of blocking calls running
+                 at the same time in an event loop or None for no limit
+    """
+    global _executor, _max_concurrency
+
+    if max_concurrency is not None and max_concurrency < 1:
+        raise ValueError("max_concurrency must be positive")
+
+    _executor = executor
+    _max_concurrency = max_concurrency
+    _semaphores.clear()
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Run blocking function in the executor
+
+    Args:
+        func (callable): blocking function
+        *args, **kwargs: arguments of the function
+
+    Returns:
+        value returned by func
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(func, *args, **kwargs)
+    semaphore = _get_semaphore(loop)
+    if semaphore is None:
+        return await loop.run_in_executor(_executor, call)
+    async with semaphore:
+        return await loop.run_in_executor(_executor, call)
+
+
+def _get_semaphore(loop):
+    """Get semaphore of the event loop or None if there is no limit"""
+    if _max_concurrency is None:
+        return None
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(_max_concurrency)
+        _semaphores[loop] = semaphore
+    return semaphore
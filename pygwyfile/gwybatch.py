@@ -0,0 +1,328 @@
+""" Parallel reading and writing of many gwy files
+
+    read_gwyfiles reads files in worker processes. Data arrays of
+    datafields, volumes, surfaces and spectra are passed back through
+    shared memory blocks instead of being pickled through the pipes of
+    the process pool, so only small metadata is pickled. The returned
+    arrays are backed by the shared memory blocks without a copy.
+
+    read_many and write_many use a pool of threads in this process.
+    Libgwyfile functions are called through CFFI, which releases
+    the GIL for the duration of each C call, and numpy releases it
+    while copying data arrays. So parsing and serialization of large
+    files in one thread do not block other Python threads, and threads
+    scale across cores without process overhead or array pickling.
+
+    Functions:
+        read_gwyfiles(filenames, workers=None, ordered=True,
+                      max_in_flight=None, **kwargs):
+                      Read gwy files in parallel processes
+        read_many(filenames, workers=None, **kwargs):
+                      Read gwy files in parallel threads
+        write_many(containers, filenames, workers=None):
+                      Write containers to gwy files in parallel threads
+
+"""
+import collections
+import concurrent.futures
+import functools
+import os
+import weakref
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from pygwyfile.gwycontainer import read_gwyfile
+
+# Datafields of a channel which are transported through shared memory
+_DATAFIELD_ATTRS = ('data', 'mask', 'show')
+
+# Container attributes with lists of objects and the array attributes
+# of the objects which are transported through shared memory
+_OBJECT_ARRAY_ATTRS = (('volumes', ('data',)),
+                       ('surfaces', ('data',)),
+                       ('spectra', ('values', 'offsets', 'coords')))
+
+
+def read_gwyfiles(filenames, workers=None, ordered=True,
+                  max_in_flight=None, **kwargs):
+    """Read gwy files in parallel processes
+
+    Args:
+        filenames (iterable of strings): names of gwy files.
+                                         The iterable is consumed lazily.
+        workers (int): number of worker processes
+                       or None for the number of processors
+        ordered (boolean): if True, results are yielded in the order of
+                           filenames, otherwise as soon as they are read
+        max_in_flight (int): maximum number of files submitted to the
+                             workers and not yet yielded, which bounds
+                             the memory used by results waiting to be
+                             consumed. Default is twice the number of
+                             workers.
+        **kwargs: channels, components arguments of read_gwyfile
+
+    Yields:
+        (filename, GwyContainer): name of the file and its contents
+
+    The first exception raised while reading a file is raised here
+    and the remaining files are not read.
+    """
+    if kwargs.get('lazy'):
+        raise ValueError("Lazy containers cannot be read in "
+                         "worker processes")
+    if 'copy' in kwargs:
+        raise TypeError("copy argument is not supported, data arrays "
+                        "are always copied to shared memory")
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if max_in_flight is None:
+        max_in_flight = 2 * workers
+    elif max_in_flight < 1:
+        raise ValueError("max_in_flight must be positive")
+
+    # workers inherit the tracker, so shared memory blocks created
+    # by workers and unlinked here are tracked by the same process
+    resource_tracker.ensure_running()
+
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        filenames = iter(filenames)
+        futures = collections.OrderedDict()
+
+        def submit_next():
+            for filename in filenames:
+                future = executor.submit(_read_gwyfile_to_shared_memory,
+                                         filename, kwargs)
+                futures[future] = filename
+                return True
+            return False
+
+        try:
+            while len(futures) < max_in_flight and submit_next():
+                pass
+
+            while futures:
+                if ordered:
+                    future = next(iter(futures))
+                else:
+                    done, _ = concurrent.futures.wait(
+                        futures,
+                        return_when=concurrent.futures.FIRST_COMPLETED)
+                    future = next(f for f in futures if f in done)
+                filename = futures.pop(future)
+                container = _attach_shared_arrays(future.result())
+                submit_next()
+                yield filename, container
+        finally:
+            for future in futures:
+                future.cancel()
+            for future in futures:
+                if not future.cancelled():
+                    _release_results(future)
+
+
+def read_many(filenames, workers=None, **kwargs):
+    """Read gwy files in parallel threads
+
+    Args:
+        filenames (iterable of strings): names of gwy files
+        workers (int): number of threads
+                       or None for the default of ThreadPoolExecutor
+        **kwargs: keyword arguments of read_gwyfile
+
+    Returns:
+        [list (GwyContainer)]: containers in the order of filenames
+    """
+    read = functools.partial(read_gwyfile, **kwargs)
+    with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+        return list(executor.map(read, filenames))
+
+
+def write_many(containers, filenames, workers=None):
+    """Write containers to gwy files in parallel threads
+
+    The files will be overwritten if they exist.
+
+    Args:
+        containers (iterable of GwyContainer): containers to write
+        filenames (iterable of strings): names of gwy files,
+                                         one for each container
+        workers (int): number of threads
+                       or None for the default of ThreadPoolExecutor
+    """
+    containers = list(containers)
+    filenames = list(filenames)
+    if len(containers) != len(filenames):
+        raise ValueError("Number of filenames must match "
+                         "number of containers")
+
+    with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+        futures = [executor.submit(container.to_gwyfile, filename)
+                   for container, filename in zip(containers, filenames)]
+        for future in futures:
+            future.result()
+
+
+class _SharedArray:
+    """Picklable reference to numpy array in a shared memory block"""
+
+    def __init__(self, name, shape, dtype):
+        """
+        Args:
+            name (string): name of the shared memory block
+            shape (tuple of int): shape of the array
+            dtype (string): numpy dtype of the array
+        """
+        self.name = name
+        self.shape = shape
+        self.dtype = dtype
+
+    @classmethod
+    def from_array(cls, array):
+        """Copy array to a new shared memory block
+
+        Args:
+            array (numpy array): array to copy
+
+        Returns:
+            _SharedArray: reference to the copy.
+                          The block must be unlinked by the receiver.
+        """
+        shm = shared_memory.SharedMemory(create=True,
+                                         size=max(array.nbytes, 1))
+        try:
+            shared = np.ndarray(array.shape, dtype=array.dtype,
+                                buffer=shm.buf)
+            shared[...] = array
+            del shared
+            return cls(shm.name, array.shape, array.dtype.str)
+        finally:
+            shm.close()
+
+    def to_array(self):
+        """Map array of the shared memory block and unlink the block
+
+        The block is unlinked at once, its memory stays mapped until
+        the returned array and all views of it are deleted.
+
+        Returns:
+            array (numpy array): array backed by the shared memory block
+        """
+        shm = shared_memory.SharedMemory(name=self.name)
+        try:
+            array = np.ndarray(self.shape, dtype=self.dtype,
+                               buffer=shm.buf)
+        except BaseException:
+            shm.close()
+            raise
+        finally:
+            shm.unlink()
+        finalizer = weakref.finalize(array, _close_shared_memory, shm)
+        # the array may still be in use at exit
+        finalizer.atexit = False
+        return array
+
+    def unlink(self):
+        """Unlink the shared memory block without reading it"""
+        shm = shared_memory.SharedMemory(name=self.name)
+        shm.close()
+        shm.unlink()
+
+
+def _close_shared_memory(shm):
+    """Unmap shared memory block when its array is deleted
+
+    Views of the array keep the array as their base,
+    so the block is not in use any more.
+    """
+    shm.close()
+
+
+def _read_gwyfile_to_shared_memory(filename, kwargs):
+    """Read gwy file and move data arrays to shared memory
+
+    Args:
+        filename (string): name of gwy file
+        kwargs (dict): keyword arguments of read_gwyfile
+
+    Returns:
+        GwyContainer: container with data arrays of datafields,
+                      volumes, surfaces and spectra replaced
+                      by _SharedArray references
+    """
+    container = read_gwyfile(filename, **kwargs)
+    shared_arrays = []
+    try:
+        for obj, attr in _iter_array_attrs(container):
+            shared_array = _SharedArray.from_array(getattr(obj, attr))
+            setattr(obj, attr, shared_array)
+            shared_arrays.append(shared_array)
+    except BaseException:
+        for shared_array in shared_arrays:
+            shared_array.unlink()
+        raise
+    return container
+
+
+def _attach_shared_arrays(container):
+    """Replace _SharedArray references in container by numpy arrays
+
+    Args:
+        container (GwyContainer): container returned by a worker
+
+    Returns:
+        GwyContainer: the same container with numpy data arrays
+    """
+    array_attrs = list(_iter_array_attrs(container))
+    try:
+        for obj, attr in array_attrs:
+            setattr(obj, attr, getattr(obj, attr).to_array())
+    except BaseException:
+        _unlink_shared_arrays(array_attrs)
+        raise
+    return container
+
+
+def _release_results(future):
+    """Unlink shared memory blocks of a result which is not yielded"""
+    try:
+        container = future.result()
+    except BaseException:
+        return
+    _unlink_shared_arrays(_iter_array_attrs(container))
+
+
+def _unlink_shared_arrays(array_attrs):
+    """Unlink shared memory blocks of arrays not attached yet
+
+    Args:
+        array_attrs (iterable of (object, string) tuples):
+            objects and names of their array attributes
+    """
+    for obj, attr in array_attrs:
+        shared_array = getattr(obj, attr)
+        if isinstance(shared_array, _SharedArray):
+            try:
+                shared_array.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _iter_array_attrs(container):
+    """Iterate over data arrays transported through shared memory
+
+    Yields:
+        (object, string): datafield, volume, surface or spectra
+                          and name of its array attribute
+    """
+    for channel in container.channels:
+        for attr in _DATAFIELD_ATTRS:
+            datafield = getattr(channel, attr, None)
+            if datafield is not None and datafield.data is not None:
+                yield datafield, 'data'
+    for container_attr, array_attrs in _OBJECT_ARRAY_ATTRS:
+        for obj in getattr(container, container_attr):
+            for attr in array_attrs:
+                if getattr(obj, attr) is not None:
+                    yield obj, attr
@@ -0,0 +1,317 @@
+""" Pythonic representation of gwyddion brick (volume data) objects
+
+    Brick data are stored in gwy files with x index varying fastest,
+    so the data array has shape (zres, yres, xres): data[k] is
+    the xy plane of level k and data[k0:k1] is a contiguous z-slab.
+
+    Classes:
+        GwyBrick: pythonic representation of gwyddion brick
+
+"""
+import numpy as np
+
+from pygwyfile._libgwyfile import ffi, lib
+from pygwyfile.gwyfile import GwyfileErrorCMsg, new_double_array_arg
+from pygwyfile.gwydatafield import _decode_c_string
+from pygwyfile.stats import timed, add_bytes_copied
+
+# Default values of optional metadata items
+_META_DEFAULTS = (('xreal', 1.), ('yreal', 1.), ('zreal', 1.),
+                  ('xoff', 0.), ('yoff', 0.), ('zoff', 0.),
+                  ('si_unit_x', ''), ('si_unit_y', ''),
+                  ('si_unit_z', ''), ('si_unit_w', ''))
+
+
+class GwyBrick:
+    """Class for GwyBrick representation
+
+    Data of bricks read with copy=False or mapped by GwyMmapFile
+    are read-only views, get_zslab and get_xy_plane return views
+    of them, so only the requested part of the volume is ever read.
+
+    Attributes:
+        data (3D numpy array, float64, shape (zres, yres, xres)):
+            data from the brick
+
+        meta (python dictionary):
+            brick metadata
+
+        title (string): title of the volume data or None
+
+    Methods:
+        from_gwy(cls, gwybrick, owner=None): Create GwyBrick instance
+                                             from <GwyBrick*> object
+        to_gwy(self, keepalive=None): Get C representation
+                                      of GwyBrick instance
+        get_zslab(self, zfrom, zto): Get brick of levels zfrom...zto-1
+                                     without a copy of the data
+        get_xy_plane(self, level): Get xy plane of the level
+                                   without a copy of the data
+        nbytes(self): Get size of the data array in bytes
+    """
+
+    def __init__(self, data, meta=None, title=None):
+        """
+        Args:
+            data (3D numpy array, float64):
+                data for the brick, shape (zres, yres, xres)
+            meta (python dictionary):
+
+                Possible items:
+
+                   'xres' (int):    Horizontal dimension in pixels
+                   'yres' (int):    Vertical dimension in pixels
+                   'zres' (int):    Depth-wise dimension in pixels
+                   =if defined xres, yres, zres must match
+                    shape of the data array=
+
+                   'xreal' (float): Horizontal size in physical units
+                                    Default value is 1. if not defined.
+                   'yreal' (float): Vertical size in physical units
+                                    Default value is 1. if not defined.
+                   'zreal' (float): Depth-wise size in physical units
+                                    Default value is 1. if not defined.
+                   'xoff' (float):  Horizontal offset of the top-left
+                                    upper corner in physical units.
+                                    Default value is 0. if not defined
+                   'yoff' (float):  Vertical offset of the top-left
+                                    upper corner in physical units.
+                                    Default value is 0. if not defined
+                   'zoff' (float):  Depth-wise offset of the top-left
+                                    upper corner in physical units.
+                                    Default value is 0. if not defined
+                   'si_unit_x' (str): Physical unit of horizontal
+                                      dimension, base SI unit, e.g. "m"
+                   'si_unit_y' (str): Physical unit of vertical
+                                      dimension, base SI unit, e.g. "m"
+                   'si_unit_z' (str): Physical unit of depth-wise
+                                      dimension, base SI unit, e.g. "V"
+                   'si_unit_w' (str): Physical unit of data values,
+                                      base SI unit, e.g. "A"
+                                      Units are '' if not defined
+
+                Unknown additional items are simply ignored
+
+            title (string): title of the volume data
+        """
+        if not meta:
+            meta = {}
+
+        if data.ndim != 3:
+            raise ValueError("data must be a 3D array")
+
+        self.meta = {}
+
+        zres, yres, xres = data.shape
+        if 'xres' in meta and 'yres' in meta and 'zres' in meta:
+            if (meta['zres'], meta['yres'], meta['xres']) != data.shape:
+                raise ValueError("data.shape is not equal "
+                                 "meta['zres'], meta['yres'], meta['xres']")
+        self.data = data
+        self.meta['xres'] = xres
+        self.meta['yres'] = yres
+        self.meta['zres'] = zres
+
+        for key, default in _META_DEFAULTS:
+            self.meta[key] = meta.get(key, default)
+
+        self.title = title
+
+    @classmethod
+    def from_gwy(cls, gwybrick, owner=None):
+        """ Create GwyBrick instance from <GwyBrick*> object
+
+        Args:
+            gwybrick (GwyBrick*):
+                GwyBrick object from Libgwyfile
+            owner (Gwyfile):
+                Gwyfile instance containing gwybrick or None.
+                If owner is given, the data is not copied: data array
+                is a read-only view which keeps the owner's gwyfile
+                object alive. Otherwise the data is copied.
+
+        Returns:
+            brick (GwyBrick):
+                GwyBrick instance
+        """
+        meta = cls._get_meta(gwybrick)
+        shape = (meta['zres'], meta['yres'], meta['xres'])
+        data = cls._get_data(gwybrick, shape, owner=owner)
+        return GwyBrick(data=data, meta=meta)
+
+    @staticmethod
+    def _get_meta(gwybrick):
+        """Get metadata from the brick
+
+        Args:
+            gwybrick (GwyBrick*):
+                GwyBrick object from Libgwyfile
+
+        Returns:
+            meta: Python dictionary with the brick metadata
+                  (see the constructor for its keys)
+
+        """
+
+        error = ffi.new("GwyfileError*")
+        errorp = ffi.new("GwyfileError**", error)
+        c_meta = ffi.new("PygwyfileBrickMeta*")
+
+        if not lib.pygwyfile_brick_get_meta(gwybrick, c_meta, errorp):
+            raise GwyfileErrorCMsg(errorp[0].message)
+
+        meta = {}
+        meta['xres'] = c_meta.xres
+        meta['yres'] = c_meta.yres
+        meta['zres'] = c_meta.zres
+        meta['xreal'] = c_meta.xreal
+        meta['yreal'] = c_meta.yreal
+        meta['zreal'] = c_meta.zreal
+        meta['xoff'] = c_meta.xoff
+        meta['yoff'] = c_meta.yoff
+        meta['zoff'] = c_meta.zoff
+        meta['si_unit_x'] = _decode_c_string(c_meta.si_unit_x)
+        meta['si_unit_y'] = _decode_c_string(c_meta.si_unit_y)
+        meta['si_unit_z'] = _decode_c_string(c_meta.si_unit_z)
+        meta['si_unit_w'] = _decode_c_string(c_meta.si_unit_w)
+
+        # unit strings are newly allocated by libgwyfile
+        lib.pygwyfile_brick_meta_free(c_meta)
+        return meta
+
+    @staticmethod
+    @timed('datafield_copy')
+    def _get_data(gwybrick, shape, owner=None):
+        """Get data array from <GwyBrick*> object
+
+        Args:
+            gwybrick (GwyBrick*):
+                GwyBrick object from Libgwyfile
+            shape (tuple of int): (zres, yres, xres) of the brick
+            owner (Gwyfile): Gwyfile instance containing gwybrick or None
+
+        Returns:
+            data (3D numpy array, float64):
+                read-only view of the data owned by gwybrick if owner
+                is given, otherwise a copy of the data
+
+        """
+
+        error = ffi.new("GwyfileError*")
+        errorp = ffi.new("GwyfileError**", error)
+
+        # libgwyfile returns a pointer to the data owned by gwybrick
+        datap = ffi.new("double**")
+
+        if lib.gwyfile_object_brick_get(gwybrick, errorp,
+                                        ffi.new("char[]", b'data'), datap,
+                                        ffi.NULL):
+            if owner is not None:
+                return owner.view_double_array(datap[0], shape)
+
+            size = shape[0] * shape[1] * shape[2]
+            data_buf = ffi.buffer(datap[0], size * ffi.sizeof("double"))
+            data_array = np.frombuffer(data_buf, dtype=np.float64,
+                                       count=size).reshape(shape)
+            add_bytes_copied(data_array.nbytes)
+            return data_array.copy()
+        else:
+            raise GwyfileErrorCMsg(errorp[0].message)
+
+    def to_gwy(self, keepalive=None):
+        """Get C representation of GwyBrick instance
+
+        Args:
+            keepalive (list): if None, the data are copied.
+                              Otherwise the data array is borrowed
+                              and appended to keepalive, which must be
+                              kept alive as long as the returned object.
+
+        Returns:
+            gwybrick (<cdata GwyfileObject*>):
+                A new GWY file GwyBrick object
+
+        """
+        zres, yres, xres = self.data.shape
+        args = [ffi.cast("int32_t", xres),
+                ffi.cast("int32_t", yres),
+                ffi.cast("int32_t", zres),
+                ffi.cast("double", self.meta['xreal']),
+                ffi.cast("double", self.meta['yreal']),
+                ffi.cast("double", self.meta['zreal'])]
+
+        args.extend(new_double_array_arg("data", self.data, keepalive))
+
+        for key in ('xoff', 'yoff', 'zoff'):
+            if self.meta[key] is not None:
+                args.append(ffi.new("char[]", key.encode('utf-8')))
+                args.append(ffi.cast("double", self.meta[key]))
+
+        for key in ('si_unit_x', 'si_unit_y', 'si_unit_z', 'si_unit_w'):
+            if self.meta[key] is not None:
+                args.append(ffi.new("char[]", key.encode('utf-8')))
+                args.append(ffi.new("char[]",
+                                    self.meta[key].encode('utf-8')))
+
+        args.append(ffi.NULL)
+
+        gwybrick = lib.gwyfile_object_new_brick(*args)
+        return gwybrick
+
+    def get_zslab(self, zfrom, zto):
+        """Get brick of levels zfrom, ..., zto - 1
+
+        The data are not copied, the returned brick views the data
+        of this brick. Its depth-wise size and offset are adjusted
+        to the slab.
+
+        Args:
+            zfrom (int): first level of the slab
+            zto (int): level after the last level of the slab
+
+        Returns:
+            brick (GwyBrick): brick of shape (zto - zfrom, yres, xres)
+        """
+        zres = self.meta['zres']
+        if not 0 <= zfrom < zto <= zres:
+            raise ValueError("Slab {:d}...{:d} is out of "
+                             "levels 0...{:d}".format(zfrom, zto, zres))
+
+        dz = self.meta['zreal'] / zres
+        meta = dict(self.meta)
+        meta['zres'] = zto - zfrom
+        meta['zreal'] = dz * (zto - zfrom)
+        meta['zoff'] = self.meta['zoff'] + dz * zfrom
+        return GwyBrick(self.data[zfrom:zto], meta=meta, title=self.title)
+
+    def get_xy_plane(self, level):
+        """Get xy plane of the level
+
+        The data are not copied, the returned array views the data
+        of this brick.
+
+        Args:
+            level (int): index of the level, negative values
+                         count from the last level
+
+        Returns:
+            data (2D numpy array, float64): array of shape (yres, xres)
+        """
+        zres = self.meta['zres']
+        if not -zres <= level < zres:
+            raise IndexError("Level {:d} is out of levels "
+                             "0...{:d}".format(level, zres - 1))
+        return self.data[level]
+
+    def nbytes(self):
+        """Get size of the data array in bytes"""
+        return self.data.nbytes
+
+    def __repr__(self):
+        return "<{} instance at {}.\n title: {},\n meta: {},\n " \
+            "data: {}>".format(
+                self.__class__.__name__,
+                hex(id(self)),
+                self.title.__repr__(),
+                self.meta.__repr__(),
+                self.data.__repr__())
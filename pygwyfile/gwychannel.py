@@ -3,6 +3,13 @@
     Classes:
         GwyChannel:   pythonic representation of gwyddion channel
 
+    Functions:
+        check_components: check names of components to read
+
+    Constants:
+        CHANNEL_COMPONENTS: names of channel parts which can be
+                            loaded selectively
+
 """
 from pygwyfile.gwyfile import GwyfileError
 from pygwyfile.gwyfile import Gwyfile
@@ -13,12 +20,18 @@ from pygwyfile.gwyfile import (new_gwyitem_bool,
                                new_gwyitem_string,
                                new_gwyitem_object)
 from pygwyfile.gwydatafield import GwyDataField
+from pygwyfile.stats import timed
 from pygwyfile.gwyselection import (GwyPointSelection,
                                     GwyPointerSelection,
                                     GwyLineSelection,
                                     GwyRectangleSelection,
                                     GwyEllipseSelection)
 
+# Channel parts which can be skipped while reading.
+# Title, visibility, palette, color range and mask color
+# are always read.
+CHANNEL_COMPONENTS = ('data', 'mask', 'show', 'selections')
+
 
 class GwyChannel:
     """Class for GwyChannel representation
@@ -26,6 +39,7 @@ class GwyChannel:
     Attributes:
         title (string): channel title, as shown in the data browser
         data (GwyDataField): channel data
+                             or None if the data was not loaded
         visible (boolean): whether the channel should be displayed in
                            a window when the file is loaded
         palette (string): name of the false color gradient used to
@@ -40,9 +54,13 @@ class GwyChannel:
         ellipse_selections (GwyEllipseSelection): ellipse selections
 
     Methods:
-        from_gwy(cls, gwyfile, channel_id): Get channel with id=channel_id
-                                            from Gwyfile object
-        to_gwy(self, gwycontainer, channel_id): Add the channel to gwycontainer
+        from_gwy(cls, gwyfile, channel_id, components=None, copy=True):
+                                Get channel with id=channel_id
+                                from Gwyfile object
+        to_gwy(self, gwycontainer, channel_id, keepalive=None):
+                                Add the channel to gwycontainer
+        nbytes(self): Get memory used by the channel data
+                      broken down by component
 
     """
 
@@ -68,10 +86,11 @@ class GwyChannel:
         self.mask_blue = mask_blue
         self.mask_alpha = mask_alpha
 
-        if not isinstance(data, GwyDataField):
-            raise TypeError("data must be an instance of GwyDataField")
-        else:
+        if data is None or isinstance(data, GwyDataField):
             self.data = data
+        else:
+            raise TypeError("data must be an instance of GwyDataField "
+                            "or None")
 
         if mask is None or isinstance(mask, GwyDataField):
             self.mask = mask
@@ -119,12 +138,19 @@ class GwyChannel:
                             "GwyEllipseSelection or None")
 
     @classmethod
-    def from_gwy(cls, gwyfile, channel_id):
+    @timed('decode')
+    def from_gwy(cls, gwyfile, channel_id, components=None, copy=True):
         """ Get channel with id=channel_id from Gwyfile object
 
         Args:
             gwyfile (Gwyfile): instance of Gwyfile class
             channel_id (int): id of the channel
+            components (iterable of strings): channel parts to read,
+                any of CHANNEL_COMPONENTS: 'data', 'mask', 'show',
+                'selections'. Skipped parts are set to None.
+                If None, all parts are read.
+            copy (boolean): if False, datafields are read-only views
+                of the data owned by gwyfile (see Gwyfile.view_double_array)
 
         Returns:
             GwyChannel instance.
@@ -133,24 +159,42 @@ class GwyChannel:
         if not isinstance(gwyfile, Gwyfile):
             raise TypeError("gwyfile must be an instance of Gwyfile")
 
+        components = check_components(components, CHANNEL_COMPONENTS)
+
         title = cls._get_title(gwyfile, channel_id)
-        data = cls._get_data(gwyfile, channel_id)
+        if 'data' in components:
+            data = cls._get_data(gwyfile, channel_id, copy=copy)
+        else:
+            data = None
         visible = cls._get_visibility(gwyfile, channel_id)
         palette = cls._get_palette(gwyfile, channel_id)
         range_type = cls._get_range_type(gwyfile, channel_id)
         range_min = cls._get_range_min(gwyfile, channel_id)
         range_max = cls._get_range_max(gwyfile, channel_id)
-        mask = cls._get_mask(gwyfile, channel_id)
+        if 'mask' in components:
+            mask = cls._get_mask(gwyfile, channel_id, copy=copy)
+        else:
+            mask = None
         mask_red = cls._get_mask_red(gwyfile, channel_id)
         mask_green = cls._get_mask_green(gwyfile, channel_id)
         mask_blue = cls._get_mask_blue(gwyfile, channel_id)
         mask_alpha = cls._get_mask_alpha(gwyfile, channel_id)
-        show = cls._get_show(gwyfile, channel_id)
-        point_sel = cls._get_point_sel(gwyfile, channel_id)
-        pointer_sel = cls._get_pointer_sel(gwyfile, channel_id)
-        line_sel = cls._get_line_sel(gwyfile, channel_id)
-        rectangle_sel = cls._get_rectangle_sel(gwyfile, channel_id)
-        ellipse_sel = cls._get_ellipse_sel(gwyfile, channel_id)
+        if 'show' in components:
+            show = cls._get_show(gwyfile, channel_id, copy=copy)
+        else:
+            show = None
+        if 'selections' in components:
+            point_sel = cls._get_point_sel(gwyfile, channel_id)
+            pointer_sel = cls._get_pointer_sel(gwyfile, channel_id)
+            line_sel = cls._get_line_sel(gwyfile, channel_id)
+            rectangle_sel = cls._get_rectangle_sel(gwyfile, channel_id)
+            ellipse_sel = cls._get_ellipse_sel(gwyfile, channel_id)
+        else:
+            point_sel = None
+            pointer_sel = None
+            line_sel = None
+            rectangle_sel = None
+            ellipse_sel = None
         return GwyChannel(title=title,
                           data=data,
                           visible=visible,
@@ -170,7 +214,8 @@ class GwyChannel:
                           rectangle_sel=rectangle_sel,
                           ellipse_sel=ellipse_sel)
 
-    def to_gwy(self, gwycontainer, channel_id):
+    @timed('construct')
+    def to_gwy(self, gwycontainer, channel_id, keepalive=None):
         """ Add the channel to gwycontainer
 
         Args:
@@ -178,25 +223,30 @@ class GwyChannel:
                 Gwyddion container object
             channel_id (int):
                 id of the channel in the gwycontainer
+            keepalive (list):
+                if None, data of datafields and selections are copied.
+                Otherwise the data are borrowed and appended
+                to keepalive, which must be kept alive as long as
+                gwycontainer (see GwyContainer.to_gwy)
         """
         self._add_title_to_gwy(gwycontainer, channel_id)
-        self._add_data_to_gwy(gwycontainer, channel_id)
+        self._add_data_to_gwy(gwycontainer, channel_id, keepalive)
         self._add_visibility_to_gwy(gwycontainer, channel_id)
         self._add_palette_to_gwy(gwycontainer, channel_id)
         self._add_range_type_to_gwy(gwycontainer, channel_id)
         self._add_range_min_to_gwy(gwycontainer, channel_id)
         self._add_range_max_to_gwy(gwycontainer, channel_id)
-        self._add_mask_to_gwy(gwycontainer, channel_id)
+        self._add_mask_to_gwy(gwycontainer, channel_id, keepalive)
         self._add_mask_red_to_gwy(gwycontainer, channel_id)
         self._add_mask_green_to_gwy(gwycontainer, channel_id)
         self._add_mask_blue_to_gwy(gwycontainer, channel_id)
         self._add_mask_alpha_to_gwy(gwycontainer, channel_id)
-        self._add_show_to_gwy(gwycontainer, channel_id)
-        self._add_point_sel_to_gwy(gwycontainer, channel_id)
-        self._add_pointer_sel_to_gwy(gwycontainer, channel_id)
-        self._add_line_sel_to_gwy(gwycontainer, channel_id)
-        self._add_rectangle_sel_to_gwy(gwycontainer, channel_id)
-        self._add_ellipse_sel_to_gwy(gwycontainer, channel_id)
+        self._add_show_to_gwy(gwycontainer, channel_id, keepalive)
+        self._add_point_sel_to_gwy(gwycontainer, channel_id, keepalive)
+        self._add_pointer_sel_to_gwy(gwycontainer, channel_id, keepalive)
+        self._add_line_sel_to_gwy(gwycontainer, channel_id, keepalive)
+        self._add_rectangle_sel_to_gwy(gwycontainer, channel_id, keepalive)
+        self._add_ellipse_sel_to_gwy(gwycontainer, channel_id, keepalive)
 
     @staticmethod
     def _get_title(gwyfile, channel_id):
@@ -547,12 +597,14 @@ class GwyChannel:
             return False
 
     @staticmethod
-    def _get_data(gwyfile, channel_id):
+    def _get_data(gwyfile, channel_id, copy=True):
         """ Get datafield from the channel with id=channel_id from Gwyfile
 
         Args:
             gwyfile (Gwyfile): Gwyfile object
             channel_id (int): id of the channel
+            copy (boolean): if False, the data is a read-only view
+                            of the data owned by gwyfile
 
         Returns:
             datafield (GwyDataField): channel datafield
@@ -562,25 +614,36 @@ class GwyChannel:
         key = "/{:d}/data".format(channel_id)
         gwydf = gwyfile.get_gwyitem_object(key)
         if gwydf:
-            return GwyDataField.from_gwy(gwydf)
+            return GwyDataField.from_gwy(gwydf,
+                                         owner=None if copy else gwyfile)
         else:
             raise GwyfileError(
                 "Channel with id:{:d} is not found".format(channel_id))
 
-    def _add_data_to_gwy(self, gwycontainer, channel_id):
+    def _add_data_to_gwy(self, gwycontainer, channel_id,
+                         keepalive=None):
         """ Add datafield from the channel to GwyContainer
 
         Args:
             gwycontainer (<GwyfileObject*>):
                 Gwyddion container
             channel_id (int): id of the channel in GwyContainer
+            keepalive (list): list of borrowed data or None to copy
+                              the data, see GwyContainer.to_gwy
 
         Returns:
             True if the item was actually added.
+
+        Raises:
+            ValueError: if the channel was read without 'data' component
         """
-        if isinstance(self.data, GwyDataField):
+        if self.data is None:
+            raise ValueError(
+                "Channel {!r} has no 'data' component and cannot be "
+                "written".format(self.title))
+        elif isinstance(self.data, GwyDataField):
             key = "/{:d}/data".format(channel_id)
-            gwydf = self.data.to_gwy()
+            gwydf = self.data.to_gwy(keepalive)
             gwyitem = new_gwyitem_object(key, gwydf)
             is_added = add_gwyitem_to_gwycontainer(gwyitem, gwycontainer)
             return is_added
@@ -588,12 +651,14 @@ class GwyChannel:
             raise TypeError("Datafield is of wrong type")
 
     @staticmethod
-    def _get_mask(gwyfile, channel_id):
+    def _get_mask(gwyfile, channel_id, copy=True):
         """ Get mask datafield from the channel with id=channel_id from Gwyfile
 
         Args:
             gwyfile (Gwyfile): Gwyfile object
             channel_id (int): id of the channel
+            copy (boolean): if False, the data is a read-only view
+                            of the data owned by gwyfile
 
         Returns:
            mask (GwyDataField): mask datafield or
@@ -603,17 +668,21 @@ class GwyChannel:
         key = "/{:d}/mask".format(channel_id)
         gwymask = gwyfile.get_gwyitem_object(key)
         if gwymask:
-            return GwyDataField.from_gwy(gwymask)
+            return GwyDataField.from_gwy(gwymask,
+                                         owner=None if copy else gwyfile)
         else:
             return None
 
-    def _add_mask_to_gwy(self, gwycontainer, channel_id):
+    def _add_mask_to_gwy(self, gwycontainer, channel_id,
+                         keepalive=None):
         """ Add mask datafield from the channel to GwyContainer
 
         Args:
             gwycontainer (<GwyfileObject*>):
                 Gwyddion container
             channel_id (int): id of the channel in GwyContainer
+            keepalive (list): list of borrowed data or None to copy
+                              the data, see GwyContainer.to_gwy
 
         Returns:
             True if the item was actually added.
@@ -622,7 +691,7 @@ class GwyChannel:
             return False
         elif isinstance(self.mask, GwyDataField):
             key = "/{:d}/mask".format(channel_id)
-            gwydf = self.mask.to_gwy()
+            gwydf = self.mask.to_gwy(keepalive)
             gwyitem = new_gwyitem_object(key, gwydf)
             is_added = add_gwyitem_to_gwycontainer(gwyitem, gwycontainer)
             return is_added
@@ -630,13 +699,15 @@ class GwyChannel:
             raise TypeError("Mask must be a GwyDataField instance or None")
 
     @staticmethod
-    def _get_show(gwyfile, channel_id):
+    def _get_show(gwyfile, channel_id, copy=True):
         """ Get presentation datafield from the channel with id=channel_id
             from Gwyfile
 
         Args:
             gwyfile (Gwyfile): Gwyfile object
             channel_id (int): id of the channel
+            copy (boolean): if False, the data is a read-only view
+                            of the data owned by gwyfile
 
         Returns:
             show (GwyDataField): presentation datafield or
@@ -646,17 +717,21 @@ class GwyChannel:
         key = "/{:d}/show".format(channel_id)
         gwyshow = gwyfile.get_gwyitem_object(key)
         if gwyshow:
-            return GwyDataField.from_gwy(gwyshow)
+            return GwyDataField.from_gwy(gwyshow,
+                                         owner=None if copy else gwyfile)
         else:
             return None
 
-    def _add_show_to_gwy(self, gwycontainer, channel_id):
+    def _add_show_to_gwy(self, gwycontainer, channel_id,
+                         keepalive=None):
         """ Add presentation datafield from the channel to GwyContainer
 
         Args:
             gwycontainer (<GwyfileObject*>):
                 Gwyddion container
             channel_id (int): id of the channel in GwyContainer
+            keepalive (list): list of borrowed data or None to copy
+                              the data, see GwyContainer.to_gwy
 
         Returns:
             True if the item was actually added.
@@ -665,7 +740,7 @@ class GwyChannel:
             return False
         elif isinstance(self.show, GwyDataField):
             key = "/{:d}/show".format(channel_id)
-            gwydf = self.show.to_gwy()
+            gwydf = self.show.to_gwy(keepalive)
             gwyitem = new_gwyitem_object(key, gwydf)
             is_added = add_gwyitem_to_gwycontainer(gwyitem, gwycontainer)
             return is_added
@@ -692,13 +767,16 @@ class GwyChannel:
         else:
             return None
 
-    def _add_point_sel_to_gwy(self, gwycontainer, channel_id):
+    def _add_point_sel_to_gwy(self, gwycontainer, channel_id,
+                              keepalive=None):
         """ Add point selections from the channel to GwyContainer
 
         Args:
             gwycontainer (<GwyfileObject*>):
                 Gwyddion container
             channel_id (int): id of the channel in GwyContainer
+            keepalive (list): list of borrowed data or None to copy
+                              the data, see GwyContainer.to_gwy
 
         Returns:
             True if the item was actually added.
@@ -707,7 +785,7 @@ class GwyChannel:
             return False
         elif isinstance(self.point_selections, GwyPointSelection):
             key = "/{:d}/select/point".format(channel_id)
-            gwysel = self.point_selections.to_gwy()
+            gwysel = self.point_selections.to_gwy(keepalive)
             gwyitem = new_gwyitem_object(key, gwysel)
             is_added = add_gwyitem_to_gwycontainer(gwyitem, gwycontainer)
             return is_added
@@ -735,13 +813,16 @@ class GwyChannel:
         else:
             return None
 
-    def _add_pointer_sel_to_gwy(self, gwycontainer, channel_id):
+    def _add_pointer_sel_to_gwy(self, gwycontainer, channel_id,
+                                keepalive=None):
         """ Add pointer selections from the channel to GwyContainer
 
         Args:
             gwycontainer (<GwyfileObject*>):
                 Gwyddion container
             channel_id (int): id of the channel in GwyContainer
+            keepalive (list): list of borrowed data or None to copy
+                              the data, see GwyContainer.to_gwy
 
         Returns:
             True if the item was actually added.
@@ -750,7 +831,7 @@ class GwyChannel:
             return False
         elif isinstance(self.pointer_selections, GwyPointerSelection):
             key = "/{:d}/select/pointer".format(channel_id)
-            gwysel = self.pointer_selections.to_gwy()
+            gwysel = self.pointer_selections.to_gwy(keepalive)
             gwyitem = new_gwyitem_object(key, gwysel)
             is_added = add_gwyitem_to_gwycontainer(gwyitem, gwycontainer)
             return is_added
@@ -778,13 +859,16 @@ class GwyChannel:
         else:
             return None
 
-    def _add_line_sel_to_gwy(self, gwycontainer, channel_id):
+    def _add_line_sel_to_gwy(self, gwycontainer, channel_id,
+                             keepalive=None):
         """ Add line selections from the channel to GwyContainer
 
         Args:
             gwycontainer (<GwyfileObject*>):
                 Gwyddion container
             channel_id (int): id of the channel in GwyContainer
+            keepalive (list): list of borrowed data or None to copy
+                              the data, see GwyContainer.to_gwy
 
         Returns:
             True if the item was actually added.
@@ -793,7 +877,7 @@ class GwyChannel:
             return False
         elif isinstance(self.line_selections, GwyLineSelection):
             key = "/{:d}/select/line".format(channel_id)
-            gwysel = self.line_selections.to_gwy()
+            gwysel = self.line_selections.to_gwy(keepalive)
             gwyitem = new_gwyitem_object(key, gwysel)
             is_added = add_gwyitem_to_gwycontainer(gwyitem, gwycontainer)
             return is_added
@@ -821,13 +905,16 @@ class GwyChannel:
         else:
             return None
 
-    def _add_rectangle_sel_to_gwy(self, gwycontainer, channel_id):
+    def _add_rectangle_sel_to_gwy(self, gwycontainer, channel_id,
+                                  keepalive=None):
         """ Add rectangle selections from the channel to GwyContainer
 
         Args:
             gwycontainer (<GwyfileObject*>):
                 Gwyddion container
             channel_id (int): id of the channel in GwyContainer
+            keepalive (list): list of borrowed data or None to copy
+                              the data, see GwyContainer.to_gwy
 
         Returns:
             True if the item was actually added.
@@ -836,7 +923,7 @@ class GwyChannel:
             return False
         elif isinstance(self.rectangle_selections, GwyRectangleSelection):
             key = "/{:d}/select/rectangle".format(channel_id)
-            gwysel = self.rectangle_selections.to_gwy()
+            gwysel = self.rectangle_selections.to_gwy(keepalive)
             gwyitem = new_gwyitem_object(key, gwysel)
             is_added = add_gwyitem_to_gwycontainer(gwyitem, gwycontainer)
             return is_added
@@ -864,13 +951,16 @@ class GwyChannel:
         else:
             return None
 
-    def _add_ellipse_sel_to_gwy(self, gwycontainer, channel_id):
+    def _add_ellipse_sel_to_gwy(self, gwycontainer, channel_id,
+                                keepalive=None):
         """ Add ellipse selections from the channel to GwyContainer
 
         Args:
             gwycontainer (<GwyfileObject*>):
                 Gwyddion container
             channel_id (int): id of the channel in GwyContainer
+            keepalive (list): list of borrowed data or None to copy
+                              the data, see GwyContainer.to_gwy
 
         Returns:
             True if the item was actually added.
@@ -879,7 +969,7 @@ class GwyChannel:
             return False
         elif isinstance(self.ellipse_selections, GwyEllipseSelection):
             key = "/{:d}/select/ellipse".format(channel_id)
-            gwysel = self.ellipse_selections.to_gwy()
+            gwysel = self.ellipse_selections.to_gwy(keepalive)
             gwyitem = new_gwyitem_object(key, gwysel)
             is_added = add_gwyitem_to_gwycontainer(gwyitem, gwycontainer)
             return is_added
@@ -887,8 +977,63 @@ class GwyChannel:
             raise TypeError("ellipse_selections must be"
                             "a GwyEllipseSelection instance or None")
 
+    def nbytes(self):
+        """Get memory used by the channel data broken down by component
+
+        Returns:
+            dictionary: 'data', 'mask', 'show' and 'selections'
+                        -> size in bytes.
+                        Components which are None have zero size.
+        """
+        selections = (self.point_selections,
+                      self.pointer_selections,
+                      self.line_selections,
+                      self.rectangle_selections,
+                      self.ellipse_selections)
+        return {'data': _get_nbytes(self.data),
+                'mask': _get_nbytes(self.mask),
+                'show': _get_nbytes(self.show),
+                'selections': sum(_get_nbytes(selection)
+                                  for selection in selections)}
+
     def __repr__(self):
         return "<{} instance at {}. Title: {}>".format(
             self.__class__.__name__,
             hex(id(self)),
             self.title)
+
+
+def check_components(components, allowed):
+    """Check names of components to read
+
+    Args:
+        components (iterable of strings or string): component names
+                                                    or None for all
+        allowed (tuple of strings): all valid component names
+
+    Returns:
+        components (frozenset of strings): component names
+
+    Raises:
+        ValueError: if some of the components is unknown
+    """
+    if components is None:
+        return frozenset(allowed)
+    elif isinstance(components, str):
+        components = (components,)
+
+    components = frozenset(components)
+    unknown = components.difference(allowed)
+    if unknown:
+        raise ValueError("Unknown components: {}. "
+                         "Valid components are: {}".format(
+                             ", ".join(sorted(unknown)),
+                             ", ".join(allowed)))
+    return components
+
+
+def _get_nbytes(value):
+    """Get size of datafield or selection, zero if it is None"""
+    if value is None:
+        return 0
+    return value.nbytes()
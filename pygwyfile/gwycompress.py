@@ -0,0 +1,288 @@
+""" Compressed gwy files
+
+    Gwy files compressed by gzip or zstd (.gwy.gz, .gwy.zst) are
+    read and written without temporary files. The data are streamed
+    between libgwyfile and the (de)compressor through a pipe, which
+    is served by a helper thread, so (de)compression overlaps with
+    parsing or serialization and the whole file is never held in memory
+    in both forms.
+
+    Compression of read files is detected by their magic header,
+    compression of written files is chosen by the extension of their
+    names unless it is given explicitly.
+
+    zstd requires the optional zstandard package.
+
+    Functions:
+        detect_compression(magic): Get compression of data
+                                   by its magic header
+        get_compression(filename): Get compression by extension
+                                   of the file name
+        peek_magic(fileobj): Get magic header of file object
+                             without consuming it
+        open_decompressed(fileobj, compression):
+                             Open stream of decompressed data
+        read_decompressed(fileobj, compression, read_fd):
+                             Read decompressed data from pipe
+        write_compressed(fileobj, compression, level, write_fd):
+                             Compress data written to pipe
+
+    Constants:
+        COMPRESSIONS: names of supported compressions
+        DEFAULT_LEVELS: compression -> default compression level
+        MAGIC_SIZE: length of data sufficient to detect compression
+
+"""
+import contextvars
+import gzip
+import io
+import os
+import shutil
+import threading
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIONS = ('gzip', 'zstd')
+
+DEFAULT_LEVELS = {'gzip': 6, 'zstd': 3}
+
+# Magic headers of compressed data
+_MAGICS = {'gzip': b"\x1f\x8b",
+           'zstd': b"\x28\xb5\x2f\xfd"}
+
+# Length of data sufficient to detect compression
+MAGIC_SIZE = max(len(magic) for magic in _MAGICS.values())
+
+# Extensions of compressed file names
+_EXTENSIONS = {'.gz': 'gzip',
+               '.gzip': 'gzip',
+               '.zst': 'zstd',
+               '.zstd': 'zstd'}
+
+# Size of chunks passed through the pipe
+_CHUNK_SIZE = 2**20
+
+
+def detect_compression(magic):
+    """Get compression of data by its magic header
+
+    Args:
+        magic (bytes): at least MAGIC_SIZE first bytes of the data
+
+    Returns:
+        compression (string): one of COMPRESSIONS or None
+                              if the data are not compressed
+    """
+    for compression, compression_magic in _MAGICS.items():
+        if magic[:len(compression_magic)] == compression_magic:
+            return compression
+    return None
+
+
+def get_compression(filename):
+    """Get compression by extension of the file name
+
+    Args:
+        filename (string): name of the file, e.g. "scan.gwy.gz"
+
+    Returns:
+        compression (string): one of COMPRESSIONS or None
+                              if the extension is not known
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    return _EXTENSIONS.get(extension)
+
+
+def peek_magic(fileobj):
+    """Get magic header of file object without consuming it
+
+    Args:
+        fileobj (file object): binary file object
+
+    Returns:
+        (magic, stream): (bytes) first bytes of the data,
+                         (file object) stream reading the data
+                         from its start, fileobj itself if it is
+                         seekable or supports peek
+    """
+    if fileobj.seekable():
+        position = fileobj.tell()
+        magic = fileobj.read(MAGIC_SIZE)
+        fileobj.seek(position)
+        return magic, fileobj
+    if hasattr(fileobj, 'peek'):
+        return fileobj.peek(MAGIC_SIZE)[:MAGIC_SIZE], fileobj
+    magic = fileobj.read(MAGIC_SIZE)
+    return magic, io.BufferedReader(_PrefixedReader(magic, fileobj))
+
+
+def read_decompressed(fileobj, compression, read_fd):
+    """Read decompressed data from pipe
+
+    Data of fileobj are decompressed by a helper thread
+    into a pipe, whose read end is passed to read_fd.
+
+    Args:
+        fileobj (file object): compressed binary file object
+        compression (string): one of COMPRESSIONS
+        read_fd (callable): function reading the data from file
+                            descriptor, e.g. Gwyfile.from_fd.
+                            It must not close the descriptor.
+
+    Returns:
+        value returned by read_fd
+    """
+    reader = open_decompressed(fileobj, compression)
+    pipe_read_fd, pipe_write_fd = os.pipe()
+    errors = []
+    thread = threading.Thread(target=_decompress_to_fd,
+                              args=(reader, pipe_write_fd, errors),
+                              daemon=True)
+    thread.start()
+    try:
+        return read_fd(pipe_read_fd)
+    finally:
+        # stops the thread if read_fd has not read all data
+        os.close(pipe_read_fd)
+        thread.join()
+        reader.close()
+        if errors:
+            raise errors[0]
+
+
+def write_compressed(fileobj, compression, level, write_fd):
+    """Compress data written to pipe
+
+    write_fd is called by a helper thread with the write end
+    of a pipe, the data are compressed into fileobj while they are
+    being written.
+
+    Args:
+        fileobj (file object): binary file object for compressed data
+        compression (string): one of COMPRESSIONS
+        level (int): compression level or None for the default level
+        write_fd (callable): function writing the data to file
+                             descriptor, e.g. partial of
+                             write_gwycontainer_to_fd.
+                             It must not close the descriptor.
+    """
+    writer = _open_compressed(fileobj, compression, level)
+    pipe_read_fd, pipe_write_fd = os.pipe()
+    errors = []
+    # statistics of pygwyfile.stats are collected in the thread
+    context = contextvars.copy_context()
+    thread = threading.Thread(target=context.run,
+                              args=(_write_to_fd, write_fd,
+                                    pipe_write_fd, errors),
+                              daemon=True)
+    thread.start()
+    try:
+        with open(pipe_read_fd, 'rb') as pipe, writer:
+            shutil.copyfileobj(pipe, writer, _CHUNK_SIZE)
+    except BaseException:
+        # the thread stops on the closed pipe
+        thread.join()
+        raise
+    thread.join()
+    if errors:
+        raise errors[0]
+
+
+def open_decompressed(fileobj, compression):
+    """Open stream of decompressed data of fileobj
+
+    Args:
+        fileobj (file object): compressed binary file object
+        compression (string): one of COMPRESSIONS
+
+    Returns:
+        binary file object, closing it does not close fileobj
+    """
+    _check_compression(compression)
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=fileobj, mode='rb')
+    return zstandard.ZstdDecompressor().stream_reader(fileobj,
+                                                      closefd=False)
+
+
+def _check_compression(compression):
+    """Raise exception if compression is not supported"""
+    if compression not in COMPRESSIONS:
+        raise ValueError("Unknown compression {}".format(compression))
+    if compression == 'zstd' and zstandard is None:
+        raise ImportError("zstd compression requires zstandard package")
+
+
+def _open_compressed(fileobj, compression, level):
+    """Open stream compressing data into fileobj
+
+    Returns:
+        binary file object, closing it finishes the compressed data
+        and does not close fileobj
+    """
+    _check_compression(compression)
+    if level is None:
+        level = DEFAULT_LEVELS[compression]
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=fileobj, mode='wb',
+                             compresslevel=level)
+    compressor = zstandard.ZstdCompressor(level=level)
+    return compressor.stream_writer(fileobj, closefd=False)
+
+
+def _decompress_to_fd(reader, fd, errors):
+    """Copy decompressed data to fd and close it
+
+    Exceptions are appended to errors, except for the closed pipe.
+    """
+    try:
+        while True:
+            chunk = reader.read(_CHUNK_SIZE)
+            if not chunk:
+                break
+            view = memoryview(chunk)
+            while view:
+                view = view[os.write(fd, view):]
+    except BrokenPipeError:
+        # the reader has stopped reading
+        pass
+    except Exception as error:
+        errors.append(error)
+    finally:
+        os.close(fd)
+
+
+def _write_to_fd(write_fd, fd, errors):
+    """Call write_fd with fd and close it
+
+    Exceptions are appended to errors.
+    """
+    try:
+        write_fd(fd)
+    except Exception as error:
+        errors.append(error)
+    finally:
+        os.close(fd)
+
+
+class _PrefixedReader(io.RawIOBase):
+    """Raw stream reading prefix and then the rest of file object"""
+
+    def __init__(self, prefix, fileobj):
+        self._prefix = prefix
+        self._fileobj = fileobj
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._prefix:
+            data = self._prefix[:len(buffer)]
+            self._prefix = self._prefix[len(data):]
+        else:
+            data = self._fileobj.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
@@ -4,25 +4,46 @@
         GwyContainer: class for gwyddion container representation
 
     Functions:
-        read_gwyfile: create GwyContainer instance from gwy file
+        read_gwyfile: create GwyContainer instance from gwy file,
+                      its contents, file object or file descriptor
+        aread_gwyfile: coroutine version of read_gwyfile
+
+    Constants:
+        COMPONENTS: names of container parts which can be
+                    loaded selectively
 
 """
+import functools
 import os.path
-import weakref
+import re
 
 from pygwyfile._libgwyfile import ffi, lib
-from pygwyfile.gwyfile import Gwyfile, new_gwycontainer
+from pygwyfile.gwyfile import Gwyfile, new_gwycontainer, add_keepalive
 from pygwyfile.gwyfile import add_gwyitem_to_gwycontainer
-from pygwyfile.gwyfile import write_gwycontainer_to_gwyfile
+from pygwyfile.gwyfile import get_gwycontainer_size
+from pygwyfile.gwyfile import (write_gwycontainer_to_gwyfile,
+                               write_gwycontainer_to_bytes,
+                               write_gwycontainer_to_fileobj,
+                               write_gwycontainer_to_compressed_fileobj)
 from pygwyfile.gwyfile import (new_gwyitem_bool,
                                new_gwyitem_string,
                                new_gwyitem_object)
+from pygwyfile.gwyasync import run_blocking
+from pygwyfile.gwybrick import GwyBrick
+from pygwyfile.gwycompress import get_compression
 from pygwyfile.gwychannel import GwyChannel
+from pygwyfile.gwychannel import CHANNEL_COMPONENTS, check_components
 from pygwyfile.gwygraph import GwyGraphModel
+from pygwyfile.gwylazy import GwyDecodedCache, GwyLazySequence
+from pygwyfile.gwyspectra import GwySpectra
+from pygwyfile.gwysurface import GwySurface
+from pygwyfile.stats import timed
+
+# Parts of the container which can be skipped while reading
+COMPONENTS = CHANNEL_COMPONENTS + ('graphs', 'volumes', 'surfaces',
+                                   'spectra')
 
-# weak key dictionary to keep alive gwygraphs objects
-# in gwycontainer
-_container_graphs_dic = weakref.WeakKeyDictionary()
+_SURFACE_KEY_RE = re.compile(r'^/xyz/(\d+)$')
 
 
 class GwyContainer:
@@ -31,30 +52,64 @@ class GwyContainer:
     Attributes:
         channels: list of GwyChannel instances
                   All channels in Gwyfile instance
+                  (GwyLazySequence if the container is lazy)
 
         graphs: list of GwyGraphModel instances
                 All graphs in Gwyfile instance
+                (GwyLazySequence if the container is lazy)
+
+        volumes: list of GwyBrick instances
+                 All volume data in Gwyfile instance
+                 (GwyLazySequence if the container is lazy)
+
+        surfaces: list of GwySurface instances
+                  All XYZ data in Gwyfile instance
+                  (GwyLazySequence if the container is lazy)
+
+        spectra: list of GwySpectra instances
+                 All point spectroscopy data in Gwyfile instance
+                 (GwyLazySequence if the container is lazy)
 
     Methods:
-        from_gwy(cls, gwyfile): create GwyContainer instance
+        from_gwy(cls, gwyfile, lazy=False, cache_size=None,
+                 channels=None, components=None, copy=True):
+                                create GwyContainer instance
                                 from Gwyfile object
-        to_gwy(self): Create a new GWY container object with data
-                      from this container
-        to_gwyfile(self, filename=None): Write this container to gwy file.
+        to_gwy(self, borrow=False): Create a new GWY container object
+                                    with data from this container
+        to_gwyfile(self, filename=None, compression=None, level=None):
+                                Write this container to gwy file,
+                                optionally compressed.
                                 The file will be overwritten if it exists.
+        to_bytes(self): Serialize this container to contents of gwy file
+        to_fileobj(self, fileobj): Write this container to
+                                   binary file object
+        ato_gwyfile(self, filename=None, compression=None, level=None):
+                                Coroutine version of to_gwyfile
+        ato_bytes(self): Coroutine version of to_bytes
+        nbytes(self): Get memory used by the container data
+                      broken down by component
+        serialized_size(self): Get size of the serialized container
     """
 
-    def __init__(self, filename=None, channels=None, graphs=None):
+    def __init__(self, filename=None, channels=None, graphs=None,
+                 volumes=None, surfaces=None, spectra=None):
         """
         Args:
             filename (string): basename of the file the GwyContainer
                                is currently associated with.
             channels: list of GwyChannel instances
             graphs:   list of GwyGraphModel instances
+            volumes:  list of GwyBrick instances
+            surfaces: list of GwySurface instances
+            spectra:  list of GwySpectra instances
         """
         self.filename = filename
         self.channels = []
         self.graphs = []
+        self.volumes = []
+        self.surfaces = []
+        self.spectra = []
 
         if channels:
             for channel in channels:
@@ -72,12 +127,58 @@ class GwyContainer:
                     raise TypeError("graphs must be a list of "
                                     "GwyGraphModel instances")
 
+        if volumes:
+            for volume in volumes:
+                if isinstance(volume, GwyBrick):
+                    self.volumes.append(volume)
+                else:
+                    raise TypeError("volumes must be a list of "
+                                    "GwyBrick instances")
+
+        if surfaces:
+            for surface in surfaces:
+                if isinstance(surface, GwySurface):
+                    self.surfaces.append(surface)
+                else:
+                    raise TypeError("surfaces must be a list of "
+                                    "GwySurface instances")
+
+        if spectra:
+            for item in spectra:
+                if isinstance(item, GwySpectra):
+                    self.spectra.append(item)
+                else:
+                    raise TypeError("spectra must be a list of "
+                                    "GwySpectra instances")
+
     @classmethod
-    def from_gwy(cls, gwyfile):
+    @timed('decode')
+    def from_gwy(cls, gwyfile, lazy=False, cache_size=None,
+                 channels=None, components=None, copy=True):
         """ Create GwyContainer instance from Gwyfile object
 
         Args:
             gwyfile: instance of Gwyfile object
+            lazy (boolean): if True, channels, graphs, volumes,
+                            surfaces and spectra are decoded only when
+                            they are accessed
+            cache_size (int): byte budget for decoded channels, graphs,
+                              volumes, surfaces and spectra of the lazy
+                              container or None for unlimited cache.
+                              Least recently used ones are evicted
+                              and decoded again on the next access.
+            channels (list of int or string): ids or titles of channels
+                              to read or None for all channels
+            components (iterable of strings): parts to read,
+                              any of COMPONENTS: 'data', 'mask', 'show',
+                              'selections', 'graphs', 'volumes',
+                              'surfaces', 'spectra'. If None, all parts
+                              are read.
+            copy (boolean): if False, channel datafields, graph curves,
+                              volume bricks, surfaces and coordinates
+                              of spectra are read-only views of the data
+                              owned by gwyfile, which is kept alive
+                              while they exist
 
         Retruns:
             container: instance of GwyContainer class
@@ -86,61 +187,300 @@ class GwyContainer:
         if not isinstance(gwyfile, Gwyfile):
             raise TypeError("gwyfile must be an instance of "
                             "Gwyfile class")
+
+        components = check_components(components, COMPONENTS)
+        channel_components = components.intersection(CHANNEL_COMPONENTS)
+
+        if lazy:
+            return cls._from_gwy_lazy(gwyfile, cache_size,
+                                      channels, components, copy)
         else:
             filename = cls._get_filename(gwyfile)
-            channels = cls._dump_channels(gwyfile)
-            graphs = cls._dump_graphs(gwyfile)
+            channels = cls._dump_channels(gwyfile,
+                                          channels=channels,
+                                          components=channel_components,
+                                          copy=copy)
+            if 'graphs' in components:
+                graphs = cls._dump_graphs(gwyfile, copy=copy)
+            else:
+                graphs = []
+            if 'volumes' in components:
+                volumes = cls._dump_volumes(gwyfile, copy=copy)
+            else:
+                volumes = []
+            if 'surfaces' in components:
+                surfaces = cls._dump_surfaces(gwyfile, copy=copy)
+            else:
+                surfaces = []
+            if 'spectra' in components:
+                spectra = cls._dump_spectra(gwyfile, copy=copy)
+            else:
+                spectra = []
             return GwyContainer(filename=filename,
                                 channels=channels,
-                                graphs=graphs)
+                                graphs=graphs,
+                                volumes=volumes,
+                                surfaces=surfaces,
+                                spectra=spectra)
 
-    def to_gwy(self):
+    @classmethod
+    def _from_gwy_lazy(cls, gwyfile, cache_size,
+                       channels=None, components=None, copy=True):
+        """ Create GwyContainer instance with lazy channels, graphs,
+            volumes, surfaces and spectra
+
+        Args:
+            gwyfile: instance of Gwyfile object
+            cache_size (int): byte budget for decoded channels, graphs,
+                              volumes, surfaces and spectra or None for
+                              unlimited cache
+            channels (list of int or string): ids or titles of channels
+                                              or None for all channels
+            components (iterable of strings): parts to read
+                                              or None for all parts
+            copy (boolean): if False, channel datafields, graph curves,
+                            volume bricks, surfaces and coordinates
+                            of spectra are read-only views of the data
+                            owned by gwyfile
+
+        Returns:
+            container: instance of GwyContainer class
+                       with GwyLazySequence channels, graphs, volumes,
+                       surfaces and spectra
+
+        """
+        components = check_components(components, COMPONENTS)
+        channel_components = components.intersection(CHANNEL_COMPONENTS)
+
+        filename = cls._get_filename(gwyfile)
+        container = GwyContainer(filename=filename)
+
+        if 'graphs' in components:
+            graph_ids = cls._get_graph_ids(gwyfile)
+        else:
+            graph_ids = []
+
+        if 'volumes' in components:
+            volume_ids = cls._get_volume_ids(gwyfile)
+        else:
+            volume_ids = []
+
+        if 'surfaces' in components:
+            surface_ids = cls._get_surface_ids(gwyfile)
+        else:
+            surface_ids = []
+
+        if 'spectra' in components:
+            spectra_ids = cls._get_spectra_ids(gwyfile)
+        else:
+            spectra_ids = []
+
+        # all parts share the byte budget
+        cache = GwyDecodedCache(max_bytes=cache_size)
+        container.channels = GwyLazySequence(
+            cls._select_channel_ids(gwyfile, channels),
+            functools.partial(GwyChannel.from_gwy, gwyfile,
+                              components=channel_components,
+                              copy=copy),
+            cache)
+        container.graphs = GwyLazySequence(
+            graph_ids,
+            functools.partial(cls._get_graph, gwyfile, copy=copy),
+            cache)
+        container.volumes = GwyLazySequence(
+            volume_ids,
+            functools.partial(cls._get_volume, gwyfile, copy=copy),
+            cache)
+        container.surfaces = GwyLazySequence(
+            surface_ids,
+            functools.partial(cls._get_surface, gwyfile, copy=copy),
+            cache)
+        container.spectra = GwyLazySequence(
+            spectra_ids,
+            functools.partial(cls._get_spectra, gwyfile, copy=copy),
+            cache)
+        return container
+
+    @timed('construct')
+    def to_gwy(self, borrow=False):
         """ Create a new GWY container object with data from this container
 
+        Args:
+            borrow (boolean): if False, the data of datafields, curves,
+                              selections, bricks, surfaces and spectra
+                              are copied to the new object.
+                              If True, the new object references numpy
+                              arrays of this container and keeps them
+                              alive. The arrays must not be changed
+                              while the object is used.
+
         Returns:
             gwycontainer (<GwyfileObject*>):
                 The newly created Gwy container object
         """
         gwycontainer = new_gwycontainer()
-        _container_graphs_dic[gwycontainer] = []
+        keepalive = [] if borrow else None
 
-        self._add_channels_to_gwycontainer(gwycontainer)
-        self._add_graphs_to_gwycontainer(gwycontainer)
+        self._add_channels_to_gwycontainer(gwycontainer, keepalive)
+        self._add_graphs_to_gwycontainer(gwycontainer, keepalive)
+        self._add_volumes_to_gwycontainer(gwycontainer, keepalive)
+        self._add_surfaces_to_gwycontainer(gwycontainer, keepalive)
+        self._add_spectra_to_gwycontainer(gwycontainer, keepalive)
 
+        if keepalive:
+            add_keepalive(gwycontainer, keepalive)
         return gwycontainer
 
-    def _add_channels_to_gwycontainer(self, gwycontainer):
+    def _add_channels_to_gwycontainer(self, gwycontainer, keepalive=None):
         """ Convert channels to gwychannels and add them to gwycontainer
 
         Args:
             gwycontainer (<GwyfileObject*>)
+            keepalive (list): list of borrowed data or None to copy data
+
+        Raises:
+            ValueError: if a channel was read without 'data' component
 
         """
         for channel_id, channel in enumerate(self.channels):
-            channel.to_gwy(gwycontainer, channel_id)
+            if channel.data is None:
+                raise ValueError(
+                    "Channel {:d} ({!r}) has no 'data' component and "
+                    "cannot be written".format(channel_id, channel.title))
+        for channel_id, channel in enumerate(self.channels):
+            channel.to_gwy(gwycontainer, channel_id, keepalive)
 
-    def _add_graphs_to_gwycontainer(self, gwycontainer):
+    def _add_graphs_to_gwycontainer(self, gwycontainer, keepalive=None):
         """ Convert graphs to gwygraphmodels and them to gwycontainer
 
         Args:
             gwycontainer (<GwyfileObject*>)
+            keepalive (list): list of borrowed data or None to copy data
 
         """
         for graph_id, graph in enumerate(self.graphs):
-            gwygraph = graph.to_gwy()
+            gwygraph = graph.to_gwy(keepalive)
 
             # graph enumeration in gwyddion starts with 1
             key = "/0/graph/graph/{:d}".format(graph_id + 1)
             gwyitem = new_gwyitem_object(key, gwygraph)
 
             if add_gwyitem_to_gwycontainer(gwyitem, gwycontainer):
-                # gwycontainer object keeps alive gwygraph objects
-                _container_graphs_dic[gwycontainer].append(gwygraph)
-
                 self._add_graph_visibility_to_gwycontainer(graph,
                                                            gwycontainer,
                                                            key)
 
+    def _add_volumes_to_gwycontainer(self, gwycontainer, keepalive=None):
+        """ Convert volumes to gwybricks and add them to gwycontainer
+
+        Args:
+            gwycontainer (<GwyfileObject*>)
+            keepalive (list): list of borrowed data or None to copy data
+
+        """
+        for volume_id, volume in enumerate(self.volumes):
+            self._add_volume_to_gwycontainer(volume, gwycontainer,
+                                             volume_id, keepalive)
+
+    @staticmethod
+    def _add_volume_to_gwycontainer(volume, gwycontainer, volume_id,
+                                    keepalive=None):
+        """ Add brick and title of the volume to gwycontainer
+
+        Args:
+            volume (GwyBrick instance):
+            gwycontainer (<GwyfileObject*>)
+            volume_id (int): id of the volume in gwycontainer
+            keepalive (list): list of borrowed data or None to copy data
+
+        """
+        gwybrick = volume.to_gwy(keepalive)
+        key = "/brick/{:d}".format(volume_id)
+        gwyitem = new_gwyitem_object(key, gwybrick)
+
+        if add_gwyitem_to_gwycontainer(gwyitem, gwycontainer):
+            GwyContainer._add_title_to_gwycontainer(volume.title,
+                                                    gwycontainer, key)
+
+    def _add_surfaces_to_gwycontainer(self, gwycontainer, keepalive=None):
+        """ Convert surfaces to gwysurfaces and add them to gwycontainer
+
+        Args:
+            gwycontainer (<GwyfileObject*>)
+            keepalive (list): list of borrowed data or None to copy data
+
+        """
+        for surface_id, surface in enumerate(self.surfaces):
+            self._add_surface_to_gwycontainer(surface, gwycontainer,
+                                              surface_id, keepalive)
+
+    @staticmethod
+    def _add_surface_to_gwycontainer(surface, gwycontainer, surface_id,
+                                     keepalive=None):
+        """ Add surface and its title to gwycontainer
+
+        Args:
+            surface (GwySurface instance):
+            gwycontainer (<GwyfileObject*>)
+            surface_id (int): id of the surface in gwycontainer
+            keepalive (list): list of borrowed data or None to copy data
+
+        """
+        gwysurface = surface.to_gwy(keepalive)
+        key = "/xyz/{:d}".format(surface_id)
+        gwyitem = new_gwyitem_object(key, gwysurface)
+
+        if add_gwyitem_to_gwycontainer(gwyitem, gwycontainer):
+            GwyContainer._add_title_to_gwycontainer(surface.title,
+                                                    gwycontainer, key)
+
+    def _add_spectra_to_gwycontainer(self, gwycontainer, keepalive=None):
+        """ Convert spectra to gwyspectra and add them to gwycontainer
+
+        Args:
+            gwycontainer (<GwyfileObject*>)
+            keepalive (list): list of borrowed data or None to copy data
+
+        """
+        for spectra_id, spectra in enumerate(self.spectra):
+            self._add_spectra_item_to_gwycontainer(spectra, gwycontainer,
+                                                   spectra_id, keepalive)
+
+    @staticmethod
+    def _add_spectra_item_to_gwycontainer(spectra, gwycontainer, spectra_id,
+                                          keepalive=None):
+        """ Add spectra to gwycontainer
+
+        Title of the spectra is stored in the GwySpectra object itself.
+
+        Args:
+            spectra (GwySpectra instance):
+            gwycontainer (<GwyfileObject*>)
+            spectra_id (int): id of the spectra in gwycontainer
+            keepalive (list): list of borrowed data or None to copy data
+
+        """
+        gwyspectra = spectra.to_gwy(keepalive)
+        key = "/sps/{:d}".format(spectra_id)
+        gwyitem = new_gwyitem_object(key, gwyspectra)
+        add_gwyitem_to_gwycontainer(gwyitem, gwycontainer)
+
+    @staticmethod
+    def _add_title_to_gwycontainer(title, gwycontainer, key):
+        """ Add title GWY data item of volume or surface to gwycontainer
+
+        Args:
+            title (string): the title or None, which is not added
+            gwycontainer (<GwyfileObject*>)
+            key (string): name of the object in gwycontainer
+                          (e.g. "/brick/0")
+
+        """
+        if title is not None:
+            key_title = '/'.join((key, 'title'))
+            gwyitem_title = new_gwyitem_string(key_title, title)
+            add_gwyitem_to_gwycontainer(gwyitem_title, gwycontainer)
+
     @staticmethod
     def _add_graph_visibility_to_gwycontainer(graph, gwycontainer, key):
         """ Add graph visibility GWY data item to gwycontainer
@@ -158,22 +498,78 @@ class GwyContainer:
                                                graph.visible)
             add_gwyitem_to_gwycontainer(gwyitem_visible, gwycontainer)
 
-    def to_gwyfile(self, filename=None):
+    def to_gwyfile(self, filename=None, compression=None, level=None):
         """ Write this container to gwy file.
             The file will be overwritten if it exists.
 
+        Data arrays are written without intermediate copies,
+        they must not be changed until the method returns.
+
         Args:
             filename (string): name of the gwy file or None.
                                If None, self.filename attribute is used
+            compression (string): 'gzip' or 'zstd' to compress the file
+                               or None to choose compression by extension
+                               of filename (.gz or .zst)
+            level (int): compression level or None for the default level
         """
         if filename is None:
             filename = self.filename
+        if compression is None:
+            compression = get_compression(filename)
 
-        gwycontainer = self.to_gwy()
+        gwycontainer = self.to_gwy(borrow=True)
         abspath = os.path.abspath(filename)
         gwyitem = new_gwyitem_string("/filename", abspath)
         add_gwyitem_to_gwycontainer(gwyitem, gwycontainer)
-        write_gwycontainer_to_gwyfile(gwycontainer, filename)
+        if compression is None:
+            write_gwycontainer_to_gwyfile(gwycontainer, filename)
+        else:
+            with open(filename, 'wb') as fileobj:
+                write_gwycontainer_to_compressed_fileobj(
+                    gwycontainer, fileobj, compression, level)
+
+    def to_bytes(self):
+        """Serialize this container to contents of gwy file
+
+        Returns:
+            data (bytes): contents of gwy file
+        """
+        gwycontainer = self.to_gwy(borrow=True)
+        return write_gwycontainer_to_bytes(gwycontainer)
+
+    def to_fileobj(self, fileobj):
+        """Write this container to binary file object
+
+        Args:
+            fileobj (file object): binary file object (e.g. io.BytesIO
+                                   or file opened in 'wb' mode)
+        """
+        gwycontainer = self.to_gwy(borrow=True)
+        write_gwycontainer_to_fileobj(gwycontainer, fileobj)
+
+    async def ato_gwyfile(self, filename=None, compression=None,
+                          level=None):
+        """Write this container to gwy file without blocking the event loop
+
+        Serialization and writing run in the executor of gwyasync module.
+
+        Args:
+            filename (string): name of the gwy file or None.
+                               If None, self.filename attribute is used
+            compression (string): 'gzip', 'zstd' or None
+                               (see to_gwyfile)
+            level (int): compression level or None for the default level
+        """
+        await run_blocking(self.to_gwyfile, filename, compression, level)
+
+    async def ato_bytes(self):
+        """Serialize this container without blocking the event loop
+
+        Returns:
+            data (bytes): contents of gwy file
+        """
+        return await run_blocking(self.to_bytes)
 
     @staticmethod
     def _get_channel_ids(gwyfile):
@@ -192,23 +588,69 @@ class GwyContainer:
             gwyfile.c_gwyfile,
             nchannelsp)
         if ids:
-            return [ids[i] for i in range(nchannelsp[0])]
+            channel_ids = [ids[i] for i in range(nchannelsp[0])]
+            lib.free(ids)
+            return channel_ids
         else:
             return []
 
     @classmethod
-    def _dump_channels(cls, gwyfile):
-        """Dump all channels from Gwyfile instance
+    def _select_channel_ids(cls, gwyfile, channels=None):
+        """Get ids of channels selected by their ids or titles
 
         Args:
             gwyfile: Gwyfile object
+            channels (list of int or string): ids or titles of channels
+                                              or None for all channels.
+                                              Channels which are not
+                                              found are ignored.
+
+        Returns:
+            [list (int)]: list of selected channel ids in the file order
+
+        """
+        channel_ids = cls._get_channel_ids(gwyfile)
+        if channels is None:
+            return channel_ids
+        elif isinstance(channels, (int, str)):
+            channels = [channels]
+
+        ids = {channel for channel in channels
+               if not isinstance(channel, str)}
+        titles = {channel for channel in channels
+                  if isinstance(channel, str)}
+
+        selected_ids = []
+        for channel_id in channel_ids:
+            if channel_id in ids:
+                selected_ids.append(channel_id)
+            elif titles and (GwyChannel._get_title(gwyfile, channel_id)
+                             in titles):
+                selected_ids.append(channel_id)
+        return selected_ids
+
+    @classmethod
+    def _dump_channels(cls, gwyfile, channels=None, components=None,
+                       copy=True):
+        """Dump channels from Gwyfile instance
+
+        Args:
+            gwyfile: Gwyfile object
+            channels (list of int or string): ids or titles of channels
+                                              or None for all channels
+            components (iterable of strings): channel parts to read
+                                              or None for all parts
+            copy (boolean): if False, channel datafields are read-only
+                            views of the data owned by gwyfile
 
         Returns
             channels: list of GwyChannel objects
 
         """
-        channel_ids = cls._get_channel_ids(gwyfile)
-        channels = [GwyChannel.from_gwy(gwyfile, channel_id)
+        channel_ids = cls._select_channel_ids(gwyfile, channels)
+        channels = [GwyChannel.from_gwy(gwyfile, channel_id,
+                                        components=components,
+                                        copy=copy)
                     for channel_id in channel_ids]
         return channels
 
@@ -230,16 +672,20 @@ class GwyContainer:
                                                             ngraphsp)
 
         if ids:
-            return [ids[i] for i in range(ngraphsp[0])]
+            graph_ids = [ids[i] for i in range(ngraphsp[0])]
+            lib.free(ids)
+            return graph_ids
         else:
             return []
 
     @classmethod
-    def _dump_graphs(cls, gwyfile):
+    def _dump_graphs(cls, gwyfile, copy=True):
         """Dump all graphs from Gwyfile instance
 
         Args:
             gwyfile: Gwyfile object
+            copy (boolean): if False, data of the curves are read-only
+                            views of the data owned by gwyfile
 
         Returns
             graphs: list of GwyGraphModel objects
@@ -247,30 +693,237 @@ class GwyContainer:
         """
 
         graph_ids = cls._get_graph_ids(gwyfile)
-
-        # Create list of tuples
-        # First element of each tuple is a key for GwyGraphModel data item
-        # Second element of each tuple is a key for boolean item
-        #     (wheter the graph should be displayed in a window when the file
-        #      is loaded)
-        graph_keys = [("/0/graph/graph/{:d}".format(graph_id),
-                       "/0/graph/graph/{:d}/visible".format(graph_id))
-                      for graph_id in graph_ids]
-
-        # Create list of tuples (<cdata GwyGraphModel*>, visibility_flag)
-        # First element is <cdata GwyGraphModel*> object
-        # Second element is its visibility flag (boolean)
-        gwygraphmodels = [(gwyfile.get_gwyitem_object(key[0]),
-                           gwyfile.get_gwyitem_bool(key[1]))
-                          for key in graph_keys]
-        graphs = []
-
-        for gwygraphmodel in gwygraphmodels:
-            graph = GwyGraphModel.from_gwy(gwygraphmodel[0])
-            graph.visible = gwygraphmodel[1]
-            graphs.append(graph)
+        graphs = [cls._get_graph(gwyfile, graph_id, copy=copy)
+                  for graph_id in graph_ids]
         return graphs
 
+    @staticmethod
+    def _get_graph(gwyfile, graph_id, copy=True):
+        """Get graph with id=graph_id from Gwyfile instance
+
+        Args:
+            gwyfile: Gwyfile object
+            graph_id (int): id of the graphmodel object
+            copy (boolean): if False, data of the curves are read-only
+                            views of the data owned by gwyfile
+
+        Returns:
+            graph: GwyGraphModel object
+
+        """
+        # <GwyGraphModel*> object and its visibility flag
+        # (wheter the graph should be displayed in a window when the file
+        #  is loaded)
+        key = "/0/graph/graph/{:d}".format(graph_id)
+        key_visible = "/0/graph/graph/{:d}/visible".format(graph_id)
+        gwygraphmodel = gwyfile.get_gwyitem_object(key)
+        visible = gwyfile.get_gwyitem_bool(key_visible)
+
+        owner = None if copy else gwyfile
+        graph = GwyGraphModel.from_gwy(gwygraphmodel, owner=owner)
+        graph.visible = visible
+        return graph
+
+    @staticmethod
+    def _get_volume_ids(gwyfile):
+        """Get list of brick object ids
+
+        Args:
+            gwyfile: Gwyfile object
+
+        Returns:
+            [list (int)]:
+                list of brick object ids, e.g. [0, 1]
+
+        """
+
+        nvolumesp = ffi.new("unsigned int*")
+        ids = lib.gwyfile_object_container_enumerate_volume(
+            gwyfile.c_gwyfile,
+            nvolumesp)
+
+        if ids:
+            volume_ids = [ids[i] for i in range(nvolumesp[0])]
+            lib.free(ids)
+            return volume_ids
+        else:
+            return []
+
+    @classmethod
+    def _dump_volumes(cls, gwyfile, copy=True):
+        """Dump all volumes from Gwyfile instance
+
+        Args:
+            gwyfile: Gwyfile object
+            copy (boolean): if False, the bricks are read-only views
+                            of the data owned by gwyfile
+
+        Returns
+            volumes: list of GwyBrick objects
+
+        """
+
+        volume_ids = cls._get_volume_ids(gwyfile)
+        volumes = [cls._get_volume(gwyfile, volume_id, copy=copy)
+                   for volume_id in volume_ids]
+        return volumes
+
+    @staticmethod
+    def _get_volume(gwyfile, volume_id, copy=True):
+        """Get volume with id=volume_id from Gwyfile instance
+
+        Args:
+            gwyfile: Gwyfile object
+            volume_id (int): id of the brick object
+            copy (boolean): if False, the brick is a read-only view
+                            of the data owned by gwyfile
+
+        Returns:
+            volume: GwyBrick object
+
+        """
+        key = "/brick/{:d}".format(volume_id)
+        key_title = "/brick/{:d}/title".format(volume_id)
+        gwybrick = gwyfile.get_gwyitem_object(key)
+        title = gwyfile.get_gwyitem_string(key_title)
+
+        owner = None if copy else gwyfile
+        volume = GwyBrick.from_gwy(gwybrick, owner=owner)
+        volume.title = title
+        return volume
+
+    @staticmethod
+    def _get_surface_ids(gwyfile):
+        """Get list of surface object ids
+
+        gwyfile_object_container_enumerate_xyz of the bundled
+        libgwyfile checks the objects as datafields and never finds
+        any surface, so the ids are taken from the item index.
+
+        Args:
+            gwyfile: Gwyfile object
+
+        Returns:
+            [list (int)]:
+                sorted list of surface object ids, e.g. [0, 1]
+
+        """
+        surface_ids = []
+        for key, value in gwyfile.items(scalars_only=False):
+            match = _SURFACE_KEY_RE.match(key)
+            if match and isinstance(value, ffi.CData):
+                name = ffi.string(lib.gwyfile_object_name(value))
+                if name == b'GwySurface':
+                    surface_ids.append(int(match.group(1)))
+        return sorted(surface_ids)
+
+    @classmethod
+    def _dump_surfaces(cls, gwyfile, copy=True):
+        """Dump all surfaces from Gwyfile instance
+
+        Args:
+            gwyfile: Gwyfile object
+            copy (boolean): if False, the surfaces are read-only views
+                            of the data owned by gwyfile
+
+        Returns
+            surfaces: list of GwySurface objects
+
+        """
+
+        surface_ids = cls._get_surface_ids(gwyfile)
+        surfaces = [cls._get_surface(gwyfile, surface_id, copy=copy)
+                    for surface_id in surface_ids]
+        return surfaces
+
+    @staticmethod
+    def _get_surface(gwyfile, surface_id, copy=True):
+        """Get surface with id=surface_id from Gwyfile instance
+
+        Args:
+            gwyfile: Gwyfile object
+            surface_id (int): id of the surface object
+            copy (boolean): if False, the surface is a read-only view
+                            of the data owned by gwyfile
+
+        Returns:
+            surface: GwySurface object
+
+        """
+        key = "/xyz/{:d}".format(surface_id)
+        key_title = "/xyz/{:d}/title".format(surface_id)
+        gwysurface = gwyfile.get_gwyitem_object(key)
+        title = gwyfile.get_gwyitem_string(key_title)
+
+        owner = None if copy else gwyfile
+        surface = GwySurface.from_gwy(gwysurface, owner=owner)
+        surface.title = title
+        return surface
+
+    @staticmethod
+    def _get_spectra_ids(gwyfile):
+        """Get list of spectra object ids
+
+        Args:
+            gwyfile: Gwyfile object
+
+        Returns:
+            [list (int)]:
+                list of spectra object ids, e.g. [0, 1]
+
+        """
+
+        nspectrap = ffi.new("unsigned int*")
+        ids = lib.gwyfile_object_container_enumerate_spectra(
+            gwyfile.c_gwyfile,
+            nspectrap)
+
+        if ids:
+            spectra_ids = [ids[i] for i in range(nspectrap[0])]
+            lib.free(ids)
+            return spectra_ids
+        else:
+            return []
+
+    @classmethod
+    def _dump_spectra(cls, gwyfile, copy=True):
+        """Dump all spectra from Gwyfile instance
+
+        Args:
+            gwyfile: Gwyfile object
+            copy (boolean): if False, coordinates of the spectra are
+                            read-only views of the data owned by gwyfile
+
+        Returns
+            spectra: list of GwySpectra objects
+
+        """
+
+        spectra_ids = cls._get_spectra_ids(gwyfile)
+        spectra = [cls._get_spectra(gwyfile, spectra_id, copy=copy)
+                   for spectra_id in spectra_ids]
+        return spectra
+
+    @staticmethod
+    def _get_spectra(gwyfile, spectra_id, copy=True):
+        """Get spectra with id=spectra_id from Gwyfile instance
+
+        Args:
+            gwyfile: Gwyfile object
+            spectra_id (int): id of the spectra object
+            copy (boolean): if False, coordinates of the spectra are
+                            read-only views of the data owned by gwyfile
+
+        Returns:
+            spectra: GwySpectra object
+
+        """
+        key = "/sps/{:d}".format(spectra_id)
+        gwyspectra = gwyfile.get_gwyitem_object(key)
+
+        owner = None if copy else gwyfile
+        return GwySpectra.from_gwy(gwyspectra, owner=owner)
+
     @staticmethod
     def _get_filename(gwyfile):
         """Get the name of file The GwyContainer is currently associated with.
@@ -289,26 +942,159 @@ class GwyContainer:
             basename = os.path.basename(pathname)
             return basename
 
+    def nbytes(self):
+        """Get memory used by the container data broken down by component
+
+        Parts of a lazy container are counted only if they are decoded
+        and kept in the cache.
+
+        Returns:
+            dictionary: 'data', 'mask', 'show', 'selections', 'graphs',
+                        'volumes', 'surfaces' and 'spectra'
+                        -> size in bytes
+        """
+        nbytes = dict.fromkeys(('data', 'mask', 'show', 'selections'), 0)
+        for channel in _get_decoded(self.channels):
+            for component, size in channel.nbytes().items():
+                nbytes[component] += size
+        nbytes['graphs'] = sum(graph.nbytes()
+                               for graph in _get_decoded(self.graphs))
+        nbytes['volumes'] = sum(volume.nbytes()
+                                for volume in _get_decoded(self.volumes))
+        nbytes['surfaces'] = sum(surface.nbytes()
+                                 for surface in _get_decoded(self.surfaces))
+        nbytes['spectra'] = sum(spectra.nbytes()
+                                for spectra in _get_decoded(self.spectra))
+        return nbytes
+
+    def serialized_size(self):
+        """Get size of the serialized container
+
+        The C objects of the container are created to compute the size,
+        data arrays are borrowed by them, not copied.
+
+        Returns:
+            size (int): length of to_bytes() result in bytes.
+                        to_gwyfile writes also the path to the file.
+        """
+        return get_gwycontainer_size(self.to_gwy(borrow=True))
+
     def __repr__(self):
         return "<{} instance at {}. " \
             "Channels: {}. " \
-            "Graphs: {}.>".format(
+            "Graphs: {}. " \
+            "Volumes: {}. " \
+            "Surfaces: {}. " \
+            "Spectra: {}.>".format(
                 self.__class__.__name__,
                 hex(id(self)),
                 len(self.channels),
-                len(self.graphs))
+                len(self.graphs),
+                len(self.volumes),
+                len(self.surfaces),
+                len(self.spectra))
 
 
-def read_gwyfile(filename):
+def read_gwyfile(filename, lazy=False, cache_size=None,
+                 channels=None, components=None, copy=True):
     """Read gwy file
 
+    Files compressed by gzip or zstd are detected by their magic
+    header and decompressed while they are parsed, except for
+    file descriptors.
+
     Args:
-        filename (str): Name of gwyddion file
+        filename (str, bytes-like, file object or int):
+                          name of gwyddion file, its contents,
+                          binary file object or file descriptor
+        lazy (boolean): if True, channels, graphs, volumes, surfaces
+                        and spectra are decoded only when they are
+                        accessed
+        cache_size (int): byte budget for decoded parts of the lazy
+                          container or None for unlimited cache
+        channels (list of int or string): ids or titles of channels
+                          to read or None for all channels,
+                          e.g. [0, 'Phase']
+        components (iterable of strings): parts to read,
+                          any of 'data', 'mask', 'show', 'selections',
+                          'graphs', 'volumes', 'surfaces', 'spectra',
+                          or None for all parts.
+                          E.g. ('data',) reads only channel data
+                          and titles.
+        copy (boolean): if True, datafields, curves, bricks and surfaces
+                        own copies of the data. If False, they are
+                        read-only views of the data read by libgwyfile,
+                        which is freed when all of them are deleted.
+                        Values of spectra are always copied,
+                        their coordinates are views.
 
     Returns:
         Instance of GwyContainer class with data from file
 
     """
-    gwyfile = Gwyfile.from_gwy(filename)
-    container = GwyContainer.from_gwy(gwyfile)
+    gwyfile = _open_gwyfile(filename)
+    container = GwyContainer.from_gwy(gwyfile,
+                                      lazy=lazy,
+                                      cache_size=cache_size,
+                                      channels=channels,
+                                      components=components,
+                                      copy=copy)
+    if not lazy:
+        # zero-copy datafields keep the gwyfile object alive
+        gwyfile.close()
     return container
+
+
+async def aread_gwyfile(filename, **kwargs):
+    """Read gwy file without blocking the event loop
+
+    File I/O and parsing run in the executor of gwyasync module.
+
+    Args:
+        filename (str, bytes-like, file object or int):
+                          name of gwyddion file, its contents,
+                          binary file object or file descriptor
+        **kwargs: keyword arguments of read_gwyfile
+
+    Returns:
+        Instance of GwyContainer class with data from file
+
+    """
+    return await run_blocking(read_gwyfile, filename, **kwargs)
+
+
+def _open_gwyfile(source):
+    """Create Gwyfile instance from source of any supported type
+
+    Args:
+        source (str, bytes-like, file object or int):
+               name of gwyddion file, its contents,
+               binary file object or file descriptor
+
+    Returns:
+        Gwyfile instance
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return Gwyfile.from_bytes(source)
+    elif isinstance(source, int):
+        return Gwyfile.from_fd(source)
+    elif hasattr(source, 'read'):
+        return Gwyfile.from_fileobj(source)
+    else:
+        return Gwyfile.from_gwy(source)
+
+
+def _get_decoded(sequence):
+    """Get decoded elements of list or GwyLazySequence
+
+    Args:
+        sequence (list or GwyLazySequence): channels, graphs, volumes
+                                            or surfaces
+
+    Returns:
+        list of elements which do not require decoding
+    """
+    if isinstance(sequence, GwyLazySequence):
+        return [sequence[index] for index in range(len(sequence))
+                if sequence.is_decoded(index)]
+    return sequence
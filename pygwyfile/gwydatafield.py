@@ -7,7 +7,8 @@
 import numpy as np
 
 from pygwyfile._libgwyfile import ffi, lib
-from pygwyfile.gwyfile import GwyfileErrorCMsg
+from pygwyfile.gwyfile import GwyfileErrorCMsg, new_double_array_arg
+from pygwyfile.stats import timed, add_bytes_copied
 
 
 class GwyDataField:
@@ -21,9 +22,11 @@ class GwyDataField:
             datafield metadata
 
     Methods:
-        from_gwy(cls, gwyobject): Create GwyDataField instance from
-                                  <GwyDataField*> object
-        to_gwy(self): Get C representation of GwyDataField instance
+        from_gwy(cls, gwyobject, owner=None): Create GwyDataField instance
+                                              from <GwyDataField*> object
+        to_gwy(self, keepalive=None): Get C representation
+                                      of GwyDataField instance
+        nbytes(self): Get size of the data array in bytes
     """
 
     def __init__(self, data, meta=None):
@@ -107,12 +110,17 @@ class GwyDataField:
             self.meta['si_unit_z'] = ''
 
     @classmethod
-    def from_gwy(cls, gwydf):
+    def from_gwy(cls, gwydf, owner=None):
         """ Create GwyDataField instance from <GwyDataField*> object
 
         Args:
             gwydf (GwyDataField*):
                 GwyDataField object from Libgwyfile
+            owner (Gwyfile):
+                Gwyfile instance containing gwydf or None.
+                If owner is given, the data is not copied: data array
+                is a read-only view which keeps the owner's gwyfile
+                object alive. Otherwise the data is copied.
 
         Returns:
             datafield (GwyDataField):
@@ -121,7 +129,7 @@ class GwyDataField:
         meta = cls._get_meta(gwydf)
         xres = meta['xres']
         yres = meta['yres']
-        data = cls._get_data(gwydf, xres, yres)
+        data = cls._get_data(gwydf, xres, yres, owner=owner)
         return GwyDataField(data=data, meta=meta)
 
     @staticmethod
@@ -153,50 +161,28 @@ class GwyDataField:
 
         error = ffi.new("GwyfileError*")
         errorp = ffi.new("GwyfileError**", error)
-        xresp = ffi.new("int32_t*")
-        yresp = ffi.new("int32_t*")
-        xrealp = ffi.new("double*")
-        yrealp = ffi.new("double*")
-        xoffp = ffi.new("double*")
-        yoffp = ffi.new("double*")
-        xyunitp = ffi.new("char**")
-        zunitp = ffi.new("char**")
+        c_meta = ffi.new("PygwyfileDataFieldMeta*")
 
-        meta = {}
-
-        if lib.gwyfile_object_datafield_get(
-                gwydf, errorp,
-                ffi.new("char[]", b'xres'), xresp,
-                ffi.new("char[]", b'yres'), yresp,
-                ffi.new("char[]", b'xreal'), xrealp,
-                ffi.new("char[]", b'yreal'), yrealp,
-                ffi.new("char[]", b'xoff'), xoffp,
-                ffi.new("char[]", b'yoff'), yoffp,
-                ffi.new("char[]", b'si_unit_xy'), xyunitp,
-                ffi.new("char[]", b'si_unit_z'), zunitp,
-                ffi.NULL):
-            meta['xres'] = xresp[0]
-            meta['yres'] = yresp[0]
-            meta['xreal'] = xrealp[0]
-            meta['yreal'] = yrealp[0]
-            meta['xoff'] = xoffp[0]
-            meta['yoff'] = yoffp[0]
-
-            if xyunitp[0]:
-                meta['si_unit_xy'] = ffi.string(xyunitp[0]).decode('utf-8')
-            else:
-                meta['si_unit_xy'] = ''
-            if zunitp[0]:
-                meta['si_unit_z'] = ffi.string(zunitp[0]).decode('utf-8')
-            else:
-                meta['si_unit_z'] = ''
-
-            return meta
-        else:
+        if not lib.pygwyfile_datafield_get_meta(gwydf, c_meta, errorp):
             raise GwyfileErrorCMsg(errorp[0].message)
 
+        meta = {}
+        meta['xres'] = c_meta.xres
+        meta['yres'] = c_meta.yres
+        meta['xreal'] = c_meta.xreal
+        meta['yreal'] = c_meta.yreal
+        meta['xoff'] = c_meta.xoff
+        meta['yoff'] = c_meta.yoff
+        meta['si_unit_xy'] = _decode_c_string(c_meta.si_unit_xy)
+        meta['si_unit_z'] = _decode_c_string(c_meta.si_unit_z)
+
+        # unit strings are newly allocated by libgwyfile
+        lib.pygwyfile_datafield_meta_free(c_meta)
+        return meta
+
     @staticmethod
-    def _get_data(gwydf, xres, yres):
+    @timed('datafield_copy')
+    def _get_data(gwydf, xres, yres, owner=None):
         """Get data array from <GwyDataField*> object
 
         Args:
@@ -204,31 +190,45 @@ class GwyDataField:
                 GwyDataField object from Libgwyfile
             xres (int): Horizontal dimension of the data field in pixels
             yres (int): Vertical dimension of the data field in pixels
+            owner (Gwyfile): Gwyfile instance containing gwydf or None
 
         Returns:
-            data (2D numpy array, float64): data from the data field
+            data (2D numpy array, float64):
+                read-only view of the data owned by gwydf if owner is given,
+                otherwise a copy of the data
 
         """
 
         error = ffi.new("GwyfileError*")
         errorp = ffi.new("GwyfileError**", error)
 
-        data = ffi.new("double[]", xres * yres)
-        datap = ffi.new("double**", data)
+        # libgwyfile returns a pointer to the data owned by gwydf
+        datap = ffi.new("double**")
 
         if lib.gwyfile_object_datafield_get(gwydf, errorp,
                                             ffi.new("char[]", b'data'), datap,
                                             ffi.NULL):
-            data_buf = ffi.buffer(datap[0], xres * yres * ffi.sizeof(data))
+            if owner is not None:
+                return owner.view_double_array(datap[0], (xres, yres))
+
+            data_buf = ffi.buffer(datap[0],
+                                  xres * yres * ffi.sizeof("double"))
             data_array = np.frombuffer(data_buf, dtype=np.float64,
                                        count=xres * yres).reshape((xres, yres))
-            return data_array
+            add_bytes_copied(data_array.nbytes)
+            return data_array.copy()
         else:
             raise GwyfileErrorCMsg(errorp[0].message)
 
-    def to_gwy(self):
+    def to_gwy(self, keepalive=None):
         """Get C representation of GwyDataField instance
 
+        Args:
+            keepalive (list): if None, the data are copied.
+                              Otherwise the data array is borrowed
+                              and appended to keepalive, which must be
+                              kept alive as long as the returned object.
+
         Returns:
             gwydatafield (<cdata GwyfileObject*>):
                 A new GWY file GwyDataField object
@@ -249,9 +249,7 @@ class GwyDataField:
         args.append(xreal)
         args.append(yreal)
 
-        args.append(ffi.new("char[]", b"data(copy)"))
-        datap = ffi.cast("double*", self.data.ctypes.data)
-        args.append(datap)
+        args.extend(new_double_array_arg("data", self.data, keepalive))
 
         if self.meta['xoff'] is not None:
             args.append(ffi.new("char[]", b"xoff"))
@@ -276,9 +274,21 @@ class GwyDataField:
         gwydatafield = lib.gwyfile_object_new_datafield(*args)
         return gwydatafield
 
+    def nbytes(self):
+        """Get size of the data array in bytes"""
+        return self.data.nbytes
+
     def __repr__(self):
         return "<{} instance at {}.\n meta: {},\n data: {}>".format(
             self.__class__.__name__,
             hex(id(self)),
             self.meta.__repr__(),
             self.data.__repr__())
+
+
+def _decode_c_string(c_string):
+    """Decode C string, NULL is decoded as empty string"""
+    if c_string:
+        return ffi.string(c_string).decode('utf-8')
+    else:
+        return ''
@@ -9,6 +9,12 @@
         new_gwycontainer():
             Create new empty <GwyContainer*> object
 
+        add_keepalive(gwyobject, objects):
+            Keep objects alive as long as top-level gwyobject
+
+        new_double_array_arg(name, array, keepalive=None):
+            Get name and data arguments of array for libgwyfile
+
         add_gwyitem_to_gwycontainer(gwyitem, gwycontainer):
             Add data item to <GwyContainer*> object
 
@@ -16,6 +22,32 @@
             Write gwycontainer to file.
             The file will be overwritten if it exists
 
+        write_gwycontainer_to_bytes(gwycontainer):
+            Serialize gwycontainer to contents of gwy file
+
+        write_gwycontainer_to_fileobj(gwycontainer, fileobj):
+            Write gwycontainer to binary file object
+
+        write_gwycontainer_to_fd(gwycontainer, fd):
+            Write gwycontainer to file descriptor
+
+        write_gwycontainer_to_compressed_fileobj(gwycontainer, fileobj,
+                                                 compression, level=None):
+            Write gwycontainer compressed by gzip or zstd to file object
+
+        get_gwycontainer_size(gwycontainer):
+            Get size of gwy file with gwycontainer
+
+        get_gwyobject_items_size(gwyobject):
+            Get size of serialized data items of gwyobject
+
+        write_gwyobject_items_to_bytes(gwyobject):
+            Serialize data items of gwyobject without object header
+
+        write_gwyobject_items_to_fd(gwyobject, fd):
+            Write data items of gwyobject without object header
+            to file descriptor
+
         new_gwyitem_bool(item_key, value): Create a new boolean GWY file item
 
         new_gwyitem_string(item_key, value): Create a new string GWY file item
@@ -26,11 +58,55 @@
 
         new_gwyitem_double(item_key, vlue): Create a new double GWY file item
 
+    Ownership of C objects:
+        Top-level <GwyfileObject*> objects, i.e. ones created by
+        Gwyfile.from_gwy (from_bytes, etc.) and new_gwycontainer,
+        are owned by Python and freed with gwyfile_object_free when
+        they are garbage collected or when Gwyfile.close() is called.
+
+        Objects and items added to a container are owned by the container
+        and freed together with it. Items created with borrowed data
+        (e.g. by GwyContainer.to_gwy(borrow=True)) reference numpy arrays,
+        which are kept alive by add_keepalive as long as the top-level
+        object. Objects returned by
+        Gwyfile.get_gwyitem_object are borrowed: they are valid only
+        while the Gwyfile instance is open. Pythonic objects
+        (GwyDataField, GwyGraphCurve, etc.) created from them own copies
+        of the data and do not depend on the Gwyfile instance,
+        except for zero-copy arrays created by Gwyfile.view_double_array
+        (e.g. by read_gwyfile(..., copy=False)). Such arrays keep
+        the gwyfile object alive, even after Gwyfile.close() is called.
+
 """
 
+import functools
+import io
+import os
 import os.path
+import weakref
+
+import numpy as np
 
 from pygwyfile._libgwyfile import ffi, lib
+from pygwyfile.gwycompress import MAGIC_SIZE, detect_compression, peek_magic
+from pygwyfile.gwycompress import read_decompressed, write_compressed
+from pygwyfile.stats import timed, add_bytes_copied
+
+# Magic header preceding the top-level object in gwy files
+_GWYFILE_MAGIC = b"GWYP"
+
+# Maximum number of bytes to read from streams of unknown size
+_SIZE_MAX = int(ffi.cast("size_t", -1))
+
+# Size of chunks written to file objects without file descriptor
+_WRITE_CHUNK_SIZE = 2**20
+
+# allocator for C arrays consumed (and later freed) by libgwyfile
+_c_malloc = ffi.new_allocator(alloc=lib.malloc, free=None,
+                              should_clear_after_alloc=False)
+
+# top-level objects -> Python objects borrowed by their items
+_borrowed = weakref.WeakKeyDictionary()
 
 
 class GwyfileError(Exception):
@@ -60,6 +136,7 @@ class Gwyfile:
     Attributes:
         c_gwyfile (cdata  GwyfileObject*): gwyfile object from
                                            Libgwyfile C library
+                                           or None if the file is closed
 
     Methods:
         get_gwyitem_bool(self, item_key): Get boolean value from Gwy data item
@@ -67,7 +144,24 @@ class Gwyfile:
         get_gwyitem_object(self, item_key): Get object from Gwy data item
         get_gwyitem_int32(self, item_key): Get int32 value from Gwy data item
         get_gwyitem_double(self, item_key): Get double value from Gwy data item
+        to_dict(self, scalars_only=True): Get values of all top-level items
+        items(self, scalars_only=True): Get (name, value) pairs
+                                        of all top-level items
         from_gwy(filename): Create Gwyfile instance from file
+        from_bytes(data): Create Gwyfile instance from contents of gwy file
+        from_fileobj(fileobj): Create Gwyfile instance from
+                               binary file object
+        from_fd(fd): Create Gwyfile instance from file descriptor
+        from_compressed_fileobj(fileobj, compression):
+                               Create Gwyfile instance from
+                               compressed binary file object
+        view_double_array(self, c_data, shape): Get read-only numpy array
+                                                viewing data owned by
+                                                the gwyfile object
+        close(self): Free the gwyfile object
+
+    Gwyfile instance can be used as a context manager,
+    the gwyfile object is freed on exit from the with block.
     """
 
     def __init__(self, c_gwyfile):
@@ -96,6 +190,60 @@ class Gwyfile:
 
         self.c_gwyfile = c_gwyfile
 
+        # bases of zero-copy arrays viewing the data of c_gwyfile
+        self._views = weakref.WeakSet()
+
+        # name -> item and name -> (type, value) indices of top-level
+        # items, built on first lookup
+        self._items = None
+        self._values = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Free the gwyfile object
+
+        Objects returned by get_gwyitem_object must not be used
+        after the file is closed. Closing closed file has no effect.
+
+        If zero-copy arrays created by view_double_array are still alive,
+        the gwyfile object is freed when the last of them is deleted.
+        """
+        c_gwyfile, self.c_gwyfile = self.c_gwyfile, None
+        self._items = None
+        self._values = None
+        if c_gwyfile is not None and not self._views:
+            try:
+                ffi.release(c_gwyfile)
+            except (TypeError, ValueError):
+                # c_gwyfile is not owned by Python,
+                # it is freed by its owner
+                pass
+
+    def view_double_array(self, c_data, shape):
+        """Get read-only numpy array viewing data owned by the gwyfile object
+
+        Args:
+            c_data (cdata double*): array of doubles owned by
+                                    an object from this gwyfile
+            shape (tuple of int): shape of the array
+
+        Returns:
+            array (numpy array, float64): read-only array without a copy
+                                          of the data. The array keeps
+                                          the gwyfile object alive.
+        """
+        if self.c_gwyfile is None:
+            raise GwyfileError("Gwyfile is closed")
+
+        base = _GwyfileArrayBase(self.c_gwyfile, c_data, shape)
+        self._views.add(base)
+        return np.asarray(base)
+
     def _get_gwyitem_value(self, item_key, cfunc):
         """Get value (in C representation) contained in Gwy data item
 
@@ -109,7 +257,7 @@ class Gwyfile:
                    if Gwy data item is None
 
         """
-        item = lib.gwyfile_object_get(self.c_gwyfile, item_key.encode('utf-8'))
+        item = self._get_gwyitem(item_key)
 
         if item:
             value = cfunc(item)
@@ -117,6 +265,135 @@ class Gwyfile:
         else:
             return None
 
+    def _get_gwyitem(self, item_key):
+        """Get Gwy data item by name
+
+        Items are found in a dictionary of all top-level items,
+        which is built with a single pass over the gwyfile object
+        on the first call.
+
+        Args:
+            item_key (string): Name of the Gwy data item
+
+        Returns:
+            item (cdata GwyfileItem*): Gwy data item
+                                       or None if item is not found
+
+        """
+        items, _ = self._get_index()
+        return items.get(item_key)
+
+    def _get_gwyitem_scalar(self, item_key, item_type):
+        """Get value of bool, int32, double or string Gwy data item
+
+        Values are extracted for all top-level items at once
+        on the first call.
+
+        Args:
+            item_key (string): Name of the Gwy data item
+            item_type (string): Expected type of the item,
+                                'b', 'i', 'd' or 's'
+
+        Returns:
+            value: bool, int, float or string value of the item
+                   or None if item is not found
+
+        """
+        _, values = self._get_index()
+        if item_key not in values:
+            return None
+        actual_type, value = values[item_key]
+        if actual_type != item_type:
+            raise GwyfileError("Item {} is of type '{}', not '{}'".format(
+                item_key, actual_type, item_type))
+        return value
+
+    def _get_index(self):
+        """Get indices of top-level items, build them if necessary
+
+        Returns:
+            (items, values): dictionaries item name -> item
+                             (cdata GwyfileItem*) for all items and
+                             item name -> (type, value) for bool,
+                             int32, double, string and object items
+
+        """
+        if self.c_gwyfile is None:
+            raise GwyfileError("Gwyfile is closed")
+
+        if self._items is None:
+            self._items, self._values = self._index_gwyitems()
+        return self._items, self._values
+
+    @timed('lookup')
+    def _index_gwyitems(self):
+        """Build indices of top-level Gwy data items
+
+        All items are collected with their values in a single C call.
+
+        Returns:
+            (items, values): dictionaries item name -> item
+                             (cdata GwyfileItem*) for all items and
+                             item name -> (type, value) for bool,
+                             int32, double, string and object items
+
+        """
+        nitems = lib.gwyfile_object_nitems(self.c_gwyfile)
+        c_infos = ffi.new("PygwyfileItemInfo[]", nitems)
+        nitems = lib.pygwyfile_object_items(self.c_gwyfile, c_infos)
+
+        items = {}
+        values = {}
+        for i in range(nitems):
+            c_info = c_infos[i]
+            name = ffi.string(c_info.name).decode('utf-8')
+            items[name] = c_info.item
+            item_type = c_info.type.decode('ascii')
+            if item_type == 'b':
+                values[name] = (item_type, bool(c_info.b))
+            elif item_type == 'i':
+                values[name] = (item_type, c_info.i)
+            elif item_type == 'd':
+                values[name] = (item_type, c_info.d)
+            elif item_type == 's':
+                values[name] = (item_type,
+                                ffi.string(c_info.s).decode('utf-8'))
+            elif item_type == 'o':
+                values[name] = (item_type, c_info.o)
+        return items, values
+
+    def to_dict(self, scalars_only=True):
+        """Get values of all top-level Gwy data items
+
+        Args:
+            scalars_only (boolean): if True, only bool, int32, double
+                                    and string items are included.
+                                    If False, object items are
+                                    included too.
+
+        Returns:
+            dict: item name -> value. Values of object items are
+                  borrowed cdata GwyfileObject*, valid only while
+                  the Gwyfile instance is open.
+
+        """
+        _, values = self._get_index()
+        return {name: value for name, (item_type, value) in values.items()
+                if not (scalars_only and item_type == 'o')}
+
+    def items(self, scalars_only=True):
+        """Get (name, value) pairs of all top-level Gwy data items
+
+        Args:
+            scalars_only (boolean): if True, only bool, int32, double
+                                    and string items are included
+
+        Returns:
+            view of (name, value) pairs, see to_dict
+
+        """
+        return self.to_dict(scalars_only=scalars_only).items()
+
     def get_gwyitem_bool(self, item_key):
         """Get boolean value contained in Gwy data item
 
@@ -128,9 +405,8 @@ class Gwyfile:
                      otherwise False
 
         """
-        cfunc = lib.gwyfile_item_get_bool
-        cvalue = self._get_gwyitem_value(item_key, cfunc)
-        if cvalue:
+        value = self._get_gwyitem_scalar(item_key, 'b')
+        if value:
             return True
         else:
             return False
@@ -146,12 +422,7 @@ class Gwyfile:
                     or None if item is not found
 
         """
-        cfunc = lib.gwyfile_item_get_string
-        cvalue = self._get_gwyitem_value(item_key, cfunc)
-        if cvalue:
-            return ffi.string(cvalue).decode('utf-8')
-        else:
-            return None
+        return self._get_gwyitem_scalar(item_key, 's')
 
     def get_gwyitem_object(self, item_key):
         """Get the object value contained in a Gwy data item
@@ -181,9 +452,7 @@ class Gwyfile:
             value (int): The integer contained in Gwy data item
                          or None if the item is not found
         """
-        cfunc = lib.gwyfile_item_get_int32
-        value = self._get_gwyitem_value(item_key, cfunc)
-        return value
+        return self._get_gwyitem_scalar(item_key, 'i')
 
     def get_gwyitem_double(self, item_key):
         """Get the double value contained in a Gwy file data item
@@ -195,20 +464,23 @@ class Gwyfile:
             value (double): The double value contained in Gwy data item
                             or None if the item is not found
         """
-        cfunc = lib.gwyfile_item_get_double
-        value = self._get_gwyitem_value(item_key, cfunc)
-        return value
+        return self._get_gwyitem_scalar(item_key, 'd')
 
     @staticmethod
+    @timed('parse')
     def from_gwy(filename):
         """Create Gwyfile instance from file
 
+        Files compressed by gzip or zstd are decompressed
+        (see from_compressed_fileobj).
+
         Args:
             filename (string): filename including path
 
         Returns:
             Gwyfile:
                 instnce of Gwyfile class
+                owning the gwyfile object read from the file
 
         """
         error = ffi.new("GwyfileError*")
@@ -217,26 +489,241 @@ class Gwyfile:
         if not os.path.isfile(filename):
             raise OSError("Cannot find file {}".format(filename))
 
+        compression = detect_compression(_read_file_magic(filename))
+        if compression is not None:
+            with open(filename, 'rb') as fileobj:
+                return Gwyfile.from_compressed_fileobj(fileobj, compression)
+
         c_gwyfile = lib.gwyfile_read_file(filename.encode('utf-8'), errorp)
 
         if not c_gwyfile:
             raise GwyfileErrorCMsg(errorp[0].message)
 
+        c_gwyfile = _own_gwyobject(c_gwyfile)
         gwyfile = Gwyfile(c_gwyfile)
         return gwyfile
 
+    @staticmethod
+    def from_bytes(data):
+        """Create Gwyfile instance from contents of gwy file
+
+        Args:
+            data (bytes-like object): contents of gwy file,
+                                      possibly compressed
+
+        Returns:
+            Gwyfile:
+                instance of Gwyfile class
+                owning the gwyfile object read from data
+
+        """
+        buf = ffi.from_buffer(data)
+        if not len(buf):
+            raise GwyfileError("Gwy file data is empty")
+
+        compression = detect_compression(ffi.buffer(buf)[0:MAGIC_SIZE])
+        if compression is not None:
+            return Gwyfile.from_compressed_fileobj(io.BytesIO(data),
+                                                   compression)
+
+        stream = lib.fmemopen(buf, len(buf), b"rb")
+        if not stream:
+            raise OSError(ffi.errno, os.strerror(ffi.errno))
+        return Gwyfile._from_stream(stream, len(buf))
+
+    @staticmethod
+    def from_fileobj(fileobj):
+        """Create Gwyfile instance from binary file object
+
+        Args:
+            fileobj (file object): binary file object (e.g. io.BytesIO
+                                   or file opened in 'rb' mode).
+                                   It is read till the end,
+                                   compressed data are decompressed.
+
+        Returns:
+            Gwyfile:
+                instance of Gwyfile class
+                owning the gwyfile object read from fileobj
+
+        """
+        magic, fileobj = peek_magic(fileobj)
+        compression = detect_compression(magic)
+        if compression is not None:
+            return Gwyfile.from_compressed_fileobj(fileobj, compression)
+        return Gwyfile.from_bytes(fileobj.read())
+
+    @staticmethod
+    def from_fd(fd):
+        """Create Gwyfile instance from file descriptor
+
+        The data are read by libgwyfile directly from fd
+        (e.g. pipe or socket) without intermediate copy in Python.
+        fd is not closed, but its position is undefined after reading.
+        Compressed data are not detected, use from_compressed_fileobj.
+
+        Args:
+            fd (int): file descriptor open for reading
+
+        Returns:
+            Gwyfile:
+                instance of Gwyfile class
+                owning the gwyfile object read from fd
+
+        """
+        stream = _fdopen(fd, b"rb")
+        return Gwyfile._from_stream(stream, _SIZE_MAX)
+
+    @staticmethod
+    def from_compressed_fileobj(fileobj, compression):
+        """Create Gwyfile instance from compressed binary file object
+
+        The data are decompressed by a helper thread while libgwyfile
+        parses them, the decompressed file is not held in memory.
+
+        Args:
+            fileobj (file object): binary file object with gwy file
+                                   compressed by gzip or zstd
+            compression (string): 'gzip' or 'zstd'
+
+        Returns:
+            Gwyfile:
+                instance of Gwyfile class
+                owning the gwyfile object read from fileobj
+
+        """
+        return read_decompressed(fileobj, compression, Gwyfile.from_fd)
+
+    @staticmethod
+    @timed('parse')
+    def _from_stream(stream, max_size):
+        """Read gwyfile object from C stream and close the stream
+
+        Args:
+            stream (cdata FILE*): C stream
+            max_size (int): maximum number of bytes to read
+
+        Returns:
+            Gwyfile:
+                instance of Gwyfile class
+                owning the gwyfile object read from stream
+
+        """
+        error = ffi.new("GwyfileError*")
+        errorp = ffi.new("GwyfileError**", error)
+
+        try:
+            c_gwyfile = lib.gwyfile_fread(stream, max_size, errorp)
+        finally:
+            lib.fclose(stream)
+
+        if not c_gwyfile:
+            raise GwyfileErrorCMsg(errorp[0].message)
+
+        c_gwyfile = _own_gwyobject(c_gwyfile)
+        gwyfile = Gwyfile(c_gwyfile)
+        return gwyfile
+
+
+class _GwyfileArrayBase:
+    """Base object of zero-copy numpy arrays viewing C data
+
+    It keeps alive the top-level gwyfile object owning the data.
+    """
+
+    def __init__(self, c_owner, c_data, shape):
+        """
+        Args:
+            c_owner (cdata GwyfileObject*): top-level object owning the data
+            c_data (cdata double*): the data
+            shape (tuple of int): shape of the array
+        """
+        self._c_owner = c_owner
+        self.__array_interface__ = {
+            'shape': tuple(shape),
+            'typestr': np.dtype(np.float64).str,
+            'data': (int(ffi.cast("uintptr_t", c_data)), True),
+            'version': 3}
+
 
 def new_gwycontainer():
     """ Create new empty GwyContainer
 
     Returns:
         gwycontainer (<cdata GwyfileObject*>):
-            empty Gwyddion Container
+            empty Gwyddion Container.
+            It is freed when the returned cdata is garbage collected.
     """
     gwycontainer = lib.gwyfile_object_new(
         ffi.new("char[]", b"GwyContainer"),
         ffi.NULL)
-    return gwycontainer
+    return _own_gwyobject(gwycontainer)
+
+
+def add_keepalive(gwyobject, objects):
+    """ Keep objects alive as long as top-level gwyobject
+
+    Args:
+        gwyobject (<cdata GwyfileObject*>): top-level object owned by
+                                            Python, e.g. created by
+                                            new_gwycontainer
+        objects (list): objects borrowed by items of gwyobject,
+                        e.g. numpy arrays
+    """
+    _borrowed.setdefault(gwyobject, []).extend(objects)
+
+
+def new_double_array_arg(name, array, keepalive=None):
+    """ Get name and data arguments of array for gwyfile_object_new_*
+
+    The data are passed to libgwyfile with at most one copy.
+    C-contiguous float64 arrays are borrowed if keepalive is given,
+    otherwise they are copied by libgwyfile. Other arrays are converted
+    once into a C array which is consumed by the new object.
+
+    Args:
+        name (string): name of the data item, e.g. "data"
+        array (numpy array): the data
+        keepalive (list): list of borrowed arrays or None to copy the data.
+                          It must be kept alive as long as the object
+                          created with the returned arguments.
+
+    Returns:
+        (c_name, c_data): (cdata char[]) name of the item with
+                          "(const)" or "(copy)" suffix if required,
+                          (cdata double*) the data
+    """
+    if (array.dtype == np.float64 and array.flags.c_contiguous or
+            array.size == 0):
+        c_data = ffi.cast("double*", array.ctypes.data)
+        if keepalive is not None:
+            keepalive.append(array)
+            suffix = "(const)"
+        else:
+            add_bytes_copied(array.nbytes)
+            suffix = "(copy)"
+    else:
+        c_data = _c_malloc("double[]", array.size)
+        c_array = np.frombuffer(ffi.buffer(c_data), dtype=np.float64)
+        np.copyto(c_array.reshape(array.shape), array)
+        add_bytes_copied(c_array.nbytes)
+        suffix = ""
+    return ffi.new("char[]", (name + suffix).encode('utf-8')), c_data
+
+
+def _own_gwyobject(c_object):
+    """ Make top-level GWY file object owned by Python
+
+    Args:
+        c_object (<cdata GwyfileObject*>): object which is not present
+                                           in any data item
+
+    Returns:
+        c_object (<cdata GwyfileObject*>): the same object which is freed
+                                           by gwyfile_object_free when
+                                           it is garbage collected
+    """
+    return ffi.gc(c_object, lib.gwyfile_object_free)
 
 
 def add_gwyitem_to_gwycontainer(gwyitem, gwycontainer):
@@ -248,14 +735,18 @@ def add_gwyitem_to_gwycontainer(gwyitem, gwycontainer):
         gywcontainer (GwyfileObject*): A GwyContainer
 
     Returns:
-        True if the item was actually added
+        True if the item was actually added.
+        Otherwise the item is freed.
     """
     if lib.gwyfile_object_add(gwycontainer, gwyitem):
         return True
     else:
+        # the item is not consumed by the container
+        lib.gwyfile_item_free(gwyitem)
         return False
 
 
+@timed('serialize')
 def write_gwycontainer_to_gwyfile(gwycontainer, filename):
     """Write gwycontainer to file.
        The file will be overwritten if it exists
@@ -273,6 +764,280 @@ def write_gwycontainer_to_gwyfile(gwycontainer, filename):
         raise GwyfileErrorCMsg(errorp[0].message)
 
 
+def get_gwycontainer_size(gwycontainer):
+    """Get size of gwy file with gwycontainer
+
+    The size is computed by libgwyfile without serialization.
+
+    Args:
+        gwycontainer (<GwyfileObject*>)
+
+    Returns:
+        size (int): size of the file in bytes
+    """
+    return len(_GWYFILE_MAGIC) + lib.gwyfile_object_size(gwycontainer)
+
+
+@timed('serialize')
+def write_gwycontainer_to_bytes(gwycontainer):
+    """Serialize gwycontainer to contents of gwy file
+
+    The buffer is allocated once with the exact size of the file
+    computed by libgwyfile.
+
+    Args:
+        gwycontainer (<GwyfileObject*>)
+
+    Returns:
+        data (bytes): contents of gwy file
+    """
+    data = _write_gwycontainer_to_buffer(gwycontainer)
+    add_bytes_copied(len(data))
+    return bytes(data)
+
+
+def write_gwycontainer_to_fileobj(gwycontainer, fileobj):
+    """Write gwycontainer to binary file object
+
+    Files opened in binary mode (including pipes opened
+    by os.fdopen) are written by libgwyfile directly to their
+    file descriptor at the current position. Data for other
+    file objects (e.g. io.BytesIO) are serialized to a buffer of the
+    exact size of the file and written in chunks from it.
+
+    Args:
+        gwycontainer (<GwyfileObject*>)
+        fileobj (file object): binary file object (e.g. io.BytesIO
+                               or file opened in 'wb' mode)
+    """
+    fd = _get_file_fd(fileobj)
+    if fd is None:
+        data = _write_gwycontainer_to_buffer(gwycontainer)
+        for start in range(0, len(data), _WRITE_CHUNK_SIZE):
+            fileobj.write(data[start:start + _WRITE_CHUNK_SIZE])
+        return
+
+    seekable = fileobj.seekable()
+    if seekable:
+        position = fileobj.tell()
+    fileobj.flush()
+    if seekable:
+        # the position of fd may be ahead of fileobj after reading
+        os.lseek(fd, position, os.SEEK_SET)
+    write_gwycontainer_to_fd(gwycontainer, fd)
+    if seekable:
+        # move fileobj after the written data
+        fileobj.seek(os.lseek(fd, 0, os.SEEK_CUR))
+
+
+def write_gwycontainer_to_fd(gwycontainer, fd):
+    """Write gwycontainer to file descriptor
+
+    The data are written by libgwyfile directly to fd
+    (e.g. pipe or socket). fd is not closed.
+
+    Args:
+        gwycontainer (<GwyfileObject*>)
+        fd (int): file descriptor open for writing
+    """
+    stream = _fdopen(fd, b"wb")
+    _write_gwycontainer_to_stream(gwycontainer, stream)
+
+
+def _write_gwycontainer_to_buffer(gwycontainer):
+    """Serialize gwycontainer to a buffer of the exact file size
+
+    Args:
+        gwycontainer (<GwyfileObject*>)
+
+    Returns:
+        data (memoryview): contents of gwy file
+    """
+    size = get_gwycontainer_size(gwycontainer)
+
+    # one more byte for the null byte fmemopen may append
+    buf = bytearray(size + 1)
+    stream = lib.fmemopen(ffi.from_buffer(buf), len(buf), b"wb")
+    if not stream:
+        raise OSError(ffi.errno, os.strerror(ffi.errno))
+    _write_gwycontainer_to_stream(gwycontainer, stream)
+    return memoryview(buf)[:size]
+
+
+def _get_file_fd(fileobj):
+    """Get file descriptor of file object opened by open() or os.fdopen
+
+    Args:
+        fileobj (file object): binary file object
+
+    Returns:
+        fd (int): file descriptor or None if fileobj is
+                  not a plain file, e.g. io.BytesIO or gzip.GzipFile,
+                  whose data must be written through fileobj
+    """
+    raw = fileobj
+    if isinstance(fileobj, (io.BufferedWriter, io.BufferedRandom)):
+        raw = fileobj.raw
+    if isinstance(raw, io.FileIO) and not raw.closed:
+        return raw.fileno()
+    return None
+
+
+@timed('serialize')
+def _write_gwycontainer_to_stream(gwycontainer, stream):
+    """Write gwycontainer to C stream and close the stream
+
+    Args:
+        gwycontainer (<GwyfileObject*>)
+        stream (cdata FILE*): C stream
+    """
+    error = ffi.new("GwyfileError*")
+    errorp = ffi.new("GwyfileError**", error)
+
+    try:
+        is_written = lib.gwyfile_fwrite(gwycontainer, stream, errorp)
+    finally:
+        # the data are flushed on close
+        is_closed = lib.fclose(stream) == 0
+
+    if not is_written:
+        raise GwyfileErrorCMsg(errorp[0].message)
+    if not is_closed:
+        raise OSError(ffi.errno, os.strerror(ffi.errno))
+
+
+def get_gwyobject_items_size(gwyobject):
+    """Get size of serialized data items of gwyobject
+
+    The size does not include the object header, i.e. the name
+    of the object and the size of its data.
+
+    Args:
+        gwyobject (<GwyfileObject*>)
+
+    Returns:
+        size (int): size of the items in bytes
+    """
+    name = ffi.string(lib.gwyfile_object_name(gwyobject))
+    header_size = len(name) + 1 + ffi.sizeof("uint32_t")
+    return lib.gwyfile_object_size(gwyobject) - header_size
+
+
+@timed('serialize')
+def write_gwyobject_items_to_bytes(gwyobject):
+    """Serialize data items of gwyobject without object header
+
+    Args:
+        gwyobject (<GwyfileObject*>)
+
+    Returns:
+        data (bytes): serialized items
+    """
+    size = get_gwyobject_items_size(gwyobject)
+
+    # one more byte for the null byte fmemopen may append
+    buf = bytearray(size + 1)
+    stream = lib.fmemopen(ffi.from_buffer(buf), len(buf), b"wb")
+    if not stream:
+        raise OSError(ffi.errno, os.strerror(ffi.errno))
+    _write_gwyobject_items_to_stream(gwyobject, stream)
+    add_bytes_copied(size)
+    return bytes(memoryview(buf)[:size])
+
+
+@timed('serialize')
+def write_gwyobject_items_to_fd(gwyobject, fd):
+    """Write data items of gwyobject without object header
+       to file descriptor
+
+    The items are written at the current position of fd,
+    fd is not closed.
+
+    Args:
+        gwyobject (<GwyfileObject*>)
+        fd (int): file descriptor open for writing
+    """
+    stream = _fdopen(fd, b"wb")
+    _write_gwyobject_items_to_stream(gwyobject, stream)
+
+
+def _write_gwyobject_items_to_stream(gwyobject, stream):
+    """Write data items of gwyobject to C stream and close the stream
+
+    Args:
+        gwyobject (<GwyfileObject*>)
+        stream (cdata FILE*): C stream
+    """
+    error = ffi.new("GwyfileError*")
+    errorp = ffi.new("GwyfileError**", error)
+
+    nitems = lib.gwyfile_object_nitems(gwyobject)
+    names = lib.gwyfile_object_item_names(gwyobject)
+    is_written = True
+    try:
+        for i in range(nitems):
+            gwyitem = lib.gwyfile_object_get(gwyobject, names[i])
+            if not lib.gwyfile_item_fwrite(gwyitem, stream, errorp):
+                is_written = False
+                break
+    finally:
+        if names:
+            lib.free(names)
+        # the data are flushed on close
+        is_closed = lib.fclose(stream) == 0
+
+    if not is_written:
+        raise GwyfileErrorCMsg(errorp[0].message)
+    if not is_closed:
+        raise OSError(ffi.errno, os.strerror(ffi.errno))
+
+
+def write_gwycontainer_to_compressed_fileobj(gwycontainer, fileobj,
+                                             compression, level=None):
+    """Write gwycontainer compressed by gzip or zstd to file object
+
+    The data are compressed by a helper thread while libgwyfile
+    serializes them, the uncompressed file is not held in memory.
+
+    Args:
+        gwycontainer (<GwyfileObject*>)
+        fileobj (file object): binary file object
+        compression (string): 'gzip' or 'zstd'
+        level (int): compression level or None for the default level
+    """
+    write_compressed(fileobj, compression, level,
+                     functools.partial(write_gwycontainer_to_fd,
+                                       gwycontainer))
+
+
+def _read_file_magic(filename):
+    """Read magic header of file, empty bytes if it cannot be read"""
+    try:
+        with open(filename, 'rb') as fileobj:
+            return fileobj.read(MAGIC_SIZE)
+    except OSError:
+        return b""
+
+
+def _fdopen(fd, mode):
+    """Open C stream for a duplicate of file descriptor
+
+    Args:
+        fd (int): file descriptor
+        mode (bytes): mode of the stream, e.g. b"rb"
+
+    Returns:
+        stream (cdata FILE*): C stream. Closing it does not close fd.
+    """
+    dup_fd = os.dup(fd)
+    stream = lib.fdopen(dup_fd, mode)
+    if not stream:
+        errno = ffi.errno
+        os.close(dup_fd)
+        raise OSError(errno, os.strerror(errno))
+    return stream
+
+
 def _new_gwyitem(cfunc, item_key, cvalue):
     """ Create GWY file item
 
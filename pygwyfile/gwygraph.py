@@ -4,15 +4,10 @@
         GwyGraphModel: pythonic representation of GwyGraphModel gwy object
 
 """
-import weakref
-
 from pygwyfile._libgwyfile import ffi, lib
-from pygwyfile.gwyfile import GwyfileErrorCMsg
+from pygwyfile.gwyfile import GwyfileErrorCMsg, _c_malloc
 from pygwyfile.gwygraphcurve import GwyGraphCurve
-
-# weak key dictionary to keep alive gwycurves objects
-# in gwygraph container
-_graph_curves_dict = weakref.WeakKeyDictionary()
+from pygwyfile.stats import timed
 
 
 class GwyGraphModel:
@@ -23,9 +18,11 @@ class GwyGraphModel:
         meta (dictionary): dictionary with graph metadata
 
     Methods:
-        from_gwy(gwyobject): create GwyGraphModel instance
-                             from <GwyGraphModel*> object
-        to_gwy(): create a new GWY file <GwyGraphModel*> object.
+        from_gwy(gwyobject, owner=None): create GwyGraphModel instance
+                                         from <GwyGraphModel*> object
+        to_gwy(keepalive=None): create a new GWY file
+                                <GwyGraphModel*> object.
+        nbytes(): get size of data arrays of all curves in bytes
 
     """
 
@@ -169,12 +166,18 @@ class GwyGraphModel:
             self.meta['grid-type'] = 1
 
     @classmethod
-    def from_gwy(cls, gwygraphmodel):
+    @timed('graphs')
+    def from_gwy(cls, gwygraphmodel, owner=None):
         """Create GwyGraphModel instance from <GwyGraphModel*> object
 
         Args:
             gwygraphmodel (<GwyGraphModel*>):
                 <GwyGraphModel*> object from Libgwyfile
+            owner (Gwyfile):
+                Gwyfile instance containing gwygraphmodel or None.
+                If owner is given, data of the curves are read-only
+                views which keep the owner's gwyfile object alive.
+                Otherwise the data are copied.
 
         Returns:
             graph (GwyGraphModel): instance of GwyGraphModel class
@@ -183,7 +186,9 @@ class GwyGraphModel:
         meta = cls._get_meta(gwygraphmodel)
         ncurves = meta['ncurves']
         gwycurves = cls._get_curves(gwygraphmodel, ncurves)
-        curves = [GwyGraphCurve.from_gwy(curve) for curve in gwycurves]
+        curves_meta = cls._get_curves_meta(gwygraphmodel, ncurves)
+        curves = [GwyGraphCurve.from_gwy(curve, meta=curve_meta, owner=owner)
+                  for curve, curve_meta in zip(gwycurves, curves_meta)]
         return GwyGraphModel(curves=curves, meta=meta)
 
     @staticmethod
@@ -201,214 +206,72 @@ class GwyGraphModel:
 
         error = ffi.new("GwyfileError*")
         errorp = ffi.new("GwyfileError**", error)
-        ncurvesp = ffi.new("int32_t*")
-        titlep = ffi.new("char**")
-        top_labelp = ffi.new("char**")
-        left_labelp = ffi.new("char**")
-        right_labelp = ffi.new("char**")
-        bottom_labelp = ffi.new("char**")
-        x_unitp = ffi.new("char**")
-        y_unitp = ffi.new("char**")
-        x_minp = ffi.new("double*")
-        x_min_setp = ffi.new("bool*")
-        x_maxp = ffi.new("double*")
-        x_max_setp = ffi.new("bool*")
-        y_minp = ffi.new("double*")
-        y_min_setp = ffi.new("bool*")
-        y_maxp = ffi.new("double*")
-        y_max_setp = ffi.new("bool*")
-        x_is_logarithmicp = ffi.new("bool*")
-        y_is_logarithmicp = ffi.new("bool*")
-        label_visiblep = ffi.new("bool*")
-        label_has_framep = ffi.new("bool*")
-        label_reversep = ffi.new("bool*")
-        label_frame_thicknessp = ffi.new("int32_t*")
-        label_positionp = ffi.new("int32_t*")
-        grid_typep = ffi.new("int32_t*")
-
-        meta = {}
-
-        if lib.gwyfile_object_graphmodel_get(gwygraphmodel,
-                                             errorp,
-                                             ffi.new("char[]",
-                                                     b"ncurves"),
-                                             ncurvesp,
-                                             ffi.new("char[]",
-                                                     b"title"),
-                                             titlep,
-                                             ffi.new("char[]",
-                                                     b"top_label"),
-                                             top_labelp,
-                                             ffi.new("char[]",
-                                                     b"left_label"),
-                                             left_labelp,
-                                             ffi.new("char[]",
-                                                     b"right_label"),
-                                             right_labelp,
-                                             ffi.new("char[]",
-                                                     b"bottom_label"),
-                                             bottom_labelp,
-                                             ffi.new("char[]",
-                                                     b"x_unit"),
-                                             x_unitp,
-                                             ffi.new("char[]",
-                                                     b"y_unit"),
-                                             y_unitp,
-                                             ffi.new("char[]",
-                                                     b"x_min"),
-                                             x_minp,
-                                             ffi.new("char[]",
-                                                     b"x_min_set"),
-                                             x_min_setp,
-                                             ffi.new("char[]",
-                                                     b"x_max"),
-                                             x_maxp,
-                                             ffi.new("char[]",
-                                                     b"x_max_set"),
-                                             x_max_setp,
-                                             ffi.new("char[]",
-                                                     b"y_min"),
-                                             y_minp,
-                                             ffi.new("char[]",
-                                                     b"y_min_set"),
-                                             y_min_setp,
-                                             ffi.new("char[]",
-                                                     b"y_max"),
-                                             y_maxp,
-                                             ffi.new("char[]",
-                                                     b"y_max_set"),
-                                             y_max_setp,
-                                             ffi.new("char[]",
-                                                     b"x_is_logarithmic"),
-                                             x_is_logarithmicp,
-                                             ffi.new("char[]",
-                                                     b"y_is_logarithmic"),
-                                             y_is_logarithmicp,
-                                             ffi.new("char[]",
-                                                     b"label.visible"),
-                                             label_visiblep,
-                                             ffi.new("char[]",
-                                                     b"label.has_frame"),
-                                             label_has_framep,
-                                             ffi.new("char[]",
-                                                     b"label.reverse"),
-                                             label_reversep,
-                                             ffi.new("char[]",
-                                                     b"label.frame_thickness"),
-                                             label_frame_thicknessp,
-                                             ffi.new("char[]",
-                                                     b"label.position"),
-                                             label_positionp,
-                                             ffi.new("char[]",
-                                                     b"grid-type"),
-                                             grid_typep,
-                                             ffi.NULL):
-            meta["ncurves"] = ncurvesp[0]
-
-            if titlep[0]:
-                title = ffi.string(titlep[0]).decode('utf-8')
-                meta["title"] = title
-            else:
-                meta["title"] = ''
-
-            if top_labelp[0]:
-                top_label = ffi.string(top_labelp[0]).decode('utf-8')
-                meta["top_label"] = top_label
-            else:
-                meta["top_label"] = ''
-
-            if left_labelp[0]:
-                left_label = ffi.string(left_labelp[0]).decode('utf-8')
-                meta["left_label"] = left_label
-            else:
-                meta["left_label"] = ''
+        c_meta = ffi.new("PygwyfileGraphModelMeta*")
 
-            if right_labelp[0]:
-                right_label = ffi.string(right_labelp[0]).decode('utf-8')
-                meta["right_label"] = right_label
-            else:
-                meta["right_label"] = ''
-
-            if bottom_labelp[0]:
-                bottom_label = ffi.string(bottom_labelp[0]).decode('utf-8')
-                meta["bottom_label"] = bottom_label
-            else:
-                meta["bottom_label"] = ''
-
-            if x_unitp[0]:
-                x_unit = ffi.string(x_unitp[0]).decode('utf-8')
-                meta["x_unit"] = x_unit
-            else:
-                meta["x_unit"] = ''
-
-            if y_unitp[0]:
-                y_unit = ffi.string(y_unitp[0]).decode('utf-8')
-                meta["y_unit"] = y_unit
-            else:
-                meta["y_unit"] = ''
-
-            if x_min_setp[0]:
-                meta["x_min_set"] = True
-                meta["x_min"] = x_minp[0]
-            else:
-                meta["x_min_set"] = False
-                meta["x_min"] = None
-
-            if x_max_setp[0]:
-                meta["x_max_set"] = True
-                meta["x_max"] = x_maxp[0]
-            else:
-                meta["x_max_set"] = False
-                meta["x_max"] = None
-
-            if y_min_setp[0]:
-                meta["y_min_set"] = True
-                meta["y_min"] = y_minp[0]
-            else:
-                meta["y_min_set"] = False
-                meta["y_min"] = None
-
-            if y_max_setp[0]:
-                meta["y_max_set"] = True
-                meta["y_max"] = y_maxp[0]
-            else:
-                meta["y_max_set"] = False
-                meta["y_max"] = None
-
-            if x_is_logarithmicp[0]:
-                meta["x_is_logarithmic"] = True
-            else:
-                meta["x_is_logarithmic"] = False
+        if not lib.pygwyfile_graphmodel_get_meta(gwygraphmodel,
+                                                 c_meta,
+                                                 errorp):
+            raise GwyfileErrorCMsg(errorp[0].message)
 
-            if y_is_logarithmicp[0]:
-                meta["y_is_logarithmic"] = True
-            else:
-                meta["y_is_logarithmic"] = False
+        meta = {}
+        meta["ncurves"] = c_meta.ncurves
 
-            if label_visiblep[0]:
-                meta["label.visible"] = True
+        for key in ("title", "top_label", "left_label", "right_label",
+                    "bottom_label", "x_unit", "y_unit"):
+            c_string = getattr(c_meta, key)
+            if c_string:
+                meta[key] = ffi.string(c_string).decode('utf-8')
             else:
-                meta["label.visible"] = False
+                meta[key] = ''
 
-            if label_has_framep[0]:
-                meta["label.has_frame"] = True
+        for key in ("x_min", "x_max", "y_min", "y_max"):
+            if getattr(c_meta, key + "_set"):
+                meta[key + "_set"] = True
+                meta[key] = getattr(c_meta, key)
             else:
-                meta["label.has_frame"] = False
+                meta[key + "_set"] = False
+                meta[key] = None
+
+        meta["x_is_logarithmic"] = bool(c_meta.x_is_logarithmic)
+        meta["y_is_logarithmic"] = bool(c_meta.y_is_logarithmic)
+        meta["label.visible"] = bool(c_meta.label_visible)
+        meta["label.has_frame"] = bool(c_meta.label_has_frame)
+        meta["label.reverse"] = bool(c_meta.label_reverse)
+        meta["label.frame_thickness"] = c_meta.label_frame_thickness
+        meta["label.position"] = c_meta.label_position
+        meta["grid-type"] = c_meta.grid_type
+
+        # strings are newly allocated by libgwyfile
+        lib.pygwyfile_graphmodel_meta_free(c_meta)
+        return meta
 
-            if label_reversep[0]:
-                meta["label.reverse"] = True
-            else:
-                meta["label.reverse"] = False
+    @staticmethod
+    def _get_curves_meta(gwygraphmodel, ncurves):
+        """Get metadata of all curves of a GwyGraphModel object
 
-            meta["label.frame_thickness"] = label_frame_thicknessp[0]
+        Metadata of all curves are read in one call of libgwyfile.
 
-            meta["label.position"] = label_positionp[0]
+        Args:
+            gwygraphmodel (GwyGraphModel*):
+                GwyGraphModel object from Libgwyfile C library
+            ncurves (int):
+                number of curves in the GwyGraphModel object
 
-            meta["grid-type"] = grid_typep[0]
+        Returns:
+            curves_meta (list):
+                list of metadata dictionaries of the curves
+        """
+        error = ffi.new("GwyfileError*")
+        errorp = ffi.new("GwyfileError**", error)
+        c_metas = ffi.new("PygwyfileGraphCurveMeta[]", ncurves)
 
-            return meta
-        else:
+        if not lib.pygwyfile_graphmodel_get_curves_meta(gwygraphmodel,
+                                                        c_metas,
+                                                        ncurves,
+                                                        errorp):
             raise GwyfileErrorCMsg(errorp[0].message)
+        return [GwyGraphCurve._meta_from_c(c_metas + curve_id)
+                for curve_id in range(ncurves)]
 
     @staticmethod
     def _get_curves(gwygraphmodel, ncurves):
@@ -443,17 +306,29 @@ class GwyGraphModel:
         else:
             raise GwyfileErrorCMsg(errorp[0].message)
 
-    def to_gwy(self):
-        """ Create a new GWY file GwyGraphModel object."""
+    @timed('graphs')
+    def to_gwy(self, keepalive=None):
+        """ Create a new GWY file GwyGraphModel object.
+
+        Args:
+            keepalive (list): if None, the data of curves are copied.
+                              Otherwise the data arrays are borrowed
+                              and appended to keepalive, which must be
+                              kept alive as long as the returned object.
+        """
         args = []
 
-        gwycurves = ffi.new('GwyfileObject*[]',
-                            [curve.to_gwy() for curve in self.curves])
         ncurves = ffi.cast("int32_t", len(self.curves))
         args.append(ncurves)
 
-        args.append(ffi.new("char[]", b"curves"))
-        args.append(gwycurves)
+        if self.curves:
+            # the array and the curve objects are consumed by
+            # the graph model object, the array must be malloc'ed
+            gwycurves = _c_malloc('GwyfileObject*[]', len(self.curves))
+            for curve_id, curve in enumerate(self.curves):
+                gwycurves[curve_id] = curve.to_gwy(keepalive)
+            args.append(ffi.new("char[]", b"curves"))
+            args.append(gwycurves)
 
         if self.meta['title'] is not None:
             args.append(ffi.new("char[]", b"title"))
@@ -540,12 +415,12 @@ class GwyGraphModel:
 
         args.append(ffi.NULL)
         gwygraphmodel = lib.gwyfile_object_new_graphmodel(*args)
-
-        # gwygraphmodel object keeps alive gwycurves objects
-        _graph_curves_dict[gwygraphmodel] = gwycurves
-
         return gwygraphmodel
 
+    def nbytes(self):
+        """Get size of data arrays of all curves in bytes"""
+        return sum(curve.nbytes() for curve in self.curves)
+
     def __repr__(self):
         return "<{} instance at {}. Title: {}. Curves: {}.>".format(
             self.__class__.__name__,
@@ -1,36 +1,53 @@
 """ Pythonic representation of gwyddion GwyGraphCurveModel objects.
 
+    Abscissa and ordinate data are stored in gwy files as separate
+    arrays and are kept separate in GwyGraphCurve as well, so they are
+    read as two contiguous arrays (or zero-copy views) and written
+    without stacking them.
+
     Classes:
         GwyGraphCurve: pythonic representation of GwyGraphCurveModel gwy object
 """
 import numpy as np
 
 from pygwyfile._libgwyfile import ffi, lib
-from pygwyfile.gwyfile import GwyfileErrorCMsg
+from pygwyfile.gwyfile import GwyfileErrorCMsg, new_double_array_arg
+from pygwyfile.stats import add_bytes_copied
 
 
 class GwyGraphCurve:
     """Class for GwyGraphCurveModel representation
 
     Attributes:
-        data (2D numpy array, float64):
-           abscissa and ordinate data of the same length
+        xdata (1D numpy array): abscissa data
+        ydata (1D numpy array): ordinate data of the same length
+
+        data (2D numpy array, property):
+           new array of shape (2, ndata) stacking xdata and ydata.
+           Assigning an array of shape (2, ndata) replaces xdata
+           and ydata by its rows. The stacked array is a copy,
+           so in-place changes of the data must be done
+           through xdata and ydata.
 
         meta (python dictionary): curve metadata
 
     Methods:
-        from_gwy(gwyobject): Create GwyGraphCurve instance from
-                             <GwyGraphCurveModel*> object
-        to_gwy(): Create  GWY file <GwyGraphCurveModel*> object
-                  from GwyGraphCurve instance
+        from_gwy(gwyobject, meta=None, owner=None):
+                                Create GwyGraphCurve instance from
+                                <GwyGraphCurveModel*> object
+        to_gwy(keepalive=None): Create  GWY file <GwyGraphCurveModel*>
+                                object from GwyGraphCurve instance
+        nbytes(): Get size of the data arrays in bytes
 
     """
 
-    def __init__(self, data, meta=None):
+    def __init__(self, data=None, meta=None, xdata=None, ydata=None):
         """
         Args:
-            data (2D numpy array, float64):
-                abscissa and ordinate data of the same size
+            data (2D numpy array):
+                abscissa and ordinate data of shape (2, ndata)
+                or None if xdata and ydata are given.
+                Its rows are used without a copy.
             meta (python dictionary):
 
                 Possible items:
@@ -47,24 +64,40 @@ class GwyGraphCurve:
                     'color.blue' (float): Blue component from the range
                                                                   [0, 1]
 
+            xdata (1D numpy array): abscissa data if data is None
+            ydata (1D numpy array): ordinate data of the same size
+                                    if data is None
+
+                Data of any dtype and strides are accepted,
+                they are converted to contiguous float64 arrays
+                only when the curve is written.
+
         """
         self.meta = {}
 
         if not meta:
             meta = {}
 
-        if 'ndata' in meta:
-            if data.shape == (2, meta['ndata']):
-                self.data = data
-                self.meta['ndata'] = meta['ndata']
-            else:
-                raise ValueError("data.shape is not equal (2, meta['ndata'])")
-        else:
-            if len(data.shape) == 2 and data.shape[0] == 2:
-                self.data = data
-                self.meta['ndata'] = data.shape[1]
-            else:
-                raise ValueError("data.shape is not equal (2, ndata)")
+        if data is not None:
+            if xdata is not None or ydata is not None:
+                raise ValueError("data must not be given "
+                                 "with xdata and ydata")
+            xdata, ydata = self._split_data(data)
+        elif xdata is None or ydata is None:
+            raise ValueError("data or both xdata and ydata must be given")
+
+        xdata = np.asarray(xdata)
+        ydata = np.asarray(ydata)
+        if xdata.ndim != 1 or xdata.shape != ydata.shape:
+            raise ValueError("xdata and ydata must be 1D arrays "
+                             "of the same size")
+
+        if 'ndata' in meta and meta['ndata'] != xdata.size:
+            raise ValueError("data.shape is not equal (2, meta['ndata'])")
+
+        self.xdata = xdata
+        self.ydata = ydata
+        self.meta['ndata'] = xdata.size
 
         if 'description' in meta:
             self.meta['description'] = meta['description']
@@ -111,15 +144,59 @@ class GwyGraphCurve:
         else:
             self.meta['color.blue'] = 0.
 
+    @property
+    def data(self):
+        """New array of shape (2, ndata) stacking xdata and ydata
+
+        Changes of the returned array do not change the curve,
+        use xdata and ydata for in-place changes.
+        """
+        return np.stack((self.xdata, self.ydata))
+
+    @data.setter
+    def data(self, data):
+        self.xdata, self.ydata = self._split_data(data)
+        self.meta['ndata'] = self.xdata.size
+
+    @staticmethod
+    def _split_data(data):
+        """Split array of shape (2, ndata) into xdata and ydata
+
+        Args:
+            data (array-like): abscissa and ordinate data
+                               of shape (2, ndata)
+
+        Returns:
+            (xdata, ydata): rows of data, views if data
+                            is a numpy array
+        """
+        data = np.asarray(data)
+        if data.ndim != 2 or data.shape[0] != 2:
+            raise ValueError("data.shape is not equal (2, ndata)")
+        return data[0], data[1]
+
     @classmethod
-    def from_gwy(cls, gwycurve):
+    def from_gwy(cls, gwycurve, meta=None, owner=None):
         """ Create GwyGraphCurve instance from
             <GwyGraphCurveModel*> object
+
+        Args:
+            gwycurve (GwyfileObject*):
+                GwyGraphCurveModel object
+            meta (dict):
+                metadata of the curve if it is already read
+                (see GwyGraphModel.from_gwy) or None
+            owner (Gwyfile):
+                Gwyfile instance containing gwycurve or None.
+                If owner is given, the data are not copied: xdata
+                and ydata are read-only views which keep the owner's
+                gwyfile object alive. Otherwise the data are copied.
         """
-        meta = cls._get_meta(gwycurve)
+        if meta is None:
+            meta = cls._get_meta(gwycurve)
         npoints = meta['ndata']
-        data = cls._get_data(gwycurve, npoints)
-        return GwyGraphCurve(data=data, meta=meta)
+        xdata, ydata = cls._get_data(gwycurve, npoints, owner=owner)
+        return GwyGraphCurve(xdata=xdata, ydata=ydata, meta=meta)
 
     @staticmethod
     def _get_meta(gwycurve):
@@ -137,74 +214,50 @@ class GwyGraphCurve:
         """
         error = ffi.new("GwyfileError*")
         errorp = ffi.new("GwyfileError**", error)
-        ndatap = ffi.new("int32_t*")
-        descriptionp = ffi.new("char**")
-        typep = ffi.new("int32_t*")
-        point_typep = ffi.new("int32_t*")
-        line_stylep = ffi.new("int32_t*")
-        point_sizep = ffi.new("int32_t*")
-        line_sizep = ffi.new("int32_t*")
-        color_redp = ffi.new("double*")
-        color_greenp = ffi.new("double*")
-        color_bluep = ffi.new("double*")
+        c_meta = ffi.new("PygwyfileGraphCurveMeta*")
+
+        if not lib.pygwyfile_graphcurve_get_meta(gwycurve, c_meta, errorp):
+            raise GwyfileErrorCMsg(errorp[0].message)
+        return GwyGraphCurve._meta_from_c(c_meta)
 
+    @staticmethod
+    def _meta_from_c(c_meta):
+        """
+        Convert metadata struct filled by libgwyfile to dictionary
+
+        Args:
+            c_meta (PygwyfileGraphCurveMeta*):
+                metadata of GwyGraphCurveModel object.
+                Its strings are freed.
+
+        Returns:
+            metadata (dict):
+                GwyGraphCurveModel metadata
+        """
         metadata = {}
+        metadata['ndata'] = c_meta.ndata
 
-        if not lib.gwyfile_object_graphcurvemodel_get(gwycurve,
-                                                      errorp,
-                                                      ffi.new('char[]',
-                                                              b'ndata'),
-                                                      ndatap,
-                                                      ffi.new('char[]',
-                                                              b'description'),
-                                                      descriptionp,
-                                                      ffi.new('char[]',
-                                                              b'type'),
-                                                      typep,
-                                                      ffi.new('char[]',
-                                                              b'point_type'),
-                                                      point_typep,
-                                                      ffi.new('char[]',
-                                                              b'line_style'),
-                                                      line_stylep,
-                                                      ffi.new('char[]',
-                                                              b'point_size'),
-                                                      point_sizep,
-                                                      ffi.new('char[]',
-                                                              b'line_size'),
-                                                      line_sizep,
-                                                      ffi.new('char[]',
-                                                              b'color.red'),
-                                                      color_redp,
-                                                      ffi.new('char[]',
-                                                              b'color.green'),
-                                                      color_greenp,
-                                                      ffi.new('char[]',
-                                                              b'color.blue'),
-                                                      color_bluep,
-                                                      ffi.NULL):
-            raise GwyfileErrorCMsg(errorp[0].message)
+        if c_meta.description:
+            description = ffi.string(c_meta.description).decode('utf-8')
+            metadata['description'] = description
         else:
-            metadata['ndata'] = ndatap[0]
-
-            if descriptionp[0]:
-                description = ffi.string(descriptionp[0]).decode('utf-8')
-                metadata['description'] = description
-            else:
-                metadata['description'] = ''
-
-            metadata['type'] = typep[0]
-            metadata['point_type'] = point_typep[0]
-            metadata['line_style'] = line_stylep[0]
-            metadata['point_size'] = point_sizep[0]
-            metadata['line_size'] = line_sizep[0]
-            metadata['color.red'] = color_redp[0]
-            metadata['color.green'] = color_greenp[0]
-            metadata['color.blue'] = color_bluep[0]
+            metadata['description'] = ''
+
+        metadata['type'] = c_meta.type
+        metadata['point_type'] = c_meta.point_type
+        metadata['line_style'] = c_meta.line_style
+        metadata['point_size'] = c_meta.point_size
+        metadata['line_size'] = c_meta.line_size
+        metadata['color.red'] = c_meta.color_red
+        metadata['color.green'] = c_meta.color_green
+        metadata['color.blue'] = c_meta.color_blue
+
+        # the string is newly allocated by libgwyfile
+        lib.pygwyfile_graphcurve_meta_free(c_meta)
         return metadata
 
     @staticmethod
-    def _get_data(gwycurve, npoints):
+    def _get_data(gwycurve, npoints, owner=None):
         """
         Get data from <GwyGraphCurveModel*> object
 
@@ -213,21 +266,22 @@ class GwyGraphCurve:
                 <GwyGraphCurveModel*> object from Libgwyfile
             npoints (int):
                 number of points in the curve
+            owner (Gwyfile): Gwyfile instance containing gwycurve
+                             or None
 
         Returns:
-            data (np.float64 numpy array):
-                2D numpy array with shape (2, npoints)
-                with xdata (data[0]) and ydata (data[1])
+            (xdata, ydata): 1D numpy arrays (float64) of size npoints,
+                            read-only views of the data owned by
+                            gwycurve if owner is given, otherwise
+                            copies of the data
         """
 
         error = ffi.new("GwyfileError*")
         errorp = ffi.new("GwyfileError**", error)
 
-        xdata = ffi.new("double[]", npoints)
-        xdatap = ffi.new("double**", xdata)
-
-        ydata = ffi.new("double[]", npoints)
-        ydatap = ffi.new("double**", ydata)
+        # libgwyfile returns pointers to the data owned by gwycurve
+        xdatap = ffi.new("double**")
+        ydatap = ffi.new("double**")
 
         if not lib.gwyfile_object_graphcurvemodel_get(gwycurve,
                                                       errorp,
@@ -239,37 +293,67 @@ class GwyGraphCurve:
                                                       ydatap,
                                                       ffi.NULL):
             raise GwyfileErrorCMsg(errorp[0].message)
+        elif owner is not None:
+            return (owner.view_double_array(xdatap[0], (npoints,)),
+                    owner.view_double_array(ydatap[0], (npoints,)))
         else:
-            xdata_buf = ffi.buffer(xdatap[0], npoints * ffi.sizeof(xdata))
-            xdata_array = np.frombuffer(xdata_buf, dtype=np.float64,
-                                        count=npoints)
-            ydata_buf = ffi.buffer(ydatap[0], npoints * ffi.sizeof(ydata))
-            ydata_array = np.frombuffer(ydata_buf, dtype=np.float64,
-                                        count=npoints)
-            data_array = np.vstack((xdata_array, ydata_array))
-            return data_array
-
-    def to_gwy(self):
+            return (GwyGraphCurve._copy_c_array(xdatap[0], npoints),
+                    GwyGraphCurve._copy_c_array(ydatap[0], npoints))
+
+    @staticmethod
+    def _copy_c_array(c_data, npoints):
+        """Copy C array of doubles to a new numpy array
+
+        Args:
+            c_data (cdata double*): the array, NULL if npoints is 0
+            npoints (int): size of the array
+
+        Returns:
+            array (1D numpy array, float64): copy of the array
+        """
+        if not npoints:
+            return np.zeros(0)
+        data_buf = ffi.buffer(c_data, npoints * ffi.sizeof("double"))
+        data_array = np.frombuffer(data_buf, dtype=np.float64,
+                                   count=npoints)
+        add_bytes_copied(data_array.nbytes)
+        return data_array.copy()
+
+    def to_gwy(self, keepalive=None):
         """ Get a new GWY file GwyGraphCurveModel object
 
+        xdata and ydata which are not contiguous float64 arrays
+        are converted once, directly to arrays consumed by the object.
+
+        Args:
+            keepalive (list): if None, the data are copied.
+                              Otherwise the data arrays are borrowed
+                              and appended to keepalive, which must be
+                              kept alive as long as the returned object.
+
         Returns:
             <GwyfileObject*>: GwyGraphCurveModel object
 
+        Raises:
+            ValueError: if xdata and ydata are not 1D arrays
+                        of the same size
+
         """
+        xshape = np.shape(self.xdata)
+        if len(xshape) != 1 or xshape != np.shape(self.ydata):
+            raise ValueError("xdata and ydata must be 1D arrays "
+                             "of the same size")
+
+        # xdata and ydata may have been replaced after __init__
+        self.meta['ndata'] = xshape[0]
+
         args = []
 
         ndata = ffi.cast("int32_t", self.meta['ndata'])
         args.append(ndata)
 
-        xdata = self.data[0]
-        xdatap = ffi.cast("double*", xdata.ctypes.data)
-        args.append(ffi.new("char[]", b"xdata"))
-        args.append(xdatap)
-
-        ydata = self.data[1]
-        ydatap = ffi.cast("double*", ydata.ctypes.data)
-        args.append(ffi.new("char[]", b"ydata"))
-        args.append(ydatap)
+        args.extend(new_double_array_arg("xdata", self.xdata, keepalive))
+        args.extend(new_double_array_arg("ydata", self.ydata, keepalive))
 
         if self.meta['description'] is not None:
             args.append(ffi.new("char[]", b'description'))
@@ -313,6 +397,10 @@ class GwyGraphCurve:
         gwycurve = lib.gwyfile_object_new_graphcurvemodel(*args)
         return gwycurve
 
+    def nbytes(self):
+        """Get size of the data arrays in bytes"""
+        return self.xdata.nbytes + self.ydata.nbytes
+
     def __repr__(self):
         return "<{} instance at {}. Description: {}>".format(
             self.__class__.__name__,
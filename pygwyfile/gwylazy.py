@@ -0,0 +1,195 @@
+""" Lazy containers for gwyddion objects decoded on demand
+
+    Classes:
+        GwyDecodedCache: LRU cache of decoded objects with a byte budget
+        GwyLazySequence: read-only sequence that decodes its elements
+                         on first access
+
+"""
+import collections
+from collections.abc import Sequence
+
+import numpy as np
+
+
+class GwyDecodedCache:
+    """LRU cache of decoded objects with an optional byte budget
+
+    The size of a cached object is the total size of numpy arrays
+    referenced by it (datafields, masks, curves etc.).
+    If the total size exceeds the budget, the least recently used
+    objects are evicted. The most recently used object is never evicted,
+    even if it alone exceeds the budget.
+
+    Attributes:
+        max_bytes (int): byte budget or None for unlimited cache
+        nbytes (int): total size of the cached objects in bytes
+
+    Methods:
+        get(key): Get cached object and mark it as recently used
+        put(key, value): Put object in the cache
+        clear(): Remove all objects from the cache
+    """
+
+    def __init__(self, max_bytes=None):
+        """
+        Args:
+            max_bytes (int): byte budget or None for unlimited cache
+        """
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError("max_bytes must be non-negative or None")
+
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+
+        # key -> (value, nbytes), the least recently used first
+        self._items = collections.OrderedDict()
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        """Get cached object and mark it as recently used
+
+        Args:
+            key: key of the object
+
+        Returns:
+            value: cached object
+
+        Raises:
+            KeyError: if the object is not in the cache
+        """
+        value, _ = self._items[key]
+        self._items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """Put object in the cache and evict old ones if budget is exceeded
+
+        Args:
+            key: key of the object
+            value: decoded object
+        """
+        if key in self._items:
+            _, nbytes = self._items.pop(key)
+            self.nbytes -= nbytes
+
+        nbytes = _get_nbytes(value)
+        self._items[key] = (value, nbytes)
+        self.nbytes += nbytes
+        self._evict()
+
+    def clear(self):
+        """Remove all objects from the cache"""
+        self._items.clear()
+        self.nbytes = 0
+
+    def _evict(self):
+        """Evict least recently used objects until the budget is met"""
+        if self.max_bytes is None:
+            return
+
+        while self.nbytes > self.max_bytes and len(self._items) > 1:
+            _, (_, nbytes) = self._items.popitem(last=False)
+            self.nbytes -= nbytes
+
+
+class GwyLazySequence(Sequence):
+    """Read-only sequence that decodes its elements on first access
+
+    Elements are decoded by the loader function and kept in
+    GwyDecodedCache. If the cache has a byte budget, evicted
+    elements are decoded again on the next access, so changes made
+    to an evicted element are lost. Use list(sequence) to get
+    a modifiable list of all elements.
+
+    Attributes:
+        keys (list): keys of the elements passed to the loader,
+                     e.g. channel ids
+
+    Methods:
+        is_decoded(index): Check whether the element is in the cache
+    """
+
+    def __init__(self, keys, loader, cache=None):
+        """
+        Args:
+            keys (list): keys of the elements, e.g. channel ids
+            loader (callable): function to decode the element by its key
+            cache (GwyDecodedCache): cache for decoded elements, it may be
+                                     shared by several sequences.
+                                     If None, new unlimited cache is used.
+        """
+        self.keys = list(keys)
+        self._loader = loader
+        if cache is None:
+            cache = GwyDecodedCache()
+        self._cache = cache
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        key = self.keys[index]
+        cache_key = (self, key)
+        try:
+            return self._cache.get(cache_key)
+        except KeyError:
+            value = self._loader(key)
+            self._cache.put(cache_key, value)
+            return value
+
+    def is_decoded(self, index):
+        """Check whether the element is decoded and kept in the cache
+
+        Args:
+            index (int): index of the element
+
+        Returns:
+            True if the element will be returned without decoding
+        """
+        return (self, self.keys[index]) in self._cache
+
+    def __repr__(self):
+        ndecoded = sum(1 for index in range(len(self))
+                       if self.is_decoded(index))
+        return "<{} instance at {}. Elements: {}. Decoded: {}.>".format(
+            self.__class__.__name__,
+            hex(id(self)),
+            len(self),
+            ndecoded)
+
+
+def _get_nbytes(value, _seen=None):
+    """Get total size of numpy arrays referenced by the object
+
+    Args:
+        value: decoded object (e.g. GwyChannel instance)
+
+    Returns:
+        nbytes (int): total size of the arrays in bytes
+    """
+    if _seen is None:
+        _seen = set()
+
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    elif isinstance(value, (list, tuple)):
+        return sum(_get_nbytes(item, _seen) for item in value)
+    elif isinstance(value, dict):
+        return sum(_get_nbytes(item, _seen) for item in value.values())
+    elif hasattr(value, '__dict__'):
+        return _get_nbytes(vars(value), _seen)
+    else:
+        return 0
@@ -0,0 +1,560 @@
+""" Memory-mapped reader of gwy files
+
+    The GWY file is mapped into memory and its serialized object tree
+    is walked once to build an index of all items. Data is not copied:
+    double arrays are exposed as read-only numpy views over the mapping,
+    so only the pages which are actually read are loaded from disk.
+
+    It is not a backend of read_gwyfile: it decodes datafields, bricks
+    and surfaces only, while GwyContainer.from_gwy also decodes graphs,
+    selections and spectra through libgwyfile, which validates the
+    whole file. It serves random access to large arrays and indexing
+    of files, e.g. by pygwyfile.gwyscan. The data it returns is the same
+    as read by libgwyfile.
+
+    Classes:
+        GwyItemIndex: location of a data item in the file
+        GwyMmapFile: memory-mapped gwy file with an item offset index
+
+"""
+import collections
+import mmap
+import re
+import struct
+
+import numpy as np
+
+from pygwyfile.gwyfile import GwyfileError
+from pygwyfile.gwybrick import GwyBrick
+from pygwyfile.gwydatafield import GwyDataField
+from pygwyfile.gwysurface import GwySurface
+
+_MAGIC_HEADER = b'GWYP'
+
+# libgwyfile refuses to read more deeply nested files
+_MAX_DEPTH = 200
+
+# Size of scalar items in bytes
+_SCALAR_SIZES = {'b': 1, 'c': 1, 'i': 4, 'q': 8, 'd': 8}
+
+# Item size of arrays with fixed-size elements in bytes
+_ARRAY_ITEMSIZES = {'C': 1, 'I': 4, 'Q': 8, 'D': 8}
+
+# Numpy dtypes of arrays with fixed-size elements
+_ARRAY_DTYPES = {'C': np.int8, 'I': '<i4', 'Q': '<i8', 'D': '<f8'}
+
+_CHANNEL_KEY_RE = re.compile(r'^/(\d+)/data$')
+
+_VOLUME_KEY_RE = re.compile(r'^/brick/(\d+)$')
+
+_SURFACE_KEY_RE = re.compile(r'^/xyz/(\d+)$')
+
+
+GwyItemIndex = collections.namedtuple('GwyItemIndex',
+                                      ['type', 'offset', 'length'])
+GwyItemIndex.__doc__ = """Location of a data item in the gwy file
+
+    Attributes:
+        type (str): item type character, e.g. 'd' for double,
+                    'D' for array of doubles, 'o' for object
+        offset (int): offset of the item value in the file.
+                      For arrays it is the offset of the first element,
+                      for objects it is the offset of the object name.
+        length (int): size of the item value in bytes
+                      (without terminating zero for strings)
+"""
+
+
+class GwyMmapFile:
+    """Memory-mapped gwy file with an item offset index
+
+    Items are addressed by path, i.e. a tuple of item names from the
+    top-level GwyContainer down to the item, e.g. ("/0/data", "data")
+    for the data array of the first channel. A string is a shortcut
+    for a top-level item, e.g. "/0/data/title". Elements of object
+    arrays are addressed by their index as a string, e.g.
+    ("/0/graph/graph/1", "curves", "0", "xdata").
+
+    Numpy arrays returned by this class are read-only views over the
+    mapping. The mapping stays open while any of them is alive,
+    even after close() is called, and is closed when the last of them
+    is deleted.
+
+    Attributes:
+        filename (string): name of the mapped file
+        index (dict): path -> GwyItemIndex for all items in the file
+
+    Methods:
+        from_gwy(filename): Map gwy file into memory and index it
+        get_value(path): Get value of a scalar or string item
+        get_array(path): Get array item as read-only numpy array
+        get_double_array(path): Get array of doubles as numpy array
+        get_object_name(path): Get type name of an object item
+        get_channel_ids(): Get ids of channels in the file
+        get_datafield(path): Get GwyDataField with data mapped from file
+        get_volume_ids(): Get ids of volumes in the file
+        get_brick(path): Get GwyBrick with data mapped from file
+        get_surface_ids(): Get ids of surfaces in the file
+        get_surface(path): Get GwySurface with data mapped from file
+        close(): Close the mapping
+    """
+
+    def __init__(self, filename, buf):
+        """
+        Args:
+            filename (string): name of the mapped file
+            buf (mmap.mmap or bytes): read-only mapping of the file
+                                      or contents of the file,
+                                      e.g. decompressed in memory
+
+        Top-level object of the file must be GwyContainer
+        """
+        self.filename = filename
+        self._mmap = buf
+        self.index = {}
+
+        if buf[:len(_MAGIC_HEADER)] != _MAGIC_HEADER:
+            raise GwyfileError("Wrong magic file header in {}".format(
+                filename))
+
+        name, offset = self._read_string(len(_MAGIC_HEADER), len(buf))
+        if name != 'GwyContainer':
+            raise GwyfileError("The top-level object of {} is not "
+                               "a GwyContainer".format(filename))
+
+        self._index_object(len(_MAGIC_HEADER), len(buf), (), 0)
+
+    @classmethod
+    def from_gwy(cls, filename):
+        """Map gwy file into memory and index its items
+
+        Args:
+            filename (string): filename including path
+
+        Returns:
+            GwyMmapFile: instance of GwyMmapFile class
+        """
+        with open(filename, 'rb') as fileobj:
+            buf = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            return cls(filename, buf)
+        except Exception:
+            buf.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __contains__(self, path):
+        return self._normalize_path(path) in self.index
+
+    def close(self):
+        """Close the mapping
+
+        If numpy arrays viewing the mapping are still alive,
+        the mapping is closed when the last of them is deleted.
+        Items cannot be read after close().
+        """
+        buf, self._mmap = self._mmap, None
+        if not isinstance(buf, mmap.mmap):
+            return
+        try:
+            buf.close()
+        except BufferError:
+            # arrays exported by get_array() hold references to buf,
+            # it is unmapped when the last of them is deleted
+            pass
+
+    def get_value(self, path):
+        """Get value of a scalar or string item
+
+        Args:
+            path (tuple or string): path of the item
+
+        Returns:
+            value: bool, bytes (for char), int, float or string
+                   or None if the item is not found
+        """
+        item = self._get_item(path)
+        if item is None:
+            return None
+        elif item.type == 'b':
+            return self._mmap[item.offset] != 0
+        elif item.type == 'c':
+            return self._mmap[item.offset:item.offset + 1]
+        elif item.type == 'i':
+            return struct.unpack_from('<i', self._mmap, item.offset)[0]
+        elif item.type == 'q':
+            return struct.unpack_from('<q', self._mmap, item.offset)[0]
+        elif item.type == 'd':
+            return struct.unpack_from('<d', self._mmap, item.offset)[0]
+        elif item.type == 's':
+            value = self._mmap[item.offset:item.offset + item.length]
+            return value.decode('utf-8')
+        else:
+            raise GwyfileError("Item {} of type '{}' is not a scalar".format(
+                path, item.type))
+
+    def get_array(self, path):
+        """Get array item as read-only numpy array viewing the mapping
+
+        Args:
+            path (tuple or string): path of the item
+
+        Returns:
+            array (1D numpy array): item data
+                                    or None if the item is not found
+        """
+        item = self._get_item(path)
+        if item is None:
+            return None
+        elif item.type not in _ARRAY_DTYPES:
+            raise GwyfileError("Item {} of type '{}' is not "
+                               "a numeric array".format(path, item.type))
+        count = item.length // _ARRAY_ITEMSIZES[item.type]
+        return np.frombuffer(self._mmap,
+                             dtype=_ARRAY_DTYPES[item.type],
+                             count=count,
+                             offset=item.offset)
+
+    def get_double_array(self, path):
+        """Get array of doubles as read-only numpy array viewing the mapping
+
+        Args:
+            path (tuple or string): path of the item
+
+        Returns:
+            array (1D numpy array, float64): item data
+                                             or None if item is not found
+        """
+        item = self._get_item(path)
+        if item is not None and item.type != 'D':
+            raise GwyfileError("Item {} is not an array of doubles".format(
+                path))
+        return self.get_array(path)
+
+    def get_object_name(self, path):
+        """Get type name of an object item
+
+        Args:
+            path (tuple or string): path of the item
+
+        Returns:
+            name (string): type name of the object, e.g. "GwyDataField"
+                           or None if the item is not found
+        """
+        item = self._get_item(path)
+        if item is None:
+            return None
+        elif item.type != 'o':
+            raise GwyfileError("Item {} is not an object".format(path))
+        name, _ = self._read_string(item.offset,
+                                    item.offset + item.length)
+        return name
+
+    def get_channel_ids(self):
+        """Get ids of channels in the file
+
+        Returns:
+            [list (int)]: sorted list of channel ids, e.g. [0, 1, 2]
+        """
+        ids = []
+        for path, item in self.index.items():
+            if len(path) != 1 or item.type != 'o':
+                continue
+            match = _CHANNEL_KEY_RE.match(path[0])
+            if match and self.get_object_name(path) == 'GwyDataField':
+                ids.append(int(match.group(1)))
+        return sorted(ids)
+
+    def get_datafield(self, path):
+        """Get GwyDataField with data array mapped from the file
+
+        Args:
+            path (tuple or string): path of <GwyDataField*> object,
+                                    e.g. "/0/data"
+
+        Returns:
+            datafield (GwyDataField): datafield with read-only data array
+                                      or None if the object is not found
+        """
+        path = self._normalize_path(path)
+        if path not in self.index:
+            return None
+        elif self.get_object_name(path) != 'GwyDataField':
+            raise GwyfileError("Item {} is not a GwyDataField".format(path))
+
+        meta = {}
+        meta['xres'] = self.get_value(path + ('xres',))
+        meta['yres'] = self.get_value(path + ('yres',))
+        for key, default in (('xreal', 1.), ('yreal', 1.),
+                             ('xoff', 0.), ('yoff', 0.)):
+            value = self.get_value(path + (key,))
+            meta[key] = default if value is None else value
+        for key in ('si_unit_xy', 'si_unit_z'):
+            unitstr = self.get_value(path + (key, 'unitstr'))
+            meta[key] = '' if unitstr is None else unitstr
+
+        data = self.get_double_array(path + ('data',))
+        if (meta['xres'] is None or meta['yres'] is None or data is None
+                or data.size != meta['xres'] * meta['yres']):
+            raise GwyfileError("Data array of {} does not match "
+                               "its dimensions".format(path))
+        data = data.reshape((meta['xres'], meta['yres']))
+        return GwyDataField(data=data, meta=meta)
+
+    def get_volume_ids(self):
+        """Get ids of volumes in the file
+
+        Returns:
+            [list (int)]: sorted list of volume ids, e.g. [0, 1]
+        """
+        return self._get_object_ids(_VOLUME_KEY_RE, 'GwyBrick')
+
+    def get_surface_ids(self):
+        """Get ids of surfaces (XYZ data) in the file
+
+        Returns:
+            [list (int)]: sorted list of surface ids, e.g. [0, 1]
+        """
+        return self._get_object_ids(_SURFACE_KEY_RE, 'GwySurface')
+
+    def get_brick(self, path):
+        """Get GwyBrick with data array mapped from the file
+
+        Only the pages of the volume which are accessed, e.g. by
+        GwyBrick.get_zslab or get_xy_plane, are read from disk.
+
+        Args:
+            path (tuple or string): path of <GwyBrick*> object,
+                                    e.g. "/brick/0"
+
+        Returns:
+            brick (GwyBrick): brick with read-only data array
+                              or None if the object is not found.
+                              Its title is read from the "title" item
+                              next to the brick in the top-level
+                              container.
+        """
+        path = self._normalize_path(path)
+        if path not in self.index:
+            return None
+        elif self.get_object_name(path) != 'GwyBrick':
+            raise GwyfileError("Item {} is not a GwyBrick".format(path))
+
+        meta = {}
+        for key in ('xres', 'yres', 'zres'):
+            meta[key] = self.get_value(path + (key,))
+        for key, default in (('xreal', 1.), ('yreal', 1.), ('zreal', 1.),
+                             ('xoff', 0.), ('yoff', 0.), ('zoff', 0.)):
+            value = self.get_value(path + (key,))
+            meta[key] = default if value is None else value
+        for key in ('si_unit_x', 'si_unit_y', 'si_unit_z', 'si_unit_w'):
+            unitstr = self.get_value(path + (key, 'unitstr'))
+            meta[key] = '' if unitstr is None else unitstr
+
+        shape = (meta['zres'], meta['yres'], meta['xres'])
+        data = self.get_double_array(path + ('data',))
+        if (None in shape or data is None
+                or data.size != shape[0] * shape[1] * shape[2]):
+            raise GwyfileError("Data array of {} does not match "
+                               "its dimensions".format(path))
+        data = data.reshape(shape)
+
+        return GwyBrick(data=data, meta=meta, title=self._get_title(path))
+
+    def get_surface(self, path):
+        """Get GwySurface with data array mapped from the file
+
+        Args:
+            path (tuple or string): path of <GwySurface*> object,
+                                    e.g. "/xyz/0"
+
+        Returns:
+            surface (GwySurface): surface with read-only data array
+                                  or None if the object is not found.
+                                  Its title is read as for get_brick.
+        """
+        path = self._normalize_path(path)
+        if path not in self.index:
+            return None
+        elif self.get_object_name(path) != 'GwySurface':
+            raise GwyfileError("Item {} is not a GwySurface".format(path))
+
+        meta = {}
+        for key in ('si_unit_xy', 'si_unit_z'):
+            unitstr = self.get_value(path + (key, 'unitstr'))
+            meta[key] = '' if unitstr is None else unitstr
+
+        data = self.get_double_array(path + ('data',))
+        if data is None or data.size % 3:
+            raise GwyfileError("Data array of {} is not an array "
+                               "of triplets".format(path))
+        data = data.reshape((-1, 3))
+        return GwySurface(data=data, meta=meta, title=self._get_title(path))
+
+    def _get_object_ids(self, key_re, object_name):
+        """Get sorted ids of top-level objects of the type
+
+        Args:
+            key_re (compiled regexp): key pattern with the id as group 1
+            object_name (string): type name of the objects
+        """
+        ids = []
+        for path, item in self.index.items():
+            if len(path) != 1 or item.type != 'o':
+                continue
+            match = key_re.match(path[0])
+            if match and self.get_object_name(path) == object_name:
+                ids.append(int(match.group(1)))
+        return sorted(ids)
+
+    def _get_title(self, path):
+        """Get title item next to top-level object or None"""
+        if len(path) == 1:
+            return self.get_value(path[0] + '/title')
+        return None
+
+    def _get_item(self, path):
+        """Get GwyItemIndex of the item or None if it is not found"""
+        if self._mmap is None:
+            raise ValueError("{} is closed".format(self.filename))
+        return self.index.get(self._normalize_path(path))
+
+    @staticmethod
+    def _normalize_path(path):
+        """Convert string path of top-level item to tuple"""
+        if isinstance(path, str):
+            return (path,)
+        else:
+            return tuple(path)
+
+    def _read_string(self, offset, end):
+        """Read zero-terminated UTF-8 string
+
+        Args:
+            offset (int): offset of the string
+            end (int): the string must be terminated before this offset
+
+        Returns:
+            (string, offset): the string and the offset after its
+                              terminating zero
+        """
+        nul = self._mmap.find(b'\0', offset, end)
+        if nul < 0:
+            raise GwyfileError("Unterminated string at offset {:d} "
+                               "in {}".format(offset, self.filename))
+        value = self._mmap[offset:nul].decode('utf-8')
+        return value, nul + 1
+
+    def _read_uint32(self, offset, end):
+        """Read little-endian 32bit unsigned integer"""
+        self._check_size(offset, 4, end)
+        return struct.unpack_from('<I', self._mmap, offset)[0]
+
+    def _check_size(self, offset, size, end):
+        """Raise GwyfileError if size bytes do not fit before end"""
+        if offset + size > end:
+            raise GwyfileError("Truncated data at offset {:d} "
+                               "in {}".format(offset, self.filename))
+
+    def _index_object(self, offset, end, path, depth):
+        """Index all items of the object
+
+        Args:
+            offset (int): offset of the object name
+            end (int): the object must end before this offset
+            path (tuple): path of the object
+            depth (int): nesting depth of the object
+
+        Returns:
+            offset (int): offset after the end of the object
+        """
+        if depth >= _MAX_DEPTH:
+            raise GwyfileError("Too deep object nesting in {}".format(
+                self.filename))
+
+        _, offset = self._read_string(offset, end)
+        data_size = self._read_uint32(offset, end)
+        offset += 4
+        self._check_size(offset, data_size, end)
+        object_end = offset + data_size
+
+        while offset < object_end:
+            offset = self._index_item(offset, object_end, path, depth + 1)
+        return offset
+
+    def _index_item(self, offset, end, path, depth):
+        """Index the item and, for objects, all their items
+
+        Args:
+            offset (int): offset of the item name
+            end (int): the item must end before this offset
+            path (tuple): path of the object the item belongs to
+            depth (int): nesting depth of the item
+
+        Returns:
+            offset (int): offset after the end of the item
+        """
+        name, offset = self._read_string(offset, end)
+        self._check_size(offset, 1, end)
+        item_type = chr(self._mmap[offset])
+        offset += 1
+        item_path = path + (name,)
+
+        if item_type in _SCALAR_SIZES:
+            length = _SCALAR_SIZES[item_type]
+            self._check_size(offset, length, end)
+            self.index[item_path] = GwyItemIndex(item_type, offset, length)
+            return offset + length
+        elif item_type == 's':
+            _, value_end = self._read_string(offset, end)
+            length = value_end - offset - 1
+            self.index[item_path] = GwyItemIndex(item_type, offset, length)
+            return value_end
+        elif item_type == 'o':
+            object_end = self._index_object(offset, end, item_path, depth)
+            self.index[item_path] = GwyItemIndex(item_type, offset,
+                                                 object_end - offset)
+            return object_end
+
+        nitems = self._read_uint32(offset, end)
+        offset += 4
+        if item_type in _ARRAY_ITEMSIZES:
+            length = nitems * _ARRAY_ITEMSIZES[item_type]
+            self._check_size(offset, length, end)
+            self.index[item_path] = GwyItemIndex(item_type, offset, length)
+            return offset + length
+        elif item_type == 'S':
+            array_start = offset
+            for i in range(nitems):
+                _, offset = self._read_string(offset, end)
+            self.index[item_path] = GwyItemIndex(item_type, array_start,
+                                                 offset - array_start)
+            return offset
+        elif item_type == 'O':
+            array_start = offset
+            for i in range(nitems):
+                element_path = item_path + (str(i),)
+                element_end = self._index_object(offset, end,
+                                                 element_path, depth)
+                self.index[element_path] = GwyItemIndex(
+                    'o', offset, element_end - offset)
+                offset = element_end
+            self.index[item_path] = GwyItemIndex(item_type, array_start,
+                                                 offset - array_start)
+            return offset
+        else:
+            raise GwyfileError("Invalid item type {!r} of {} in {}".format(
+                item_type, item_path, self.filename))
+
+    def __repr__(self):
+        return "<{} instance at {}. File: {}. Items: {}.>".format(
+            self.__class__.__name__,
+            hex(id(self)),
+            self.filename,
+            len(self.index))
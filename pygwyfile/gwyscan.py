@@ -0,0 +1,249 @@
+""" Metadata-only scan of gwy files
+
+    Files are read with GwyMmapFile, i.e. only the item index is built
+    and the values of metadata items are read. Data arrays are never
+    decoded or copied, so their pages are not even loaded from disk.
+    Compressed files (.gwy.gz, .gwy.zst), detected by their magic
+    header, cannot be mapped. They are decompressed in chunks into
+    a temporary file, which is mapped instead, so scanning them takes
+    time and temporary disk space proportional to the whole file.
+
+    Classes:
+        GwyChannelInfo: metadata of a channel
+        GwyGraphInfo: metadata of a graph
+        GwyFileInfo: metadata of a gwy file
+
+    Functions:
+        scan_gwyfile(filename): Get metadata of gwy file
+        scan_directory(root, pattern=GWY_PATTERNS, ignore_errors=False):
+                                Get metadata of all gwy files in directory
+
+    Constants:
+        GWY_PATTERNS: patterns of names of plain and compressed gwy files
+
+"""
+import collections
+import fnmatch
+import mmap
+import os
+import re
+import shutil
+import tempfile
+
+from pygwyfile.gwycompress import MAGIC_SIZE, detect_compression
+from pygwyfile.gwycompress import open_decompressed
+from pygwyfile.gwyfile import GwyfileError
+from pygwyfile.gwymmap import GwyMmapFile
+
+GWY_PATTERNS = ('*.gwy', '*.gwy.gz', '*.gwy.gzip',
+                '*.gwy.zst', '*.gwy.zstd')
+
+_GRAPH_KEY_RE = re.compile(r'^/0/graph/graph/(\d+)$')
+
+# Size of chunks of compressed files decompressed at once in bytes
+_COPY_CHUNK_SIZE = 2**20
+
+
+GwyChannelInfo = collections.namedtuple(
+    'GwyChannelInfo',
+    ['id', 'title', 'xres', 'yres', 'xreal', 'yreal',
+     'si_unit_xy', 'si_unit_z', 'palette', 'has_mask', 'has_show'])
+GwyChannelInfo.__doc__ = """Metadata of a channel
+
+    Attributes:
+        id (int): channel id, e.g. 0 for "/0/data"
+        title (string): title of the channel or None
+        xres (int): horizontal dimension of the data field in pixels
+        yres (int): vertical dimension of the data field in pixels
+        xreal (float): horizontal size of the data field
+                       in physical units
+        yreal (float): vertical size of the data field in physical units
+        si_unit_xy (string): physical unit of lateral dimensions
+        si_unit_z (string): physical unit of data values
+        palette (string): name of the false color gradient or None
+        has_mask (boolean): whether the channel has a mask
+        has_show (boolean): whether the channel has a presentation
+"""
+
+
+GwyGraphInfo = collections.namedtuple('GwyGraphInfo',
+                                      ['id', 'title', 'ncurves'])
+GwyGraphInfo.__doc__ = """Metadata of a graph
+
+    Attributes:
+        id (int): graph id, e.g. 1 for "/0/graph/graph/1"
+        title (string): title of the graph or None
+        ncurves (int): number of curves in the graph
+"""
+
+
+GwyFileInfo = collections.namedtuple('GwyFileInfo',
+                                     ['filename', 'channels', 'graphs'])
+GwyFileInfo.__doc__ = """Metadata of a gwy file
+
+    Attributes:
+        filename (string): name of the file
+        channels (list of GwyChannelInfo): channels sorted by id
+        graphs (list of GwyGraphInfo): graphs sorted by id
+"""
+
+
+def scan_gwyfile(filename):
+    """Get metadata of gwy file without reading of data arrays
+
+    Args:
+        filename (string): filename including path,
+                           the file may be compressed by gzip or zstd.
+                           Compressed file is decompressed
+                           to a temporary file.
+
+    Returns:
+        GwyFileInfo: metadata of channels and graphs in the file
+    """
+    with _open_gwymmap(filename) as gwymmap:
+        channels = [_scan_channel(gwymmap, channel_id)
+                    for channel_id in gwymmap.get_channel_ids()]
+        graphs = [_scan_graph(gwymmap, graph_id)
+                  for graph_id in _get_graph_ids(gwymmap)]
+    return GwyFileInfo(filename=filename,
+                       channels=channels,
+                       graphs=graphs)
+
+
+def scan_directory(root, pattern=GWY_PATTERNS, ignore_errors=False):
+    """Get metadata of all gwy files in directory tree
+
+    Args:
+        root (string): top directory
+        pattern (string or tuple of strings): shell-style pattern
+                                              or patterns of file names
+        ignore_errors (boolean): if True, files which cannot be read
+                                 are skipped, otherwise GwyfileError or
+                                 OSError is raised
+
+    Yields:
+        GwyFileInfo: metadata of each file, in the order
+                     directories are walked by os.walk
+    """
+    if isinstance(pattern, str):
+        pattern = (pattern,)
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        names = [name for name in filenames
+                 if any(fnmatch.fnmatch(name, name_pattern)
+                        for name_pattern in pattern)]
+        for name in sorted(names):
+            filename = os.path.join(dirpath, name)
+            try:
+                yield scan_gwyfile(filename)
+            except (GwyfileError, OSError, ValueError):
+                # ValueError is raised by mmap for empty files
+                if not ignore_errors:
+                    raise
+
+
+def _open_gwymmap(filename):
+    """Map gwy file or decompressed copy of it into memory and index it
+
+    Compressed files are decompressed in chunks into a temporary file,
+    which is mapped, so memory use does not grow with the file size.
+    The whole file is still decompressed, because data arrays have to
+    be decompressed to reach the items behind them.
+
+    Args:
+        filename (string): filename including path
+
+    Returns:
+        GwyMmapFile: indexed gwy file
+    """
+    with open(filename, 'rb') as fileobj:
+        compression = detect_compression(fileobj.read(MAGIC_SIZE))
+        if compression is None:
+            return GwyMmapFile.from_gwy(filename)
+        fileobj.seek(0)
+        with tempfile.TemporaryFile() as tmpfile:
+            with open_decompressed(fileobj, compression) as reader:
+                try:
+                    shutil.copyfileobj(reader, tmpfile, _COPY_CHUNK_SIZE)
+                except Exception as error:
+                    raise GwyfileError("Cannot decompress {}: {}".format(
+                        filename, error)) from error
+            tmpfile.flush()
+            if tmpfile.tell() == 0:
+                # empty file cannot be mapped
+                return GwyMmapFile(filename, b'')
+            buf = mmap.mmap(tmpfile.fileno(), 0, access=mmap.ACCESS_READ)
+
+    # the mapping stays valid after the temporary file is closed
+    try:
+        return GwyMmapFile(filename, buf)
+    except Exception:
+        buf.close()
+        raise
+
+
+def _scan_channel(gwymmap, channel_id):
+    """Get metadata of the channel
+
+    Args:
+        gwymmap (GwyMmapFile): indexed gwy file
+        channel_id (int): id of the channel
+
+    Returns:
+        GwyChannelInfo: metadata of the channel
+    """
+    key = "/{:d}/data".format(channel_id)
+    xreal = gwymmap.get_value((key, 'xreal'))
+    yreal = gwymmap.get_value((key, 'yreal'))
+    si_unit_xy = gwymmap.get_value((key, 'si_unit_xy', 'unitstr'))
+    si_unit_z = gwymmap.get_value((key, 'si_unit_z', 'unitstr'))
+    return GwyChannelInfo(
+        id=channel_id,
+        title=gwymmap.get_value(key + "/title"),
+        xres=gwymmap.get_value((key, 'xres')),
+        yres=gwymmap.get_value((key, 'yres')),
+        xreal=1. if xreal is None else xreal,
+        yreal=1. if yreal is None else yreal,
+        si_unit_xy='' if si_unit_xy is None else si_unit_xy,
+        si_unit_z='' if si_unit_z is None else si_unit_z,
+        palette=gwymmap.get_value("/{:d}/base/palette".format(channel_id)),
+        has_mask="/{:d}/mask".format(channel_id) in gwymmap,
+        has_show="/{:d}/show".format(channel_id) in gwymmap)
+
+
+def _get_graph_ids(gwymmap):
+    """Get ids of graphs in the file
+
+    Args:
+        gwymmap (GwyMmapFile): indexed gwy file
+
+    Returns:
+        [list (int)]: sorted list of graph ids, e.g. [1, 2]
+    """
+    ids = []
+    for path, item in gwymmap.index.items():
+        if len(path) != 1 or item.type != 'o':
+            continue
+        match = _GRAPH_KEY_RE.match(path[0])
+        if match and gwymmap.get_object_name(path) == 'GwyGraphModel':
+            ids.append(int(match.group(1)))
+    return sorted(ids)
+
+
+def _scan_graph(gwymmap, graph_id):
+    """Get metadata of the graph
+
+    Args:
+        gwymmap (GwyMmapFile): indexed gwy file
+        graph_id (int): id of the graph
+
+    Returns:
+        GwyGraphInfo: metadata of the graph
+    """
+    key = "/0/graph/graph/{:d}".format(graph_id)
+    ncurves = 0
+    while (key, 'curves', str(ncurves)) in gwymmap:
+        ncurves += 1
+    return GwyGraphInfo(id=graph_id,
+                        title=gwymmap.get_value((key, 'title')),
+                        ncurves=ncurves)
@@ -12,51 +12,114 @@
 
 from abc import ABC, abstractmethod
 
+import numpy as np
+
 from pygwyfile._libgwyfile import ffi, lib
-from pygwyfile.gwyfile import GwyfileErrorCMsg
+from pygwyfile.gwyfile import GwyfileErrorCMsg, new_double_array_arg
+from pygwyfile.stats import timed, add_bytes_copied
 
 
 class GwySelection(ABC):
     """Base class for GwySelection objects
 
     Attributes:
-        data: list
-              list of selection data
+        points: numpy array of shape (nsel, npoints, 2)
+                coordinates (x, y) of npoints points of each of nsel
+                selections (e.g. npoints is 2 for line selection)
+        data: list of selections as tuples of coordinates,
+              view of points kept for compatibility.
+              Assigning a list to data replaces points.
 
     Metods:
         from_gwy(gwyobject): Create GwySelection* object from <GwyfileObject*>
                              Must be redefined in subclass
+        nbytes(): Get memory used by the selection data in bytes
 
     """
     # _get_sel_func (C func): Libgwyfile C function to get selection.
     #                         Must be redefined in subclass
     #
+    # _new_sel_func (C func): Libgwyfile C function to create selection.
+    #                         Must be redefined in subclass
+    #
+    # Subclasses call the C functions through the module-global lib
+    # when they are called, so pygwyfile.stats can count the calls.
+    #
     # _npoints (int): Number of points in one selection
     #                 (e.g. 1 for point selection, 2 for line selection)
     _get_sel_func = None
     _new_sel_func = None
     _npoints = 1
 
-    data = []
-
     @abstractmethod
     def __init__(self, points):
         """
         Args:
-            points: list or tuple of points
-                    each point is a tuple of coordinates (x, y)
+            points: list or tuple of selections, each selection is
+                    a point (x, y) or a tuple of npoints points,
+                    or array of shape (nsel, npoints, 2)
         """
         pass
 
     @property
-    @abstractmethod
-    def _cdata(self):
-        """ Representation of selection data as C array
+    def data(self):
+        """List of selections as tuples of coordinates"""
+        if self._npoints == 1:
+            return [tuple(point) for point in self.points[:, 0].tolist()]
+        return [tuple(tuple(point) for point in sel)
+                for sel in self.points.tolist()]
+
+    @data.setter
+    def data(self, selections):
+        self.points = self._to_points_array(selections)
+
+    @classmethod
+    def _to_points_array(cls, selections):
+        """Convert selections to array of shape (nsel, npoints, 2)
+
+        Args:
+            selections: array-like of points or of tuples
+                        of npoints points,
+                        e.g. [(x1, y1), ...] for point selection
+                        or [((x1, y1), (x2, y2)), ...] for line selection
+
+        Returns:
+            points (numpy array): C-contiguous float64 array,
+                                  selections itself if possible
+
+        Raises:
+            ValueError: if shape of selections is not (nsel, npoints, 2)
+                        or (nsel, 2) for selections of one point
         """
-        pass
+        points = np.ascontiguousarray(selections, dtype=np.float64)
+        shape = (cls._npoints, 2)
+        if points.shape == (0,):
+            # empty list of selections
+            points = points.reshape((0,) + shape)
+        elif cls._npoints == 1 and points.ndim == 2 and points.shape[-1] == 2:
+            points = points.reshape((-1,) + shape)
+        elif points.ndim != 3 or points.shape[1:] != shape:
+            raise ValueError("selections must consist of "
+                             "{:d} points (x, y)".format(cls._npoints))
+        return points
+
+    @classmethod
+    def _combine_points(cls, points):
+        """Combine points read from gwysel into selections
+            [(x1, y1), (x2, y2), ...] -> [((x1, y1), (x2, y2)), ...]
+        """
+        return np.reshape(points, (-1, cls._npoints, 2))
+
+    def _init_points(self, selections):
+        """Set points from non-empty selections"""
+        points = self._to_points_array(selections)
+        if len(points) == 0:
+            raise ValueError("points list is empty")
+        self.points = points
 
     @classmethod
     @abstractmethod
+    @timed('selections')
     def from_gwy(cls, gwysel):
         """
         Get points from <GwyfileObject*>
@@ -67,8 +130,9 @@ class GwySelection(ABC):
                 e.g. GwySelectionPoint object for point selection
 
         Returns:
-            [(x1, y1), ..., (xN, yN)]: list of tuples with point coordinates
-            or None :                  if there are no point selections
+            points (numpy array): array of shape (nsel, npoints, 2)
+                                  with point coordinates
+            or None :             if there are no point selections
 
         """
 
@@ -76,22 +140,28 @@ class GwySelection(ABC):
         points = cls._get_selection_points(gwysel, nsel)
         return points
 
-    def to_gwy(self):
+    @timed('selections')
+    def to_gwy(self, keepalive=None):
         """ Get <GwyfileObject*> representation of the selection class
 
+        Args:
+            keepalive (list): if None, the points are copied
+                              by libgwyfile. Otherwise they are borrowed
+                              and appended to keepalive, which must be
+                              kept alive as long as the returned object.
+
         Returns:
             <GwyfileObject*> for given type of selection or None if
             selection data is empty
 
         """
-        nsel = len(self.data)
+        nsel = len(self.points)
         if nsel == 0:
             return None
         else:
-            gwysel = self._new_sel_func(nsel,
-                                        ffi.new("char[]", b"data(copy)"),
-                                        self._cdata,
-                                        ffi.NULL)
+            c_name, c_data = new_double_array_arg("data", self.points,
+                                                  keepalive)
+            gwysel = self._new_sel_func(nsel, c_name, c_data, ffi.NULL)
             return gwysel
 
     @classmethod
@@ -127,6 +197,8 @@ class GwySelection(ABC):
     def _get_selection_points(cls, gwysel, nsel):
         """Get all points of selection from the gwysel object
 
+        The coordinates are copied from the object with one buffer copy.
+
         Args:
             gwysel (GwyfileObject*):
                 GwySelection object from Libgwyfile
@@ -135,8 +207,9 @@ class GwySelection(ABC):
                 number of selections of this type in gwysel
 
         Returns:
-            [(x1, y1), ..., (xN, yN)]: list of tuples with point coordinates
-                                       or None if there are no selections
+            points (numpy array): array of shape (nsel, npoints, 2)
+                                  with point coordinates
+                                  or None if there are no selections
 
         """
 
@@ -146,44 +219,45 @@ class GwySelection(ABC):
         if nsel == 0:
             return None
         else:
-            data = ffi.new("double[]", 2 * nsel * cls._npoints)
-            datap = ffi.new("double**", data)
+            datap = ffi.new("double**")
 
         if cls._get_sel_func(gwysel,
                              errorp,
                              ffi.new("char[]", b'data'),
                              datap,
                              ffi.NULL):
-            data = datap[0]
-            points = [(data[i * 2], data[i * 2 + 1])
-                      for i in range(nsel * cls._npoints)]
+            shape = (nsel, cls._npoints, 2)
+            buf = ffi.buffer(datap[0],
+                             int(np.prod(shape)) * ffi.sizeof("double"))
+            points = np.frombuffer(buf, dtype=np.float64).reshape(shape)
+            points = points.copy()
+            add_bytes_copied(points.nbytes)
         else:
             raise GwyfileErrorCMsg(errorp[0].message)
 
         return points
 
-    @staticmethod
-    def _combine_points_in_pair(points):
-        """ Combine list of points in list of pairs
-            [(x1, y1), (x2, y2), ...] -> [((x1, y1), (x2, y2))...]
-        """
+    def nbytes(self):
+        """Get memory used by the selection data in bytes
 
-        pairs = list(zip(tuple(points[::2]),
-                         tuple(points[1::2])))
-        return pairs
+        Returns:
+            nbytes (int): size of the array of points
+        """
+        return self.points.nbytes
 
     def __repr__(self):
         return "<{} instance at {}. Selections: {}>".format(
             self.__class__.__name__,
             hex(id(self)),
-            len(self.data))
+            len(self.points))
 
 
 class GwyPointSelection(GwySelection):
     """Class for point selection
 
     Attributes:
-        data: non-empty list of points [(x1, y1), ...]
+        points: numpy array of shape (nsel, 1, 2)
+        data: list of points [(x1, y1), ...]
 
     Methods:
         from_gwy(gwyobject): Create GwyPointSelection instance from
@@ -191,29 +265,22 @@ class GwyPointSelection(GwySelection):
     """
 
     _npoints = 1  # number of points in one point selection
-    _get_sel_func = lib.gwyfile_object_selectionpoint_get
-    _new_sel_func = lib.gwyfile_object_new_selectionpoint
+
+    @staticmethod
+    def _get_sel_func(*args):
+        return lib.gwyfile_object_selectionpoint_get(*args)
+
+    @staticmethod
+    def _new_sel_func(*args):
+        return lib.gwyfile_object_new_selectionpoint(*args)
 
     def __init__(self, points):
         """
         Args:
             points: list or tuple of points (x, y)
+                    or array of shape (nsel, 2)
         """
-        if points:
-            self.data = list(points)
-        else:
-            raise ValueError("points list is empty")
-
-    @property
-    def _cdata(self):
-        """ Representation of point selections list as C array
-        """
-        if self.data:
-            flat_data_list = [val for point in self.data for val in point]
-            cdata = ffi.new("double[]", flat_data_list)
-            return cdata
-        else:
-            return None
+        self._init_points(points)
 
     @classmethod
     def from_gwy(cls, gwysel):
@@ -239,6 +306,7 @@ class GwyPointerSelection(GwySelection):
     """Class for pointer selection
 
     Attributes:
+        points: numpy array of shape (nsel, 1, 2)
         data: list of points [(x1, y1), ...]
 
     Methods:
@@ -247,14 +315,17 @@ class GwyPointerSelection(GwySelection):
     """
 
     _npoints = 1  # number of points in one pointer selection
-    _get_sel_func = lib.gwyfile_object_selectionpoint_get
-    _new_sel_func = lib.gwyfile_object_new_selectionpoint
+
+    @staticmethod
+    def _get_sel_func(*args):
+        return lib.gwyfile_object_selectionpoint_get(*args)
+
+    @staticmethod
+    def _new_sel_func(*args):
+        return lib.gwyfile_object_new_selectionpoint(*args)
 
     def __init__(self, points):
-        if points:
-            self.data = list(points)
-        else:
-            raise ValueError("points list is empty")
+        self._init_points(points)
 
     @classmethod
     def from_gwy(cls, gwysel):
@@ -275,22 +346,12 @@ class GwyPointerSelection(GwySelection):
         else:
             return None
 
-    @property
-    def _cdata(self):
-        """ Representation of pointer selections list as C array
-        """
-        if self.data:
-            flat_data_list = [val for point in self.data for val in point]
-            cdata = ffi.new("double[]", flat_data_list)
-            return cdata
-        else:
-            return None
-
 
 class GwyLineSelection(GwySelection):
     """Class for line selections
 
     Attributes:
+        points: numpy array of shape (nsel, 2, 2)
         data: list of point pairs [((x1, y1), (x2, y2))...]
               (two points for one line selection)
 
@@ -300,14 +361,17 @@ class GwyLineSelection(GwySelection):
     """
 
     _npoints = 2  # number of points in one line selection
-    _get_sel_func = lib.gwyfile_object_selectionline_get
-    _new_sel_func = lib.gwyfile_object_new_selectionline
+
+    @staticmethod
+    def _get_sel_func(*args):
+        return lib.gwyfile_object_selectionline_get(*args)
+
+    @staticmethod
+    def _new_sel_func(*args):
+        return lib.gwyfile_object_new_selectionline(*args)
 
     def __init__(self, point_pairs):
-        if point_pairs:
-            self.data = list(point_pairs)
-        else:
-            raise ValueError("points list is empty")
+        self._init_points(point_pairs)
 
     @classmethod
     def from_gwy(self, gwysel):
@@ -324,28 +388,17 @@ class GwyLineSelection(GwySelection):
         """
         points = super().from_gwy(gwysel)
         if points is not None:
-            point_pairs = super()._combine_points_in_pair(points)
+            point_pairs = super()._combine_points(points)
             return GwyLineSelection(point_pairs)
         else:
             return None
 
-    @property
-    def _cdata(self):
-        """Representation of line selections list as C array"""
-        if self.data:
-            flat_data_list = [val for line in self.data
-                              for point in line
-                              for val in point]
-            cdata = ffi.new("double[]", flat_data_list)
-            return cdata
-        else:
-            return None
-
 
 class GwyRectangleSelection(GwySelection):
     """Class for rectange selections
 
     Attributes:
+        points: numpy array of shape (nsel, 2, 2)
         data: list of point pairs [((x1, y1), (x2, y2))...]
               (two points for one rectangle selection)
 
@@ -355,14 +408,17 @@ class GwyRectangleSelection(GwySelection):
     """
 
     _npoints = 2  # number of points in one rectangle selection
-    _get_sel_func = lib.gwyfile_object_selectionrectangle_get
-    _new_sel_func = lib.gwyfile_object_new_selectionrectangle
+
+    @staticmethod
+    def _get_sel_func(*args):
+        return lib.gwyfile_object_selectionrectangle_get(*args)
+
+    @staticmethod
+    def _new_sel_func(*args):
+        return lib.gwyfile_object_new_selectionrectangle(*args)
 
     def __init__(self, point_pairs):
-        if point_pairs:
-            self.data = list(point_pairs)
-        else:
-            raise ValueError("points list is empty")
+        self._init_points(point_pairs)
 
     @classmethod
     def from_gwy(self, gwysel):
@@ -380,28 +436,17 @@ class GwyRectangleSelection(GwySelection):
         """
         points = super().from_gwy(gwysel)
         if points is not None:
-            point_pairs = super()._combine_points_in_pair(points)
+            point_pairs = super()._combine_points(points)
             return GwyRectangleSelection(point_pairs)
         else:
             return None
 
-    @property
-    def _cdata(self):
-        """Representation of rectangle selections list as C array"""
-        if self.data:
-            flat_data_list = [val for line in self.data
-                              for point in line
-                              for val in point]
-            cdata = ffi.new("double[]", flat_data_list)
-            return cdata
-        else:
-            return None
-
 
 class GwyEllipseSelection(GwySelection):
     """Class for ellipse selections
 
     Attributes:
+        points: numpy array of shape (nsel, 2, 2)
         data: list of point pairs [((x1, y1), (x2, y2))...]
               (two points for one ellipse selection)
 
@@ -412,14 +457,17 @@ class GwyEllipseSelection(GwySelection):
     """
 
     _npoints = 2  # number of points in one ellipse selection
-    _get_sel_func = lib.gwyfile_object_selectionellipse_get
-    _new_sel_func = lib.gwyfile_object_new_selectionellipse
+
+    @staticmethod
+    def _get_sel_func(*args):
+        return lib.gwyfile_object_selectionellipse_get(*args)
+
+    @staticmethod
+    def _new_sel_func(*args):
+        return lib.gwyfile_object_new_selectionellipse(*args)
 
     def __init__(self, point_pairs):
-        if point_pairs:
-            self.data = list(point_pairs)
-        else:
-            raise ValueError("points list is empty")
+        self._init_points(point_pairs)
 
     @classmethod
     def from_gwy(self, gwysel):
@@ -436,19 +484,7 @@ class GwyEllipseSelection(GwySelection):
         """
         points = super().from_gwy(gwysel)
         if points is not None:
-            point_pairs = super()._combine_points_in_pair(points)
+            point_pairs = super()._combine_points(points)
             return GwyEllipseSelection(point_pairs)
         else:
             return None
-
-    @property
-    def _cdata(self):
-        """Representation of ellipse selections list as C array"""
-        if self.data:
-            flat_data_list = [val for line in self.data
-                              for point in line
-                              for val in point]
-            cdata = ffi.new("double[]", flat_data_list)
-            return cdata
-        else:
-            return None
@@ -0,0 +1,544 @@
+""" Pythonic representation of gwyddion spectra (point spectroscopy) objects
+
+    Spectra are collections of curves (GwyDataLine objects) measured
+    at points of the sample. Data of all curves are kept in one ragged
+    array in CSR layout: values of curve i are
+    values[offsets[i]:offsets[i + 1]]. to_padded() converts them to
+    a 2D array with a row for each curve, so analysis of force maps
+    and grid spectroscopy runs over all curves at once.
+
+    Classes:
+        GwySpectra: pythonic representation of gwyddion spectra
+
+"""
+import numpy as np
+
+from pygwyfile._libgwyfile import ffi, lib
+from pygwyfile.gwyfile import (GwyfileErrorCMsg, new_double_array_arg,
+                               _c_malloc)
+from pygwyfile.gwydatafield import _decode_c_string
+from pygwyfile.stats import timed, add_bytes_copied
+
+# Default values of optional metadata items
+_META_DEFAULTS = (('spec_xlabel', ''), ('spec_ylabel', ''),
+                  ('si_unit_xy', ''), ('si_unit_x', ''), ('si_unit_y', ''))
+
+
+class GwySpectra:
+    """Class for GwySpectra representation
+
+    Attributes:
+        values (1D numpy array, float64):
+            concatenated data of all curves
+
+        offsets (1D numpy array, int64, shape (ncurves + 1,)):
+            curve i is values[offsets[i]:offsets[i + 1]]
+
+        coords (2D numpy array, float64, shape (ncurves, 2)):
+            x, y coordinates of the points of the curves
+
+        real (1D numpy array, float64, shape (ncurves,)):
+            lengths of the curves in physical units
+
+        off (1D numpy array, float64, shape (ncurves,)):
+            offsets of the curves in physical units
+
+        selected (1D numpy array, bool, shape (ncurves,)):
+            selection of the curves
+
+        meta (python dictionary):
+            spectra metadata
+
+        title (string): title of the spectra or None
+
+    Methods:
+        from_gwy(cls, gwyspectra, owner=None): Create GwySpectra instance
+                                               from <GwySpectra*> object
+        from_curves(cls, curves, coords, **kwargs):
+                                Create GwySpectra instance
+                                from list of curves
+        to_gwy(self, keepalive=None): Get C representation
+                                      of GwySpectra instance
+        get_curve(self, index): Get values of the curve
+        get_abscissa(self, index): Get abscissa of the curve
+        to_padded(self, fill_value=nan): Get values of all curves
+                                         as 2D array
+        nbytes(self): Get size of the data arrays in bytes
+    """
+
+    def __init__(self, values, offsets, coords, real=None, off=None,
+                 selected=None, meta=None, title=None):
+        """
+        Args:
+            values (1D numpy array): concatenated data of all curves
+            offsets (1D array of int): offsets of the curves in values,
+                                       offsets[0] must be 0 and
+                                       offsets[-1] must be values.size.
+                                       Curves must not be empty.
+            coords (2D numpy array): x, y coordinates of the points
+                                     of the curves, shape (ncurves, 2)
+            real (1D numpy array): lengths of the curves in physical units
+                                   Default value is 1. if not defined
+            off (1D numpy array): offsets of the curves in physical units
+                                  Default value is 0. if not defined
+            selected (1D numpy array): selection of the curves
+                                       No curve is selected if not defined
+            meta (python dictionary):
+
+                Possible items:
+
+                   'ncurves' (int): Number of curves
+                   =if defined, ncurves must match shape of offsets=
+
+                   'spec_xlabel' (str): Label of abscissae of the curves
+                   'spec_ylabel' (str): Label of ordinates of the curves
+                   'si_unit_xy' (str): Physical unit of coordinates
+                                       of the points, base SI unit,
+                                       e.g. "m"
+                   'si_unit_x' (str): Physical unit of abscissae
+                                      of the curves, e.g. "m"
+                   'si_unit_y' (str): Physical unit of values
+                                      of the curves, e.g. "N"
+                   Labels and units are '' if not defined
+
+                Unknown additional items are simply ignored
+
+            title (string): title of the spectra
+        """
+        if not meta:
+            meta = {}
+
+        offsets = np.asarray(offsets, dtype=np.int64)
+        if values.ndim != 1:
+            raise ValueError("values must be a 1D array")
+        if (offsets.ndim != 1 or offsets.size == 0 or offsets[0] != 0 or
+                offsets[-1] != values.size):
+            raise ValueError("offsets must start at 0 and end "
+                             "at values.size")
+        if np.any(np.diff(offsets) <= 0):
+            raise ValueError("curves must not be empty")
+
+        ncurves = offsets.size - 1
+        if 'ncurves' in meta and meta['ncurves'] != ncurves:
+            raise ValueError("offsets.shape is not equal "
+                             "meta['ncurves'] + 1")
+
+        coords = np.asarray(coords)
+        if coords.shape != (ncurves, 2):
+            raise ValueError("coords must be an array of shape "
+                             "(ncurves, 2)")
+
+        self.values = values
+        self.offsets = offsets
+        self.coords = coords
+        self.real = self._get_curves_array(real, 1., ncurves, 'real')
+        self.off = self._get_curves_array(off, 0., ncurves, 'off')
+        self.selected = self._get_curves_array(selected, False, ncurves,
+                                               'selected').astype(bool)
+
+        self.meta = {}
+        self.meta['ncurves'] = ncurves
+        for key, default in _META_DEFAULTS:
+            self.meta[key] = meta.get(key, default)
+
+        self.title = title
+
+    @staticmethod
+    def _get_curves_array(array, default, ncurves, name):
+        """Get array with an item for each curve
+
+        Args:
+            array (1D array): the array or None
+            default: value of the items if array is None
+            ncurves (int): number of curves
+            name (string): name of the array for the error message
+
+        Returns:
+            array (1D numpy array): array of shape (ncurves,)
+        """
+        if array is None:
+            return np.full(ncurves, default)
+        array = np.asarray(array)
+        if array.shape != (ncurves,):
+            raise ValueError("{} must be an array of shape "
+                             "(ncurves,)".format(name))
+        return array
+
+    @classmethod
+    def from_curves(cls, curves, coords, **kwargs):
+        """Create GwySpectra instance from list of curves
+
+        Args:
+            curves (list of 1D numpy arrays): values of the curves
+            coords (2D numpy array): x, y coordinates of the points
+                                     of the curves, shape (ncurves, 2)
+            **kwargs: other arguments of the constructor
+
+        Returns:
+            spectra (GwySpectra):
+                GwySpectra instance with values of the curves
+                concatenated to one array
+        """
+        offsets = np.zeros(len(curves) + 1, dtype=np.int64)
+        np.cumsum([len(curve) for curve in curves], out=offsets[1:])
+        if curves:
+            values = np.concatenate(curves)
+        else:
+            values = np.zeros(0)
+        return cls(values, offsets, coords, **kwargs)
+
+    @classmethod
+    def from_gwy(cls, gwyspectra, owner=None):
+        """ Create GwySpectra instance from <GwySpectra*> object
+
+        Data of the curves are always copied to one array,
+        metadata and data of all curves are read in three calls
+        of libgwyfile.
+
+        Args:
+            gwyspectra (GwySpectra*):
+                GwySpectra object from Libgwyfile
+            owner (Gwyfile):
+                Gwyfile instance containing gwyspectra or None.
+                If owner is given, the coordinates are not copied:
+                coords array is a read-only view which keeps the owner's
+                gwyfile object alive. Otherwise the coordinates are
+                copied.
+
+        Returns:
+            spectra (GwySpectra):
+                GwySpectra instance
+        """
+        meta = cls._get_meta(gwyspectra)
+        title = meta.pop('title')
+        ncurves = meta['ncurves']
+        res, real, off, selected = cls._get_curves_meta(gwyspectra, ncurves)
+
+        offsets = np.zeros(ncurves + 1, dtype=np.int64)
+        np.cumsum(res, out=offsets[1:])
+        values = cls._get_values(gwyspectra, offsets)
+        coords = cls._get_coords(gwyspectra, ncurves, owner=owner)
+        return GwySpectra(values=values, offsets=offsets, coords=coords,
+                          real=real, off=off, selected=selected,
+                          meta=meta, title=title)
+
+    @staticmethod
+    def _get_meta(gwyspectra):
+        """Get metadata from the spectra
+
+        Args:
+            gwyspectra (GwySpectra*):
+                GwySpectra object from Libgwyfile
+
+        Returns:
+            meta: Python dictionary with the spectra metadata
+                  (see the constructor for its keys) and
+                  'title' (str) of the spectra.
+                  Units of abscissae and values are taken from
+                  the first curve.
+
+        """
+
+        error = ffi.new("GwyfileError*")
+        errorp = ffi.new("GwyfileError**", error)
+        c_meta = ffi.new("PygwyfileSpectraMeta*")
+
+        if not lib.pygwyfile_spectra_get_meta(gwyspectra, c_meta, errorp):
+            raise GwyfileErrorCMsg(errorp[0].message)
+
+        meta = {}
+        meta['ncurves'] = c_meta.ncurves
+        meta['title'] = _decode_c_string(c_meta.title)
+        for key, _ in _META_DEFAULTS:
+            meta[key] = _decode_c_string(getattr(c_meta, key))
+
+        # strings are newly allocated by libgwyfile
+        lib.pygwyfile_spectra_meta_free(c_meta)
+        return meta
+
+    @staticmethod
+    def _get_curves_meta(gwyspectra, ncurves):
+        """Get resolutions, sizes, offsets and selection of all curves
+
+        Args:
+            gwyspectra (GwySpectra*):
+                GwySpectra object from Libgwyfile
+            ncurves (int): number of curves in the spectra
+
+        Returns:
+            (res, real, off, selected): 1D numpy arrays of shape
+                                        (ncurves,) with numbers of
+                                        values (int32), lengths and
+                                        offsets of the curves (float64)
+                                        and their selection (bool)
+        """
+        error = ffi.new("GwyfileError*")
+        errorp = ffi.new("GwyfileError**", error)
+
+        res = np.zeros(ncurves, dtype=np.int32)
+        real = np.zeros(ncurves, dtype=np.float64)
+        off = np.zeros(ncurves, dtype=np.float64)
+        selected = np.zeros(ncurves, dtype=bool)
+
+        if not lib.pygwyfile_spectra_get_curves_meta(
+                gwyspectra, ncurves,
+                ffi.from_buffer("int32_t[]", res),
+                ffi.from_buffer("double[]", real),
+                ffi.from_buffer("double[]", off),
+                ffi.from_buffer("bool[]", selected),
+                errorp):
+            raise GwyfileErrorCMsg(errorp[0].message)
+        return res, real, off, selected
+
+    @staticmethod
+    @timed('datafield_copy')
+    def _get_values(gwyspectra, offsets):
+        """Copy data of all curves to one array
+
+        Args:
+            gwyspectra (GwySpectra*):
+                GwySpectra object from Libgwyfile
+            offsets (1D numpy array, int64): offsets of the curves
+                                             in the array
+
+        Returns:
+            values (1D numpy array, float64): data of all curves
+        """
+        error = ffi.new("GwyfileError*")
+        errorp = ffi.new("GwyfileError**", error)
+
+        values = np.empty(offsets[-1], dtype=np.float64)
+        ncurves = offsets.size - 1
+        if ncurves and not lib.pygwyfile_spectra_get_curves_data(
+                gwyspectra, ncurves,
+                ffi.from_buffer("int64_t[]", offsets),
+                ffi.from_buffer("double[]", values),
+                errorp):
+            raise GwyfileErrorCMsg(errorp[0].message)
+        add_bytes_copied(values.nbytes)
+        return values
+
+    @staticmethod
+    @timed('datafield_copy')
+    def _get_coords(gwyspectra, ncurves, owner=None):
+        """Get coordinates of the points from <GwySpectra*> object
+
+        Args:
+            gwyspectra (GwySpectra*):
+                GwySpectra object from Libgwyfile
+            ncurves (int): number of curves
+            owner (Gwyfile): Gwyfile instance containing gwyspectra
+                             or None
+
+        Returns:
+            coords (2D numpy array, float64, shape (ncurves, 2)):
+                read-only view of the coordinates owned by gwyspectra
+                if owner is given, otherwise a copy of the coordinates
+
+        """
+        if not ncurves:
+            return np.zeros((0, 2))
+
+        error = ffi.new("GwyfileError*")
+        errorp = ffi.new("GwyfileError**", error)
+
+        # libgwyfile returns a pointer to the data owned by gwyspectra
+        coordsp = ffi.new("double**")
+
+        if lib.gwyfile_object_spectra_get(gwyspectra, errorp,
+                                          ffi.new("char[]", b'coords'),
+                                          coordsp,
+                                          ffi.NULL):
+            if owner is not None:
+                return owner.view_double_array(coordsp[0], (ncurves, 2))
+
+            size = 2 * ncurves
+            coords_buf = ffi.buffer(coordsp[0], size * ffi.sizeof("double"))
+            coords = np.frombuffer(coords_buf, dtype=np.float64,
+                                   count=size).reshape((ncurves, 2))
+            add_bytes_copied(coords.nbytes)
+            return coords.copy()
+        else:
+            raise GwyfileErrorCMsg(errorp[0].message)
+
+    def to_gwy(self, keepalive=None):
+        """Get C representation of GwySpectra instance
+
+        Values of other type than float64 or non-contiguous values
+        are converted once for all curves.
+
+        Args:
+            keepalive (list): if None, the data are copied.
+                              Otherwise the data arrays are borrowed
+                              and appended to keepalive, which must be
+                              kept alive as long as the returned object.
+
+        Returns:
+            gwyspectra (<cdata GwyfileObject*>):
+                A new GWY file GwySpectra object
+
+        """
+        ncurves = self.meta['ncurves']
+        if not ncurves:
+            raise ValueError("GwySpectra must have at least one curve")
+
+        values = np.ascontiguousarray(self.values, dtype=np.float64)
+
+        # the array and the curve objects are consumed by
+        # the spectra object, the array must be malloc'ed
+        gwycurves = _c_malloc('GwyfileObject*[]', ncurves)
+        ncreated = 0
+        try:
+            for curve_id in range(ncurves):
+                gwycurves[curve_id] = self._curve_to_gwy(values, curve_id,
+                                                         keepalive)
+                ncreated += 1
+            return self._new_gwyspectra(gwycurves, keepalive)
+        except BaseException:
+            # nothing has been consumed by a spectra object
+            for curve_id in range(ncreated):
+                lib.gwyfile_object_free(gwycurves[curve_id])
+            lib.free(gwycurves)
+            raise
+
+    def _new_gwyspectra(self, gwycurves, keepalive=None):
+        """Create <GwySpectra*> object with the curves
+
+        Args:
+            gwycurves (<cdata GwyfileObject*[]>): malloc'ed array
+                                                  of all curves
+            keepalive (list): list of borrowed data or None to copy data
+
+        Returns:
+            gwyspectra (<cdata GwyfileObject*>):
+                A new GWY file GwySpectra object, which
+                consumes gwycurves
+        """
+        ncurves = self.meta['ncurves']
+        args = [ffi.cast("int32_t", ncurves), gwycurves]
+
+        if self.title is not None:
+            args.append(ffi.new("char[]", b'title'))
+            args.append(ffi.new("char[]", self.title.encode('utf-8')))
+
+        for key in ('spec_xlabel', 'spec_ylabel', 'si_unit_xy'):
+            if self.meta[key] is not None:
+                args.append(ffi.new("char[]", key.encode('utf-8')))
+                args.append(ffi.new("char[]",
+                                    self.meta[key].encode('utf-8')))
+
+        if np.any(self.selected):
+            # selection is a bit array of 32bit integers
+            bits = np.zeros(32 * ((ncurves + 31) // 32), dtype=np.uint32)
+            bits[:ncurves] = self.selected
+            words = np.sum(bits.reshape((-1, 32)) <<
+                           np.arange(32, dtype=np.uint32),
+                           axis=1, dtype=np.uint32).view(np.int32)
+            args.append(ffi.new("char[]", b'selected'))
+            args.append(ffi.from_buffer("int32_t[]", words))
+
+        # a converted copy of coords is consumed by the spectra object,
+        # it is created last, when nothing can fail
+        args.extend(new_double_array_arg("coords", self.coords, keepalive))
+        args.append(ffi.NULL)
+
+        gwyspectra = lib.gwyfile_object_new_spectra(*args)
+        return gwyspectra
+
+    def _curve_to_gwy(self, values, curve_id, keepalive=None):
+        """Get C representation of the curve
+
+        Args:
+            values (1D numpy array, float64): contiguous values
+                                              of all curves
+            curve_id (int): index of the curve
+            keepalive (list): list of borrowed data or None to copy data
+
+        Returns:
+            gwydataline (<cdata GwyfileObject*>):
+                A new GWY file GwyDataLine object
+        """
+        start, end = self.offsets[curve_id], self.offsets[curve_id + 1]
+        args = [ffi.cast("int32_t", end - start),
+                ffi.cast("double", self.real[curve_id])]
+
+        args.append(ffi.new("char[]", b'off'))
+        args.append(ffi.cast("double", self.off[curve_id]))
+
+        for key in ('si_unit_x', 'si_unit_y'):
+            if self.meta[key] is not None:
+                args.append(ffi.new("char[]", key.encode('utf-8')))
+                args.append(ffi.new("char[]",
+                                    self.meta[key].encode('utf-8')))
+
+        # data are created last as coords in _new_gwyspectra
+        args.extend(new_double_array_arg("data", values[start:end],
+                                         keepalive))
+        args.append(ffi.NULL)
+        return lib.gwyfile_object_new_dataline(*args)
+
+    def get_curve(self, index):
+        """Get values of the curve
+
+        Args:
+            index (int): index of the curve, negative values
+                         count from the last curve
+
+        Returns:
+            values (1D numpy array): view of the values of the curve
+        """
+        ncurves = self.meta['ncurves']
+        if not -ncurves <= index < ncurves:
+            raise IndexError("Curve {:d} is out of curves "
+                             "0...{:d}".format(index, ncurves - 1))
+        index %= ncurves
+        return self.values[self.offsets[index]:self.offsets[index + 1]]
+
+    def get_abscissa(self, index):
+        """Get abscissa of the curve
+
+        Args:
+            index (int): index of the curve, negative values
+                         count from the last curve
+
+        Returns:
+            abscissa (1D numpy array, float64): positions of the values
+                                                of the curve in physical
+                                                units
+        """
+        res = self.get_curve(index).size
+        return self.off[index] + np.arange(res) * (self.real[index] / res)
+
+    def to_padded(self, fill_value=np.nan):
+        """Get values of all curves as 2D array
+
+        Args:
+            fill_value (float): value of items after the end of
+                                curves shorter than the longest curve
+
+        Returns:
+            padded (2D numpy array): array of shape
+                                     (ncurves, length of the longest
+                                     curve), row i holds curve i
+        """
+        lengths = np.diff(self.offsets)
+        width = lengths.max() if lengths.size else 0
+        dtype = np.result_type(self.values, fill_value)
+        padded = np.full((lengths.size, width), fill_value, dtype=dtype)
+        # items of curves in row-major order are the values in order
+        padded[np.arange(width) < lengths[:, np.newaxis]] = self.values
+        return padded
+
+    def nbytes(self):
+        """Get size of the data arrays in bytes"""
+        return self.values.nbytes + self.coords.nbytes
+
+    def __repr__(self):
+        return "<{} instance at {}.\n title: {},\n meta: {},\n " \
+            "offsets: {},\n values: {}>".format(
+                self.__class__.__name__,
+                hex(id(self)),
+                self.title.__repr__(),
+                self.meta.__repr__(),
+                self.offsets.__repr__(),
+                self.values.__repr__())
@@ -0,0 +1,340 @@
+""" Pythonic representation of gwyddion surface (XYZ data) objects
+
+    Surface data are scattered points, stored in gwy files as
+    concatenated (x, y, z) triplets. The data array has shape (n, 3),
+    as_structured() views it as a structured array with fields
+    'x', 'y' and 'z' without a copy.
+
+    Classes:
+        GwySurface: pythonic representation of gwyddion surface
+
+    Constants:
+        XYZ_DTYPE: dtype of structured arrays of surface points
+
+"""
+import numpy as np
+
+from pygwyfile._libgwyfile import ffi, lib
+from pygwyfile.gwyfile import GwyfileErrorCMsg, new_double_array_arg
+from pygwyfile.gwydatafield import GwyDataField, _decode_c_string
+from pygwyfile.stats import timed, add_bytes_copied
+
+XYZ_DTYPE = np.dtype([('x', np.float64),
+                      ('y', np.float64),
+                      ('z', np.float64)])
+
+# Number of points binned at once by regularize
+_CHUNK_SIZE = 2**20
+
+
+class GwySurface:
+    """Class for GwySurface representation
+
+    Attributes:
+        data (2D numpy array, float64, shape (n, 3)):
+            x, y, z coordinates of the points
+
+        meta (python dictionary):
+            surface metadata
+
+        title (string): title of the XYZ data or None
+
+    Methods:
+        from_gwy(cls, gwysurface, owner=None): Create GwySurface instance
+                                               from <GwySurface*> object
+        to_gwy(self, keepalive=None): Get C representation
+                                      of GwySurface instance
+        as_structured(self): Get points as structured array
+        regularize(self, xres, yres, xrange=None, yrange=None,
+                   fill_value=nan): Average points in pixels
+                                    of a GwyDataField
+        nbytes(self): Get size of the data array in bytes
+    """
+
+    def __init__(self, data, meta=None, title=None):
+        """
+        Args:
+            data (numpy array): float64 array of shape (n, 3)
+                                or structured array of XYZ_DTYPE,
+                                which is viewed as (n, 3) array
+            meta (python dictionary):
+
+                Possible items:
+
+                   'n' (int): Number of points
+                   =if defined, n must match shape of the data array=
+
+                   'si_unit_xy' (str): Physical unit of x and y
+                                       coordinates, base SI unit, e.g. "m"
+                                       Default value is '' if not defined
+                   'si_unit_z' (str): Physical unit of z values,
+                                      base SI unit, e.g. "m"
+                                      Default value is '' if not defined
+
+                Unknown additional items are simply ignored
+
+            title (string): title of the XYZ data
+        """
+        if not meta:
+            meta = {}
+
+        if data.dtype == XYZ_DTYPE:
+            data = np.ascontiguousarray(data).view(np.float64).reshape(
+                (-1, 3))
+
+        if data.ndim != 2 or data.shape[1] != 3:
+            raise ValueError("data must be an array of shape (n, 3)")
+
+        if 'n' in meta and meta['n'] != data.shape[0]:
+            raise ValueError("data.shape is not equal meta['n'], 3")
+
+        self.data = data
+        self.meta = {}
+        self.meta['n'] = data.shape[0]
+        self.meta['si_unit_xy'] = meta.get('si_unit_xy', '')
+        self.meta['si_unit_z'] = meta.get('si_unit_z', '')
+        self.title = title
+
+    @classmethod
+    def from_gwy(cls, gwysurface, owner=None):
+        """ Create GwySurface instance from <GwySurface*> object
+
+        Args:
+            gwysurface (GwySurface*):
+                GwySurface object from Libgwyfile
+            owner (Gwyfile):
+                Gwyfile instance containing gwysurface or None.
+                If owner is given, the data is not copied: data array
+                is a read-only view which keeps the owner's gwyfile
+                object alive. Otherwise the data is copied.
+
+        Returns:
+            surface (GwySurface):
+                GwySurface instance
+        """
+        meta = cls._get_meta(gwysurface)
+        data = cls._get_data(gwysurface, meta['n'], owner=owner)
+        return GwySurface(data=data, meta=meta)
+
+    @staticmethod
+    def _get_meta(gwysurface):
+        """Get metadata from the surface
+
+        Args:
+            gwysurface (GwySurface*):
+                GwySurface object from Libgwyfile
+
+        Returns:
+            meta: Python dictionary with the surface metadata
+
+                Keys of the metadata dictionary:
+                    'n' (int): Number of points
+                    'si_unit_xy' (str): Physical unit of x and y
+                                        coordinates
+                    'si_unit_z' (str): Physical unit of z values
+
+        """
+
+        error = ffi.new("GwyfileError*")
+        errorp = ffi.new("GwyfileError**", error)
+        npointsp = ffi.new("int32_t*")
+        si_unit_xyp = ffi.new("char**")
+        si_unit_zp = ffi.new("char**")
+
+        if not lib.gwyfile_object_surface_get(
+                gwysurface, errorp,
+                ffi.new("char[]", b'n'), npointsp,
+                ffi.new("char[]", b'si_unit_xy'), si_unit_xyp,
+                ffi.new("char[]", b'si_unit_z'), si_unit_zp,
+                ffi.NULL):
+            raise GwyfileErrorCMsg(errorp[0].message)
+
+        meta = {}
+        meta['n'] = npointsp[0]
+        meta['si_unit_xy'] = _decode_c_string(si_unit_xyp[0])
+        meta['si_unit_z'] = _decode_c_string(si_unit_zp[0])
+
+        # unit strings are newly allocated by libgwyfile
+        lib.free(si_unit_xyp[0])
+        lib.free(si_unit_zp[0])
+        return meta
+
+    @staticmethod
+    @timed('datafield_copy')
+    def _get_data(gwysurface, n, owner=None):
+        """Get data array from <GwySurface*> object
+
+        Args:
+            gwysurface (GwySurface*):
+                GwySurface object from Libgwyfile
+            n (int): number of points
+            owner (Gwyfile): Gwyfile instance containing gwysurface
+                             or None
+
+        Returns:
+            data (2D numpy array, float64, shape (n, 3)):
+                read-only view of the data owned by gwysurface if owner
+                is given, otherwise a copy of the data
+
+        """
+
+        error = ffi.new("GwyfileError*")
+        errorp = ffi.new("GwyfileError**", error)
+
+        # libgwyfile returns a pointer to the data owned by gwysurface
+        datap = ffi.new("double**")
+
+        if lib.gwyfile_object_surface_get(gwysurface, errorp,
+                                          ffi.new("char[]", b'data'), datap,
+                                          ffi.NULL):
+            if owner is not None:
+                return owner.view_double_array(datap[0], (n, 3))
+
+            data_buf = ffi.buffer(datap[0], 3 * n * ffi.sizeof("double"))
+            data_array = np.frombuffer(data_buf, dtype=np.float64,
+                                       count=3 * n).reshape((n, 3))
+            add_bytes_copied(data_array.nbytes)
+            return data_array.copy()
+        else:
+            raise GwyfileErrorCMsg(errorp[0].message)
+
+    def to_gwy(self, keepalive=None):
+        """Get C representation of GwySurface instance
+
+        Args:
+            keepalive (list): if None, the data are copied.
+                              Otherwise the data array is borrowed
+                              and appended to keepalive, which must be
+                              kept alive as long as the returned object.
+
+        Returns:
+            gwysurface (<cdata GwyfileObject*>):
+                A new GWY file GwySurface object
+
+        """
+        args = [ffi.cast("int32_t", self.data.shape[0])]
+
+        args.extend(new_double_array_arg("data", self.data, keepalive))
+
+        for key in ('si_unit_xy', 'si_unit_z'):
+            if self.meta[key] is not None:
+                args.append(ffi.new("char[]", key.encode('utf-8')))
+                args.append(ffi.new("char[]",
+                                    self.meta[key].encode('utf-8')))
+
+        args.append(ffi.NULL)
+
+        gwysurface = lib.gwyfile_object_new_surface(*args)
+        return gwysurface
+
+    def as_structured(self):
+        """Get points as structured array with fields 'x', 'y' and 'z'
+
+        Returns:
+            points (1D numpy array of XYZ_DTYPE):
+                view of the data array if it is C-contiguous,
+                e.g. read from a file, otherwise a copy
+        """
+        data = np.ascontiguousarray(self.data, dtype=np.float64)
+        return data.view(XYZ_DTYPE).reshape(-1)
+
+    def regularize(self, xres, yres, xrange=None, yrange=None,
+                   fill_value=np.nan):
+        """Average points in pixels of a GwyDataField
+
+        Points are binned into xres x yres pixels covering
+        xrange x yrange, the value of each pixel is the mean z value
+        of its points. Points are processed in chunks by numpy,
+        so memory overhead does not grow with the number of points.
+
+        Args:
+            xres (int): horizontal dimension of the grid in pixels
+            yres (int): vertical dimension of the grid in pixels
+            xrange ((float, float)): (min, max) of x coordinates
+                                     covered by the grid or None
+                                     for the range of the points
+            yrange ((float, float)): (min, max) of y coordinates
+                                     covered by the grid or None
+                                     for the range of the points
+            fill_value (float): value of pixels without points
+
+        Returns:
+            datafield (GwyDataField): grid with the data laid out as
+                                      datafields read from gwy files
+                                      and xoff, yoff, xreal, yreal
+                                      matching the ranges.
+                                      Points outside the ranges
+                                      are ignored.
+        """
+        if xres < 1 or yres < 1:
+            raise ValueError("xres and yres must be positive")
+        xmin, xmax = self._get_range(0, xrange)
+        ymin, ymax = self._get_range(1, yrange)
+        dx = (xmax - xmin) / xres
+        dy = (ymax - ymin) / yres
+
+        size = xres * yres
+        sums = np.zeros(size)
+        counts = np.zeros(size, dtype=np.intp)
+        for start in range(0, self.data.shape[0], _CHUNK_SIZE):
+            chunk = self.data[start:start + _CHUNK_SIZE]
+            x, y, z = chunk[:, 0], chunk[:, 1], chunk[:, 2]
+            inside = (x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax)
+            # points on the max edges belong to the last pixels
+            cols = np.minimum(((x[inside] - xmin) / dx).astype(np.intp),
+                              xres - 1)
+            rows = np.minimum(((y[inside] - ymin) / dy).astype(np.intp),
+                              yres - 1)
+            index = rows * xres + cols
+            sums += np.bincount(index, weights=z[inside], minlength=size)
+            counts += np.bincount(index, minlength=size)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            data = sums / counts
+        data[counts == 0] = fill_value
+
+        meta = {'xreal': xmax - xmin,
+                'yreal': ymax - ymin,
+                'xoff': xmin,
+                'yoff': ymin,
+                'si_unit_xy': self.meta['si_unit_xy'],
+                'si_unit_z': self.meta['si_unit_z']}
+        # pixels are in row-major order of gwy files, the shape is
+        # (xres, yres) as in GwyDataField._get_data
+        return GwyDataField(data.reshape((xres, yres)), meta=meta)
+
+    def _get_range(self, axis, value_range):
+        """Get (min, max) of the coordinate range
+
+        Args:
+            axis (int): 0 for x, 1 for y
+            value_range ((float, float)): the range or None
+                                          for the range of the points
+
+        Returns:
+            (min, max) (float, float): non-empty range
+        """
+        if value_range is None:
+            if self.data.shape[0] == 0:
+                raise ValueError("surface has no points")
+            coords = self.data[:, axis]
+            value_range = (coords.min(), coords.max())
+
+        vmin, vmax = (float(value) for value in value_range)
+        if not vmin < vmax:
+            raise ValueError("{} range {}...{} is empty".format(
+                'xy'[axis], vmin, vmax))
+        return vmin, vmax
+
+    def nbytes(self):
+        """Get size of the data array in bytes"""
+        return self.data.nbytes
+
+    def __repr__(self):
+        return "<{} instance at {}.\n title: {},\n meta: {},\n " \
+            "data: {}>".format(
+                self.__class__.__name__,
+                hex(id(self)),
+                self.title.__repr__(),
+                self.meta.__repr__(),
+                self.data.__repr__())
@@ -0,0 +1,302 @@
+""" Incremental writing of gwy files
+
+    GwyContainer.to_gwyfile creates C objects of all channels, graphs,
+    volumes, surfaces and spectra before the file is written. GwyWriter
+    serializes each of them to the file as soon as it is added and frees
+    its C objects, so only one of them is resident at a time:
+
+        with GwyWriter(filename) as writer:
+            for channel in channels:
+                writer.add_channel(channel)
+
+    The size of the top-level container is not known until the last
+    item is written, it is written to the header when the writer
+    is closed. Therefore the output must be seekable.
+
+    Classes:
+        GwyWriter: writer of gwy file emitting channels, graphs,
+                   volumes, surfaces and spectra as they are added
+
+"""
+import os
+import struct
+
+from pygwyfile._libgwyfile import ffi
+from pygwyfile.gwyfile import GwyfileError, new_gwycontainer
+from pygwyfile.gwyfile import add_gwyitem_to_gwycontainer
+from pygwyfile.gwyfile import get_gwyobject_items_size
+from pygwyfile.gwyfile import (write_gwyobject_items_to_bytes,
+                               write_gwyobject_items_to_fd)
+from pygwyfile.gwyfile import new_gwyitem_string, new_gwyitem_object
+from pygwyfile.gwybrick import GwyBrick
+from pygwyfile.gwychannel import GwyChannel
+from pygwyfile.gwycontainer import GwyContainer
+from pygwyfile.gwygraph import GwyGraphModel
+from pygwyfile.gwyspectra import GwySpectra
+from pygwyfile.gwysurface import GwySurface
+
+# Magic header and name of the top-level container,
+# followed by uint32 size of its items
+_HEADER = b"GWYP" + b"GwyContainer\0"
+
+# Maximum size of items of the container
+_MAX_SIZE = 0xffffffff
+
+
+class GwyWriter:
+    """Writer of gwy file emitting channels, graphs, volumes,
+    surfaces and spectra as they are added
+
+    Channels, volumes, surfaces and spectra are numbered from 0 and graphs
+    from 1 in the order they are added, as in GwyContainer.to_gwyfile.
+
+    If the with block exits with an exception, the header is not
+    completed and the file is not a valid gwy file.
+
+    Attributes:
+        nchannels (int): number of added channels
+        ngraphs (int): number of added graphs
+        nvolumes (int): number of added volumes
+        nsurfaces (int): number of added surfaces
+        nspectra (int): number of added spectra
+
+    Methods:
+        add_channel(channel): Write channel to the file
+        add_graph(graph): Write graph to the file
+        add_volume(volume): Write volume to the file
+        add_surface(surface): Write surface to the file
+        add_spectra(spectra): Write spectra to the file
+        close(): Complete the header and close the file
+    """
+
+    def __init__(self, target):
+        """
+        Args:
+            target (string or file object): name of the gwy file,
+                which will be overwritten if it exists,
+                or seekable binary file object
+                (e.g. io.BytesIO or file opened in 'wb' mode)
+        """
+        self.nchannels = 0
+        self.ngraphs = 0
+        self.nvolumes = 0
+        self.nsurfaces = 0
+        self.nspectra = 0
+        self._size = 0
+
+        if isinstance(target, (str, os.PathLike)):
+            filename = os.fspath(target)
+            # unbuffered, items are written directly to its descriptor
+            self._fileobj = open(filename, 'wb', buffering=0)
+            self._fd = self._fileobj.fileno()
+            self._owns_fileobj = True
+        else:
+            if not target.seekable():
+                raise ValueError("file object must be seekable")
+            filename = None
+            self._fileobj = target
+            self._fd = None
+            self._owns_fileobj = False
+
+        try:
+            self._start = self._fileobj.tell()
+            self._fileobj.write(_HEADER + struct.pack('<I', 0))
+            if filename is not None:
+                self._add_filename(filename)
+        except BaseException:
+            self._close_fileobj()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._close_fileobj()
+
+    def add_channel(self, channel):
+        """Write channel to the file
+
+        Data arrays of the channel are not copied and must not be
+        changed until the method returns.
+
+        Args:
+            channel (GwyChannel): the channel
+
+        Returns:
+            channel_id (int): id of the channel in the file
+        """
+        if not isinstance(channel, GwyChannel):
+            raise TypeError("channel must be a GwyChannel instance")
+        self._check_open()
+
+        channel_id = self.nchannels
+        gwycontainer = new_gwycontainer()
+        keepalive = []
+        channel.to_gwy(gwycontainer, channel_id, keepalive)
+        self._write_items(gwycontainer)
+        self.nchannels += 1
+        return channel_id
+
+    def add_graph(self, graph):
+        """Write graph to the file
+
+        Data arrays of the graph are not copied and must not be
+        changed until the method returns.
+
+        Args:
+            graph (GwyGraphModel): the graph
+
+        Returns:
+            graph_id (int): id of the graph in the file
+        """
+        if not isinstance(graph, GwyGraphModel):
+            raise TypeError("graph must be a GwyGraphModel instance")
+        self._check_open()
+
+        # graph enumeration in gwyddion starts with 1
+        graph_id = self.ngraphs + 1
+        gwycontainer = new_gwycontainer()
+        keepalive = []
+        gwygraph = graph.to_gwy(keepalive)
+        key = "/0/graph/graph/{:d}".format(graph_id)
+        gwyitem = new_gwyitem_object(key, gwygraph)
+        if add_gwyitem_to_gwycontainer(gwyitem, gwycontainer):
+            GwyContainer._add_graph_visibility_to_gwycontainer(
+                graph, gwycontainer, key)
+        self._write_items(gwycontainer)
+        self.ngraphs += 1
+        return graph_id
+
+    def add_volume(self, volume):
+        """Write volume to the file
+
+        Data array of the volume is not copied and must not be
+        changed until the method returns.
+
+        Args:
+            volume (GwyBrick): the volume
+
+        Returns:
+            volume_id (int): id of the volume in the file
+        """
+        if not isinstance(volume, GwyBrick):
+            raise TypeError("volume must be a GwyBrick instance")
+        self._check_open()
+
+        volume_id = self.nvolumes
+        gwycontainer = new_gwycontainer()
+        keepalive = []
+        GwyContainer._add_volume_to_gwycontainer(volume, gwycontainer,
+                                                 volume_id, keepalive)
+        self._write_items(gwycontainer)
+        self.nvolumes += 1
+        return volume_id
+
+    def add_surface(self, surface):
+        """Write surface to the file
+
+        Data array of the surface is not copied and must not be
+        changed until the method returns.
+
+        Args:
+            surface (GwySurface): the surface
+
+        Returns:
+            surface_id (int): id of the surface in the file
+        """
+        if not isinstance(surface, GwySurface):
+            raise TypeError("surface must be a GwySurface instance")
+        self._check_open()
+
+        surface_id = self.nsurfaces
+        gwycontainer = new_gwycontainer()
+        keepalive = []
+        GwyContainer._add_surface_to_gwycontainer(surface, gwycontainer,
+                                                  surface_id, keepalive)
+        self._write_items(gwycontainer)
+        self.nsurfaces += 1
+        return surface_id
+
+    def add_spectra(self, spectra):
+        """Write spectra to the file
+
+        Values and coordinates of the spectra are not copied and
+        must not be changed until the method returns.
+
+        Args:
+            spectra (GwySpectra): the spectra
+
+        Returns:
+            spectra_id (int): id of the spectra in the file
+        """
+        if not isinstance(spectra, GwySpectra):
+            raise TypeError("spectra must be a GwySpectra instance")
+        self._check_open()
+
+        spectra_id = self.nspectra
+        gwycontainer = new_gwycontainer()
+        keepalive = []
+        GwyContainer._add_spectra_item_to_gwycontainer(spectra, gwycontainer,
+                                                       spectra_id, keepalive)
+        self._write_items(gwycontainer)
+        self.nspectra += 1
+        return spectra_id
+
+    def close(self):
+        """Complete the header and close the file
+
+        File objects passed to the constructor are not closed.
+        Closing closed writer has no effect.
+        """
+        if self._fileobj is None:
+            return
+        try:
+            self._fileobj.seek(self._start + len(_HEADER))
+            self._fileobj.write(struct.pack('<I', self._size))
+            self._fileobj.seek(0, os.SEEK_END)
+        finally:
+            self._close_fileobj()
+
+    def _add_filename(self, filename):
+        """Write /filename item as GwyContainer.to_gwyfile does"""
+        gwycontainer = new_gwycontainer()
+        gwyitem = new_gwyitem_string("/filename", os.path.abspath(filename))
+        add_gwyitem_to_gwycontainer(gwyitem, gwycontainer)
+        self._write_items(gwycontainer)
+
+    def _write_items(self, gwycontainer):
+        """Write items of gwycontainer to the file and free it
+
+        Args:
+            gwycontainer (<GwyfileObject*>): container owned by Python
+        """
+        try:
+            size = get_gwyobject_items_size(gwycontainer)
+            if self._size + size > _MAX_SIZE:
+                raise GwyfileError("Size of gwy file data exceeds 4 GiB")
+            if self._fd is not None:
+                write_gwyobject_items_to_fd(gwycontainer, self._fd)
+            else:
+                self._fileobj.write(
+                    write_gwyobject_items_to_bytes(gwycontainer))
+            self._size += size
+        finally:
+            ffi.release(gwycontainer)
+
+    def _check_open(self):
+        if self._fileobj is None:
+            raise ValueError("I/O operation on closed GwyWriter")
+
+    def _close_fileobj(self):
+        fileobj, self._fileobj = self._fileobj, None
+        if fileobj is not None and self._owns_fileobj:
+            fileobj.close()
+
+    def __repr__(self):
+        return "<{} nchannels={:d} ngraphs={:d} nvolumes={:d} " \
+            "nsurfaces={:d} nspectra={:d}>".format(
+                type(self).__name__, self.nchannels, self.ngraphs,
+                self.nvolumes, self.nsurfaces, self.nspectra)
@@ -8,10 +8,13 @@ ffibuilder = FFI()
 
 ffibuilder.set_source("pygwyfile._libgwyfile",
                       r"""
+                      #include <stdio.h>
                       #include "gwyfile.h"
+                      #include "libgwyfile_helpers.h"
                       """,
-                      include_dirs=["pygwyfile/libgwyfile"],
-                      sources=["pygwyfile/libgwyfile/gwyfile.c"])
+                      include_dirs=["pygwyfile/libgwyfile", "pygwyfile"],
+                      sources=["pygwyfile/libgwyfile/gwyfile.c",
+                               "pygwyfile/libgwyfile_helpers.c"])
 
 ffibuilder.cdef("""
 typedef ... GwyfileObject;
@@ -26,17 +29,37 @@ GwyfileObject* gwyfile_read_file(const char*  filename,
 bool gwyfile_write_file(GwyfileObject* object,
                         const char* filename,
                         GwyfileError** error);
+GwyfileObject* gwyfile_fread(FILE* stream,
+                             size_t max_size,
+                             GwyfileError** error);
+bool gwyfile_fwrite(GwyfileObject* object,
+                    FILE* stream,
+                    GwyfileError** error);
+size_t gwyfile_object_size(const GwyfileObject* object);
 const char* gwyfile_object_name(const GwyfileObject* object);
 int* gwyfile_object_container_enumerate_channels(const GwyfileObject* object,
                                                  unsigned int* nchannels);
 int* gwyfile_object_container_enumerate_graphs(const GwyfileObject* object,
                                                unsigned int* ngraphs);
+int* gwyfile_object_container_enumerate_volume(const GwyfileObject* object,
+                                               unsigned int* nvolume);
+int* gwyfile_object_container_enumerate_spectra(const GwyfileObject* object,
+                                                unsigned int* nspectra);
 GwyfileItem* gwyfile_object_get(const GwyfileObject* object,
                                 const char* name);
 GwyfileObject* gwyfile_item_get_object(const GwyfileItem* item);
 bool gwyfile_object_datafield_get(const GwyfileObject* object,
                                   GwyfileError** error,
                                   ...);
+bool gwyfile_object_brick_get(const GwyfileObject* object,
+                              GwyfileError** error,
+                              ...);
+bool gwyfile_object_surface_get(const GwyfileObject* object,
+                                GwyfileError** error,
+                                ...);
+bool gwyfile_object_spectra_get(const GwyfileObject* object,
+                                GwyfileError** error,
+                                ...);
 bool gwyfile_object_selectionpoint_get(const GwyfileObject* object,
                                        const GwyfileError** error,
                                        ...);
@@ -70,6 +93,20 @@ GwyfileObject* gwyfile_object_new_datafield(int xres,
                                             double xreal,
                                             double yreal,
                                             ...);
+GwyfileObject* gwyfile_object_new_brick(int xres,
+                                        int yres,
+                                        int zres,
+                                        double xreal,
+                                        double yreal,
+                                        double zreal,
+                                        ...);
+GwyfileObject* gwyfile_object_new_surface(int n, ...);
+GwyfileObject* gwyfile_object_new_dataline(int res,
+                                           double real,
+                                           ...);
+GwyfileObject* gwyfile_object_new_spectra(int ncurves,
+                                          GwyfileObject** curves,
+                                          ...);
 GwyfileItem* gwyfile_item_new_object(const char* name,
                                      GwyfileObject* value);
 GwyfileItem* gwyfile_item_new_bool(const char* name,
@@ -83,6 +120,138 @@ GwyfileItem* gwyfile_item_new_int32(const char* name,
 GwyfileObject* gwyfile_object_new(const char* name,
                                   ...);
 bool gwyfile_object_add(GwyfileObject* object, GwyfileItem* item);
+void gwyfile_object_free(GwyfileObject* object);
+void gwyfile_item_free(GwyfileItem* item);
+void* malloc(size_t size);
+void free(void* ptr);
+unsigned int gwyfile_object_nitems(const GwyfileObject* object);
+const char** gwyfile_object_item_names(const GwyfileObject* object);
+bool gwyfile_item_fwrite(const GwyfileItem* item,
+                         FILE* stream,
+                         GwyfileError** error);
+typedef struct {
+    GwyfileItem* item;
+    const char* name;
+    char type;
+    bool b;
+    int32_t i;
+    double d;
+    const char* s;
+    GwyfileObject* o;
+} PygwyfileItemInfo;
+unsigned int pygwyfile_object_items(const GwyfileObject* object,
+                                    PygwyfileItemInfo* items);
+typedef struct {
+    int32_t xres;
+    int32_t yres;
+    double xreal;
+    double yreal;
+    double xoff;
+    double yoff;
+    char* si_unit_xy;
+    char* si_unit_z;
+} PygwyfileDataFieldMeta;
+typedef struct {
+    int32_t xres;
+    int32_t yres;
+    int32_t zres;
+    double xreal;
+    double yreal;
+    double zreal;
+    double xoff;
+    double yoff;
+    double zoff;
+    char* si_unit_x;
+    char* si_unit_y;
+    char* si_unit_z;
+    char* si_unit_w;
+} PygwyfileBrickMeta;
+typedef struct {
+    int32_t ncurves;
+    char* title;
+    char* spec_xlabel;
+    char* spec_ylabel;
+    char* si_unit_xy;
+    char* si_unit_x;
+    char* si_unit_y;
+} PygwyfileSpectraMeta;
+typedef struct {
+    int32_t ndata;
+    char* description;
+    int32_t type;
+    int32_t point_type;
+    int32_t line_style;
+    int32_t point_size;
+    int32_t line_size;
+    double color_red;
+    double color_green;
+    double color_blue;
+} PygwyfileGraphCurveMeta;
+typedef struct {
+    int32_t ncurves;
+    char* title;
+    char* top_label;
+    char* left_label;
+    char* right_label;
+    char* bottom_label;
+    char* x_unit;
+    char* y_unit;
+    double x_min;
+    bool x_min_set;
+    double x_max;
+    bool x_max_set;
+    double y_min;
+    bool y_min_set;
+    double y_max;
+    bool y_max_set;
+    bool x_is_logarithmic;
+    bool y_is_logarithmic;
+    bool label_visible;
+    bool label_has_frame;
+    bool label_reverse;
+    int32_t label_frame_thickness;
+    int32_t label_position;
+    int32_t grid_type;
+} PygwyfileGraphModelMeta;
+bool pygwyfile_datafield_get_meta(const GwyfileObject* datafield,
+                                  PygwyfileDataFieldMeta* meta,
+                                  GwyfileError** error);
+void pygwyfile_datafield_meta_free(PygwyfileDataFieldMeta* meta);
+bool pygwyfile_brick_get_meta(const GwyfileObject* brick,
+                              PygwyfileBrickMeta* meta,
+                              GwyfileError** error);
+void pygwyfile_brick_meta_free(PygwyfileBrickMeta* meta);
+bool pygwyfile_spectra_get_meta(const GwyfileObject* spectra,
+                                PygwyfileSpectraMeta* meta,
+                                GwyfileError** error);
+void pygwyfile_spectra_meta_free(PygwyfileSpectraMeta* meta);
+bool pygwyfile_spectra_get_curves_meta(const GwyfileObject* spectra,
+                                       unsigned int ncurves,
+                                       int32_t* res,
+                                       double* real,
+                                       double* off,
+                                       bool* selected,
+                                       GwyfileError** error);
+bool pygwyfile_spectra_get_curves_data(const GwyfileObject* spectra,
+                                       unsigned int ncurves,
+                                       const int64_t* offsets,
+                                       double* values,
+                                       GwyfileError** error);
+bool pygwyfile_graphcurve_get_meta(const GwyfileObject* curve,
+                                   PygwyfileGraphCurveMeta* meta,
+                                   GwyfileError** error);
+void pygwyfile_graphcurve_meta_free(PygwyfileGraphCurveMeta* meta);
+bool pygwyfile_graphmodel_get_meta(const GwyfileObject* graphmodel,
+                                   PygwyfileGraphModelMeta* meta,
+                                   GwyfileError** error);
+void pygwyfile_graphmodel_meta_free(PygwyfileGraphModelMeta* meta);
+bool pygwyfile_graphmodel_get_curves_meta(const GwyfileObject* graphmodel,
+                                          PygwyfileGraphCurveMeta* metas,
+                                          unsigned int ncurves,
+                                          GwyfileError** error);
+FILE* fmemopen(void* buf, size_t size, const char* mode);
+FILE* fdopen(int fd, const char* mode);
+int fclose(FILE* stream);
 """)
 
 
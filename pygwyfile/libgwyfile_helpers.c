@@ -0,0 +1,383 @@
+/*
+ * Helpers for bulk access to Libgwyfile objects from pygwyfile.
+ */
+#include <stdlib.h>
+#include <string.h>
+
+#include "libgwyfile_helpers.h"
+
+typedef struct {
+    PygwyfileItemInfo *items;
+    unsigned int nitems;
+} ItemCollector;
+
+static void
+collect_item(const GwyfileItem *item, void *user_data)
+{
+    ItemCollector *collector = (ItemCollector*)user_data;
+    PygwyfileItemInfo *info = collector->items + collector->nitems;
+
+    info->item = (GwyfileItem*)item;
+    info->name = gwyfile_item_name(item);
+    info->type = (char)gwyfile_item_type(item);
+
+    switch (info->type) {
+        case GWYFILE_ITEM_BOOL:
+            info->b = gwyfile_item_get_bool(item);
+            break;
+        case GWYFILE_ITEM_INT32:
+            info->i = gwyfile_item_get_int32(item);
+            break;
+        case GWYFILE_ITEM_DOUBLE:
+            info->d = gwyfile_item_get_double(item);
+            break;
+        case GWYFILE_ITEM_STRING:
+            info->s = gwyfile_item_get_string(item);
+            break;
+        case GWYFILE_ITEM_OBJECT:
+            info->o = gwyfile_item_get_object(item);
+            break;
+        default:
+            break;
+    }
+    collector->nitems++;
+}
+
+/*
+ * Collect all items of the object with their names and values
+ * in one pass.
+ *
+ * items must have room for gwyfile_object_nitems(object) elements.
+ * The items, names, strings and objects remain owned by the object.
+ *
+ * Returns the number of collected items.
+ */
+unsigned int
+pygwyfile_object_items(const GwyfileObject *object,
+                       PygwyfileItemInfo *items)
+{
+    ItemCollector collector = { items, 0 };
+
+    gwyfile_object_foreach(object, collect_item, &collector);
+    return collector.nitems;
+}
+
+/*
+ * Get all metadata of GwyDataField in one call.
+ */
+bool
+pygwyfile_datafield_get_meta(const GwyfileObject *datafield,
+                             PygwyfileDataFieldMeta *meta,
+                             GwyfileError **error)
+{
+    return gwyfile_object_datafield_get(datafield, error,
+                                        "xres", &meta->xres,
+                                        "yres", &meta->yres,
+                                        "xreal", &meta->xreal,
+                                        "yreal", &meta->yreal,
+                                        "xoff", &meta->xoff,
+                                        "yoff", &meta->yoff,
+                                        "si_unit_xy", &meta->si_unit_xy,
+                                        "si_unit_z", &meta->si_unit_z,
+                                        NULL);
+}
+
+void
+pygwyfile_datafield_meta_free(PygwyfileDataFieldMeta *meta)
+{
+    free(meta->si_unit_xy);
+    free(meta->si_unit_z);
+    meta->si_unit_xy = meta->si_unit_z = NULL;
+}
+
+/*
+ * Get all metadata of GwyBrick in one call.
+ */
+bool
+pygwyfile_brick_get_meta(const GwyfileObject *brick,
+                         PygwyfileBrickMeta *meta,
+                         GwyfileError **error)
+{
+    return gwyfile_object_brick_get(brick, error,
+                                    "xres", &meta->xres,
+                                    "yres", &meta->yres,
+                                    "zres", &meta->zres,
+                                    "xreal", &meta->xreal,
+                                    "yreal", &meta->yreal,
+                                    "zreal", &meta->zreal,
+                                    "xoff", &meta->xoff,
+                                    "yoff", &meta->yoff,
+                                    "zoff", &meta->zoff,
+                                    "si_unit_x", &meta->si_unit_x,
+                                    "si_unit_y", &meta->si_unit_y,
+                                    "si_unit_z", &meta->si_unit_z,
+                                    "si_unit_w", &meta->si_unit_w,
+                                    NULL);
+}
+
+void
+pygwyfile_brick_meta_free(PygwyfileBrickMeta *meta)
+{
+    free(meta->si_unit_x);
+    free(meta->si_unit_y);
+    free(meta->si_unit_z);
+    free(meta->si_unit_w);
+    meta->si_unit_x = meta->si_unit_y = NULL;
+    meta->si_unit_z = meta->si_unit_w = NULL;
+}
+
+/*
+ * Get all metadata of GwySpectra in one call.
+ */
+bool
+pygwyfile_spectra_get_meta(const GwyfileObject *spectra,
+                           PygwyfileSpectraMeta *meta,
+                           GwyfileError **error)
+{
+    GwyfileObject **curves = NULL;
+
+    meta->si_unit_x = meta->si_unit_y = NULL;
+    if (!gwyfile_object_spectra_get(spectra, error,
+                                    "ndata", &meta->ncurves,
+                                    "data", &curves,
+                                    "title", &meta->title,
+                                    "spec_xlabel", &meta->spec_xlabel,
+                                    "spec_ylabel", &meta->spec_ylabel,
+                                    "si_unit_xy", &meta->si_unit_xy,
+                                    NULL))
+        return false;
+
+    /* curves were checked by gwyfile_object_spectra_get */
+    if (meta->ncurves)
+        gwyfile_object_dataline_get(curves[0], NULL,
+                                    "si_unit_x", &meta->si_unit_x,
+                                    "si_unit_y", &meta->si_unit_y,
+                                    NULL);
+    return true;
+}
+
+void
+pygwyfile_spectra_meta_free(PygwyfileSpectraMeta *meta)
+{
+    free(meta->title);
+    free(meta->spec_xlabel);
+    free(meta->spec_ylabel);
+    free(meta->si_unit_xy);
+    free(meta->si_unit_x);
+    free(meta->si_unit_y);
+    meta->title = meta->spec_xlabel = meta->spec_ylabel = NULL;
+    meta->si_unit_xy = meta->si_unit_x = meta->si_unit_y = NULL;
+}
+
+/*
+ * Get resolutions, sizes, offsets and selection of all curves
+ * of GwySpectra in one call.
+ *
+ * res, real, off and selected must have room for ncurves elements,
+ * ncurves must be the number of curves in the spectra.
+ *
+ * The selection bits are read from the item directly,
+ * "selected" of gwyfile_object_spectra_get copies only
+ * ceil(ncurves/32) bytes of them.
+ */
+bool
+pygwyfile_spectra_get_curves_meta(const GwyfileObject *spectra,
+                                  unsigned int ncurves,
+                                  int32_t *res,
+                                  double *real,
+                                  double *off,
+                                  bool *selected,
+                                  GwyfileError **error)
+{
+    GwyfileObject **curves = NULL;
+    GwyfileItem *selected_item;
+    const int32_t *bits = NULL;
+    unsigned int i;
+
+    if (!gwyfile_object_spectra_get(spectra, error,
+                                    "data", &curves,
+                                    NULL))
+        return false;
+
+    for (i = 0; i < ncurves; i++) {
+        if (!gwyfile_object_dataline_get(curves[i], error,
+                                         "res", res + i,
+                                         "real", real + i,
+                                         "off", off + i,
+                                         NULL))
+            return false;
+    }
+
+    /* its length was checked by gwyfile_object_spectra_get */
+    selected_item = gwyfile_object_get_with_type(spectra, "selected",
+                                                 GWYFILE_ITEM_INT32_ARRAY);
+    if (selected_item && ncurves)
+        bits = gwyfile_item_get_int32_array(selected_item);
+    for (i = 0; i < ncurves; i++)
+        selected[i] = bits ? (bits[i/32] >> (i % 32)) & 1 : false;
+    return true;
+}
+
+/*
+ * Copy data of all curves of GwySpectra to one array in one call.
+ *
+ * Data of curve i are copied to values + offsets[i],
+ * offsets must have ncurves elements and values must have room
+ * for data of all curves.
+ */
+bool
+pygwyfile_spectra_get_curves_data(const GwyfileObject *spectra,
+                                  unsigned int ncurves,
+                                  const int64_t *offsets,
+                                  double *values,
+                                  GwyfileError **error)
+{
+    GwyfileObject **curves = NULL;
+    const double *data;
+    int32_t res;
+    unsigned int i;
+
+    if (!gwyfile_object_spectra_get(spectra, error,
+                                    "data", &curves,
+                                    NULL))
+        return false;
+
+    for (i = 0; i < ncurves; i++) {
+        if (!gwyfile_object_dataline_get(curves[i], error,
+                                         "res", &res,
+                                         "data", &data,
+                                         NULL))
+            return false;
+        memcpy(values + offsets[i], data, res*sizeof(double));
+    }
+    return true;
+}
+
+/*
+ * Get all metadata of GwyGraphCurveModel in one call.
+ */
+bool
+pygwyfile_graphcurve_get_meta(const GwyfileObject *curve,
+                              PygwyfileGraphCurveMeta *meta,
+                              GwyfileError **error)
+{
+    return gwyfile_object_graphcurvemodel_get(curve, error,
+                                              "ndata", &meta->ndata,
+                                              "description",
+                                              &meta->description,
+                                              "type", &meta->type,
+                                              "point_type",
+                                              &meta->point_type,
+                                              "line_style",
+                                              &meta->line_style,
+                                              "point_size",
+                                              &meta->point_size,
+                                              "line_size",
+                                              &meta->line_size,
+                                              "color.red", &meta->color_red,
+                                              "color.green",
+                                              &meta->color_green,
+                                              "color.blue",
+                                              &meta->color_blue,
+                                              NULL);
+}
+
+void
+pygwyfile_graphcurve_meta_free(PygwyfileGraphCurveMeta *meta)
+{
+    free(meta->description);
+    meta->description = NULL;
+}
+
+/*
+ * Get all metadata of GwyGraphModel in one call.
+ */
+bool
+pygwyfile_graphmodel_get_meta(const GwyfileObject *graphmodel,
+                              PygwyfileGraphModelMeta *meta,
+                              GwyfileError **error)
+{
+    return gwyfile_object_graphmodel_get(graphmodel, error,
+                                         "ncurves", &meta->ncurves,
+                                         "title", &meta->title,
+                                         "top_label", &meta->top_label,
+                                         "left_label", &meta->left_label,
+                                         "right_label", &meta->right_label,
+                                         "bottom_label",
+                                         &meta->bottom_label,
+                                         "x_unit", &meta->x_unit,
+                                         "y_unit", &meta->y_unit,
+                                         "x_min", &meta->x_min,
+                                         "x_min_set", &meta->x_min_set,
+                                         "x_max", &meta->x_max,
+                                         "x_max_set", &meta->x_max_set,
+                                         "y_min", &meta->y_min,
+                                         "y_min_set", &meta->y_min_set,
+                                         "y_max", &meta->y_max,
+                                         "y_max_set", &meta->y_max_set,
+                                         "x_is_logarithmic",
+                                         &meta->x_is_logarithmic,
+                                         "y_is_logarithmic",
+                                         &meta->y_is_logarithmic,
+                                         "label.visible",
+                                         &meta->label_visible,
+                                         "label.has_frame",
+                                         &meta->label_has_frame,
+                                         "label.reverse",
+                                         &meta->label_reverse,
+                                         "label.frame_thickness",
+                                         &meta->label_frame_thickness,
+                                         "label.position",
+                                         &meta->label_position,
+                                         "grid-type", &meta->grid_type,
+                                         NULL);
+}
+
+void
+pygwyfile_graphmodel_meta_free(PygwyfileGraphModelMeta *meta)
+{
+    free(meta->title);
+    free(meta->top_label);
+    free(meta->left_label);
+    free(meta->right_label);
+    free(meta->bottom_label);
+    free(meta->x_unit);
+    free(meta->y_unit);
+    meta->title = meta->top_label = meta->left_label = NULL;
+    meta->right_label = meta->bottom_label = NULL;
+    meta->x_unit = meta->y_unit = NULL;
+}
+
+/*
+ * Get metadata of all curves of GwyGraphModel in one call.
+ *
+ * metas must have room for ncurves elements, ncurves must not exceed
+ * the number of curves in the graph model. On failure, strings of
+ * metadata already read are freed.
+ */
+bool
+pygwyfile_graphmodel_get_curves_meta(const GwyfileObject *graphmodel,
+                                     PygwyfileGraphCurveMeta *metas,
+                                     unsigned int ncurves,
+                                     GwyfileError **error)
+{
+    GwyfileObject **curves = NULL;
+    unsigned int i, j;
+
+    if (!ncurves)
+        return true;
+
+    if (!gwyfile_object_graphmodel_get(graphmodel, error,
+                                       "curves", &curves,
+                                       NULL))
+        return false;
+
+    for (i = 0; i < ncurves; i++) {
+        if (!pygwyfile_graphcurve_get_meta(curves[i], metas + i, error)) {
+            for (j = 0; j < i; j++)
+                pygwyfile_graphcurve_meta_free(metas + j);
+            return false;
+        }
+    }
+    return true;
+}
@@ -0,0 +1,161 @@
+/*
+ * Helpers for bulk access to Libgwyfile objects from pygwyfile.
+ * Each helper replaces many calls of Libgwyfile functions through CFFI
+ * by a single call.
+ */
+#ifndef PYGWYFILE_LIBGWYFILE_HELPERS_H
+#define PYGWYFILE_LIBGWYFILE_HELPERS_H
+
+#include "gwyfile.h"
+
+/*
+ * Item of a GwyfileObject with its value.
+ * Only the value field matching the item type is set:
+ * b for bool, i for int32, d for double, s for string and
+ * o for object items. Values of other types are not extracted.
+ */
+typedef struct {
+    GwyfileItem *item;
+    const char *name;
+    char type;
+    bool b;
+    int32_t i;
+    double d;
+    const char *s;
+    GwyfileObject *o;
+} PygwyfileItemInfo;
+
+unsigned int pygwyfile_object_items(const GwyfileObject *object,
+                                    PygwyfileItemInfo *items);
+
+/*
+ * Metadata of GwyDataField, GwyBrick, GwySpectra, GwyGraphCurveModel and
+ * GwyGraphModel objects. Strings are newly allocated and must be freed with
+ * the corresponding pygwyfile_*_meta_free function.
+ */
+typedef struct {
+    int32_t xres;
+    int32_t yres;
+    double xreal;
+    double yreal;
+    double xoff;
+    double yoff;
+    char *si_unit_xy;
+    char *si_unit_z;
+} PygwyfileDataFieldMeta;
+
+typedef struct {
+    int32_t xres;
+    int32_t yres;
+    int32_t zres;
+    double xreal;
+    double yreal;
+    double zreal;
+    double xoff;
+    double yoff;
+    double zoff;
+    char *si_unit_x;
+    char *si_unit_y;
+    char *si_unit_z;
+    char *si_unit_w;
+} PygwyfileBrickMeta;
+
+/*
+ * si_unit_x and si_unit_y are units of the first curve of GwySpectra,
+ * they are NULL if there are no curves.
+ */
+typedef struct {
+    int32_t ncurves;
+    char *title;
+    char *spec_xlabel;
+    char *spec_ylabel;
+    char *si_unit_xy;
+    char *si_unit_x;
+    char *si_unit_y;
+} PygwyfileSpectraMeta;
+
+typedef struct {
+    int32_t ndata;
+    char *description;
+    int32_t type;
+    int32_t point_type;
+    int32_t line_style;
+    int32_t point_size;
+    int32_t line_size;
+    double color_red;
+    double color_green;
+    double color_blue;
+} PygwyfileGraphCurveMeta;
+
+typedef struct {
+    int32_t ncurves;
+    char *title;
+    char *top_label;
+    char *left_label;
+    char *right_label;
+    char *bottom_label;
+    char *x_unit;
+    char *y_unit;
+    double x_min;
+    bool x_min_set;
+    double x_max;
+    bool x_max_set;
+    double y_min;
+    bool y_min_set;
+    double y_max;
+    bool y_max_set;
+    bool x_is_logarithmic;
+    bool y_is_logarithmic;
+    bool label_visible;
+    bool label_has_frame;
+    bool label_reverse;
+    int32_t label_frame_thickness;
+    int32_t label_position;
+    int32_t grid_type;
+} PygwyfileGraphModelMeta;
+
+bool pygwyfile_datafield_get_meta(const GwyfileObject *datafield,
+                                  PygwyfileDataFieldMeta *meta,
+                                  GwyfileError **error);
+void pygwyfile_datafield_meta_free(PygwyfileDataFieldMeta *meta);
+
+bool pygwyfile_brick_get_meta(const GwyfileObject *brick,
+                              PygwyfileBrickMeta *meta,
+                              GwyfileError **error);
+void pygwyfile_brick_meta_free(PygwyfileBrickMeta *meta);
+
+bool pygwyfile_spectra_get_meta(const GwyfileObject *spectra,
+                                PygwyfileSpectraMeta *meta,
+                                GwyfileError **error);
+void pygwyfile_spectra_meta_free(PygwyfileSpectraMeta *meta);
+
+bool pygwyfile_spectra_get_curves_meta(const GwyfileObject *spectra,
+                                       unsigned int ncurves,
+                                       int32_t *res,
+                                       double *real,
+                                       double *off,
+                                       bool *selected,
+                                       GwyfileError **error);
+
+bool pygwyfile_spectra_get_curves_data(const GwyfileObject *spectra,
+                                       unsigned int ncurves,
+                                       const int64_t *offsets,
+                                       double *values,
+                                       GwyfileError **error);
+
+bool pygwyfile_graphcurve_get_meta(const GwyfileObject *curve,
+                                   PygwyfileGraphCurveMeta *meta,
+                                   GwyfileError **error);
+void pygwyfile_graphcurve_meta_free(PygwyfileGraphCurveMeta *meta);
+
+bool pygwyfile_graphmodel_get_meta(const GwyfileObject *graphmodel,
+                                   PygwyfileGraphModelMeta *meta,
+                                   GwyfileError **error);
+void pygwyfile_graphmodel_meta_free(PygwyfileGraphModelMeta *meta);
+
+bool pygwyfile_graphmodel_get_curves_meta(const GwyfileObject *graphmodel,
+                                          PygwyfileGraphCurveMeta *metas,
+                                          unsigned int ncurves,
+                                          GwyfileError **error);
+
+#endif
@@ -0,0 +1,272 @@
+""" Opt-in timing and counters of the read/write pipeline
+
+    Statistics are collected only inside a collect() block:
+
+        with stats.collect() as file_stats:
+            container = read_gwyfile(filename)
+        print(file_stats.report())
+
+    Time is accounted to the innermost running stage, i.e. times of
+    stages do not overlap and their sum is the time spent in
+    instrumented code. Stages are:
+
+        parse:          parsing of gwy file by libgwyfile
+        lookup:         indexing of top-level items of the file
+        decode:         creation of channels and container from the file
+        datafield_copy: copying of datafield, brick, surface and
+                        spectra data out of C objects
+        selections:     conversion of selections in both directions
+        graphs:         conversion of graphs and curves in both directions
+        construct:      creation of C objects from container and channels
+        serialize:      serialization of C objects by libgwyfile
+
+    Collection is bound to the current thread (or asyncio task),
+    operations run in other threads are not collected.
+    When no collection is running, instrumented functions only check
+    a context variable.
+
+    Calls of libgwyfile are counted by a proxy of the compiled
+    library. It replaces lib in the instrumented modules only while
+    at least one collection is running, so calls are not wrapped
+    otherwise. Functions of the proxy check the context variable
+    and count the call only if a collection is running in the current
+    context; operations of other threads run through the proxy
+    in the meantime are slower, but not counted.
+
+    Classes:
+        GwyStats: statistics collected in a collect() block
+
+    Functions:
+        collect(): Collect statistics of operations in a with block
+        timed(stage): Decorator accounting time of a function to a stage
+        add_bytes_copied(nbytes): Count copied bytes
+
+    Constants:
+        STAGES: names of pipeline stages
+
+"""
+import contextlib
+import contextvars
+import functools
+import importlib
+import threading
+import time
+
+from pygwyfile._libgwyfile import lib
+
+STAGES = ('parse', 'lookup', 'decode', 'datafield_copy',
+          'selections', 'graphs', 'construct', 'serialize')
+
+# modules calling libgwyfile through their global lib
+_INSTRUMENTED_MODULES = ('pygwyfile.gwyfile',
+                         'pygwyfile.gwydatafield',
+                         'pygwyfile.gwybrick',
+                         'pygwyfile.gwysurface',
+                         'pygwyfile.gwyspectra',
+                         'pygwyfile.gwygraph',
+                         'pygwyfile.gwygraphcurve',
+                         'pygwyfile.gwyselection',
+                         'pygwyfile.gwycontainer')
+
+# GwyStats instance of the running collection or None
+_current = contextvars.ContextVar('pygwyfile_stats', default=None)
+
+# number of running collections in all threads
+_nactive = 0
+_nactive_lock = threading.Lock()
+
+
+class GwyStats:
+    """Statistics collected in a collect() block
+
+    Attributes:
+        times (dictionary): stage -> time spent in the stage in seconds
+        calls (dictionary): stage -> number of entries into the stage
+        cffi_calls (int): number of calls of libgwyfile functions
+        bytes_copied (int): number of bytes of data arrays copied
+                            between C objects and Python
+
+    Methods:
+        total_time(): Get time spent in all stages
+        report(): Get statistics as a text table
+    """
+
+    def __init__(self):
+        self.times = dict.fromkeys(STAGES, 0.)
+        self.calls = dict.fromkeys(STAGES, 0)
+        self.cffi_calls = 0
+        self.bytes_copied = 0
+
+        # [stage, start time] of running stages, innermost last
+        self._stack = []
+
+    def total_time(self):
+        """Get time spent in all stages in seconds"""
+        return sum(self.times.values())
+
+    def report(self):
+        """Get statistics as a text table
+
+        Returns:
+            report (string): time and number of entries of each stage,
+                             number of CFFI calls and copied bytes
+        """
+        lines = ["{:<16s}{:>12s}{:>10s}".format('stage', 'time, ms', 'calls')]
+        for stage in STAGES:
+            lines.append("{:<16s}{:>12.3f}{:>10d}".format(
+                stage, self.times[stage] * 1e3, self.calls[stage]))
+        lines.append("{:<16s}{:>12.3f}".format('total',
+                                               self.total_time() * 1e3))
+        lines.append("cffi calls: {:d}".format(self.cffi_calls))
+        lines.append("bytes copied: {:d}".format(self.bytes_copied))
+        return '\n'.join(lines)
+
+    def _enter(self, stage):
+        """Start stage, pause the enclosing one"""
+        now = time.perf_counter()
+        if self._stack:
+            outer = self._stack[-1]
+            self.times[outer[0]] += now - outer[1]
+        self._stack.append([stage, now])
+        self.calls[stage] += 1
+
+    def _exit(self):
+        """Stop innermost stage, resume the enclosing one"""
+        now = time.perf_counter()
+        stage, start = self._stack.pop()
+        self.times[stage] += now - start
+        if self._stack:
+            self._stack[-1][1] = now
+
+    def __repr__(self):
+        return "<{} total_time={:.6f} cffi_calls={:d} " \
+               "bytes_copied={:d}>".format(type(self).__name__,
+                                           self.total_time(),
+                                           self.cffi_calls,
+                                           self.bytes_copied)
+
+
+@contextlib.contextmanager
+def collect():
+    """Collect statistics of operations in a with block
+
+    Collections may be nested, operations in the inner block
+    are collected by the inner collection only.
+
+    Yields:
+        GwyStats: statistics, filled when the block exits
+    """
+    stats = GwyStats()
+    token = _current.set(stats)
+    _activate()
+    try:
+        yield stats
+    finally:
+        _deactivate()
+        _current.reset(token)
+
+
+def timed(stage):
+    """Decorator accounting time of a function to the stage
+
+    Args:
+        stage (string): one of STAGES
+    """
+    if stage not in STAGES:
+        raise ValueError("Unknown stage {}".format(stage))
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stats = _current.get()
+            if stats is None:
+                return func(*args, **kwargs)
+            stats._enter(stage)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats._exit()
+        return wrapper
+    return decorator
+
+
+def add_bytes_copied(nbytes):
+    """Count bytes of data arrays copied between C objects and Python
+
+    Args:
+        nbytes (int): number of copied bytes
+    """
+    stats = _current.get()
+    if stats is not None:
+        stats.bytes_copied += nbytes
+
+
+def _activate():
+    """Start counting of libgwyfile calls if it is not running"""
+    global _nactive
+    with _nactive_lock:
+        if _nactive == 0:
+            _swap_lib(lib, _counting_lib)
+        _nactive += 1
+
+
+def _deactivate():
+    """Stop counting of libgwyfile calls after the last collection"""
+    global _nactive
+    with _nactive_lock:
+        _nactive -= 1
+        if _nactive == 0:
+            _swap_lib(_counting_lib, lib)
+
+
+def _swap_lib(old, new):
+    """Replace lib in the instrumented modules"""
+    for name in _INSTRUMENTED_MODULES:
+        module = importlib.import_module(name)
+        if module.lib is old:
+            module.lib = new
+
+
+class _CountingLib:
+    """Proxy of the compiled library counting function calls
+
+    Functions are wrapped on the first lookup.
+    """
+
+    def __init__(self, lib):
+        self._lib = lib
+
+    def __getattr__(self, name):
+        attr = getattr(self._lib, name)
+        if not callable(attr):
+            return attr
+
+        counted = _CountedFunction(attr)
+
+        # next lookups of the name bypass __getattr__
+        setattr(self, name, counted)
+        return counted
+
+    def __dir__(self):
+        return dir(self._lib)
+
+
+class _CountedFunction:
+    """Library function counting its calls in the running collection"""
+
+    __slots__ = ('_func',)
+
+    def __init__(self, func):
+        self._func = func
+
+    def __call__(self, *args):
+        stats = _current.get()
+        if stats is not None:
+            stats.cffi_calls += 1
+        return self._func(*args)
+
+    def __repr__(self):
+        return "<counted {!r}>".format(self._func)
+
+
+_counting_lib = _CountingLib(lib)
@@ -0,0 +1,327 @@
+""" Deterministic synthetic gwy files for load testing
+
+    Files contain channels with data, mask and presentation datafields,
+    all five kinds of selections and graphs. The same arguments and
+    seed always produce the same files.
+
+    Datafields are generated in chunks of rows. Fields larger than
+    MEMMAP_MIN_BYTES are kept in temporary memory-mapped files next to
+    the output file, so only the pages being written are resident
+    in RAM while the file is generated.
+
+    Functions:
+        make_container(nchannels=1, resolution=256, mask=True, show=True,
+                       nselections=10, ngraphs=1, ncurves=3, npoints=100,
+                       seed=0, chunk_rows=CHUNK_ROWS, tmpdir=None):
+                       Create synthetic GwyContainer
+        write_synth_gwyfile(filename, seed=0, **kwargs):
+                       Write synthetic gwy file
+        write_synth_corpus(directory, nfiles, seed=0, **kwargs):
+                       Write directory of synthetic gwy files
+
+    Command line:
+        python -m pygwyfile.synth --help
+
+"""
+import argparse
+import os
+import tempfile
+
+import numpy as np
+
+from pygwyfile.gwychannel import GwyChannel
+from pygwyfile.gwycontainer import GwyContainer
+from pygwyfile.gwydatafield import GwyDataField
+from pygwyfile.gwygraph import GwyGraphModel
+from pygwyfile.gwygraphcurve import GwyGraphCurve
+from pygwyfile.gwyselection import (GwyPointSelection,
+                                    GwyPointerSelection,
+                                    GwyLineSelection,
+                                    GwyRectangleSelection,
+                                    GwyEllipseSelection)
+
+# Number of rows of a datafield generated at once
+CHUNK_ROWS = 256
+
+# Datafields of at least this size are memory-mapped
+MEMMAP_MIN_BYTES = 64 * 2**20
+
+# Physical size of the datafields
+_XREAL = 1e-6
+_YREAL = 1e-6
+
+
+def make_container(nchannels=1, resolution=256, mask=True, show=True,
+                   nselections=10, ngraphs=1, ncurves=3, npoints=100,
+                   seed=0, chunk_rows=CHUNK_ROWS, tmpdir=None):
+    """Create synthetic GwyContainer
+
+    Args:
+        nchannels (int): number of channels
+        resolution (int or (int, int)): xres and yres of datafields
+        mask (boolean): whether channels have masks
+        show (boolean): whether channels have presentations
+        nselections (int): number of selections of each kind
+                           in each channel, no selections if zero
+        ngraphs (int): number of graphs
+        ncurves (int): number of curves in each graph
+        npoints (int): number of points in each curve
+        seed (int): seed of the random generator
+        chunk_rows (int): number of rows of a datafield generated at once
+        tmpdir (string): directory for memory-mapped datafields
+                         or None to keep all datafields in memory
+
+    Returns:
+        GwyContainer
+    """
+    xres, yres = _check_resolution(resolution)
+    if chunk_rows < 1:
+        raise ValueError("chunk_rows must be positive")
+
+    seeds = np.random.SeedSequence(seed).spawn(nchannels + ngraphs)
+    channels = [_make_channel(xres, yres, mask, show, nselections,
+                              channel_seed, chunk_rows, tmpdir)
+                for channel_seed in seeds[:nchannels]]
+    graphs = [_make_graph(ncurves, npoints, graph_seed)
+              for graph_seed in seeds[nchannels:]]
+    return GwyContainer(channels=channels, graphs=graphs)
+
+
+def write_synth_gwyfile(filename, seed=0, **kwargs):
+    """Write synthetic gwy file
+
+    Args:
+        filename (string): name of the file, it is overwritten if exists
+        seed (int): seed of the random generator
+        **kwargs: other arguments of make_container except tmpdir
+
+    Returns:
+        filename (string): name of the written file
+    """
+    dirname = os.path.dirname(os.path.abspath(filename))
+    with tempfile.TemporaryDirectory(dir=dirname,
+                                     prefix='.synth-') as tmpdir:
+        container = make_container(seed=seed, tmpdir=tmpdir, **kwargs)
+        container.to_gwyfile(filename)
+        # release memory maps before the directory is removed
+        del container
+    return filename
+
+
+def write_synth_corpus(directory, nfiles, seed=0, **kwargs):
+    """Write directory of synthetic gwy files
+
+    File i is generated with seed + i, so any file of the corpus
+    can be regenerated alone.
+
+    Args:
+        directory (string): output directory, created if does not exist
+        nfiles (int): number of files
+        seed (int): seed of the first file
+        **kwargs: other arguments of make_container except tmpdir
+
+    Returns:
+        filenames (list of strings): names of the written files
+    """
+    os.makedirs(directory, exist_ok=True)
+    filenames = []
+    for i in range(nfiles):
+        filename = os.path.join(directory, "synth_{:05d}.gwy".format(i))
+        write_synth_gwyfile(filename, seed=seed + i, **kwargs)
+        filenames.append(filename)
+    return filenames
+
+
+def _check_resolution(resolution):
+    """Get xres and yres from resolution argument
+
+    Args:
+        resolution (int or (int, int)): xres and yres of datafields
+
+    Returns:
+        (xres, yres)
+    """
+    if isinstance(resolution, int):
+        xres = yres = resolution
+    else:
+        xres, yres = resolution
+    if xres < 1 or yres < 1:
+        raise ValueError("resolution must be positive")
+    return xres, yres
+
+
+def _new_array(shape, tmpdir):
+    """Allocate float64 array, memory-mapped if it is large
+
+    Args:
+        shape (tuple of int): shape of the array
+        tmpdir (string): directory for memory-mapped arrays or None
+
+    Returns:
+        numpy array or numpy memmap
+    """
+    nbytes = int(np.prod(shape)) * np.dtype(np.float64).itemsize
+    if tmpdir is None or nbytes < MEMMAP_MIN_BYTES:
+        return np.empty(shape, dtype=np.float64)
+    fd, path = tempfile.mkstemp(dir=tmpdir, suffix='.f64')
+    os.close(fd)
+    return np.memmap(path, dtype=np.float64, mode='w+', shape=shape)
+
+
+def _make_fields(xres, yres, mask, show, seed, chunk_rows, tmpdir):
+    """Generate data, mask and presentation arrays in chunks of rows
+
+    Data is a tilted plane with a periodic pattern and noise, the mask
+    marks noise outliers and the presentation is data without the plane.
+
+    Returns:
+        (data, mask, show): numpy arrays, mask and show are None
+                            if they are not requested
+    """
+    rng = np.random.default_rng(seed)
+    data = _new_array((xres, yres), tmpdir)
+    mask_data = _new_array((xres, yres), tmpdir) if mask else None
+    show_data = _new_array((xres, yres), tmpdir) if show else None
+
+    y = np.arange(yres) / yres
+    pattern_y = np.sin(8 * np.pi * y)
+    for start in range(0, xres, chunk_rows):
+        stop = min(start + chunk_rows, xres)
+        x = (np.arange(start, stop) / xres)[:, np.newaxis]
+        noise = rng.standard_normal((stop - start, yres))
+        plane = 1e-8 * (x + 0.5 * y)
+        relief = 1e-9 * np.sin(8 * np.pi * x) * pattern_y + 1e-10 * noise
+        data[start:stop] = plane + relief
+        if mask_data is not None:
+            mask_data[start:stop] = np.abs(noise) > 2.
+        if show_data is not None:
+            show_data[start:stop] = relief
+    return data, mask_data, show_data
+
+
+def _make_datafield(data, si_unit_z):
+    """Wrap array into GwyDataField"""
+    if data is None:
+        return None
+    return GwyDataField(data, meta={'xreal': _XREAL, 'yreal': _YREAL,
+                                    'si_unit_xy': 'm',
+                                    'si_unit_z': si_unit_z})
+
+
+def _make_selections(nselections, rng):
+    """Create selections of all five kinds
+
+    Returns:
+        dictionary of GwyChannel arguments, empty if nselections is zero
+    """
+    if not nselections:
+        return {}
+
+    def points():
+        return rng.random((nselections, 2)) * (_XREAL, _YREAL)
+
+    def pairs():
+        return np.stack((points(), points()), axis=1)
+
+    return {'point_sel': GwyPointSelection(points()),
+            'pointer_sel': GwyPointerSelection(points()),
+            'line_sel': GwyLineSelection(pairs()),
+            'rectangle_sel': GwyRectangleSelection(pairs()),
+            'ellipse_sel': GwyEllipseSelection(pairs())}
+
+
+def _make_channel(xres, yres, mask, show, nselections, seed,
+                  chunk_rows, tmpdir):
+    """Create synthetic channel
+
+    Returns:
+        GwyChannel
+    """
+    data, mask_data, show_data = _make_fields(xres, yres, mask, show,
+                                              seed, chunk_rows, tmpdir)
+    rng = np.random.default_rng(seed.spawn(1)[0])
+    return GwyChannel('Topography', _make_datafield(data, 'm'),
+                      palette='Gray',
+                      mask=_make_datafield(mask_data, ''),
+                      show=_make_datafield(show_data, 'm'),
+                      **_make_selections(nselections, rng))
+
+
+def _make_graph(ncurves, npoints, seed):
+    """Create graph with ncurves profiles of npoints points
+
+    Returns:
+        GwyGraphModel
+    """
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0., _XREAL, npoints)
+    curves = []
+    for i in range(ncurves):
+        y = 1e-9 * np.sin(8 * np.pi * x / _XREAL + i)
+        y += 1e-10 * rng.standard_normal(npoints)
+        curves.append(GwyGraphCurve(xdata=x, ydata=y,
+                                    meta={'description':
+                                          "Profile {:d}".format(i + 1)}))
+    return GwyGraphModel(curves, meta={'title': 'Profiles',
+                                       'x_unit': 'm',
+                                       'y_unit': 'm'})
+
+
+def _parse_args(args=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m pygwyfile.synth',
+        description="Write deterministic synthetic gwy files")
+    parser.add_argument('output',
+                        help="output file, or directory if --files is given")
+    parser.add_argument('--files', type=int, default=None,
+                        help="number of files written to output directory")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="seed of the random generator (default: 0)")
+    parser.add_argument('--channels', type=int, default=1,
+                        help="number of channels (default: 1)")
+    parser.add_argument('--resolution', type=int, nargs='+', default=[256],
+                        metavar='RES',
+                        help="xres [yres] of datafields (default: 256)")
+    parser.add_argument('--no-mask', action='store_true',
+                        help="do not add masks")
+    parser.add_argument('--no-show', action='store_true',
+                        help="do not add presentations")
+    parser.add_argument('--selections', type=int, default=10,
+                        help="number of selections of each kind "
+                             "(default: 10)")
+    parser.add_argument('--graphs', type=int, default=1,
+                        help="number of graphs (default: 1)")
+    parser.add_argument('--curves', type=int, default=3,
+                        help="number of curves in each graph (default: 3)")
+    parser.add_argument('--points', type=int, default=100,
+                        help="number of points in each curve (default: 100)")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS,
+                        help="rows of a datafield generated at once "
+                             "(default: {:d})".format(CHUNK_ROWS))
+    args = parser.parse_args(args)
+    if len(args.resolution) > 2:
+        parser.error("--resolution takes one or two values")
+    return args
+
+
+def main(args=None):
+    """Entry point of python -m pygwyfile.synth"""
+    args = _parse_args(args)
+    kwargs = dict(nchannels=args.channels,
+                  resolution=tuple(args.resolution * 2)[:2],
+                  mask=not args.no_mask,
+                  show=not args.no_show,
+                  nselections=args.selections,
+                  ngraphs=args.graphs,
+                  ncurves=args.curves,
+                  npoints=args.points,
+                  chunk_rows=args.chunk_rows)
+    if args.files is None:
+        write_synth_gwyfile(args.output, seed=args.seed, **kwargs)
+    else:
+        write_synth_corpus(args.output, args.files, seed=args.seed,
+                           **kwargs)
+
+
+if __name__ == '__main__':
+    main()
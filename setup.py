@@ -19,5 +19,6 @@ setup(name="pygwyfile",
           "Operating System :: POSIX :: Linux"],
       setup_requires=["cffi>=1.0.0"],
       cffi_modules=["pygwyfile/libgwyfile_build.py:ffibuilder"],
-      install_requires=["cffi>=1.0.0", "numpy"]
+      install_requires=["cffi>=1.0.0", "numpy"],
+      extras_require={"zstd": ["zstandard"]}
       )
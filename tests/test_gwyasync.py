@@ -0,0 +1,69 @@
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, call
+
+from pygwyfile import gwyasync
+from pygwyfile.gwyasync import configure, run_blocking
+
+
+class Func_run_blocking(unittest.TestCase):
+    """Test run_blocking and configure functions"""
+
+    def setUp(self):
+        self.addCleanup(configure)
+
+    def test_run_in_another_thread(self):
+        """Run function with args in another thread"""
+        func = Mock(side_effect=lambda *args, **kwargs:
+                    threading.current_thread())
+        thread = asyncio.run(run_blocking(func, 1, key='value'))
+        func.assert_has_calls([call(1, key='value')])
+        self.assertIsNot(thread, threading.current_thread())
+
+    def test_configured_executor(self):
+        """Run function in the configured executor"""
+        executor = ThreadPoolExecutor(1, thread_name_prefix='gwytest')
+        self.addCleanup(executor.shutdown)
+        configure(executor=executor)
+        name = asyncio.run(run_blocking(
+            lambda: threading.current_thread().name))
+        self.assertTrue(name.startswith('gwytest'))
+
+    def test_max_concurrency(self):
+        """Limit number of blocking calls running at the same time"""
+        executor = ThreadPoolExecutor(4)
+        self.addCleanup(executor.shutdown)
+        configure(executor=executor, max_concurrency=2)
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def func():
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            threading.Event().wait(0.01)
+            with lock:
+                running[0] -= 1
+
+        async def main():
+            await asyncio.gather(*[run_blocking(func) for i in range(8)])
+
+        asyncio.run(main())
+        self.assertEqual(running[1], 2)
+
+    def test_raise_ValueError_if_max_concurrency_is_not_positive(self):
+        """Raise ValueError if max_concurrency is less than 1"""
+        self.assertRaises(ValueError, configure, max_concurrency=0)
+
+    def test_semaphore_per_event_loop(self):
+        """Semaphore is created for each event loop"""
+        configure(max_concurrency=1)
+        asyncio.run(run_blocking(Mock()))
+        asyncio.run(run_blocking(Mock()))
+        self.assertLessEqual(len(gwyasync._semaphores), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from pygwyfile.gwybatch import read_gwyfiles, _SharedArray
+from pygwyfile.gwybatch import read_many, write_many
+from pygwyfile.gwybatch import _read_gwyfile_to_shared_memory
+from pygwyfile.gwybatch import _attach_shared_arrays
+from pygwyfile.gwybrick import GwyBrick
+from pygwyfile.gwychannel import GwyChannel
+from pygwyfile.gwycontainer import GwyContainer
+from pygwyfile.gwydatafield import GwyDataField
+from pygwyfile.gwyspectra import GwySpectra
+from pygwyfile.gwysurface import GwySurface
+
+
+class Func_read_gwyfiles(unittest.TestCase):
+    """Test read_gwyfiles function"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.filenames = []
+        for i in range(4):
+            data = np.full((4, 3), float(i))
+            channel = GwyChannel('Topo', GwyDataField(data),
+                                 mask=GwyDataField(data + 1.))
+            filename = os.path.join(self.root, '{:d}.gwy'.format(i))
+            GwyContainer(channels=[channel]).to_gwyfile(filename)
+            self.filenames.append(filename)
+
+    def test_ordered_results(self):
+        """Yield filenames and containers in the order of filenames"""
+        results = list(read_gwyfiles(self.filenames,
+                                     workers=2,
+                                     max_in_flight=1))
+        self.assertEqual([filename for filename, _ in results],
+                         self.filenames)
+        for i, (_, container) in enumerate(results):
+            channel = container.channels[0]
+            np.testing.assert_equal(channel.data.data,
+                                    np.full((4, 3), float(i)))
+            np.testing.assert_equal(channel.mask.data,
+                                    np.full((4, 3), i + 1.))
+
+    def test_unordered_results(self):
+        """Yield all files if ordered is False"""
+        results = list(read_gwyfiles(self.filenames,
+                                     workers=2,
+                                     ordered=False))
+        self.assertEqual(sorted(filename for filename, _ in results),
+                         self.filenames)
+
+    def test_pass_args_to_read_gwyfile(self):
+        """Pass components arg to read_gwyfile"""
+        results = list(read_gwyfiles(self.filenames[:1],
+                                     workers=1,
+                                     components=('data',)))
+        self.assertIsNone(results[0][1].channels[0].mask)
+
+    def test_raise_exception_of_worker(self):
+        """Raise exception raised while reading a file"""
+        filenames = self.filenames + [os.path.join(self.root, 'no.gwy')]
+        self.assertRaises(OSError,
+                          list,
+                          read_gwyfiles(filenames, workers=2))
+
+    def test_raise_ValueError_if_lazy(self):
+        """Lazy containers cannot be returned by workers"""
+        self.assertRaises(ValueError,
+                          list,
+                          read_gwyfiles(self.filenames, lazy=True))
+
+    def test_raise_ValueError_if_max_in_flight_is_not_positive(self):
+        """Raise ValueError if max_in_flight is less than 1"""
+        self.assertRaises(ValueError,
+                          list,
+                          read_gwyfiles(self.filenames, max_in_flight=0))
+
+
+class Func_read_gwyfiles_volumes(unittest.TestCase):
+    """Test transport of volumes, surfaces and spectra"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.brick_data = np.random.rand(3, 4, 5)
+        self.surface_data = np.random.rand(6, 3)
+        self.curves = [np.random.rand(4), np.random.rand(2)]
+        self.coords = np.random.rand(2, 2)
+        container = GwyContainer(
+            volumes=[GwyBrick(self.brick_data)],
+            surfaces=[GwySurface(self.surface_data)],
+            spectra=[GwySpectra.from_curves(self.curves, self.coords)])
+        self.filename = os.path.join(self.root, 'volume.gwy')
+        container.to_gwyfile(self.filename)
+
+    def _check_container(self, container):
+        np.testing.assert_equal(container.volumes[0].data,
+                                self.brick_data)
+        np.testing.assert_equal(container.surfaces[0].data,
+                                self.surface_data)
+        spectra = container.spectra[0]
+        np.testing.assert_equal(spectra.get_curve(1), self.curves[1])
+        np.testing.assert_equal(spectra.coords, self.coords)
+
+    def test_arrays_are_in_shared_memory(self):
+        """Arrays of volumes, surfaces and spectra are not pickled"""
+        container = _read_gwyfile_to_shared_memory(self.filename, {})
+        self.assertIsInstance(container.volumes[0].data, _SharedArray)
+        self.assertIsInstance(container.surfaces[0].data, _SharedArray)
+        for attr in ('values', 'offsets', 'coords'):
+            self.assertIsInstance(getattr(container.spectra[0], attr),
+                                  _SharedArray)
+        self._check_container(_attach_shared_arrays(container))
+
+    def test_read_volume_in_worker(self):
+        """Read volume, surface and spectra in a worker process"""
+        results = list(read_gwyfiles([self.filename], workers=1))
+        self._check_container(results[0][1])
+
+
+class Func_read_many_write_many(unittest.TestCase):
+    """Test read_many and write_many functions"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.containers = [
+            GwyContainer(channels=[GwyChannel('Topo', GwyDataField(
+                np.full((4, 3), float(i))))])
+            for i in range(4)]
+        self.filenames = [os.path.join(self.root, '{:d}.gwy'.format(i))
+                          for i in range(4)]
+
+    def test_round_trip(self):
+        """Read files written by write_many in the order of filenames"""
+        write_many(self.containers, self.filenames, workers=2)
+        containers = read_many(self.filenames, workers=2,
+                               components=('data',))
+        for i, container in enumerate(containers):
+            np.testing.assert_equal(container.channels[0].data.data,
+                                    np.full((4, 3), float(i)))
+
+    def test_raise_ValueError_if_numbers_do_not_match(self):
+        """Raise ValueError if there is no filename for a container"""
+        self.assertRaises(ValueError,
+                          write_many,
+                          self.containers,
+                          self.filenames[:-1])
+
+    def test_raise_exception_of_thread(self):
+        """Raise exception raised while reading a file"""
+        self.assertRaises(OSError,
+                          read_many,
+                          self.filenames)
+
+
+class SharedArray(unittest.TestCase):
+    """Test transport of arrays through shared memory"""
+
+    def test_round_trip(self):
+        """Receiver maps the block without a copy, block is unlinked"""
+        array = np.arange(6, dtype=np.float64).reshape((2, 3))
+        shared_array = _SharedArray.from_array(array)
+        received = shared_array.to_array()
+        np.testing.assert_equal(received, array)
+        self.assertFalse(received.flags.owndata)
+        self.assertRaises(FileNotFoundError, shared_array.to_array)
+
+    def test_close_block_with_last_view(self):
+        """Block is closed when the array and its views are deleted"""
+        array = np.arange(6, dtype=np.float64)
+        shared_array = _SharedArray.from_array(array)
+        with patch('pygwyfile.gwybatch._close_shared_memory',
+                   side_effect=lambda shm: shm.close()) as mock_close:
+            received = shared_array.to_array()
+            view = received[2:]
+            del received
+            mock_close.assert_not_called()
+            np.testing.assert_equal(view, array[2:])
+            del view
+            mock_close.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
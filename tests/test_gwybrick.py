@@ -0,0 +1,358 @@
+import unittest
+from unittest.mock import patch, call, Mock
+
+import numpy as np
+
+from pygwyfile._libgwyfile import ffi
+from pygwyfile.gwyfile import GwyfileErrorCMsg
+from pygwyfile.gwybrick import GwyBrick
+
+
+class GwyBrick_init(unittest.TestCase):
+    """Test constructor of GwyBrick class
+    """
+
+    def setUp(self):
+        self.test_data = np.random.rand(5, 4, 3)
+        self.test_meta = {'xres': 3,
+                          'yres': 4,
+                          'zres': 5,
+                          'xreal': 1e-6,
+                          'yreal': 2e-6,
+                          'zreal': 1.,
+                          'xoff': 0.,
+                          'yoff': 0.,
+                          'zoff': -0.5,
+                          'si_unit_x': 'm',
+                          'si_unit_y': 'm',
+                          'si_unit_z': 'V',
+                          'si_unit_w': 'A'}
+
+    def test_init_with_test_data(self):
+        """Test __init__ with data, meta and title args
+        """
+        brick = GwyBrick(data=self.test_data, meta=self.test_meta,
+                         title='Spectra')
+        self.assertIs(brick.data, self.test_data)
+        self.assertDictEqual(brick.meta, self.test_meta)
+        self.assertEqual(brick.title, 'Spectra')
+
+    def test_init_with_empty_meta(self):
+        """Dimensions are taken from data shape, other items are defaults
+        """
+        brick = GwyBrick(data=self.test_data)
+        self.assertDictEqual(brick.meta,
+                             {'xres': 3,
+                              'yres': 4,
+                              'zres': 5,
+                              'xreal': 1.,
+                              'yreal': 1.,
+                              'zreal': 1.,
+                              'xoff': 0.,
+                              'yoff': 0.,
+                              'zoff': 0.,
+                              'si_unit_x': '',
+                              'si_unit_y': '',
+                              'si_unit_z': '',
+                              'si_unit_w': ''})
+        self.assertIsNone(brick.title)
+
+    def test_raise_ValueError_if_mismatched_data_shape_and_res(self):
+        """Raise ValueError if data.shape is not (zres, yres, xres)
+        """
+        self.test_meta['xres'] = 4
+        self.test_meta['yres'] = 3
+        self.assertRaises(ValueError,
+                          GwyBrick,
+                          data=self.test_data,
+                          meta=self.test_meta)
+
+    def test_raise_ValueError_if_data_is_not_3D(self):
+        """Raise ValueError if data is not a 3D array
+        """
+        self.assertRaises(ValueError,
+                          GwyBrick,
+                          data=np.zeros((4, 3)))
+
+
+class GwyBrick_from_gwy(unittest.TestCase):
+    """Test from_gwy method of GwyBrick class
+    """
+
+    @patch('pygwyfile.gwybrick.GwyBrick', autospec=True)
+    @patch.object(GwyBrick, '_get_data')
+    @patch.object(GwyBrick, '_get_meta')
+    def test_GwyBrick_from_gwy(self,
+                               mock_get_meta,
+                               mock_get_data,
+                               mock_GwyBrick):
+        """Get metadata and data and create GwyBrick instance
+        """
+        gwybrick = Mock()
+        owner = Mock()
+        meta = {'xres': 3, 'yres': 4, 'zres': 5}
+        mock_get_meta.return_value = meta
+        brick = GwyBrick.from_gwy(gwybrick, owner=owner)
+        mock_get_meta.assert_has_calls([call(gwybrick)])
+        mock_get_data.assert_has_calls(
+            [call(gwybrick, (5, 4, 3), owner=owner)])
+        mock_GwyBrick.assert_has_calls(
+            [call(data=mock_get_data.return_value, meta=meta)])
+        self.assertEqual(brick, mock_GwyBrick.return_value)
+
+
+class GwyBrick_get_meta(unittest.TestCase):
+    """Test _get_meta method of GwyBrick
+    """
+
+    def setUp(self):
+        self.cgwybrick = Mock()
+
+        patcher_lib = patch('pygwyfile.gwybrick.lib',
+                            autospec=True)
+        self.addCleanup(patcher_lib.stop)
+        self.mock_lib = patcher_lib.start()
+
+        self.falsep = ffi.new("bool*", False)
+        self.truep = ffi.new("bool*", True)
+        self.test_metadata_dict = {'xres': 3,
+                                   'yres': 4,
+                                   'zres': 5,
+                                   'xreal': 1e-6,
+                                   'yreal': 2e-6,
+                                   'zreal': 1.,
+                                   'xoff': 0.,
+                                   'yoff': 0.,
+                                   'zoff': -0.5,
+                                   'si_unit_x': 'm',
+                                   'si_unit_y': 'm',
+                                   'si_unit_z': 'V',
+                                   'si_unit_w': 'A'}
+
+    def test_raise_exception_if_brick_looks_unacceptable(self):
+        """Raise GwyfileErrorCMsg if pygwyfile_brick_get_meta
+        returns False
+        """
+        self.mock_lib.pygwyfile_brick_get_meta.return_value = (
+            self.falsep[0])
+        self.assertRaises(GwyfileErrorCMsg,
+                          GwyBrick._get_meta,
+                          self.cgwybrick)
+
+    def test_returned_metadata_dict(self):
+        """Return metadata dictionary and free unit strings
+        """
+        self.mock_lib.pygwyfile_brick_get_meta.side_effect = (
+            self._side_effect_return_metadata)
+        meta = GwyBrick._get_meta(self.cgwybrick)
+        self.assertDictEqual(meta, self.test_metadata_dict)
+        self.assertEqual(
+            self.mock_lib.pygwyfile_brick_meta_free.call_count, 1)
+
+    def _side_effect_return_metadata(self, gwybrick, c_meta, errorp):
+        self.assertEqual(gwybrick, self.cgwybrick)
+
+        # keep C strings alive until they are read
+        self.metadata_c_strs = []
+        for key, value in self.test_metadata_dict.items():
+            if key.startswith('si_unit'):
+                metadata_c_str = ffi.new("char[]", value.encode('utf-8'))
+                self.metadata_c_strs.append(metadata_c_str)
+                setattr(c_meta, key, metadata_c_str)
+            else:
+                setattr(c_meta, key, value)
+        return self.truep[0]
+
+
+class GwyBrick_get_data(unittest.TestCase):
+    """Test _get_data method of GwyBrick class
+    """
+
+    def setUp(self):
+        self.cgwybrick = Mock()
+
+        patcher_lib = patch('pygwyfile.gwybrick.lib',
+                            autospec=True)
+        self.addCleanup(patcher_lib.stop)
+        self.mock_lib = patcher_lib.start()
+
+        self.falsep = ffi.new("bool*", False)
+        self.truep = ffi.new("bool*", True)
+        self.shape = (5, 4, 3)
+        self.data = np.random.rand(*self.shape)
+
+    def test_raise_exception_if_brick_looks_unacceptable(self):
+        """Raise GwyfileErrorCMsg if gwyfile_object_brick_get
+        returns False
+        """
+        self.mock_lib.gwyfile_object_brick_get.return_value = (
+            self.falsep[0])
+        self.assertRaises(GwyfileErrorCMsg,
+                          GwyBrick._get_data,
+                          self.cgwybrick,
+                          self.shape)
+
+    def test_returned_data_is_a_copy(self):
+        """Return copy of the data if owner is None
+        """
+        self.mock_lib.gwyfile_object_brick_get.side_effect = (
+            self._side_effect)
+        data = GwyBrick._get_data(self.cgwybrick, self.shape)
+        np.testing.assert_equal(data, self.data)
+        self.assertFalse(np.shares_memory(data, self.data))
+
+    def test_returned_data_is_a_view_of_owner(self):
+        """Return array created by owner.view_double_array if owner is given
+        """
+        self.mock_lib.gwyfile_object_brick_get.side_effect = (
+            self._side_effect)
+        owner = Mock()
+        data = GwyBrick._get_data(self.cgwybrick, self.shape, owner=owner)
+        owner.view_double_array.assert_has_calls(
+            [call(ffi.cast("double*", self.data.ctypes.data),
+                  self.shape)])
+        self.assertIs(data, owner.view_double_array.return_value)
+
+    def _side_effect(self, *args):
+
+        # first arg is GwyBrick object from Libgwyfile
+        self.assertEqual(args[0], self.cgwybrick)
+
+        # last arg in NULL
+        self.assertEqual(args[-1], ffi.NULL)
+
+        self.assertEqual(ffi.string(args[2]), b'data')
+        datap = args[3]
+        datap[0] = ffi.cast("double*", self.data.ctypes.data)
+        return self.truep[0]
+
+
+class GwyBrick_to_gwy(unittest.TestCase):
+    """Test to_gwy method of GwyBrick class
+    """
+
+    def setUp(self):
+        self.data = np.random.rand(5, 4, 3)
+        self.brick = GwyBrick(self.data,
+                              meta={'xreal': 2., 'zoff': -1.,
+                                    'si_unit_x': 'm', 'si_unit_w': 'A'})
+
+    @patch('pygwyfile.gwybrick.lib', autospec=True)
+    def test_args_of_libgwyfile_func(self, mock_lib):
+        """Pass dimensions, data and metadata to gwyfile_object_new_brick
+        """
+        mock_lib.gwyfile_object_new_brick.side_effect = self._side_effect
+        gwybrick = self.brick.to_gwy()
+        self.assertEqual(gwybrick, self.expected_return)
+
+    def _side_effect(self, *args):
+        self.assertEqual(int(args[0]), 3)
+        self.assertEqual(int(args[1]), 4)
+        self.assertEqual(int(args[2]), 5)
+        self.assertEqual(float(args[3]), 2.)
+        self.assertEqual(float(args[4]), 1.)
+        self.assertEqual(float(args[5]), 1.)
+        self.assertEqual(args[-1], ffi.NULL)
+
+        arg_keys = [ffi.string(key).decode('utf-8') for key in args[6:-1:2]]
+        arg_values = args[7:-1:2]
+        arg_dict = dict(zip(arg_keys, arg_values))
+
+        data = np.frombuffer(ffi.buffer(arg_dict['data(copy)'],
+                                        self.data.nbytes))
+        np.testing.assert_equal(data, self.data.ravel())
+        self.assertEqual(float(arg_dict['zoff']), -1.)
+        self.assertEqual(ffi.string(arg_dict['si_unit_x']), b'm')
+        self.assertEqual(ffi.string(arg_dict['si_unit_w']), b'A')
+        self.assertEqual(ffi.string(arg_dict['si_unit_z']), b'')
+
+        self.expected_return = Mock()
+        return self.expected_return
+
+    def test_borrow_data(self):
+        """Data array is borrowed and appended to keepalive
+        """
+        keepalive = []
+        self.brick.to_gwy(keepalive)
+        self.assertIs(keepalive[0], self.data)
+
+
+class GwyBrick_round_trip(unittest.TestCase):
+    """Test conversion of GwyBrick to C object and back
+    """
+
+    def setUp(self):
+        self.data = np.random.rand(5, 4, 3)
+        self.brick = GwyBrick(self.data,
+                              meta={'xreal': 2., 'yreal': 3., 'zreal': 4.,
+                                    'xoff': 1., 'yoff': 0.5, 'zoff': -1.,
+                                    'si_unit_x': 'm', 'si_unit_y': 'm',
+                                    'si_unit_z': 'V', 'si_unit_w': 'A'})
+
+    def test_round_trip(self):
+        """Read the same data and metadata as written
+        """
+        brick = GwyBrick.from_gwy(self.brick.to_gwy())
+        np.testing.assert_equal(brick.data, self.data)
+        self.assertDictEqual(brick.meta, self.brick.meta)
+
+
+class GwyBrick_slices(unittest.TestCase):
+    """Test get_zslab and get_xy_plane methods of GwyBrick
+    """
+
+    def setUp(self):
+        self.data = np.random.rand(8, 4, 3)
+        self.brick = GwyBrick(self.data,
+                              meta={'zreal': 4., 'zoff': 1.,
+                                    'si_unit_z': 'V'},
+                              title='Spectra')
+
+    def test_get_zslab(self):
+        """Return brick viewing the levels with adjusted z axis
+        """
+        slab = self.brick.get_zslab(2, 6)
+        np.testing.assert_equal(slab.data, self.data[2:6])
+        self.assertTrue(np.shares_memory(slab.data, self.data))
+        self.assertEqual(slab.meta['zres'], 4)
+        self.assertEqual(slab.meta['zreal'], 2.)
+        self.assertEqual(slab.meta['zoff'], 2.)
+        self.assertEqual(slab.meta['si_unit_z'], 'V')
+        self.assertEqual(slab.title, 'Spectra')
+
+    def test_raise_ValueError_if_zslab_is_out_of_levels(self):
+        """Raise ValueError if the slab is empty or out of levels
+        """
+        self.assertRaises(ValueError, self.brick.get_zslab, -1, 2)
+        self.assertRaises(ValueError, self.brick.get_zslab, 3, 3)
+        self.assertRaises(ValueError, self.brick.get_zslab, 0, 9)
+
+    def test_get_xy_plane(self):
+        """Return view of the level
+        """
+        plane = self.brick.get_xy_plane(3)
+        self.assertEqual(plane.shape, (4, 3))
+        np.testing.assert_equal(plane, self.data[3])
+        self.assertTrue(np.shares_memory(plane, self.data))
+        np.testing.assert_equal(self.brick.get_xy_plane(-1), self.data[7])
+
+    def test_raise_IndexError_if_level_is_out_of_levels(self):
+        """Raise IndexError if the level does not exist
+        """
+        self.assertRaises(IndexError, self.brick.get_xy_plane, 8)
+        self.assertRaises(IndexError, self.brick.get_xy_plane, -9)
+
+
+class GwyBrick_nbytes(unittest.TestCase):
+    """Test nbytes method of GwyBrick
+    """
+
+    def test_size_of_data_array(self):
+        """Return size of the data array in bytes
+        """
+        brick = GwyBrick(np.zeros((2, 4, 4)))
+        self.assertEqual(brick.nbytes(), 256)
+
+
+if __name__ == '__main__':
+    unittest.main()
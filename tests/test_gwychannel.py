@@ -12,6 +12,7 @@ from pygwyfile.gwyselection import (GwyPointSelection,
                                     GwyRectangleSelection,
                                     GwyEllipseSelection)
 from pygwyfile.gwychannel import GwyDataField, GwyChannel
+from pygwyfile.gwychannel import CHANNEL_COMPONENTS, check_components
 
 
 class GwyChannel_get_title(unittest.TestCase):
@@ -877,7 +878,17 @@ class GwyChannel_get_data(unittest.TestCase):
         gwydatafield = self.gwyfile.get_gwyitem_object.return_value
         GwyChannel._get_data(self.gwyfile, self.channel_id)
         self.mock_GwyDataField.from_gwy.assert_has_calls(
-            [call(gwydatafield)])
+            [call(gwydatafield, owner=None)])
+
+    def test_zero_copy_GwyDataField(self):
+        """
+        Pass gwyfile as owner of the data if copy is False
+        """
+
+        gwydatafield = self.gwyfile.get_gwyitem_object.return_value
+        GwyChannel._get_data(self.gwyfile, self.channel_id, copy=False)
+        self.mock_GwyDataField.from_gwy.assert_has_calls(
+            [call(gwydatafield, owner=self.gwyfile)])
 
     def test_check_returned_value(self):
         """
@@ -910,6 +921,15 @@ class GwyChannel_add_data_to_gwy(unittest.TestCase):
                           self.gwycontainer,
                           self.channel_id)
 
+    def test_raise_ValueError_if_data_is_None(self):
+        """ Raise ValueError if channel was read without data"""
+        self.gwychannel.data = None
+        self.gwychannel.title = 'Topography'
+        with self.assertRaisesRegex(ValueError, "'data' component"):
+            self.gwychannel._add_data_to_gwy(self.gwychannel,
+                                             self.gwycontainer,
+                                             self.channel_id)
+
     @patch('pygwyfile.gwychannel.add_gwyitem_to_gwycontainer', autospec=True)
     @patch('pygwyfile.gwychannel.new_gwyitem_object', autospec=True)
     def test_create_new_gwyitem(self,
@@ -985,7 +1005,17 @@ class GwyChannel_get_mask(unittest.TestCase):
         gwydatafield = self.gwyfile.get_gwyitem_object.return_value
         GwyChannel._get_mask(self.gwyfile, self.channel_id)
         self.mock_GwyDataField.from_gwy.assert_has_calls(
-            [call(gwydatafield)])
+            [call(gwydatafield, owner=None)])
+
+    def test_zero_copy_GwyDataField(self):
+        """
+        Pass gwyfile as owner of the data if copy is False
+        """
+
+        gwydatafield = self.gwyfile.get_gwyitem_object.return_value
+        GwyChannel._get_mask(self.gwyfile, self.channel_id, copy=False)
+        self.mock_GwyDataField.from_gwy.assert_has_calls(
+            [call(gwydatafield, owner=self.gwyfile)])
 
     def test_check_returned_value(self):
         """
@@ -1104,7 +1134,17 @@ class GwyChannel_get_show(unittest.TestCase):
         gwydatafield = self.gwyfile.get_gwyitem_object.return_value
         GwyChannel._get_show(self.gwyfile, self.channel_id)
         self.mock_GwyDataField.from_gwy.assert_has_calls(
-            [call(gwydatafield)])
+            [call(gwydatafield, owner=None)])
+
+    def test_zero_copy_GwyDataField(self):
+        """
+        Pass gwyfile as owner of the data if copy is False
+        """
+
+        gwydatafield = self.gwyfile.get_gwyitem_object.return_value
+        GwyChannel._get_show(self.gwyfile, self.channel_id, copy=False)
+        self.mock_GwyDataField.from_gwy.assert_has_calls(
+            [call(gwydatafield, owner=self.gwyfile)])
 
     def test_check_returned_value(self):
         """
@@ -1831,6 +1871,12 @@ class GwyChannel_init(unittest.TestCase):
                           title='Title',
                           data=data)
 
+    def test_data_is_None(self):
+        """Data is None if it was not loaded
+        """
+        channel = GwyChannel(title='Title', data=None)
+        self.assertIsNone(channel.data)
+
     def test_raise_TypeError_if_mask_is_not_GwyDataField_or_None(self):
         """Raise TypeError exception if mask is not GwyDataField instance or None
         """
@@ -2074,10 +2120,10 @@ class GwyChannel_from_gwy(unittest.TestCase):
             [call(gwyfile, channel_id)])
 
         mock_get_data.assert_has_calls(
-            [call(gwyfile, channel_id)])
+            [call(gwyfile, channel_id, copy=True)])
 
         mock_get_mask.assert_has_calls(
-            [call(gwyfile, channel_id)])
+            [call(gwyfile, channel_id, copy=True)])
 
         mock_get_visibility.assert_has_calls(
             [call(gwyfile, channel_id)])
@@ -2132,6 +2178,108 @@ class GwyChannel_from_gwy(unittest.TestCase):
                   ellipse_sel=ellipse_sel)])
 
 
+class GwyChannel_from_gwy_components(unittest.TestCase):
+    """Test from_gwy method of GwyChannel class with components arg"""
+
+    def setUp(self):
+        self.gwyfile = Mock(spec=Gwyfile)
+        self.channel_id = 0
+        self.getters = {}
+        for name in ['_get_title', '_get_data', '_get_mask', '_get_show',
+                     '_get_point_sel', '_get_pointer_sel', '_get_line_sel',
+                     '_get_rectangle_sel', '_get_ellipse_sel',
+                     '_get_visibility', '_get_palette', '_get_range_type',
+                     '_get_range_min', '_get_range_max', '_get_mask_red',
+                     '_get_mask_green', '_get_mask_blue', '_get_mask_alpha']:
+            patcher = patch.object(GwyChannel, name, return_value=None)
+            self.addCleanup(patcher.stop)
+            self.getters[name] = patcher.start()
+        self.getters['_get_title'].return_value = 'Title'
+        self.getters['_get_data'].return_value = Mock(spec=GwyDataField)
+
+    def test_raise_ValueError_if_component_is_unknown(self):
+        """Raise ValueError if components contain unknown name"""
+        self.assertRaises(ValueError,
+                          GwyChannel.from_gwy,
+                          self.gwyfile,
+                          self.channel_id,
+                          components=('data', 'graphs'))
+
+    def test_read_only_data(self):
+        """Skip mask, presentation and selections"""
+        channel = GwyChannel.from_gwy(self.gwyfile, self.channel_id,
+                                      components=('data',))
+        for name in ['_get_mask', '_get_show', '_get_point_sel',
+                     '_get_pointer_sel', '_get_line_sel',
+                     '_get_rectangle_sel', '_get_ellipse_sel']:
+            self.getters[name].assert_not_called()
+        self.getters['_get_data'].assert_has_calls(
+            [call(self.gwyfile, self.channel_id, copy=True)])
+        self.assertEqual(channel.title, 'Title')
+        self.assertIsNone(channel.mask)
+        self.assertIsNone(channel.show)
+
+    def test_skip_data(self):
+        """Channel data is None if data is not in components"""
+        channel = GwyChannel.from_gwy(self.gwyfile, self.channel_id,
+                                      components=['mask', 'selections'])
+        self.getters['_get_data'].assert_not_called()
+        self.getters['_get_mask'].assert_has_calls(
+            [call(self.gwyfile, self.channel_id, copy=True)])
+        self.getters['_get_point_sel'].assert_has_calls(
+            [call(self.gwyfile, self.channel_id)])
+        self.getters['_get_show'].assert_not_called()
+        self.assertIsNone(channel.data)
+
+    def test_zero_copy_datafields(self):
+        """Pass copy arg to datafield getters"""
+        GwyChannel.from_gwy(self.gwyfile, self.channel_id, copy=False)
+        for name in ['_get_data', '_get_mask', '_get_show']:
+            self.getters[name].assert_has_calls(
+                [call(self.gwyfile, self.channel_id, copy=False)])
+
+
+class Func_check_components(unittest.TestCase):
+    """Test check_components function"""
+
+    def test_return_all_components_if_arg_is_None(self):
+        """Return all allowed components if components is None"""
+        self.assertEqual(check_components(None, CHANNEL_COMPONENTS),
+                         frozenset(CHANNEL_COMPONENTS))
+
+    def test_accept_single_component_name(self):
+        """Single string is a name of one component"""
+        self.assertEqual(check_components('mask', CHANNEL_COMPONENTS),
+                         frozenset(['mask']))
+
+    def test_raise_ValueError_if_component_is_unknown(self):
+        """Raise ValueError if components contain unknown name"""
+        self.assertRaises(ValueError,
+                          check_components,
+                          ['data', 'title'],
+                          CHANNEL_COMPONENTS)
+
+
+class GwyChannel_nbytes(unittest.TestCase):
+    """Test nbytes method of GwyChannel class"""
+
+    def test_nbytes_by_component(self):
+        """Sizes of data, mask, presentation and all selections"""
+        point_sel = GwyPointSelection([(0., 0.)])
+        line_sel = GwyLineSelection([((0., 0.), (1., 1.))])
+        channel = GwyChannel('Topo',
+                             GwyDataField(np.zeros((4, 8))),
+                             show=GwyDataField(np.zeros((2, 2))),
+                             point_sel=point_sel,
+                             line_sel=line_sel)
+        self.assertDictEqual(channel.nbytes(),
+                             {'data': 256,
+                              'mask': 0,
+                              'show': 32,
+                              'selections': (point_sel.nbytes() +
+                                             line_sel.nbytes())})
+
+
 class GwyChannel_to_gwy(unittest.TestCase):
     """ Tests for to_gwy method of GwyChannel class"""
     def setUp(self):
@@ -2169,7 +2317,7 @@ class GwyChannel_to_gwy(unittest.TestCase):
         """ Add data item to GwyContainer"""
         self.channel.to_gwy(self.channel, self.gwycontainer, self.channel_id)
         self.channel._add_data_to_gwy.assert_has_calls(
-            [call(self.gwycontainer, self.channel_id)])
+            [call(self.gwycontainer, self.channel_id, None)])
 
     def test_add_visibility_to_gwy(self):
         """ Add visible item to GwyContainer"""
@@ -2205,7 +2353,7 @@ class GwyChannel_to_gwy(unittest.TestCase):
         """ Add mask datafield item to GwyContainer"""
         self.channel.to_gwy(self.channel, self.gwycontainer, self.channel_id)
         self.channel._add_mask_to_gwy.assert_has_calls(
-            [call(self.gwycontainer, self.channel_id)])
+            [call(self.gwycontainer, self.channel_id, None)])
 
     def test_add_mask_red_to_gwy(self):
         """ Add red component of the mask to GwyContainer"""
@@ -2235,37 +2383,37 @@ class GwyChannel_to_gwy(unittest.TestCase):
         """ Add presentation datafield to GwyContainer"""
         self.channel.to_gwy(self.channel, self.gwycontainer, self.channel_id)
         self.channel._add_show_to_gwy.assert_has_calls(
-            [call(self.gwycontainer, self.channel_id)])
+            [call(self.gwycontainer, self.channel_id, None)])
 
     def test_add_point_sel_to_gwy(self):
         """ Add point selection item to GwyContainer"""
         self.channel.to_gwy(self.channel, self.gwycontainer, self.channel_id)
         self.channel._add_point_sel_to_gwy.assert_has_calls(
-            [call(self.gwycontainer, self.channel_id)])
+            [call(self.gwycontainer, self.channel_id, None)])
 
     def test_add_pointer_sel_to_gwy(self):
         """ Add pointer selection item to GwyContainer"""
         self.channel.to_gwy(self.channel, self.gwycontainer, self.channel_id)
         self.channel._add_pointer_sel_to_gwy.assert_has_calls(
-            [call(self.gwycontainer, self.channel_id)])
+            [call(self.gwycontainer, self.channel_id, None)])
 
     def test_add_line_sel_to_gwy(self):
         """ Add line selection item to GwyContainer"""
         self.channel.to_gwy(self.channel, self.gwycontainer, self.channel_id)
         self.channel._add_line_sel_to_gwy.assert_has_calls(
-            [call(self.gwycontainer, self.channel_id)])
+            [call(self.gwycontainer, self.channel_id, None)])
 
     def test_add_rectangle_sel_to_gwy(self):
         """ Add rectangle selection item to GwyContainer"""
         self.channel.to_gwy(self.channel, self.gwycontainer, self.channel_id)
         self.channel._add_rectangle_sel_to_gwy.assert_has_calls(
-            [call(self.gwycontainer, self.channel_id)])
+            [call(self.gwycontainer, self.channel_id, None)])
 
     def test_add_ellipse_sel_to_gwy(self):
         """ Add ellipse selection item to GwyContainer"""
         self.channel.to_gwy(self.channel, self.gwycontainer, self.channel_id)
         self.channel._add_ellipse_sel_to_gwy.assert_has_calls(
-            [call(self.gwycontainer, self.channel_id)])
+            [call(self.gwycontainer, self.channel_id, None)])
 
 
 if __name__ == '__main__':
@@ -0,0 +1,136 @@
+import gzip
+import io
+import os
+import unittest
+from unittest.mock import patch
+
+from pygwyfile import gwycompress
+from pygwyfile.gwycompress import detect_compression, get_compression
+from pygwyfile.gwycompress import peek_magic
+from pygwyfile.gwycompress import read_decompressed, write_compressed
+
+
+def _read_all(fd):
+    """Read data from fd without closing it"""
+    with os.fdopen(os.dup(fd), 'rb') as fileobj:
+        return fileobj.read()
+
+
+class _NonSeekable(io.RawIOBase):
+    """Non-seekable raw stream without peek method"""
+
+    def __init__(self, data):
+        self._fileobj = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        return self._fileobj.readinto(buffer)
+
+
+class Func_detect_compression(unittest.TestCase):
+    """Test detect_compression and get_compression functions"""
+
+    def test_detect_by_magic(self):
+        """Detect gzip and zstd magic headers"""
+        self.assertEqual(detect_compression(gzip.compress(b"GWYP")),
+                         'gzip')
+        self.assertEqual(detect_compression(b"\x28\xb5\x2f\xfd"), 'zstd')
+        self.assertIsNone(detect_compression(b"GWYP"))
+        self.assertIsNone(detect_compression(b""))
+
+    def test_detect_by_extension(self):
+        """Get compression by extension of file name"""
+        self.assertEqual(get_compression('scan.gwy.gz'), 'gzip')
+        self.assertEqual(get_compression('scan.gwy.ZST'), 'zstd')
+        self.assertIsNone(get_compression('scan.gwy'))
+
+
+class Func_peek_magic(unittest.TestCase):
+    """Test peek_magic function"""
+
+    def test_seekable_fileobj(self):
+        """Return magic and fileobj at its initial position"""
+        fileobj = io.BytesIO(b"GWYPdata")
+        magic, stream = peek_magic(fileobj)
+        self.assertEqual(magic, b"GWYP")
+        self.assertIs(stream, fileobj)
+        self.assertEqual(stream.read(), b"GWYPdata")
+
+    def test_non_seekable_fileobj(self):
+        """Return stream reading magic and the rest of fileobj"""
+        magic, stream = peek_magic(_NonSeekable(b"GWYPdata"))
+        self.assertEqual(magic, b"GWYP")
+        self.assertEqual(stream.read(), b"GWYPdata")
+
+
+class Func_read_write_compressed(unittest.TestCase):
+    """Test read_decompressed and write_compressed functions"""
+
+    def setUp(self):
+        self.data = os.urandom(3 * 2**20 + 17)
+
+    def test_write_gzip(self):
+        """Compress data written to fd by the callback"""
+        fileobj = io.BytesIO()
+        write_compressed(fileobj, 'gzip', 1,
+                         lambda fd: os.write(fd, self.data[:2**16]))
+        self.assertEqual(gzip.decompress(fileobj.getvalue()),
+                         self.data[:2**16])
+        self.assertFalse(fileobj.closed)
+
+    def test_read_gzip(self):
+        """Pass decompressed data to the callback"""
+        fileobj = io.BytesIO(gzip.compress(self.data))
+        self.assertEqual(read_decompressed(fileobj, 'gzip', _read_all),
+                         self.data)
+
+    def test_read_part_of_data(self):
+        """Do not block if the callback stops reading"""
+        fileobj = io.BytesIO(gzip.compress(self.data))
+        self.assertEqual(
+            read_decompressed(fileobj, 'gzip', lambda fd: os.read(fd, 4)),
+            self.data[:4])
+
+    def test_raise_error_of_decompression(self):
+        """Raise exception of decompression of corrupted data"""
+        fileobj = io.BytesIO(gzip.compress(self.data)[:-8])
+        self.assertRaises(EOFError,
+                          read_decompressed, fileobj, 'gzip', _read_all)
+
+    def test_raise_error_of_writer(self):
+        """Raise exception of the callback"""
+        def write_fd(fd):
+            raise OSError("Cannot write")
+
+        self.assertRaises(OSError,
+                          write_compressed, io.BytesIO(), 'gzip', None,
+                          write_fd)
+
+    def test_raise_ValueError_if_compression_is_unknown(self):
+        """Raise ValueError if compression is not supported"""
+        self.assertRaises(ValueError,
+                          read_decompressed, io.BytesIO(), 'lzma', _read_all)
+
+    @patch.object(gwycompress, 'zstandard', None)
+    def test_raise_ImportError_if_zstandard_is_missing(self):
+        """Raise ImportError if zstd is used without zstandard"""
+        self.assertRaises(ImportError,
+                          write_compressed, io.BytesIO(), 'zstd', None,
+                          _read_all)
+
+    @unittest.skipIf(gwycompress.zstandard is None,
+                     "zstandard is not installed")
+    def test_zstd_round_trip(self):
+        """Compress and decompress data by zstd"""
+        fileobj = io.BytesIO()
+        write_compressed(fileobj, 'zstd', None,
+                         lambda fd: os.write(fd, self.data[:2**16]))
+        fileobj.seek(0)
+        self.assertEqual(read_decompressed(fileobj, 'zstd', _read_all),
+                         self.data[:2**16])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,26 @@
+import asyncio
+import gzip
+import io
+import os
+import shutil
+import tempfile
 import unittest
 from unittest.mock import patch, call, Mock
 
+import numpy as np
+
 from pygwyfile._libgwyfile import ffi
 from pygwyfile.gwyfile import Gwyfile
+from pygwyfile.gwybrick import GwyBrick
 from pygwyfile.gwycontainer import GwyContainer, read_gwyfile
+from pygwyfile.gwycontainer import aread_gwyfile
 from pygwyfile.gwychannel import GwyChannel, GwyDataField
+from pygwyfile.gwychannel import CHANNEL_COMPONENTS
 from pygwyfile.gwygraph import GwyGraphModel
+from pygwyfile.gwygraphcurve import GwyGraphCurve
+from pygwyfile.gwylazy import GwyLazySequence
+from pygwyfile.gwyspectra import GwySpectra
+from pygwyfile.gwysurface import GwySurface
 
 
 class GwyContainer_get_channel_ids_TestCase(unittest.TestCase):
@@ -30,6 +45,7 @@ class GwyContainer_get_channel_ids_TestCase(unittest.TestCase):
         enum_chs.side_effect = self._side_effect_non_zero_channels
         ids = GwyContainer._get_channel_ids(self.gwyfile)
         self.assertEqual(ids, [0, 1, 2])
+        self.assertEqual(self.mock_lib.free.call_count, 1)
 
     def _side_effect_non_zero_channels(self, c_gwyfile, nchannelsp):
         """
@@ -73,6 +89,7 @@ class GwyContainer_get_graph_ids_TestCase(unittest.TestCase):
             self._side_effect_non_zero_graphs)
         ids = GwyContainer._get_graph_ids(self.gwyfile)
         self.assertEqual(ids, [1, 2])
+        self.assertEqual(self.mock_lib.free.call_count, 1)
 
     def _side_effect_non_zero_graphs(self, c_gwyfile, ngraphsp):
         """
@@ -125,6 +142,57 @@ class GwyContainer_dump_channels(unittest.TestCase):
                               for channel_id in channel_ids])
 
 
+class GwyContainer_select_channel_ids(unittest.TestCase):
+    """Test _select_channel_ids method of GwyContainer class
+    """
+
+    def setUp(self):
+        self.gwyfile = Mock(spec=Gwyfile)
+
+        patcher_channel_ids = patch.object(GwyContainer, '_get_channel_ids')
+        self.addCleanup(patcher_channel_ids.stop)
+        self.mock_get_channel_ids = patcher_channel_ids.start()
+        self.mock_get_channel_ids.return_value = [0, 1, 2]
+
+        patcher_title = patch.object(GwyChannel, '_get_title')
+        self.addCleanup(patcher_title.stop)
+        self.mock_get_title = patcher_title.start()
+        titles = {0: 'Topography', 1: 'Phase', 2: 'Amplitude'}
+        self.mock_get_title.side_effect = (
+            lambda gwyfile, channel_id: titles[channel_id])
+
+    def test_return_all_channel_ids_if_channels_is_None(self):
+        """Return all channel ids if channels arg is None"""
+        ids = GwyContainer._select_channel_ids(self.gwyfile)
+        self.assertEqual(ids, [0, 1, 2])
+        self.mock_get_title.assert_not_called()
+
+    def test_select_channels_by_ids(self):
+        """Select channels by ids without reading titles"""
+        ids = GwyContainer._select_channel_ids(self.gwyfile, [2, 0, 5])
+        self.assertEqual(ids, [0, 2])
+        self.mock_get_title.assert_not_called()
+
+    def test_select_channels_by_titles(self):
+        """Select channels by titles"""
+        ids = GwyContainer._select_channel_ids(self.gwyfile,
+                                               ['Amplitude', 'Phase'])
+        self.assertEqual(ids, [1, 2])
+
+    def test_select_channels_by_ids_and_titles(self):
+        """Select channels by ids and titles"""
+        ids = GwyContainer._select_channel_ids(self.gwyfile,
+                                               [0, 'Amplitude'])
+        self.assertEqual(ids, [0, 2])
+
+    def test_select_single_channel(self):
+        """Single id or title is accepted"""
+        self.assertEqual(
+            GwyContainer._select_channel_ids(self.gwyfile, 1), [1])
+        self.assertEqual(
+            GwyContainer._select_channel_ids(self.gwyfile, 'Phase'), [1])
+
+
 class GwyContainer_dump_graphs(unittest.TestCase):
     """Test _dump_graphs method of GwyContainer class
     """
@@ -191,32 +259,294 @@ class GwyContainer_from_gwy(unittest.TestCase):
 
     @patch('pygwyfile.gwycontainer.GwyContainer', autospec=True)
     @patch.object(GwyContainer, '_get_filename')
+    @patch.object(GwyContainer, '_dump_spectra')
+    @patch.object(GwyContainer, '_dump_surfaces')
+    @patch.object(GwyContainer, '_dump_volumes')
     @patch.object(GwyContainer, '_dump_graphs')
     @patch.object(GwyContainer, '_dump_channels')
     def test_from_gwy_method_of_GwyContainer(self,
                                              mock_dump_channels,
                                              mock_dump_graphs,
+                                             mock_dump_volumes,
+                                             mock_dump_surfaces,
+                                             mock_dump_spectra,
                                              mock_get_filename,
                                              mock_GwyContainer):
         gwyfile = Mock(spec=Gwyfile)
         channels = [Mock(spec=GwyChannel), Mock(spec=GwyChannel)]
         graphs = [Mock(spec=GwyGraphModel)]
+        volumes = [Mock(spec=GwyBrick)]
+        surfaces = [Mock(spec=GwySurface)]
+        spectra = [Mock(spec=GwySpectra)]
         filename = 'sample.gwy'
         mock_get_filename.return_value = filename
         mock_dump_channels.return_value = channels
         mock_dump_graphs.return_value = graphs
+        mock_dump_volumes.return_value = volumes
+        mock_dump_surfaces.return_value = surfaces
+        mock_dump_spectra.return_value = spectra
         mock_GwyContainer.return_value = Mock(spec=GwyContainer)
         container = GwyContainer.from_gwy(gwyfile)
         mock_get_filename.assert_has_calls(
             [call(gwyfile)])
         mock_dump_channels.assert_has_calls(
-            [call(gwyfile)])
+            [call(gwyfile,
+                  channels=None,
+                  components=frozenset(CHANNEL_COMPONENTS),
+                  copy=True)])
         mock_dump_graphs.assert_has_calls(
-            [call(gwyfile)])
+            [call(gwyfile, copy=True)])
+        mock_dump_volumes.assert_has_calls(
+            [call(gwyfile, copy=True)])
+        mock_dump_surfaces.assert_has_calls(
+            [call(gwyfile, copy=True)])
+        mock_dump_spectra.assert_has_calls(
+            [call(gwyfile, copy=True)])
         mock_GwyContainer.assert_has_calls(
-            [call(filename=filename, channels=channels, graphs=graphs)])
+            [call(filename=filename, channels=channels, graphs=graphs,
+                  volumes=volumes, surfaces=surfaces, spectra=spectra)])
         self.assertEqual(container, mock_GwyContainer.return_value)
 
+    def test_raise_ValueError_if_component_is_unknown(self):
+        """Raise ValueError if components contain unknown name"""
+        gwyfile = Mock(spec=Gwyfile)
+        self.assertRaises(ValueError,
+                          GwyContainer.from_gwy,
+                          gwyfile,
+                          components=('data', 'curves'))
+
+    @patch.object(GwyContainer, '_get_filename')
+    @patch.object(GwyContainer, '_dump_spectra')
+    @patch.object(GwyContainer, '_dump_surfaces')
+    @patch.object(GwyContainer, '_dump_volumes')
+    @patch.object(GwyContainer, '_dump_graphs')
+    @patch.object(GwyContainer, '_dump_channels')
+    def test_read_selected_channels_and_components(self,
+                                                   mock_dump_channels,
+                                                   mock_dump_graphs,
+                                                   mock_dump_volumes,
+                                                   mock_dump_surfaces,
+                                                   mock_dump_spectra,
+                                                   mock_get_filename):
+        """Pass channels and channel components to _dump_channels
+           and skip other parts if they are not in components
+        """
+        gwyfile = Mock(spec=Gwyfile)
+        mock_get_filename.return_value = 'sample.gwy'
+        mock_dump_channels.return_value = [Mock(spec=GwyChannel)]
+        container = GwyContainer.from_gwy(gwyfile,
+                                          channels=['Phase'],
+                                          components=('data', 'mask'))
+        mock_dump_channels.assert_has_calls(
+            [call(gwyfile,
+                  channels=['Phase'],
+                  components=frozenset(('data', 'mask')),
+                  copy=True)])
+        mock_dump_graphs.assert_not_called()
+        mock_dump_volumes.assert_not_called()
+        mock_dump_surfaces.assert_not_called()
+        mock_dump_spectra.assert_not_called()
+        self.assertEqual(container.graphs, [])
+        self.assertEqual(container.volumes, [])
+        self.assertEqual(container.surfaces, [])
+        self.assertEqual(container.spectra, [])
+
+
+class GwyContainer_from_gwy_lazy(unittest.TestCase):
+    """Test from_gwy method of GwyContainer with lazy=True
+    """
+
+    def setUp(self):
+        self.gwyfile = Mock(spec=Gwyfile)
+
+        patcher_channel_ids = patch.object(GwyContainer, '_get_channel_ids')
+        self.addCleanup(patcher_channel_ids.stop)
+        self.mock_get_channel_ids = patcher_channel_ids.start()
+        self.mock_get_channel_ids.return_value = [0, 1, 2]
+
+        patcher_graph_ids = patch.object(GwyContainer, '_get_graph_ids')
+        self.addCleanup(patcher_graph_ids.stop)
+        self.mock_get_graph_ids = patcher_graph_ids.start()
+        self.mock_get_graph_ids.return_value = [1, 2]
+
+        patcher_volume_ids = patch.object(GwyContainer, '_get_volume_ids')
+        self.addCleanup(patcher_volume_ids.stop)
+        self.mock_get_volume_ids = patcher_volume_ids.start()
+        self.mock_get_volume_ids.return_value = [0]
+
+        patcher_surface_ids = patch.object(GwyContainer, '_get_surface_ids')
+        self.addCleanup(patcher_surface_ids.stop)
+        self.mock_get_surface_ids = patcher_surface_ids.start()
+        self.mock_get_surface_ids.return_value = [0, 3]
+
+        patcher_spectra_ids = patch.object(GwyContainer, '_get_spectra_ids')
+        self.addCleanup(patcher_spectra_ids.stop)
+        self.mock_get_spectra_ids = patcher_spectra_ids.start()
+        self.mock_get_spectra_ids.return_value = [1]
+
+        patcher_filename = patch.object(GwyContainer, '_get_filename')
+        self.addCleanup(patcher_filename.stop)
+        self.mock_get_filename = patcher_filename.start()
+        self.mock_get_filename.return_value = 'sample.gwy'
+
+        patcher_channel = patch.object(GwyChannel, 'from_gwy')
+        self.addCleanup(patcher_channel.stop)
+        self.mock_channel_from_gwy = patcher_channel.start()
+
+        patcher_graph = patch.object(GwyContainer, '_get_graph')
+        self.addCleanup(patcher_graph.stop)
+        self.mock_get_graph = patcher_graph.start()
+
+        patcher_volume = patch.object(GwyContainer, '_get_volume')
+        self.addCleanup(patcher_volume.stop)
+        self.mock_get_volume = patcher_volume.start()
+
+        patcher_surface = patch.object(GwyContainer, '_get_surface')
+        self.addCleanup(patcher_surface.stop)
+        self.mock_get_surface = patcher_surface.start()
+
+        patcher_spectra = patch.object(GwyContainer, '_get_spectra')
+        self.addCleanup(patcher_spectra.stop)
+        self.mock_get_spectra = patcher_spectra.start()
+
+    def test_channels_and_graphs_are_lazy_sequences(self):
+        """All parts are GwyLazySequence instances"""
+        container = GwyContainer.from_gwy(self.gwyfile, lazy=True)
+        self.assertEqual(container.filename, 'sample.gwy')
+        self.assertIsInstance(container.channels, GwyLazySequence)
+        self.assertIsInstance(container.graphs, GwyLazySequence)
+        self.assertIsInstance(container.volumes, GwyLazySequence)
+        self.assertIsInstance(container.surfaces, GwyLazySequence)
+        self.assertIsInstance(container.spectra, GwyLazySequence)
+        self.assertEqual(len(container.channels), 3)
+        self.assertEqual(len(container.graphs), 2)
+        self.assertEqual(len(container.volumes), 1)
+        self.assertEqual(len(container.surfaces), 2)
+        self.assertEqual(len(container.spectra), 1)
+
+    def test_nothing_is_decoded_before_access(self):
+        """Nothing is decoded until it is accessed"""
+        GwyContainer.from_gwy(self.gwyfile, lazy=True)
+        self.mock_channel_from_gwy.assert_not_called()
+        self.mock_get_graph.assert_not_called()
+        self.mock_get_volume.assert_not_called()
+        self.mock_get_surface.assert_not_called()
+        self.mock_get_spectra.assert_not_called()
+
+    def test_decode_only_accessed_channel(self):
+        """Decode only the channel which is accessed"""
+        container = GwyContainer.from_gwy(self.gwyfile, lazy=True)
+        channel = container.channels[1]
+        self.mock_channel_from_gwy.assert_has_calls(
+            [call(self.gwyfile, 1,
+                  components=frozenset(CHANNEL_COMPONENTS),
+                  copy=True)])
+        self.assertEqual(self.mock_channel_from_gwy.call_count, 1)
+        self.assertEqual(channel, self.mock_channel_from_gwy.return_value)
+
+    def test_decode_only_accessed_graph(self):
+        """Decode only the graph which is accessed"""
+        container = GwyContainer.from_gwy(self.gwyfile, lazy=True)
+        graph = container.graphs[-1]
+        self.mock_get_graph.assert_has_calls(
+            [call(self.gwyfile, 2, copy=True)])
+        self.assertEqual(self.mock_get_graph.call_count, 1)
+        self.assertEqual(graph, self.mock_get_graph.return_value)
+
+    def test_decode_accessed_volume_without_copy(self):
+        """Decode only the accessed volume, pass copy to _get_volume"""
+        container = GwyContainer.from_gwy(self.gwyfile, lazy=True,
+                                          copy=False)
+        volume = container.volumes[0]
+        self.mock_get_volume.assert_has_calls(
+            [call(self.gwyfile, 0, copy=False)])
+        self.assertEqual(volume, self.mock_get_volume.return_value)
+
+    def test_decode_accessed_surface_without_copy(self):
+        """Decode only the accessed surface, pass copy to _get_surface"""
+        container = GwyContainer.from_gwy(self.gwyfile, lazy=True,
+                                          copy=False)
+        surface = container.surfaces[1]
+        self.mock_get_surface.assert_has_calls(
+            [call(self.gwyfile, 3, copy=False)])
+        self.assertEqual(self.mock_get_surface.call_count, 1)
+        self.assertEqual(surface, self.mock_get_surface.return_value)
+
+    def test_decode_accessed_spectra_without_copy(self):
+        """Decode only the accessed spectra, pass copy to _get_spectra"""
+        container = GwyContainer.from_gwy(self.gwyfile, lazy=True,
+                                          copy=False)
+        spectra = container.spectra[0]
+        self.mock_get_spectra.assert_has_calls(
+            [call(self.gwyfile, 1, copy=False)])
+        self.assertEqual(spectra, self.mock_get_spectra.return_value)
+
+    def test_channels_and_graphs_share_cache(self):
+        """All parts share one byte budget"""
+        container = GwyContainer.from_gwy(self.gwyfile, lazy=True,
+                                          cache_size=1024)
+        self.assertIs(container.channels._cache, container.graphs._cache)
+        self.assertIs(container.channels._cache, container.volumes._cache)
+        self.assertIs(container.channels._cache, container.surfaces._cache)
+        self.assertIs(container.channels._cache, container.spectra._cache)
+        self.assertEqual(container.channels._cache.max_bytes, 1024)
+
+    def test_lazy_container_with_selected_channels_and_components(self):
+        """Decode only selected channels and components"""
+        container = GwyContainer.from_gwy(self.gwyfile, lazy=True,
+                                          channels=[0, 2],
+                                          components=('data',))
+        self.assertEqual(container.channels.keys, [0, 2])
+        self.assertEqual(len(container.graphs), 0)
+        self.assertEqual(len(container.volumes), 0)
+        self.assertEqual(len(container.surfaces), 0)
+        self.assertEqual(len(container.spectra), 0)
+        self.mock_get_graph_ids.assert_not_called()
+        self.mock_get_volume_ids.assert_not_called()
+        self.mock_get_surface_ids.assert_not_called()
+        self.mock_get_spectra_ids.assert_not_called()
+        container.channels[1]
+        self.mock_channel_from_gwy.assert_has_calls(
+            [call(self.gwyfile, 2, components=frozenset(('data',)),
+                  copy=True)])
+
+
+class GwyContainer_get_graph(unittest.TestCase):
+    """Test _get_graph method of GwyContainer class
+    """
+
+    def setUp(self):
+        self.gwyfile = Mock(spec=Gwyfile)
+        self.graph_id = 1
+
+    @patch.object(GwyGraphModel, 'from_gwy')
+    def test_getting_gwygraphmodel_object(self, mock_from_gwy):
+        """Get <GwyGraphModel*> object and its visibility flag"""
+        GwyContainer._get_graph(self.gwyfile, self.graph_id)
+        self.gwyfile.get_gwyitem_object.assert_has_calls(
+            [call("/0/graph/graph/1")])
+        self.gwyfile.get_gwyitem_bool.assert_has_calls(
+            [call("/0/graph/graph/1/visible")])
+        mock_from_gwy.assert_has_calls(
+            [call(self.gwyfile.get_gwyitem_object.return_value,
+                  owner=None)])
+
+    @patch.object(GwyGraphModel, 'from_gwy')
+    def test_pass_gwyfile_as_owner_without_copy(self, mock_from_gwy):
+        """Curves view the data of gwyfile if copy is False"""
+        GwyContainer._get_graph(self.gwyfile, self.graph_id, copy=False)
+        mock_from_gwy.assert_has_calls(
+            [call(self.gwyfile.get_gwyitem_object.return_value,
+                  owner=self.gwyfile)])
+
+    @patch.object(GwyGraphModel, 'from_gwy')
+    def test_returned_value(self, mock_from_gwy):
+        """Return GwyGraphModel with visibility flag"""
+        self.gwyfile.get_gwyitem_bool.return_value = True
+        graph = GwyContainer._get_graph(self.gwyfile, self.graph_id)
+        self.assertIs(graph, mock_from_gwy.return_value)
+        self.assertTrue(graph.visible)
+
 
 class GwyContainer_init(unittest.TestCase):
     """Test constructor of GwyContainer
@@ -229,6 +559,27 @@ class GwyContainer_init(unittest.TestCase):
                           GwyContainer,
                           channels=[Mock(GwyDataField)])
 
+    def test_raise_TypeError_if_volumes_is_not_list_of_GwyBrick(self):
+        """Raise TypeError if volumes is not list of GwyBrick instances
+        """
+        self.assertRaises(TypeError,
+                          GwyContainer,
+                          volumes=[Mock(GwyDataField)])
+
+    def test_raise_TypeError_if_surfaces_is_not_list_of_GwySurface(self):
+        """Raise TypeError if surfaces is not list of GwySurface instances
+        """
+        self.assertRaises(TypeError,
+                          GwyContainer,
+                          surfaces=[Mock(GwyBrick)])
+
+    def test_raise_TypeError_if_spectra_is_not_list_of_GwySpectra(self):
+        """Raise TypeError if spectra is not list of GwySpectra instances
+        """
+        self.assertRaises(TypeError,
+                          GwyContainer,
+                          spectra=[Mock(GwySurface)])
+
     def test_raise_TypeError_if_graphs_is_not_list_of_GwyGraphModel(self):
         """Raise TypeError if channels is not list of GwyGraphModel instances
         """
@@ -313,7 +664,7 @@ class GwyContainer_to_gwyfile(unittest.TestCase):
         """ Create gwycontainer (GwyfileObject*) from this container"""
         self.gwycontainer.to_gwyfile(self.gwycontainer, self.filename)
         self.gwycontainer.to_gwy.assert_has_calls(
-            [call()])
+            [call(borrow=True)])
 
     @patch('pygwyfile.gwycontainer.os.path', autospec=True)
     @patch('pygwyfile.gwycontainer.Gwyfile', autospec=True)
@@ -395,6 +746,386 @@ class GwyContainer_to_gwyfile(unittest.TestCase):
                   self.filename)])
 
 
+class GwyContainer_to_bytes(unittest.TestCase):
+    """Tests for GwyContainer.to_bytes and to_fileobj methods"""
+
+    def setUp(self):
+        self.gwycontainer = Mock(spec=GwyContainer)
+        self.gwycontainer.to_gwy = Mock(autospec=True)
+        self.gwycontainer.to_bytes = GwyContainer.to_bytes
+        self.gwycontainer.to_fileobj = GwyContainer.to_fileobj
+
+    @patch('pygwyfile.gwycontainer.write_gwycontainer_to_bytes',
+           autospec=True)
+    def test_to_bytes(self, mock_write_gwy):
+        """Serialize gwycontainer created from this container"""
+        data = self.gwycontainer.to_bytes(self.gwycontainer)
+        mock_write_gwy.assert_has_calls(
+            [call(self.gwycontainer.to_gwy.return_value)])
+        self.assertIs(data, mock_write_gwy.return_value)
+
+    @patch('pygwyfile.gwycontainer.write_gwycontainer_to_fileobj',
+           autospec=True)
+    def test_to_fileobj(self, mock_write_gwy):
+        """Write gwycontainer created from this container to fileobj"""
+        fileobj = Mock()
+        self.gwycontainer.to_fileobj(self.gwycontainer, fileobj)
+        mock_write_gwy.assert_has_calls(
+            [call(self.gwycontainer.to_gwy.return_value, fileobj)])
+
+
+class GwyContainer_async_methods(unittest.TestCase):
+    """Tests for ato_gwyfile and ato_bytes methods of GwyContainer"""
+
+    def setUp(self):
+        self.gwycontainer = Mock(spec=GwyContainer)
+        self.gwycontainer.ato_gwyfile = GwyContainer.ato_gwyfile
+        self.gwycontainer.ato_bytes = GwyContainer.ato_bytes
+
+    @patch('pygwyfile.gwycontainer.run_blocking')
+    def test_ato_gwyfile(self, mock_run_blocking):
+        """Run to_gwyfile method with run_blocking"""
+        asyncio.run(self.gwycontainer.ato_gwyfile(self.gwycontainer,
+                                                  'filename.gwy'))
+        mock_run_blocking.assert_has_calls(
+            [call(self.gwycontainer.to_gwyfile, 'filename.gwy',
+                  None, None)])
+
+    @patch('pygwyfile.gwycontainer.run_blocking')
+    def test_ato_bytes(self, mock_run_blocking):
+        """Run to_bytes method with run_blocking and return its value"""
+        data = asyncio.run(self.gwycontainer.ato_bytes(self.gwycontainer))
+        mock_run_blocking.assert_has_calls(
+            [call(self.gwycontainer.to_bytes)])
+        self.assertIs(data, mock_run_blocking.return_value)
+
+
+class GwyContainer_nbytes(unittest.TestCase):
+    """Test nbytes and serialized_size methods of GwyContainer"""
+
+    def setUp(self):
+        data = GwyDataField(np.zeros((4, 8)))
+        curve = GwyGraphCurve(np.zeros((2, 10)))
+        self.container = GwyContainer(
+            channels=[GwyChannel('Topo', data, mask=data),
+                      GwyChannel('Phase', data)],
+            graphs=[GwyGraphModel([curve, curve])])
+
+    def test_nbytes(self):
+        """Sizes of components of all channels and graphs"""
+        self.assertDictEqual(self.container.nbytes(),
+                             {'data': 512,
+                              'mask': 256,
+                              'show': 0,
+                              'selections': 0,
+                              'graphs': 320,
+                              'volumes': 0,
+                              'surfaces': 0,
+                              'spectra': 0})
+
+    def test_nbytes_of_lazy_container(self):
+        """Only decoded channels and graphs are counted"""
+        gwyfile = Gwyfile.from_bytes(self.container.to_bytes())
+        container = GwyContainer.from_gwy(gwyfile, lazy=True)
+        self.assertEqual(sum(container.nbytes().values()), 0)
+        container.channels[0]
+        self.assertDictEqual(container.nbytes(),
+                             {'data': 256,
+                              'mask': 256,
+                              'show': 0,
+                              'selections': 0,
+                              'graphs': 0,
+                              'volumes': 0,
+                              'surfaces': 0,
+                              'spectra': 0})
+
+    def test_serialized_size(self):
+        """Return length of serialized container"""
+        self.assertEqual(self.container.serialized_size(),
+                         len(self.container.to_bytes()))
+
+
+class GwyContainer_volumes(unittest.TestCase):
+    """Test reading and writing of volume data"""
+
+    def setUp(self):
+        self.data = np.random.rand(4, 3, 2)
+        self.volume = GwyBrick(self.data,
+                               meta={'zreal': 2., 'si_unit_w': 'A'},
+                               title='Spectra')
+        self.container = GwyContainer(volumes=[self.volume,
+                                               GwyBrick(self.data[:1])])
+
+    def test_get_volume_ids(self):
+        """Return sorted ids of /brick/N objects"""
+        gwyfile = Gwyfile.from_bytes(self.container.to_bytes())
+        self.assertEqual(GwyContainer._get_volume_ids(gwyfile), [0, 1])
+
+    def test_round_trip(self):
+        """Read the same data, metadata and titles as written"""
+        container = read_gwyfile(self.container.to_bytes())
+        self.assertEqual(len(container.volumes), 2)
+        volume = container.volumes[0]
+        np.testing.assert_equal(volume.data, self.data)
+        self.assertDictEqual(volume.meta, self.volume.meta)
+        self.assertEqual(volume.title, 'Spectra')
+        self.assertIsNone(container.volumes[1].title)
+
+    def test_read_volumes_without_copy(self):
+        """Volumes are read-only views if copy is False"""
+        container = read_gwyfile(self.container.to_bytes(), copy=False)
+        data = container.volumes[0].data
+        self.assertFalse(data.flags.writeable)
+        np.testing.assert_equal(data, self.data)
+
+    def test_skip_volumes(self):
+        """Volumes are not read if they are not in components"""
+        container = read_gwyfile(self.container.to_bytes(),
+                                 components=('data', 'graphs'))
+        self.assertEqual(container.volumes, [])
+
+    def test_nbytes(self):
+        """Count size of volume data"""
+        self.assertEqual(self.container.nbytes()['volumes'],
+                         self.data.nbytes + self.data[:1].nbytes)
+
+
+class GwyContainer_surfaces(unittest.TestCase):
+    """Test reading and writing of XYZ data"""
+
+    def setUp(self):
+        self.data = np.random.rand(10, 3)
+        self.surface = GwySurface(self.data,
+                                  meta={'si_unit_xy': 'm'},
+                                  title='Profilometer')
+        self.container = GwyContainer(
+            channels=[GwyChannel('Topo', GwyDataField(np.zeros((2, 2))))],
+            surfaces=[self.surface, GwySurface(self.data[:2])])
+
+    def test_get_surface_ids(self):
+        """Return sorted ids of /xyz/N surface objects only"""
+        gwyfile = Gwyfile.from_bytes(self.container.to_bytes())
+        self.assertEqual(GwyContainer._get_surface_ids(gwyfile), [0, 1])
+
+    def test_round_trip(self):
+        """Read the same data, metadata and titles as written"""
+        container = read_gwyfile(self.container.to_bytes())
+        self.assertEqual(len(container.surfaces), 2)
+        surface = container.surfaces[0]
+        np.testing.assert_equal(surface.data, self.data)
+        self.assertDictEqual(surface.meta, self.surface.meta)
+        self.assertEqual(surface.title, 'Profilometer')
+        self.assertIsNone(container.surfaces[1].title)
+
+    def test_read_surfaces_without_copy(self):
+        """Surfaces are read-only views if copy is False"""
+        container = read_gwyfile(self.container.to_bytes(), copy=False)
+        data = container.surfaces[0].data
+        self.assertFalse(data.flags.writeable)
+        np.testing.assert_equal(data, self.data)
+
+    def test_skip_surfaces(self):
+        """Surfaces are not read if they are not in components"""
+        container = read_gwyfile(self.container.to_bytes(),
+                                 components=('data', 'volumes'))
+        self.assertEqual(container.surfaces, [])
+
+    def test_nbytes(self):
+        """Count size of surface data"""
+        self.assertEqual(self.container.nbytes()['surfaces'], 12 * 8 * 3)
+
+
+class GwyContainer_spectra(unittest.TestCase):
+    """Test reading and writing of point spectroscopy data"""
+
+    def setUp(self):
+        self.curves = [np.random.rand(5), np.random.rand(3)]
+        self.coords = np.random.rand(2, 2)
+        self.spectra = GwySpectra.from_curves(self.curves, self.coords,
+                                              meta={'si_unit_y': 'N'},
+                                              title='Force map')
+        self.container = GwyContainer(
+            spectra=[self.spectra,
+                     GwySpectra.from_curves(self.curves[:1],
+                                            self.coords[:1])])
+
+    def test_get_spectra_ids(self):
+        """Return ids of /sps/N objects"""
+        gwyfile = Gwyfile.from_bytes(self.container.to_bytes())
+        self.assertEqual(GwyContainer._get_spectra_ids(gwyfile), [0, 1])
+
+    def test_round_trip(self):
+        """Read the same values, coordinates, metadata and titles
+        as written
+        """
+        container = read_gwyfile(self.container.to_bytes())
+        self.assertEqual(len(container.spectra), 2)
+        spectra = container.spectra[0]
+        np.testing.assert_equal(spectra.values, self.spectra.values)
+        np.testing.assert_equal(spectra.offsets, [0, 5, 8])
+        np.testing.assert_equal(spectra.coords, self.coords)
+        self.assertDictEqual(spectra.meta, self.spectra.meta)
+        self.assertEqual(spectra.title, 'Force map')
+        self.assertEqual(container.spectra[1].meta['ncurves'], 1)
+
+    def test_read_coords_without_copy(self):
+        """Coordinates are read-only views if copy is False"""
+        container = read_gwyfile(self.container.to_bytes(), copy=False)
+        coords = container.spectra[0].coords
+        self.assertFalse(coords.flags.writeable)
+        np.testing.assert_equal(coords, self.coords)
+
+    def test_skip_spectra(self):
+        """Spectra are not read if they are not in components"""
+        container = read_gwyfile(self.container.to_bytes(),
+                                 components=('data', 'surfaces'))
+        self.assertEqual(container.spectra, [])
+
+    def test_nbytes(self):
+        """Count size of values and coordinates of spectra"""
+        self.assertEqual(self.container.nbytes()['spectra'],
+                         (8 + 4 + 5 + 2) * 8)
+
+
+class GwyContainer_borrowed_write(unittest.TestCase):
+    """Test writing of borrowed data arrays"""
+
+    def test_round_trip_of_converted_arrays(self):
+        """Arrays of any layout and type are written correctly"""
+        data = np.random.rand(3, 4)
+        curve_data = np.random.rand(5, 2).T
+        container = GwyContainer(
+            channels=[GwyChannel('Topo', GwyDataField(data.T),
+                                 mask=GwyDataField(
+                                     data.astype(np.float32)))],
+            graphs=[GwyGraphModel([GwyGraphCurve(curve_data)])])
+        result = read_gwyfile(container.to_bytes())
+        np.testing.assert_equal(result.channels[0].data.data, data.T)
+        np.testing.assert_allclose(result.channels[0].mask.data, data)
+        np.testing.assert_equal(result.graphs[0].curves[0].data,
+                                curve_data)
+
+
+class GwyContainer_graph_curves(unittest.TestCase):
+    """Test reading of graph curves"""
+
+    def setUp(self):
+        self.xdata = np.random.rand(6)
+        self.ydata = np.random.rand(6)
+        curve = GwyGraphCurve(xdata=self.xdata, ydata=self.ydata)
+        self.container = GwyContainer(graphs=[GwyGraphModel([curve])])
+
+    def test_read_curves_without_copy(self):
+        """Curves are read-only views if copy is False"""
+        for lazy in (False, True):
+            container = read_gwyfile(self.container.to_bytes(),
+                                     lazy=lazy, copy=False)
+            curve = container.graphs[0].curves[0]
+            self.assertFalse(curve.xdata.flags.writeable)
+            self.assertFalse(curve.ydata.flags.writeable)
+            np.testing.assert_equal(curve.xdata, self.xdata)
+            np.testing.assert_equal(curve.ydata, self.ydata)
+
+    def test_read_curves_with_copy(self):
+        """Curves own contiguous copies of the data by default"""
+        curve = read_gwyfile(self.container.to_bytes()).graphs[0].curves[0]
+        self.assertTrue(curve.xdata.flags.owndata)
+        self.assertTrue(curve.ydata.flags.c_contiguous)
+        np.testing.assert_equal(curve.ydata, self.ydata)
+
+
+class GwyContainer_selective_read_and_write(unittest.TestCase):
+    """Test writing of containers read with some of the components"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.filename = os.path.join(self.root, 'test.gwy')
+        self.data = np.random.rand(8, 6)
+        curve = GwyGraphCurve(np.random.rand(2, 5))
+        container = GwyContainer(
+            channels=[GwyChannel('Topo', GwyDataField(self.data),
+                                 mask=GwyDataField(np.zeros((8, 6))))],
+            graphs=[GwyGraphModel([curve])])
+        container.to_gwyfile(self.filename)
+
+    def test_raise_ValueError_if_written_without_data(self):
+        """Containers read without channel data cannot be written"""
+        newname = os.path.join(self.root, 'graphs.gwy')
+        for lazy in (False, True):
+            container = read_gwyfile(self.filename, components=['graphs'],
+                                     lazy=lazy)
+            self.assertRaises(ValueError, container.to_gwyfile, newname)
+
+    def test_round_trip_without_mask(self):
+        """Channels read without mask are written without mask"""
+        newname = os.path.join(self.root, 'data.gwy')
+        read_gwyfile(self.filename,
+                     components=['data']).to_gwyfile(newname)
+        container = read_gwyfile(newname)
+        self.assertIsNone(container.channels[0].mask)
+        np.testing.assert_equal(container.channels[0].data.data,
+                                self.data)
+        self.assertEqual(len(container.graphs), 0)
+
+
+class Func_aread_gwyfile(unittest.TestCase):
+    """Test aread_gwyfile function"""
+
+    @patch('pygwyfile.gwycontainer.run_blocking')
+    def test_run_read_gwyfile(self, mock_run_blocking):
+        """Run read_gwyfile with run_blocking and return its value"""
+        container = asyncio.run(aread_gwyfile('testfile.gwy', lazy=True))
+        mock_run_blocking.assert_has_calls(
+            [call(read_gwyfile, 'testfile.gwy', lazy=True)])
+        self.assertIs(container, mock_run_blocking.return_value)
+
+
+class GwyContainer_compressed_gwyfile(unittest.TestCase):
+    """Tests for writing and reading of compressed gwy files"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.data = np.random.rand(8, 6)
+        self.container = GwyContainer(
+            channels=[GwyChannel('Topo', GwyDataField(self.data))])
+
+    def _check_container(self, container):
+        np.testing.assert_equal(container.channels[0].data.data,
+                                self.data)
+
+    def test_compression_by_extension(self):
+        """Compress file by gzip if its name ends with .gz"""
+        filename = os.path.join(self.root, 'test.gwy.gz')
+        self.container.to_gwyfile(filename)
+        with gzip.open(filename, 'rb') as fileobj:
+            self.assertEqual(fileobj.read(4), b"GWYP")
+        self._check_container(read_gwyfile(filename))
+
+    def test_explicit_compression(self):
+        """Compress file by gzip with given level"""
+        filename = os.path.join(self.root, 'test.gwy')
+        self.container.to_gwyfile(filename, compression='gzip', level=1)
+        with open(filename, 'rb') as fileobj:
+            self.assertEqual(fileobj.read(2), b"\x1f\x8b")
+        self._check_container(read_gwyfile(filename))
+
+    def test_read_compressed_bytes_and_fileobj(self):
+        """Detect compressed contents and file objects by magic"""
+        data = gzip.compress(self.container.to_bytes())
+        self._check_container(read_gwyfile(data))
+        self._check_container(read_gwyfile(io.BytesIO(data)))
+
+    def test_raise_ValueError_if_compression_is_unknown(self):
+        """Raise ValueError if compression is not supported"""
+        filename = os.path.join(self.root, 'test.gwy')
+        self.assertRaises(ValueError,
+                          self.container.to_gwyfile,
+                          filename,
+                          compression='lzma')
+
+
 class Func_read_gwyfile_TestCase(unittest.TestCase):
     """ Test read_gwyfile function"""
 
@@ -407,6 +1138,38 @@ class Func_read_gwyfile_TestCase(unittest.TestCase):
         mock_gwyfile.assert_has_calls(
             [call(filename)])
 
+    @patch.object(GwyContainer, 'from_gwy')
+    @patch.object(Gwyfile, 'from_bytes')
+    def test_create_Gwyfile_instance_from_bytes(self,
+                                                mock_gwyfile,
+                                                mock_gwycontainer):
+        """Create Gwyfile instance from contents of gwy file"""
+        data = b'GWYP'
+        read_gwyfile(data)
+        mock_gwyfile.assert_has_calls(
+            [call(data)])
+
+    @patch.object(GwyContainer, 'from_gwy')
+    @patch.object(Gwyfile, 'from_fileobj')
+    def test_create_Gwyfile_instance_from_fileobj(self,
+                                                  mock_gwyfile,
+                                                  mock_gwycontainer):
+        """Create Gwyfile instance from file object"""
+        fileobj = Mock()
+        read_gwyfile(fileobj)
+        mock_gwyfile.assert_has_calls(
+            [call(fileobj)])
+
+    @patch.object(GwyContainer, 'from_gwy')
+    @patch.object(Gwyfile, 'from_fd')
+    def test_create_Gwyfile_instance_from_fd(self,
+                                             mock_gwyfile,
+                                             mock_gwycontainer):
+        """Create Gwyfile instance from file descriptor"""
+        read_gwyfile(3)
+        mock_gwyfile.assert_has_calls(
+            [call(3)])
+
     @patch.object(GwyContainer, 'from_gwy')
     @patch.object(Gwyfile, 'from_gwy')
     def test_create_GwyContainer_instance(self,
@@ -420,7 +1183,62 @@ class Func_read_gwyfile_TestCase(unittest.TestCase):
         read_gwyfile(filename)
 
         mock_gwycontainer.assert_has_calls(
-            [call(gwyfile)])
+            [call(gwyfile, lazy=False, cache_size=None,
+                  channels=None, components=None, copy=True)])
+
+    @patch.object(GwyContainer, 'from_gwy')
+    @patch.object(Gwyfile, 'from_gwy')
+    def test_create_lazy_GwyContainer_instance(self,
+                                               mock_gwyfile,
+                                               mock_gwycontainer):
+        """Pass lazy and cache_size args to GwyContainer.from_gwy"""
+        filename = 'testfile.gwy'
+        gwyfile = Mock(spec=Gwyfile)
+        mock_gwyfile.return_value = gwyfile
+
+        read_gwyfile(filename, lazy=True, cache_size=1024)
+
+        mock_gwycontainer.assert_has_calls(
+            [call(gwyfile, lazy=True, cache_size=1024,
+                  channels=None, components=None, copy=True)])
+
+    @patch.object(GwyContainer, 'from_gwy')
+    @patch.object(Gwyfile, 'from_gwy')
+    def test_read_selected_channels_and_components(self,
+                                                   mock_gwyfile,
+                                                   mock_gwycontainer):
+        """Pass channels and components args to GwyContainer.from_gwy"""
+        filename = 'testfile.gwy'
+        gwyfile = Mock(spec=Gwyfile)
+        mock_gwyfile.return_value = gwyfile
+
+        read_gwyfile(filename, channels=[0], components=('data',))
+
+        mock_gwycontainer.assert_has_calls(
+            [call(gwyfile, lazy=False, cache_size=None,
+                  channels=[0], components=('data',), copy=True)])
+
+    @patch.object(GwyContainer, 'from_gwy')
+    @patch.object(Gwyfile, 'from_gwy')
+    def test_close_gwyfile(self, mock_gwyfile, mock_gwycontainer):
+        """Close Gwyfile instance after reading if container is not lazy"""
+        gwyfile = Mock(spec=Gwyfile)
+        mock_gwyfile.return_value = gwyfile
+
+        read_gwyfile('testfile.gwy')
+        gwyfile.close.assert_has_calls([call()])
+
+    @patch.object(GwyContainer, 'from_gwy')
+    @patch.object(Gwyfile, 'from_gwy')
+    def test_keep_gwyfile_open_if_container_is_lazy(self,
+                                                    mock_gwyfile,
+                                                    mock_gwycontainer):
+        """Lazy container keeps Gwyfile instance open"""
+        gwyfile = Mock(spec=Gwyfile)
+        mock_gwyfile.return_value = gwyfile
+
+        read_gwyfile('testfile.gwy', lazy=True)
+        gwyfile.close.assert_not_called()
 
     @patch.object(GwyContainer, 'from_gwy')
     @patch.object(Gwyfile, 'from_gwy')
@@ -458,14 +1276,27 @@ class GwyContainer_to_gwy(unittest.TestCase):
         """ Add channels to created gwycontainer"""
         self.gwycontainer.to_gwy(self.gwycontainer)
         self.gwycontainer._add_channels_to_gwycontainer.assert_has_calls(
-            [call(mock_new_gwycontainer.return_value)])
+            [call(mock_new_gwycontainer.return_value, None)])
 
     @patch('pygwyfile.gwycontainer.new_gwycontainer', autospec=True)
     def test_add_graphs_to_gwycontainer_object(self, mock_new_gwycontainer):
         """ Add graphs to gwycontainer """
         self.gwycontainer.to_gwy(self.gwycontainer)
         self.gwycontainer._add_graphs_to_gwycontainer.assert_has_calls(
-            [call(mock_new_gwycontainer.return_value)])
+            [call(mock_new_gwycontainer.return_value, None)])
+
+    @patch('pygwyfile.gwycontainer.add_keepalive', autospec=True)
+    @patch('pygwyfile.gwycontainer.new_gwycontainer', autospec=True)
+    def test_borrow_data(self, mock_new_gwycontainer, mock_add_keepalive):
+        """ Pass keepalive list and keep it alive with gwycontainer"""
+        def add_array(gwycontainer, keepalive):
+            keepalive.append('array')
+
+        self.gwycontainer._add_channels_to_gwycontainer.side_effect = (
+            add_array)
+        self.gwycontainer.to_gwy(self.gwycontainer, borrow=True)
+        mock_add_keepalive.assert_has_calls(
+            [call(mock_new_gwycontainer.return_value, ['array'])])
 
     @patch('pygwyfile.gwycontainer.new_gwycontainer', autospec=True)
     def test_return_gwycontainer(self, mock_new_gwycontainer):
@@ -482,23 +1313,28 @@ class GwyContainer_add_channels_to_gwycontainer(unittest.TestCase):
         self.container._add_channels_to_gwycontainer = (
             GwyContainer._add_channels_to_gwycontainer)
         self.channel0 = Mock(spec=GwyChannel)
+        self.channel0.data = Mock(spec=GwyDataField)
         self.channel1 = Mock(spec=GwyChannel)
+        self.channel1.data = Mock(spec=GwyDataField)
         self.container.channels = [self.channel0, self.channel1]
 
     def test_converting_channels_to_gwychannels(self):
         """ Convert channels to gwychannels and add them to gwycontainer"""
         self.container._add_channels_to_gwycontainer(self.container,
                                                      self.gwycontainer)
-        self.channel0.to_gwy.side_effect = self._ch0_to_gwy_side_effect
-        self.channel1.to_gwy.side_effect = self._ch1_to_gwy_side_effect
-
-    def _ch0_to_gwy_side_effect(self, *args):
-        self.assertEqual(args[0], self.gwycontainer)
-        self.assertEqual(args[1], 0)
+        self.channel0.to_gwy.assert_has_calls(
+            [call(self.gwycontainer, 0, None)])
+        self.channel1.to_gwy.assert_has_calls(
+            [call(self.gwycontainer, 1, None)])
 
-    def _ch1_to_gwy_side_effect(self, *args):
-        self.assertEqual(args[0], self.gwycontainer)
-        self.assertEqual(args[1], 1)
+    def test_raise_ValueError_if_channel_has_no_data(self):
+        """ Raise ValueError before adding any channel without data"""
+        self.channel1.data = None
+        self.channel1.title = 'Phase'
+        with self.assertRaisesRegex(ValueError, "'data' component"):
+            self.container._add_channels_to_gwycontainer(self.container,
+                                                         self.gwycontainer)
+        self.channel0.to_gwy.assert_not_called()
 
 
 class GwyContainer_add_graphs_to_gwycontainer(unittest.TestCase):
@@ -512,29 +1348,25 @@ class GwyContainer_add_graphs_to_gwycontainer(unittest.TestCase):
         self.graph2 = Mock(spec=GwyGraphModel)
         self.container.graphs = [self.graph1, self.graph2]
 
-    @patch('pygwyfile.gwycontainer._container_graphs_dic')
     @patch('pygwyfile.gwycontainer.add_gwyitem_to_gwycontainer', autospec=True)
     @patch('pygwyfile.gwycontainer.new_gwyitem_object', autospec=True)
     def test_convert_graphs_to_gwygraph_objects(self,
                                                 mock_new_gwyitem_object,
-                                                mock_add_gwyitem,
-                                                mock_weadref_dic):
+                                                mock_add_gwyitem):
         """ Convert graphs to gwygraphmodel objects"""
         self.container._add_graphs_to_gwycontainer(self.container,
                                                    self.gwycontainer)
         self.graph1.to_gwy.assert_has_calls(
-            [call()])
+            [call(None)])
         self.graph2.to_gwy.assert_has_calls(
-            [call()])
+            [call(None)])
 
-    @patch('pygwyfile.gwycontainer._container_graphs_dic')
     @patch('pygwyfile.gwycontainer.add_gwyitem_to_gwycontainer', autospec=True)
     @patch('pygwyfile.gwycontainer.new_gwyitem_object', autospec=True)
     def test_create_new_gwyitems_from_gwygraphmodel_objects(
             self,
             mock_new_gwyitem_object,
-            mock_add_gwyitem,
-            mock_weadref_dic):
+            mock_add_gwyitem):
         """ Create new gwyitems from the gwygraphmodel objects"""
         self.container._add_graphs_to_gwycontainer(self.container,
                                                    self.gwycontainer)
@@ -542,13 +1374,11 @@ class GwyContainer_add_graphs_to_gwycontainer(unittest.TestCase):
             [call('/0/graph/graph/1', self.graph1.to_gwy.return_value),
              call('/0/graph/graph/2', self.graph2.to_gwy.return_value)])
 
-    @patch('pygwyfile.gwycontainer._container_graphs_dic')
     @patch('pygwyfile.gwycontainer.add_gwyitem_to_gwycontainer', autospec=True)
     @patch('pygwyfile.gwycontainer.new_gwyitem_object', autospec=True)
     def test_add_gwyitems_to_gwycontainer(self,
                                           mock_new_gwyitem_object,
-                                          mock_add_gwyitem,
-                                          mock_weadref_dic):
+                                          mock_add_gwyitem):
         """ Add created gwyitems to the gwycontainer"""
         self.container._add_graphs_to_gwycontainer(self.container,
                                                    self.gwycontainer)
@@ -556,30 +1386,11 @@ class GwyContainer_add_graphs_to_gwycontainer(unittest.TestCase):
             [call(mock_new_gwyitem_object.return_value,
                   self.gwycontainer)])
 
-    @patch('pygwyfile.gwycontainer._container_graphs_dic')
-    @patch('pygwyfile.gwycontainer.add_gwyitem_to_gwycontainer', autospec=True)
-    @patch('pygwyfile.gwycontainer.new_gwyitem_object', autospec=True)
-    def test_append_weakref_dictionary_with_gwygraph_objects(
-            self,
-            mock_new_gwyitem_object,
-            mock_add_gwyitem,
-            mock_weadref_dic):
-        """ Append _container_graphs_dic weakref key dictionary to
-            prevent removing gwygraph objects by garbage collector
-        """
-        self.container._add_graphs_to_gwycontainer(self.container,
-                                                   self.gwycontainer)
-        mock_weadref_dic[self.gwycontainer].append.assert_has_calls(
-            [call(self.graph1.to_gwy.return_value),
-             call(self.graph2.to_gwy.return_value)])
-
-    @patch('pygwyfile.gwycontainer._container_graphs_dic')
     @patch('pygwyfile.gwycontainer.add_gwyitem_to_gwycontainer', autospec=True)
     @patch('pygwyfile.gwycontainer.new_gwyitem_object', autospec=True)
     def test_add_graph_visibility_to_gwycontainer(self,
                                                   mock_new_gwyitem_object,
-                                                  mock_add_gwyitem,
-                                                  mock_weadref_dic):
+                                                  mock_add_gwyitem):
         """ Add graph visibility data item to gwycontainer """
         self.container._add_graph_visibility_to_gwycontainer = (
             Mock(autospec=True))
@@ -3,7 +3,7 @@ from unittest.mock import patch, call, Mock
 
 import numpy as np
 
-from pygwyfile._libgwyfile import ffi
+from pygwyfile._libgwyfile import ffi, lib
 from pygwyfile.gwyfile import GwyfileErrorCMsg
 from pygwyfile.gwydatafield import GwyDataField
 
@@ -84,7 +84,8 @@ class GwyDataField_from_gwy(unittest.TestCase):
         mock_get_meta.assert_has_calls(
             [call(cgwydf)])
         mock_get_data.assert_has_calls(
-            [call(cgwydf, test_meta['xres'], test_meta['yres'])])
+            [call(cgwydf, test_meta['xres'], test_meta['yres'],
+                  owner=None)])
         mock_GwyDataField.assert_has_calls(
             [call(data=test_data, meta=test_meta)])
         self.assertEqual(gwydf, mock_GwyDataField(data=test_data,
@@ -92,7 +93,7 @@ class GwyDataField_from_gwy(unittest.TestCase):
 
 
 class GwyDataField_get_meta(unittest.TestCase):
-    """Test _get_meta method of GwyDataFieldself
+    """Test _get_meta method of GwyDataField
     """
 
     def setUp(self):
@@ -107,22 +108,21 @@ class GwyDataField_get_meta(unittest.TestCase):
 
         self.falsep = ffi.new("bool*", False)
         self.truep = ffi.new("bool*", True)
-        self.errorp = ffi.new("GwyfileError**")
-        self.error_msg = "Test error message"
-        self.metadata_dict = {'xres': ffi.typeof(ffi.new("int32_t*")),
-                              'yres': ffi.typeof(ffi.new("int32_t*")),
-                              'xreal': ffi.typeof(ffi.new("double*")),
-                              'yreal': ffi.typeof(ffi.new("double*")),
-                              'xoff': ffi.typeof(ffi.new("double*")),
-                              'yoff': ffi.typeof(ffi.new("double*")),
-                              'si_unit_xy': ffi.typeof(ffi.new("char**")),
-                              'si_unit_z': ffi.typeof(ffi.new("char**"))}
+        self.test_metadata_dict = {'xres': 256,
+                                   'yres': 256,
+                                   'xreal': 1e-6,
+                                   'yreal': 1e-6,
+                                   'xoff': 0,
+                                   'yoff': 0,
+                                   'si_unit_xy': 'm',
+                                   'si_unit_z': 'A'}
 
     def test_raise_exception_if_df_loock_unacceptable(self):
-        """Raise GywfileErrorCMsg if gwyfile_object_datafield_get returns False
+        """Raise GywfileErrorCMsg if pygwyfile_datafield_get_meta
+        returns False
         """
 
-        self.mock_lib.gwyfile_object_datafield_get.return_value = (
+        self.mock_lib.pygwyfile_datafield_get_meta.return_value = (
             self.falsep[0])
         self.assertRaises(GwyfileErrorCMsg,
                           self.mock_gwydf._get_meta,
@@ -130,33 +130,28 @@ class GwyDataField_get_meta(unittest.TestCase):
 
     def test_libgwyfile_function_args(self):
         """
-        Test args of gwyfile_object_datafield_get C function
+        Test args of pygwyfile_datafield_get_meta C function
         """
 
-        self.mock_lib.gwyfile_object_datafield_get.side_effect = (
+        self.mock_lib.pygwyfile_datafield_get_meta.side_effect = (
             self._side_effect_check_args)
         self.mock_gwydf._get_meta(self.cgwydf)
 
     def _side_effect_check_args(self, *args):
         """
-        Check args passing to gwyfile_object_datafield_get C function
+        Check args passing to pygwyfile_datafield_get_meta C function
         """
 
         # first arg is GwyDatafield object from Libgwyfile
         self.assertEqual(args[0], self.cgwydf)
 
-        # second arg is GwyfileError**
-        assert ffi.typeof(args[1]) == ffi.typeof(self.errorp)
+        # second arg is metadata struct
+        self.assertEqual(ffi.typeof(args[1]),
+                         ffi.typeof("PygwyfileDataFieldMeta*"))
 
-        # last arg in NULL
-        self.assertEqual(args[-1], ffi.NULL)
-
-        # create dict from names and types of pointers in args
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointer_types = [ffi.typeof(pointer) for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointer_types))
-
-        self.assertDictEqual(arg_dict, self.metadata_dict)
+        # third arg is GwyfileError**
+        self.assertEqual(ffi.typeof(args[2]),
+                         ffi.typeof("GwyfileError**"))
 
         return self.truep[0]
 
@@ -165,33 +160,47 @@ class GwyDataField_get_meta(unittest.TestCase):
         Returns dictionary with metadata
         """
 
-        self.test_metadata_dict = {'xres': 256,
-                                   'yres': 256,
-                                   'xreal': 1e-6,
-                                   'yreal': 1e-6,
-                                   'xoff': 0,
-                                   'yoff': 0,
-                                   'si_unit_xy': 'm',
-                                   'si_unit_z': 'A'}
-        self.mock_lib.gwyfile_object_datafield_get.side_effect = (
+        self.mock_lib.pygwyfile_datafield_get_meta.side_effect = (
             self._side_effect_return_metadata)
 
         meta = self.mock_gwydf._get_meta(self.cgwydf)
         self.assertDictEqual(self.test_metadata_dict, meta)
 
-    def _side_effect_return_metadata(self, *args):
+    def test_null_units(self):
+        """
+        NULL unit strings are returned as empty strings
+        """
 
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
+        self.mock_lib.pygwyfile_datafield_get_meta.return_value = (
+            self.truep[0])
+
+        meta = self.mock_gwydf._get_meta(self.cgwydf)
+        self.assertEqual(meta['si_unit_xy'], '')
+        self.assertEqual(meta['si_unit_z'], '')
+
+    def test_free_unit_strings(self):
+        """
+        Unit strings are freed
+        """
+
+        self.mock_lib.pygwyfile_datafield_get_meta.side_effect = (
+            self._side_effect_return_metadata)
 
-        for key in arg_dict:
-            if key not in ['si_unit_xy', 'si_unit_z']:
-                arg_dict[key][0] = self.test_metadata_dict[key]
+        self.mock_gwydf._get_meta(self.cgwydf)
+        self.assertEqual(
+            self.mock_lib.pygwyfile_datafield_meta_free.call_count, 1)
+
+    def _side_effect_return_metadata(self, gwydf, c_meta, errorp):
+
+        # keep C strings alive until they are read
+        self.metadata_c_strs = []
+        for key, value in self.test_metadata_dict.items():
+            if key in ['si_unit_xy', 'si_unit_z']:
+                metadata_c_str = ffi.new("char[]", value.encode('utf-8'))
+                self.metadata_c_strs.append(metadata_c_str)
+                setattr(c_meta, key, metadata_c_str)
             else:
-                metadata_value = self.test_metadata_dict[key].encode('utf-8')
-                metadata_c_str = ffi.new("char[]", metadata_value)
-                arg_dict[key][0] = metadata_c_str
+                setattr(c_meta, key, value)
         return self.truep[0]
 
 
@@ -247,6 +256,39 @@ class GwyDataField_get_data(unittest.TestCase):
 
         np.testing.assert_almost_equal(self.data, data)
 
+    def test_returned_data_is_a_copy(self):
+        """
+        Returned array does not share memory with the datafield object
+        """
+
+        self.mock_lib.gwyfile_object_datafield_get.side_effect = (
+            self._side_effect)
+
+        data = self.mock_gwydf._get_data(self.cgwydf,
+                                         self.xres,
+                                         self.yres)
+
+        self.assertFalse(np.shares_memory(self.data, data))
+
+    def test_returned_data_is_a_view_of_owner(self):
+        """
+        Return array created by owner.view_double_array if owner is given
+        """
+
+        self.mock_lib.gwyfile_object_datafield_get.side_effect = (
+            self._side_effect)
+        owner = Mock()
+
+        data = self.mock_gwydf._get_data(self.cgwydf,
+                                         self.xres,
+                                         self.yres,
+                                         owner=owner)
+
+        owner.view_double_array.assert_has_calls(
+            [call(ffi.cast("double*", self.data.ctypes.data),
+                  (self.xres, self.yres))])
+        self.assertIs(data, owner.view_double_array.return_value)
+
     def _side_effect(self, *args):
 
         # first arg is GwyDatafield object from Libgwyfile
@@ -318,5 +360,41 @@ class GwyDataField_to_gwy(unittest.TestCase):
         return self.expected_return
 
 
+class GwyDataField_nbytes(unittest.TestCase):
+    """Test nbytes method of GwyDataField"""
+
+    def test_size_of_data_array(self):
+        """Return size of the data array in bytes"""
+        datafield = GwyDataField(np.zeros((4, 8)))
+        self.assertEqual(datafield.nbytes(), 256)
+
+
+class GwyDataField_to_gwy_data(unittest.TestCase):
+    """Test data passed to libgwyfile by to_gwy method of GwyDataField"""
+
+    def _round_trip(self, data, keepalive=None):
+        gwydf = GwyDataField(data).to_gwy(keepalive)
+        self.addCleanup(lib.gwyfile_object_free, gwydf)
+        return GwyDataField.from_gwy(gwydf).data
+
+    def test_borrow_data(self):
+        """Data array is borrowed and appended to keepalive"""
+        data = np.random.rand(4, 3)
+        keepalive = []
+        np.testing.assert_equal(self._round_trip(data, keepalive), data)
+        self.assertEqual(len(keepalive), 1)
+        self.assertIs(keepalive[0], data)
+
+    def test_convert_non_contiguous_data(self):
+        """Non-contiguous and float32 data are converted once"""
+        data = np.random.rand(3, 4)
+        for converted in (data.T, np.asfortranarray(data),
+                          data.astype(np.float32)):
+            keepalive = []
+            np.testing.assert_allclose(
+                self._round_trip(converted, keepalive), converted)
+            self.assertEqual(keepalive, [])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,11 +1,27 @@
+import gc
+import gzip
+import io
+import os
+import tempfile
 import unittest
+import weakref
 from unittest.mock import patch, call, ANY, Mock
 
+import numpy as np
+
 from pygwyfile.gwyfile import Gwyfile
 from pygwyfile.gwyfile import GwyfileError, GwyfileErrorCMsg
 from pygwyfile.gwyfile import ffi, lib
 from pygwyfile.gwyfile import new_gwycontainer, add_gwyitem_to_gwycontainer
+from pygwyfile.gwyfile import add_keepalive, new_double_array_arg
 from pygwyfile.gwyfile import write_gwycontainer_to_gwyfile
+from pygwyfile.gwyfile import get_gwycontainer_size
+from pygwyfile.gwyfile import (write_gwycontainer_to_bytes,
+                               write_gwycontainer_to_fileobj,
+                               write_gwycontainer_to_fd)
+from pygwyfile.gwyfile import get_gwyobject_items_size
+from pygwyfile.gwyfile import (write_gwyobject_items_to_bytes,
+                               write_gwyobject_items_to_fd)
 from pygwyfile.gwyfile import _new_gwyitem
 from pygwyfile.gwyfile import (new_gwyitem_bool,
                                new_gwyitem_double,
@@ -90,6 +106,82 @@ class Gwyfile_init_TestCase(unittest.TestCase):
         self.assertIs(c_gwyfile, test_instance.c_gwyfile)
 
 
+class Gwyfile_close(unittest.TestCase):
+    """Test close method and context manager of Gwyfile class"""
+
+    def setUp(self):
+        self.gwycontainer = new_gwycontainer()
+        self.gwyfile = Gwyfile(self.gwycontainer)
+
+    def test_free_owned_gwyfile_object(self):
+        """Free the gwyfile object and set c_gwyfile to None"""
+        with patch('pygwyfile.gwyfile.ffi') as mock_ffi:
+            self.gwyfile.close()
+        mock_ffi.release.assert_has_calls(
+            [call(self.gwycontainer)])
+        self.assertIsNone(self.gwyfile.c_gwyfile)
+
+    def test_close_closed_gwyfile(self):
+        """Closing closed file has no effect"""
+        self.gwyfile.close()
+        self.gwyfile.close()
+        self.assertIsNone(self.gwyfile.c_gwyfile)
+
+    def test_close_gwyfile_object_not_owned_by_python(self):
+        """Do not free gwyfile object which is not owned by Python"""
+        c_gwyfile = ffi.cast("GwyfileObject*", self.gwycontainer)
+        gwyfile = Gwyfile(c_gwyfile)
+        gwyfile.close()
+        self.assertIsNone(gwyfile.c_gwyfile)
+
+    def test_raise_GwyfileError_if_gwyfile_is_closed(self):
+        """Raise GwyfileError on access to items of closed file"""
+        self.gwyfile.close()
+        self.assertRaises(GwyfileError,
+                          self.gwyfile.get_gwyitem_string,
+                          '/filename')
+
+    def test_context_manager(self):
+        """Close the file on exit from with block"""
+        with self.gwyfile as gwyfile:
+            self.assertIs(gwyfile, self.gwyfile)
+            self.assertIsNotNone(gwyfile.c_gwyfile)
+        self.assertIsNone(self.gwyfile.c_gwyfile)
+
+
+class Gwyfile_view_double_array(unittest.TestCase):
+    """Test view_double_array method of Gwyfile class"""
+
+    def setUp(self):
+        self.gwycontainer = new_gwycontainer()
+        self.gwyfile = Gwyfile(self.gwycontainer)
+        self.data = np.arange(6, dtype=np.float64)
+        self.c_data = ffi.cast("double*", self.data.ctypes.data)
+
+    def test_returned_array_is_readonly_view(self):
+        """Return read-only array sharing memory with C data"""
+        array = self.gwyfile.view_double_array(self.c_data, (2, 3))
+        np.testing.assert_equal(array, self.data.reshape((2, 3)))
+        self.assertFalse(array.flags.writeable)
+        self.assertTrue(np.shares_memory(array, self.data))
+
+    def test_defer_free_while_views_are_alive(self):
+        """Do not release gwyfile object on close() if views are alive"""
+        array = self.gwyfile.view_double_array(self.c_data, (6,))
+        with patch('pygwyfile.gwyfile.ffi') as mock_ffi:
+            self.gwyfile.close()
+        mock_ffi.release.assert_not_called()
+        self.assertIs(array.base._c_owner, self.gwycontainer)
+
+    def test_raise_GwyfileError_if_gwyfile_is_closed(self):
+        """Raise GwyfileError if gwyfile is closed"""
+        self.gwyfile.close()
+        self.assertRaises(GwyfileError,
+                          self.gwyfile.view_double_array,
+                          self.c_data,
+                          (6,))
+
+
 class Gwyfile_from_gwy(unittest.TestCase):
     """ Test from_gwy method of Gwyfile class
     """
@@ -112,6 +204,11 @@ class Gwyfile_from_gwy(unittest.TestCase):
         self.addCleanup(patcher_Gwyfile.stop)
         self.mock_Gwyfile = patcher_Gwyfile.start()
 
+        patcher_own = patch('pygwyfile.gwyfile._own_gwyobject',
+                            autospec=True)
+        self.addCleanup(patcher_own.stop)
+        self.mock_own_gwyobject = patcher_own.start()
+
     def test_raise_exception_if_file_doesnt_exist(self):
         """
         Raise OSError exception if file does not exist
@@ -147,8 +244,10 @@ class Gwyfile_from_gwy(unittest.TestCase):
         c_gwyfile = Mock()
         self.mock_lib.gwyfile_read_file.return_value = c_gwyfile
         Gwyfile.from_gwy(self.filename)
-        self.mock_Gwyfile.assert_has_calls(
+        self.mock_own_gwyobject.assert_has_calls(
             [call(c_gwyfile)])
+        self.mock_Gwyfile.assert_has_calls(
+            [call(self.mock_own_gwyobject.return_value)])
 
     def test_returned_value(self):
         """Return Gwyfile instance
@@ -163,28 +262,22 @@ class Gwyfile__get_gwyitem_value(unittest.TestCase):
     """ Tests for Gwyfile._get_gwyitem_value method """
     def setUp(self):
         self.gwyfile = Mock(spec=Gwyfile)
-        self.gwyfile.c_gwyfile = Mock()
         self.gwyfile._get_gwyitem_value = Gwyfile._get_gwyitem_value
         self.cfunc = Mock()
         self.item_key = '/0/data/title'
 
-        patcher_lib = patch('pygwyfile.gwyfile.lib',
-                            autospec=True)
-        self.addCleanup(patcher_lib.stop)
-        self.mock_lib = patcher_lib.start()
-
-    def test_args_of_gwyfile_object_get(self):
+    def test_args_of_get_gwyitem(self):
         """Get data item from Gwy file object"""
-        self.mock_lib.gwyfile_object_get.return_value = ffi.NULL
+        self.gwyfile._get_gwyitem.return_value = None
         self.gwyfile._get_gwyitem_value(self.gwyfile,
                                         self.item_key,
                                         self.cfunc)
-        self.mock_lib.gwyfile_object_get.assert_has_calls(
-            [call(self.gwyfile.c_gwyfile, self.item_key.encode('utf-8'))])
+        self.gwyfile._get_gwyitem.assert_has_calls(
+            [call(self.item_key)])
 
     def test_return_None_if_data_item_is_not_found(self):
         """Return None if data item is not found"""
-        self.mock_lib.gwyfile_object_get.return_value = ffi.NULL
+        self.gwyfile._get_gwyitem.return_value = None
         actual_return = self.gwyfile._get_gwyitem_value(self.gwyfile,
                                                         self.item_key,
                                                         self.cfunc)
@@ -192,7 +285,7 @@ class Gwyfile__get_gwyitem_value(unittest.TestCase):
 
     def test_return_data_item_value_if_data_item_is_found(self):
         """Return data item value if data item is found"""
-        item = self.mock_lib.gwyfile_object_get.return_value
+        item = self.gwyfile._get_gwyitem.return_value
         actual_return = self.gwyfile._get_gwyitem_value(self.gwyfile,
                                                         self.item_key,
                                                         self.cfunc)
@@ -200,43 +293,119 @@ class Gwyfile__get_gwyitem_value(unittest.TestCase):
         self.assertEqual(actual_return, self.cfunc.return_value)
 
 
+class Gwyfile__get_gwyitem(unittest.TestCase):
+    """ Tests for Gwyfile._get_gwyitem method """
+    def setUp(self):
+        self.gwycontainer = new_gwycontainer()
+        for i in range(3):
+            add_gwyitem_to_gwycontainer(
+                new_gwyitem_int32("/{:d}/data/n".format(i), i),
+                self.gwycontainer)
+        self.gwyfile = Gwyfile(self.gwycontainer)
+
+    def test_return_data_item(self):
+        """Return the item with the given name"""
+        for i in range(3):
+            item = self.gwyfile._get_gwyitem("/{:d}/data/n".format(i))
+            self.assertEqual(lib.gwyfile_item_get_int32(item), i)
+
+    def test_return_None_if_data_item_is_not_found(self):
+        """Return None if data item is not found"""
+        self.assertIsNone(self.gwyfile._get_gwyitem("/3/data/n"))
+
+    def test_index_items_once(self):
+        """Build index of items only on the first call"""
+        with patch.object(Gwyfile, '_index_gwyitems',
+                          autospec=True,
+                          return_value=({}, {})) as mock_index:
+            self.gwyfile._get_gwyitem("/0/data/n")
+            self.gwyfile._get_gwyitem("/1/data/n")
+        mock_index.assert_has_calls([call(self.gwyfile)])
+        self.assertEqual(mock_index.call_count, 1)
+
+    def test_raise_GwyfileError_if_gwyfile_is_closed(self):
+        """Raise GwyfileError if gwyfile is closed"""
+        self.gwyfile._get_gwyitem("/0/data/n")
+        self.gwyfile.close()
+        self.assertRaises(GwyfileError,
+                          self.gwyfile._get_gwyitem,
+                          "/0/data/n")
+
+
+class Gwyfile_to_dict(unittest.TestCase):
+    """ Tests for Gwyfile.to_dict, items and _get_gwyitem_scalar methods """
+    def setUp(self):
+        self.gwycontainer = new_gwycontainer()
+        self.datafield = lib.gwyfile_object_new_datafield(
+            1, 1, 1., 1., ffi.NULL)
+        for gwyitem in [new_gwyitem_bool("/0/data/visible", True),
+                        new_gwyitem_int32("/0/base/range_type", 1),
+                        new_gwyitem_double("/0/base/min", 0.5),
+                        new_gwyitem_string("/0/data/title", "Title"),
+                        new_gwyitem_object("/0/data", self.datafield)]:
+            add_gwyitem_to_gwycontainer(gwyitem, self.gwycontainer)
+        self.gwyfile = Gwyfile(self.gwycontainer)
+
+    def test_scalar_values(self):
+        """ Return values of bool, int32, double and string items """
+        self.assertEqual(self.gwyfile.to_dict(),
+                         {"/0/data/visible": True,
+                          "/0/base/range_type": 1,
+                          "/0/base/min": 0.5,
+                          "/0/data/title": "Title"})
+        self.assertEqual(dict(self.gwyfile.items()),
+                         self.gwyfile.to_dict())
+
+    def test_object_values(self):
+        """ Include object items if scalars_only is False """
+        values = self.gwyfile.to_dict(scalars_only=False)
+        self.assertEqual(values["/0/data"], self.datafield)
+
+    def test_raise_GwyfileError_if_item_type_does_not_match(self):
+        """ Raise GwyfileError if item is of another type """
+        self.assertEqual(
+            self.gwyfile._get_gwyitem_scalar("/0/data/title", 's'),
+            "Title")
+        self.assertRaises(GwyfileError,
+                          self.gwyfile._get_gwyitem_scalar,
+                          "/0/data/title",
+                          'd')
+
+
 class Gwyfile_get_gwyitem_bool(unittest.TestCase):
     """ Tests for Gwyfile.get_gwyitem_bool method """
     def setUp(self):
         self.gwyfile = Mock(spec=Gwyfile)
         self.gwyfile.get_gwyitem_bool = Gwyfile.get_gwyitem_bool
-        self.gwyfile._get_gwyitem_value = Mock(autospec=True)
         self.item_key = '/0/data/visible'
 
     def test_return_False_if_data_item_is_not_found(self):
         """ Return False if data item is not found """
-        self.gwyfile._get_gwyitem_value.return_value = None
+        self.gwyfile._get_gwyitem_scalar.return_value = None
         actual_return = self.gwyfile.get_gwyitem_bool(self.gwyfile,
                                                       self.item_key)
         self.assertIs(actual_return, False)
 
     def test_return_False_if_data_item_value_is_False(self):
         """ Return Flase if data item value is False """
-        falsep = ffi.new("bool*", False)
-        self.gwyfile._get_gwyitem_value.return_value = falsep[0]
+        self.gwyfile._get_gwyitem_scalar.return_value = False
         actual_return = self.gwyfile.get_gwyitem_bool(self.gwyfile,
                                                       self.item_key)
         self.assertIs(actual_return, False)
 
     def test_return_True_if_data_item_value_is_True(self):
         """ Return True if data item value is True """
-        truep = ffi.new("bool*", True)
-        self.gwyfile._get_gwyitem_value.return_value = truep[0]
+        self.gwyfile._get_gwyitem_scalar.return_value = True
         actual_return = self.gwyfile.get_gwyitem_bool(self.gwyfile,
                                                       self.item_key)
         self.assertIs(actual_return, True)
 
-    def test_args_of_get_gwyitem_value_call(self):
-        """ Test args of Gwyfile._get_gwyitem_value call"""
-        self.gwyfile._get_gwyitem_value.return_value = None
+    def test_args_of_get_gwyitem_scalar_call(self):
+        """ Test args of Gwyfile._get_gwyitem_scalar call"""
+        self.gwyfile._get_gwyitem_scalar.return_value = None
         self.gwyfile.get_gwyitem_bool(self.gwyfile, self.item_key)
-        self.gwyfile._get_gwyitem_value.assert_has_calls(
-            [call(self.item_key, lib.gwyfile_item_get_bool)])
+        self.gwyfile._get_gwyitem_scalar.assert_has_calls(
+            [call(self.item_key, 'b')])
 
 
 class Gwyfile_get_gwyitem_string(unittest.TestCase):
@@ -244,30 +413,28 @@ class Gwyfile_get_gwyitem_string(unittest.TestCase):
     def setUp(self):
         self.gwyfile = Mock(spec=Gwyfile)
         self.gwyfile.get_gwyitem_string = Gwyfile.get_gwyitem_string
-        self.gwyfile._get_gwyitem_value = Mock(autospec=True)
         self.item_key = '/0/data/title'
 
     def test_return_None_if_data_item_is_not_found(self):
         """ Return None if data item is not found """
-        self.gwyfile._get_gwyitem_value.return_value = None
+        self.gwyfile._get_gwyitem_scalar.return_value = None
         actual_return = self.gwyfile.get_gwyitem_string(self.gwyfile,
                                                         self.item_key)
         self.assertIs(actual_return, None)
 
     def test_return_string_value_if_data_item_is_found(self):
         """ Return data item string value if data item is found """
-        cvalue = ffi.new("char[]", b'Title')
-        self.gwyfile._get_gwyitem_value.return_value = cvalue
+        self.gwyfile._get_gwyitem_scalar.return_value = 'Title'
         actual_return = self.gwyfile.get_gwyitem_string(self.gwyfile,
                                                         self.item_key)
         self.assertEqual(actual_return, 'Title')
 
-    def test_args_of_get_gwyitem_value_call(self):
-        """ Test args of Gwyfile._get_gwyitem_value call"""
-        self.gwyfile._get_gwyitem_value.return_value = None
+    def test_args_of_get_gwyitem_scalar_call(self):
+        """ Test args of Gwyfile._get_gwyitem_scalar call"""
+        self.gwyfile._get_gwyitem_scalar.return_value = None
         self.gwyfile.get_gwyitem_string(self.gwyfile, self.item_key)
-        self.gwyfile._get_gwyitem_value.assert_has_calls(
-            [call(self.item_key, lib.gwyfile_item_get_string)])
+        self.gwyfile._get_gwyitem_scalar.assert_has_calls(
+            [call(self.item_key, 's')])
 
 
 class Func_new_gwyitem_string(unittest.TestCase):
@@ -370,25 +537,24 @@ class Gwyfile_get_gwyitem_int32(unittest.TestCase):
 
     def test_return_None_if_data_item_is_not_found(self):
         """ Return None if data item is not found """
-        self.gwyfile._get_gwyitem_value.return_value = None
+        self.gwyfile._get_gwyitem_scalar.return_value = None
         actual_return = self.gwyfile.get_gwyitem_int32(self.gwyfile,
                                                        self.item_key)
         self.assertIs(actual_return, None)
 
     def test_return_int32_value_if_data_item_is_found(self):
         """ Return int32 value if data item is found """
-        valuep = ffi.new("int32_t*", 1)
-        self.gwyfile._get_gwyitem_value.return_value = valuep[0]
+        self.gwyfile._get_gwyitem_scalar.return_value = 1
         actual_return = self.gwyfile.get_gwyitem_int32(self.gwyfile,
                                                        self.item_key)
         self.assertEqual(actual_return, 1)
 
-    def test_args_of_get_gwyitem_value_call(self):
-        """ Test args of Gwyfile._get_gwyitem_value call"""
-        self.gwyfile._get_gwyitem_value.return_value = None
+    def test_args_of_get_gwyitem_scalar_call(self):
+        """ Test args of Gwyfile._get_gwyitem_scalar call"""
+        self.gwyfile._get_gwyitem_scalar.return_value = None
         self.gwyfile.get_gwyitem_int32(self.gwyfile, self.item_key)
-        self.gwyfile._get_gwyitem_value.assert_has_calls(
-            [call(self.item_key, lib.gwyfile_item_get_int32)])
+        self.gwyfile._get_gwyitem_scalar.assert_has_calls(
+            [call(self.item_key, 'i')])
 
 
 class Func_new_gwyitem_int32(unittest.TestCase):
@@ -427,25 +593,24 @@ class Gwyfile_get_gwyitem_double(unittest.TestCase):
 
     def test_return_None_if_data_item_is_not_found(self):
         """ Return None if data item is not found """
-        self.gwyfile._get_gwyitem_value.return_value = None
+        self.gwyfile._get_gwyitem_scalar.return_value = None
         actual_return = self.gwyfile.get_gwyitem_double(self.gwyfile,
                                                         self.item_key)
         self.assertIs(actual_return, None)
 
     def test_return_double_value_if_data_item_is_found(self):
         """ Return double value if data item is found """
-        valuep = ffi.new("double*", 1.)
-        self.gwyfile._get_gwyitem_value.return_value = valuep[0]
+        self.gwyfile._get_gwyitem_scalar.return_value = 1.
         actual_return = self.gwyfile.get_gwyitem_double(self.gwyfile,
                                                         self.item_key)
         self.assertEqual(actual_return, 1.)
 
-    def test_args_of_get_gwyitem_value_call(self):
-        """ Test args of Gwyfile._get_gwyitem_value call"""
-        self.gwyfile._get_gwyitem_value.return_value = None
+    def test_args_of_get_gwyitem_scalar_call(self):
+        """ Test args of Gwyfile._get_gwyitem_scalar call"""
+        self.gwyfile._get_gwyitem_scalar.return_value = None
         self.gwyfile.get_gwyitem_double(self.gwyfile, self.item_key)
-        self.gwyfile._get_gwyitem_value.assert_has_calls(
-            [call(self.item_key, lib.gwyfile_item_get_double)])
+        self.gwyfile._get_gwyitem_scalar.assert_has_calls(
+            [call(self.item_key, 'd')])
 
 
 class Func_new_gwyitem_double(unittest.TestCase):
@@ -481,13 +646,24 @@ class Func_new_gwycontainer(unittest.TestCase):
     def setUp(self):
         self.gwycontainer = Mock()
 
+    @patch('pygwyfile.gwyfile._own_gwyobject', autospec=True)
     @patch('pygwyfile.gwyfile.lib', autospec=True)
-    def test_args_of_libgwyfile_func_call(self, mock_lib):
+    def test_args_of_libgwyfile_func_call(self, mock_lib, mock_own):
         """ Call gwyfile_object_new C func to create empty GwyContainer"""
         mock_lib.gwyfile_object_new.side_effect = self._side_effect
+        mock_own.side_effect = lambda c_object: c_object
         gwycontainer = new_gwycontainer()
         self.assertEqual(gwycontainer, self.gwycontainer)
 
+    @patch('pygwyfile.gwyfile._own_gwyobject', autospec=True)
+    @patch('pygwyfile.gwyfile.lib', autospec=True)
+    def test_gwycontainer_is_owned_by_python(self, mock_lib, mock_own):
+        """ Free the new GwyContainer when it is garbage collected"""
+        gwycontainer = new_gwycontainer()
+        mock_own.assert_has_calls(
+            [call(mock_lib.gwyfile_object_new.return_value)])
+        self.assertEqual(gwycontainer, mock_own.return_value)
+
     def _side_effect(self, *args):
         """ First arg of lib.gwyfile_object_new is b"GwyContainer"
             Last arg of lib.gwyfile_object_new is ffi.NULL
@@ -497,6 +673,57 @@ class Func_new_gwycontainer(unittest.TestCase):
         return self.gwycontainer
 
 
+class Func_add_keepalive(unittest.TestCase):
+    """Test add_keepalive function"""
+
+    def test_keep_objects_alive(self):
+        """Objects live as long as the gwy object"""
+        class Borrowed:
+            pass
+
+        gwycontainer = new_gwycontainer()
+        borrowed = Borrowed()
+        ref = weakref.ref(borrowed)
+        add_keepalive(gwycontainer, [borrowed])
+        del borrowed
+        self.assertIsNotNone(ref())
+        del gwycontainer
+        gc.collect()
+        self.assertIsNone(ref())
+
+
+class Func_new_double_array_arg(unittest.TestCase):
+    """Test new_double_array_arg function"""
+
+    def test_borrow_array(self):
+        """Borrow C-contiguous float64 array"""
+        array = np.zeros((2, 3))
+        keepalive = []
+        c_name, c_data = new_double_array_arg("data", array, keepalive)
+        self.assertEqual(ffi.string(c_name), b"data(const)")
+        self.assertEqual(int(ffi.cast("uintptr_t", c_data)),
+                         array.ctypes.data)
+        self.assertEqual(keepalive, [array])
+
+    def test_copy_array(self):
+        """Let libgwyfile copy C-contiguous float64 array"""
+        array = np.zeros((2, 3))
+        c_name, c_data = new_double_array_arg("data", array)
+        self.assertEqual(ffi.string(c_name), b"data(copy)")
+        self.assertEqual(int(ffi.cast("uintptr_t", c_data)),
+                         array.ctypes.data)
+
+    def test_convert_array(self):
+        """Convert other arrays to C array consumed by libgwyfile"""
+        array = np.arange(6, dtype=np.int32).reshape((2, 3)).T
+        keepalive = []
+        c_name, c_data = new_double_array_arg("xdata", array, keepalive)
+        self.addCleanup(lib.free, c_data)
+        self.assertEqual(ffi.string(c_name), b"xdata")
+        self.assertEqual(list(c_data[0:6]), [0., 3., 1., 4., 2., 5.])
+        self.assertEqual(keepalive, [])
+
+
 class Func_add_gwyitem_to_gwycontainer(unittest.TestCase):
     """ Tests for add_gwyitem_to_gwycontainer function"""
     def setUp(self):
@@ -522,6 +749,23 @@ class Func_add_gwyitem_to_gwycontainer(unittest.TestCase):
                                                     self.gwycontainer)
         self.assertEqual(actual_return, self.is_added)
 
+    @patch('pygwyfile.gwyfile.lib', autospec=True)
+    def test_free_gwyitem_if_it_was_not_added(self, mock_lib):
+        """ Free gwyitem if it was not consumed by the container"""
+        self.is_added = False
+        mock_lib.gwyfile_object_add.side_effect = self._side_effect
+        add_gwyitem_to_gwycontainer(self.gwyitem, self.gwycontainer)
+        mock_lib.gwyfile_item_free.assert_has_calls(
+            [call(self.gwyitem)])
+
+    @patch('pygwyfile.gwyfile.lib', autospec=True)
+    def test_do_not_free_added_gwyitem(self, mock_lib):
+        """ Gwyitem added to the container is owned by the container"""
+        self.is_added = True
+        mock_lib.gwyfile_object_add.side_effect = self._side_effect
+        add_gwyitem_to_gwycontainer(self.gwyitem, self.gwycontainer)
+        mock_lib.gwyfile_item_free.assert_not_called()
+
     def _side_effect(self, *args):
         """ First arg is a GWY file data object
             Second arg is a Gwy file data item
@@ -565,6 +809,168 @@ class Func_write_gwycontainer_to_gwyfile(unittest.TestCase):
         return ffi.cast("bool", True)
 
 
+class Func_write_gwycontainer_to_bytes(unittest.TestCase):
+    """Tests for in-memory serialization of gwycontainer
+    and Gwyfile.from_bytes, from_fileobj, from_fd methods
+    """
+
+    def setUp(self):
+        self.gwycontainer = new_gwycontainer()
+        add_gwyitem_to_gwycontainer(
+            new_gwyitem_string("/0/data/title", "Title"),
+            self.gwycontainer)
+
+    def test_serialized_data(self):
+        """Return contents of gwy file with the exact size"""
+        data = write_gwycontainer_to_bytes(self.gwycontainer)
+        self.assertIsInstance(data, bytes)
+        self.assertTrue(data.startswith(b"GWYP"))
+        self.assertEqual(len(data),
+                         4 + lib.gwyfile_object_size(self.gwycontainer))
+
+    def test_size_before_writing(self):
+        """get_gwycontainer_size returns size of serialized data"""
+        size = get_gwycontainer_size(self.gwycontainer)
+        self.assertEqual(size,
+                         len(write_gwycontainer_to_bytes(self.gwycontainer)))
+
+    def test_from_bytes(self):
+        """Read gwyfile object serialized by write_gwycontainer_to_bytes"""
+        data = write_gwycontainer_to_bytes(self.gwycontainer)
+        gwyfile = Gwyfile.from_bytes(data)
+        self.assertEqual(gwyfile.get_gwyitem_string("/0/data/title"),
+                         "Title")
+
+    def test_fileobj_round_trip(self):
+        """Write gwycontainer to file object and read it back"""
+        fileobj = io.BytesIO()
+        write_gwycontainer_to_fileobj(self.gwycontainer, fileobj)
+        fileobj.seek(0)
+        gwyfile = Gwyfile.from_fileobj(fileobj)
+        self.assertEqual(gwyfile.get_gwyitem_string("/0/data/title"),
+                         "Title")
+
+    @patch('pygwyfile.gwyfile._WRITE_CHUNK_SIZE', 16)
+    def test_write_fileobj_in_chunks(self):
+        """Write file objects without fd in chunks of the buffer"""
+        fileobj = Mock(spec=io.BytesIO)
+        write_gwycontainer_to_fileobj(self.gwycontainer, fileobj)
+        size = get_gwycontainer_size(self.gwycontainer)
+        self.assertEqual(fileobj.write.call_count, -(-size // 16))
+        data = b''.join(bytes(args[0])
+                        for args, _ in fileobj.write.call_args_list)
+        self.assertEqual(data, write_gwycontainer_to_bytes(
+            self.gwycontainer))
+
+    def test_write_file_to_fd(self):
+        """Write files directly to their fd after buffered data"""
+        fd, filename = tempfile.mkstemp(suffix='.gwy')
+        os.close(fd)
+        self.addCleanup(os.remove, filename)
+        with open(filename, 'wb') as fileobj, \
+                patch('pygwyfile.gwyfile._write_gwycontainer_to_buffer') \
+                as mock_write_to_buffer:
+            fileobj.write(b'head')
+            write_gwycontainer_to_fileobj(self.gwycontainer, fileobj)
+            fileobj.write(b'tail')
+        mock_write_to_buffer.assert_not_called()
+        with open(filename, 'rb') as fileobj:
+            data = fileobj.read()
+        self.assertEqual(data,
+                         b'head'
+                         + write_gwycontainer_to_bytes(self.gwycontainer)
+                         + b'tail')
+
+    def test_write_file_at_position_after_reading(self):
+        """Write file opened for reading at the logical position"""
+        fd, filename = tempfile.mkstemp(suffix='.gwy')
+        os.close(fd)
+        self.addCleanup(os.remove, filename)
+        with open(filename, 'wb') as fileobj:
+            fileobj.write(b'0123456789')
+        with open(filename, 'r+b') as fileobj:
+            self.assertEqual(fileobj.read(2), b'01')
+            write_gwycontainer_to_fileobj(self.gwycontainer, fileobj)
+            size = get_gwycontainer_size(self.gwycontainer)
+            self.assertEqual(fileobj.tell(), 2 + size)
+        with open(filename, 'rb') as fileobj:
+            data = fileobj.read()
+        self.assertEqual(data[2:], write_gwycontainer_to_bytes(
+            self.gwycontainer))
+
+    def test_write_gzip_fileobj_through_fileobj(self):
+        """Data of wrapping file objects are not written to their fd"""
+        fd, filename = tempfile.mkstemp(suffix='.gwy.gz')
+        os.close(fd)
+        self.addCleanup(os.remove, filename)
+        with gzip.open(filename, 'wb') as fileobj:
+            write_gwycontainer_to_fileobj(self.gwycontainer, fileobj)
+        with gzip.open(filename, 'rb') as fileobj:
+            self.assertEqual(fileobj.read(), write_gwycontainer_to_bytes(
+                self.gwycontainer))
+
+    def test_fd_round_trip(self):
+        """Write gwycontainer to pipe and read it back, fds stay open"""
+        read_fd, write_fd = os.pipe()
+        self.addCleanup(os.close, read_fd)
+        write_gwycontainer_to_fd(self.gwycontainer, write_fd)
+        os.close(write_fd)
+        gwyfile = Gwyfile.from_fd(read_fd)
+        os.fstat(read_fd)
+        self.assertEqual(gwyfile.get_gwyitem_string("/0/data/title"),
+                         "Title")
+
+    def test_raise_GwyfileErrorCMsg_if_data_is_invalid(self):
+        """Raise GwyfileErrorCMsg if data is not a gwy file"""
+        data = write_gwycontainer_to_bytes(self.gwycontainer)
+        self.assertRaises(GwyfileErrorCMsg,
+                          Gwyfile.from_bytes,
+                          b"GWYO" + data[4:])
+        self.assertRaises(GwyfileErrorCMsg,
+                          Gwyfile.from_bytes,
+                          data[:-1])
+
+    def test_raise_GwyfileError_if_data_is_empty(self):
+        """Raise GwyfileError if data is empty"""
+        self.assertRaises(GwyfileError, Gwyfile.from_bytes, b"")
+
+
+class Func_write_gwyobject_items(unittest.TestCase):
+    """Tests for serialization of items without object header"""
+
+    def setUp(self):
+        self.gwycontainer = new_gwycontainer()
+        add_gwyitem_to_gwycontainer(
+            new_gwyitem_string("/0/data/title", "Title"),
+            self.gwycontainer)
+        add_gwyitem_to_gwycontainer(
+            new_gwyitem_bool("/0/data/visible", True),
+            self.gwycontainer)
+        self.file_data = write_gwycontainer_to_bytes(self.gwycontainer)
+
+    def test_items_to_bytes(self):
+        """Return items as in gwy file after the container header"""
+        data = write_gwyobject_items_to_bytes(self.gwycontainer)
+        self.assertEqual(data, self.file_data[21:])
+        self.assertEqual(len(data),
+                         get_gwyobject_items_size(self.gwycontainer))
+
+    def test_items_to_fd(self):
+        """Write items to pipe, fd stays open"""
+        read_fd, write_fd = os.pipe()
+        self.addCleanup(os.close, read_fd)
+        write_gwyobject_items_to_fd(self.gwycontainer, write_fd)
+        os.close(write_fd)
+        with os.fdopen(os.dup(read_fd), 'rb') as fileobj:
+            self.assertEqual(fileobj.read(), self.file_data[21:])
+
+    def test_empty_object(self):
+        """Return empty bytes if object has no items"""
+        gwycontainer = new_gwycontainer()
+        self.assertEqual(get_gwyobject_items_size(gwycontainer), 0)
+        self.assertEqual(write_gwyobject_items_to_bytes(gwycontainer), b"")
+
+
 class Func_new_gwyitem(unittest.TestCase):
     """ Tests for _new_gwyitem method of Gwyfile class"""
 
@@ -3,7 +3,7 @@ from unittest.mock import patch, call, Mock
 
 import numpy as np
 
-from pygwyfile._libgwyfile import ffi
+from pygwyfile._libgwyfile import ffi, lib
 from pygwyfile.gwyfile import GwyfileErrorCMsg
 from pygwyfile.gwygraph import GwyGraphCurve, GwyGraphModel
 
@@ -102,11 +102,13 @@ class GwyGraphModel_from_gwy(unittest.TestCase):
 
     @patch('pygwyfile.gwygraph.GwyGraphModel', autospec=True)
     @patch('pygwyfile.gwygraph.GwyGraphCurve', autospec=True)
+    @patch.object(GwyGraphModel, '_get_curves_meta')
     @patch.object(GwyGraphModel, '_get_curves')
     @patch.object(GwyGraphModel, '_get_meta')
     def test_arg_passing_to_other_methods(self,
                                           mock_get_meta,
                                           mock_get_curves,
+                                          mock_get_curves_meta,
                                           mock_GwyGraphCurve,
                                           mock_GwyGraphModel):
         """
@@ -114,12 +116,15 @@ class GwyGraphModel_from_gwy(unittest.TestCase):
         gwygraphmodel = Mock()
         test_meta = {'ncurves': 2}
         test_gwycurves = [Mock(), Mock()]
+        test_curves_meta = [{'ndata': 1}, {'ndata': 2}]
         mock_get_meta.return_value = test_meta
         mock_get_curves.return_value = test_gwycurves
+        mock_get_curves_meta.return_value = test_curves_meta
         graphmodel = Mock(spec=GwyGraphModel)
         mock_GwyGraphModel.return_value = graphmodel
 
-        graph = GwyGraphModel.from_gwy(gwygraphmodel)
+        owner = Mock()
+        graph = GwyGraphModel.from_gwy(gwygraphmodel, owner=owner)
 
         # get meta data from <GwyGraphModel*> object
         mock_get_meta.assert_has_calls(
@@ -129,9 +134,15 @@ class GwyGraphModel_from_gwy(unittest.TestCase):
         mock_get_curves.assert_has_calls(
             [call(gwygraphmodel, test_meta['ncurves'])])
 
+        # get metadata of all curves at once
+        mock_get_curves_meta.assert_has_calls(
+            [call(gwygraphmodel, test_meta['ncurves'])])
+
         # create list of GwyGraphCurves instances
         mock_GwyGraphCurve.from_gwy.assert_has_calls(
-            [call(gwycurve) for gwycurve in test_gwycurves])
+            [call(gwycurve, meta=curve_meta, owner=owner)
+             for gwycurve, curve_meta in zip(test_gwycurves,
+                                             test_curves_meta)])
 
         # create GwyGraphModel instance
         mock_GwyGraphModel.assert_has_calls(
@@ -155,27 +166,25 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         self.addCleanup(patcher_lib.stop)
         self.mock_lib = patcher_lib.start()
 
+        self.title = ffi.new("char[]", b"test title")
+        self.x_unit = ffi.new("char[]", b"m")
+
     def test_getting_number_of_curves(self):
         """
         Test getting number of curves from graphmodel object
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._get_number_of_curves)
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertEqual(meta['ncurves'], 3)
 
-    def _get_number_of_curves(self, *args):
+    def _get_number_of_curves(self, gwygraphmodel, c_meta, errorp):
         """
         Return 3 as a number of curves in graphmodel object
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
-        arg_dict['ncurves'][0] = 3
+        c_meta.ncurves = 3
 
         # C func returns true if the graphmodel object loock acceptable
         truep = ffi.new("bool*", True)
@@ -186,24 +195,46 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         'title' field in graphmodel object is not empty
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._title_is_not_empty)
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertEqual(meta['title'], "test title")
 
-    def _title_is_not_empty(self, *args):
+    def test_free_title_string(self):
         """
-        Write "test title" C string to title field
+        Free 'title' string newly allocated by libgwyfile
         """
 
-        title = ffi.new("char[]", b"test title")
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
+            self._title_is_not_empty)
+        GwyGraphModel._get_meta(self.gwygraphmodel)
+        self.assertEqual(
+            self.mock_lib.pygwyfile_graphmodel_meta_free.call_count, 1)
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
+    def test_do_not_free_empty_title(self):
+        """
+        Do not free NULL 'title' string
+        """
+
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
+            self._title_is_empty)
+        GwyGraphModel._get_meta(self.gwygraphmodel)
+        free = self.mock_lib.pygwyfile_graphmodel_meta_free
+        c_meta = free.call_args[0][0]
+        self.assertEqual(c_meta.title, ffi.NULL)
+
+        # the struct is freed by C function, which skips NULL strings
+        lib.pygwyfile_graphmodel_meta_free(c_meta)
+
+    def _title_is_not_empty(self, gwygraphmodel, c_meta, errorp):
+        """
+        Write "test title" C string to title field
+        """
+
+        # keep C string alive until it is read
+        self.title = ffi.new("char[]", b"test title")
 
-        arg_dict['title'][0] = title
+        c_meta.title = self.title
 
         # C func returns true if the graphmodel object loock acceptable
         truep = ffi.new("bool*", True)
@@ -214,22 +245,17 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         'title' field in graphmodel object is empty
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._title_is_empty)
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertEqual(meta['title'], '')
 
-    def _title_is_empty(self, *args):
+    def _title_is_empty(self, gwygraphmodel, c_meta, errorp):
         """
         Write NULL to title field
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
-        arg_dict['title'][0] = ffi.NULL
+        c_meta.title = ffi.NULL
 
         # C func returns true if the graphmodel object loock acceptable
         truep = ffi.new("bool*", True)
@@ -240,24 +266,20 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         'top_label' field in graphmodel object is not empty
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._top_label_is_not_empty)
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertEqual(meta['top_label'], "test top label")
 
-    def _top_label_is_not_empty(self, *args):
+    def _top_label_is_not_empty(self, gwygraphmodel, c_meta, errorp):
         """
         Write "test top label" C string to 'top_label' field
         """
 
-        top_label = ffi.new("char[]", b"test top label")
+        # keep C string alive until it is read
+        self.top_label = ffi.new("char[]", b"test top label")
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
-        arg_dict['top_label'][0] = top_label
+        c_meta.top_label = self.top_label
 
         # C func returns true if the graphmodel object loock acceptable
         truep = ffi.new("bool*", True)
@@ -268,22 +290,17 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         'top_label' field in graphmodel object is empty
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._top_label_is_empty)
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertEqual(meta['top_label'], '')
 
-    def _top_label_is_empty(self, *args):
+    def _top_label_is_empty(self, gwygraphmodel, c_meta, errorp):
         """
         Write NULL to top_label field
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
-        arg_dict['top_label'][0] = ffi.NULL
+        c_meta.top_label = ffi.NULL
 
         # C func returns true if the graphmodel object loock acceptable
         truep = ffi.new("bool*", True)
@@ -294,24 +311,20 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         'left_label' field in graphmodel object is not empty
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._left_label_is_not_empty)
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertEqual(meta['left_label'], "test left label")
 
-    def _left_label_is_not_empty(self, *args):
+    def _left_label_is_not_empty(self, gwygraphmodel, c_meta, errorp):
         """
         Write "test left label" C string to 'left_label' field
         """
 
-        left_label = ffi.new("char[]", b"test left label")
+        # keep C string alive until it is read
+        self.left_label = ffi.new("char[]", b"test left label")
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
-        arg_dict['left_label'][0] = left_label
+        c_meta.left_label = self.left_label
 
         # C func returns true if the graphmodel object loock acceptable
         truep = ffi.new("bool*", True)
@@ -322,22 +335,17 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         'left_label' field in graphmodel object is empty
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._left_label_is_empty)
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertEqual(meta['left_label'], '')
 
-    def _left_label_is_empty(self, *args):
+    def _left_label_is_empty(self, gwygraphmodel, c_meta, errorp):
         """
         Write NULL to left_label field
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
-        arg_dict['left_label'][0] = ffi.NULL
+        c_meta.left_label = ffi.NULL
 
         # C func returns true if the graphmodel object loock acceptable
         truep = ffi.new("bool*", True)
@@ -348,24 +356,20 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         'right_label' field in graphmodel object is not empty
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._right_label_is_not_empty)
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertEqual(meta['right_label'], "test right label")
 
-    def _right_label_is_not_empty(self, *args):
+    def _right_label_is_not_empty(self, gwygraphmodel, c_meta, errorp):
         """
         Write "test right label" C string to 'right_label' field
         """
 
-        right_label = ffi.new("char[]", b"test right label")
+        # keep C string alive until it is read
+        self.right_label = ffi.new("char[]", b"test right label")
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
-        arg_dict['right_label'][0] = right_label
+        c_meta.right_label = self.right_label
 
         # C func returns true if the graphmodel object loock acceptable
         truep = ffi.new("bool*", True)
@@ -376,22 +380,17 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         'right_label' field in graphmodel object is empty
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._right_label_is_empty)
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertEqual(meta['right_label'], '')
 
-    def _right_label_is_empty(self, *args):
+    def _right_label_is_empty(self, gwygraphmodel, c_meta, errorp):
         """
         Write NULL to right_label field
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
-        arg_dict['right_label'][0] = ffi.NULL
+        c_meta.right_label = ffi.NULL
 
         # C func returns true if the graphmodel object loock acceptable
         truep = ffi.new("bool*", True)
@@ -402,24 +401,20 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         'bottom_label' field in graphmodel object is not empty
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._bottom_label_is_not_empty)
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertEqual(meta['bottom_label'], "test bottom label")
 
-    def _bottom_label_is_not_empty(self, *args):
+    def _bottom_label_is_not_empty(self, gwygraphmodel, c_meta, errorp):
         """
         Write "test bottom label" C string to 'bottom_label' field
         """
 
-        bottom_label = ffi.new("char[]", b"test bottom label")
-
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
+        # keep C string alive until it is read
+        self.bottom_label = ffi.new("char[]", b"test bottom label")
 
-        arg_dict['bottom_label'][0] = bottom_label
+        c_meta.bottom_label = self.bottom_label
 
         # C func returns true if the graphmodel object loock acceptable
         truep = ffi.new("bool*", True)
@@ -430,22 +425,17 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         'bottom_label' field in graphmodel object is empty
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._bottom_label_is_empty)
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertEqual(meta['bottom_label'], '')
 
-    def _bottom_label_is_empty(self, *args):
+    def _bottom_label_is_empty(self, gwygraphmodel, c_meta, errorp):
         """
         Write NULL to bottom_label field
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
-        arg_dict['bottom_label'][0] = ffi.NULL
+        c_meta.bottom_label = ffi.NULL
 
         # C func returns true if the graphmodel object loock acceptable
         truep = ffi.new("bool*", True)
@@ -456,24 +446,20 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         'x_unit' field in graphmodel object is not empty
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._x_unit_is_not_empty)
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertEqual(meta['x_unit'], 'm')
 
-    def _x_unit_is_not_empty(self, *args):
+    def _x_unit_is_not_empty(self, gwygraphmodel, c_meta, errorp):
         """
         Write "m" C string to 'x_unit' field
         """
 
-        x_unit = ffi.new("char[]", b"m")
+        # keep C string alive until it is read
+        self.x_unit = ffi.new("char[]", b"m")
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
-        arg_dict['x_unit'][0] = x_unit
+        c_meta.x_unit = self.x_unit
 
         # C func returns true if the graphmodel object loock acceptable
         truep = ffi.new("bool*", True)
@@ -484,22 +470,17 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         'x_unit' field in graphmodel object is empty
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._x_unit_is_empty)
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertEqual(meta['x_unit'], '')
 
-    def _x_unit_is_empty(self, *args):
+    def _x_unit_is_empty(self, gwygraphmodel, c_meta, errorp):
         """
         Write NULL to x_unit field
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
-        arg_dict['x_unit'][0] = ffi.NULL
+        c_meta.x_unit = ffi.NULL
 
         # C func returns true if the graphmodel object loock acceptable
         truep = ffi.new("bool*", True)
@@ -510,24 +491,20 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         'y_unit' field in graphmodel object is not empty
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._y_unit_is_not_empty)
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertEqual(meta['y_unit'], 'm')
 
-    def _y_unit_is_not_empty(self, *args):
+    def _y_unit_is_not_empty(self, gwygraphmodel, c_meta, errorp):
         """
         Write "m" C string to 'y_unit' field
         """
 
-        y_unit = ffi.new("char[]", b"m")
-
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
+        # keep C string alive until it is read
+        self.y_unit = ffi.new("char[]", b"m")
 
-        arg_dict['y_unit'][0] = y_unit
+        c_meta.y_unit = self.y_unit
 
         # C func returns true if the graphmodel object loock acceptable
         truep = ffi.new("bool*", True)
@@ -538,22 +515,17 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         'y_unit' field in graphmodel object is empty
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._y_unit_is_empty)
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertEqual(meta['y_unit'], '')
 
-    def _y_unit_is_empty(self, *args):
+    def _y_unit_is_empty(self, gwygraphmodel, c_meta, errorp):
         """
         Write NULL to y_unit field
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
-        arg_dict['y_unit'][0] = ffi.NULL
+        c_meta.y_unit = ffi.NULL
 
         # C func returns true if the graphmodel object loock acceptable
         truep = ffi.new("bool*", True)
@@ -564,26 +536,21 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         Check metadata dictionary if 'x_min_set' is True
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._x_min_set_is_true)
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertIs(meta['x_min_set'], True)
         self.assertEqual(meta['x_min'], 0.)
 
-    def _x_min_set_is_true(self, *args):
+    def _x_min_set_is_true(self, gwygraphmodel, c_meta, errorp):
         """
         Write True in 'x_min_set' field and 0. in 'x_min' field
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
         truep = ffi.new("bool*", True)
 
-        arg_dict['x_min_set'][0] = truep[0]
-        arg_dict['x_min'][0] = 0.
+        c_meta.x_min_set = truep[0]
+        c_meta.x_min = 0.
 
         # C func returns true if the graphmodel object loock acceptable
         return truep[0]
@@ -593,27 +560,22 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         Check metadata dictionary if 'x_min_set' is False
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._x_min_set_is_false)
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertIs(meta['x_min_set'], False)
         self.assertIsNone(meta['x_min'])
 
-    def _x_min_set_is_false(self, *args):
+    def _x_min_set_is_false(self, gwygraphmodel, c_meta, errorp):
         """
         Write False in 'x_min_set' field and 0. in 'x_min' field
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
         truep = ffi.new("bool*", True)
         falsep = ffi.new("bool*", False)
 
-        arg_dict['x_min_set'][0] = falsep[0]
-        arg_dict['x_min'][0] = 0.
+        c_meta.x_min_set = falsep[0]
+        c_meta.x_min = 0.
 
         # C func returns true if the graphmodel object loock acceptable
         return truep[0]
@@ -623,26 +585,21 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         Check metadata dictionary if 'x_max_set' is True
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._x_max_set_is_true)
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertIs(meta['x_max_set'], True)
         self.assertEqual(meta['x_max'], 0.)
 
-    def _x_max_set_is_true(self, *args):
+    def _x_max_set_is_true(self, gwygraphmodel, c_meta, errorp):
         """
         Write True in 'x_max_set' field and 0. in 'x_max' field
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
         truep = ffi.new("bool*", True)
 
-        arg_dict['x_max_set'][0] = truep[0]
-        arg_dict['x_max'][0] = 0.
+        c_meta.x_max_set = truep[0]
+        c_meta.x_max = 0.
 
         # C func returns true if the graphmodel object loock acceptable
         return truep[0]
@@ -652,27 +609,22 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         Check metadata dictionary if 'x_max_set' is False
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._x_max_set_is_false)
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertIs(meta['x_max_set'], False)
         self.assertIsNone(meta['x_max'])
 
-    def _x_max_set_is_false(self, *args):
+    def _x_max_set_is_false(self, gwygraphmodel, c_meta, errorp):
         """
         Write False in 'x_max_set' field and 0. in 'x_max' field
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
         truep = ffi.new("bool*", True)
         falsep = ffi.new("bool*", False)
 
-        arg_dict['x_max_set'][0] = falsep[0]
-        arg_dict['x_max'][0] = 0.
+        c_meta.x_max_set = falsep[0]
+        c_meta.x_max = 0.
 
         # C func returns true if the graphmodel object loock acceptable
         return truep[0]
@@ -682,26 +634,21 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         Check metadata dictionary if 'y_min_set' is True
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._y_min_set_is_true)
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertIs(meta['y_min_set'], True)
         self.assertEqual(meta['y_min'], 0.)
 
-    def _y_min_set_is_true(self, *args):
+    def _y_min_set_is_true(self, gwygraphmodel, c_meta, errorp):
         """
         Write True in 'y_min_set' field and 0. in 'y_min' field
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
         truep = ffi.new("bool*", True)
 
-        arg_dict['y_min_set'][0] = truep[0]
-        arg_dict['y_min'][0] = 0.
+        c_meta.y_min_set = truep[0]
+        c_meta.y_min = 0.
 
         # C func returns true if the graphmodel object loock acceptable
         return truep[0]
@@ -711,27 +658,22 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         Check metadata dictionary if 'y_min_set' is False
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._y_min_set_is_false)
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertIs(meta['y_min_set'], False)
         self.assertIsNone(meta['y_min'])
 
-    def _y_min_set_is_false(self, *args):
+    def _y_min_set_is_false(self, gwygraphmodel, c_meta, errorp):
         """
         Write False in 'y_min_set' field and 0. in 'y_min' field
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
         truep = ffi.new("bool*", True)
         falsep = ffi.new("bool*", False)
 
-        arg_dict['y_min_set'][0] = falsep[0]
-        arg_dict['y_min'][0] = 0.
+        c_meta.y_min_set = falsep[0]
+        c_meta.y_min = 0.
 
         # C func returns true if the graphmodel object loock acceptable
         return truep[0]
@@ -741,26 +683,21 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         Check metadata dictionary if 'y_max_set' is True
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._y_max_set_is_true)
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertIs(meta['y_max_set'], True)
         self.assertEqual(meta['y_max'], 0.)
 
-    def _y_max_set_is_true(self, *args):
+    def _y_max_set_is_true(self, gwygraphmodel, c_meta, errorp):
         """
         Write True in 'y_max_set' field and 0. in 'y_max' field
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
         truep = ffi.new("bool*", True)
 
-        arg_dict['y_max_set'][0] = truep[0]
-        arg_dict['y_max'][0] = 0.
+        c_meta.y_max_set = truep[0]
+        c_meta.y_max = 0.
 
         # C func returns true if the graphmodel object loock acceptable
         return truep[0]
@@ -770,27 +707,22 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         Check metadata dictionary if 'y_max_set' is False
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._y_max_set_is_false)
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertIs(meta['y_max_set'], False)
         self.assertIsNone(meta['y_max'])
 
-    def _y_max_set_is_false(self, *args):
+    def _y_max_set_is_false(self, gwygraphmodel, c_meta, errorp):
         """
         Write False in 'y_max_set' field and 0. in 'y_max' field
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
         truep = ffi.new("bool*", True)
         falsep = ffi.new("bool*", False)
 
-        arg_dict['y_max_set'][0] = falsep[0]
-        arg_dict['y_max'][0] = 0.
+        c_meta.y_max_set = falsep[0]
+        c_meta.y_max = 0.
 
         # C func returns true if the graphmodel object loock acceptable
         return truep[0]
@@ -800,7 +732,7 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         'x_is_logarithmic' field is True
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._x_is_logarithmic)
 
         self.x_is_logarithmic = True
@@ -813,7 +745,7 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         'x_is_logarithmic' field is False
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._x_is_logarithmic)
 
         self.x_is_logarithmic = False
@@ -821,23 +753,18 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertIs(meta['x_is_logarithmic'], False)
 
-    def _x_is_logarithmic(self, *args):
+    def _x_is_logarithmic(self, gwygraphmodel, c_meta, errorp):
         """
         Write self.x_is_logarithmic in 'x_is_logarithmic' field
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
         truep = ffi.new("bool*", True)
         falsep = ffi.new("bool*", False)
 
         if self.x_is_logarithmic:
-            arg_dict['x_is_logarithmic'][0] = truep[0]
+            c_meta.x_is_logarithmic = truep[0]
         else:
-            arg_dict['x_is_logarithmic'][0] = falsep[0]
+            c_meta.x_is_logarithmic = falsep[0]
 
         # C func returns true if the graphmodel object loock acceptable
         return truep[0]
@@ -847,7 +774,7 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         'y_is_logarithmic' field is True
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._y_is_logarithmic)
 
         self.y_is_logarithmic = True
@@ -860,7 +787,7 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         'y_is_logarithmic' field is False
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._y_is_logarithmic)
 
         self.y_is_logarithmic = False
@@ -868,23 +795,18 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertIs(meta['y_is_logarithmic'], False)
 
-    def _y_is_logarithmic(self, *args):
+    def _y_is_logarithmic(self, gwygraphmodel, c_meta, errorp):
         """
         Write self.y_is_logarithmic in 'y_is_logarithmic' field
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
         truep = ffi.new("bool*", True)
         falsep = ffi.new("bool*", False)
 
         if self.y_is_logarithmic:
-            arg_dict['y_is_logarithmic'][0] = truep[0]
+            c_meta.y_is_logarithmic = truep[0]
         else:
-            arg_dict['y_is_logarithmic'][0] = falsep[0]
+            c_meta.y_is_logarithmic = falsep[0]
 
         # C func returns true if the graphmodel object loock acceptable
         return truep[0]
@@ -894,7 +816,7 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         'label.visible' field is True
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._label_visible)
 
         self.label_visible = True
@@ -907,7 +829,7 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         'label.visible' field is False
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._label_visible)
 
         self.label_visible = False
@@ -915,23 +837,18 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertIs(meta['label.visible'], False)
 
-    def _label_visible(self, *args):
+    def _label_visible(self, gwygraphmodel, c_meta, errorp):
         """
         Write self.label_visible in 'label.visible' field
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
         truep = ffi.new("bool*", True)
         falsep = ffi.new("bool*", False)
 
         if self.label_visible:
-            arg_dict['label.visible'][0] = truep[0]
+            c_meta.label_visible = truep[0]
         else:
-            arg_dict['label.visible'][0] = falsep[0]
+            c_meta.label_visible = falsep[0]
 
         # C func returns true if the graphmodel object loock acceptable
         return truep[0]
@@ -941,7 +858,7 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         'label.has_frame' field is True
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._label_has_frame)
 
         self.label_has_frame = True
@@ -954,7 +871,7 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         'label.has_frame' field is False
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._label_has_frame)
 
         self.label_has_frame = False
@@ -962,23 +879,18 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertIs(meta['label.has_frame'], False)
 
-    def _label_has_frame(self, *args):
+    def _label_has_frame(self, gwygraphmodel, c_meta, errorp):
         """
         Write self.label_has_frame in 'label.has_frame' field
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
         truep = ffi.new("bool*", True)
         falsep = ffi.new("bool*", False)
 
         if self.label_has_frame:
-            arg_dict['label.has_frame'][0] = truep[0]
+            c_meta.label_has_frame = truep[0]
         else:
-            arg_dict['label.has_frame'][0] = falsep[0]
+            c_meta.label_has_frame = falsep[0]
 
         # C func returns true if the graphmodel object loock acceptable
         return truep[0]
@@ -988,7 +900,7 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         'label.reverse' field is True
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._label_reverse)
 
         self.label_reverse = True
@@ -1001,7 +913,7 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         'label.reverse' field is False
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._label_reverse)
 
         self.label_reverse = False
@@ -1009,23 +921,18 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertIs(meta['label.reverse'], False)
 
-    def _label_reverse(self, *args):
+    def _label_reverse(self, gwygraphmodel, c_meta, errorp):
         """
         Write self.label_reverse in 'label.reverse' field
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
         truep = ffi.new("bool*", True)
         falsep = ffi.new("bool*", False)
 
         if self.label_reverse:
-            arg_dict['label.reverse'][0] = truep[0]
+            c_meta.label_reverse = truep[0]
         else:
-            arg_dict['label.reverse'][0] = falsep[0]
+            c_meta.label_reverse = falsep[0]
 
         # C func returns true if the graphmodel object loock acceptable
         return truep[0]
@@ -1035,7 +942,7 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         Check 'label.frame_thickness' field in metadata dictionary
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._label_frame_thickness)
 
         self.label_frame_thickness = 1
@@ -1044,17 +951,12 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         self.assertEqual(meta['label.frame_thickness'],
                          self.label_frame_thickness)
 
-    def _label_frame_thickness(self, *args):
+    def _label_frame_thickness(self, gwygraphmodel, c_meta, errorp):
         """
         Write self.label_frame_thickness in 'label.frame_thickness' field
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
-        arg_dict['label.frame_thickness'][0] = self.label_frame_thickness
+        c_meta.label_frame_thickness = self.label_frame_thickness
         # C func returns true if the graphmodel object loock acceptable
         truep = ffi.new("bool*", True)
         return truep[0]
@@ -1064,7 +966,7 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         Check 'label.position' field in metadata dictionary
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._label_position)
 
         self.label_position = 1
@@ -1072,17 +974,12 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertEqual(meta['label.position'], self.label_position)
 
-    def _label_position(self, *args):
+    def _label_position(self, gwygraphmodel, c_meta, errorp):
         """
         Write self.label_position in 'label.position' field
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
-        arg_dict['label.position'][0] = self.label_position
+        c_meta.label_position = self.label_position
         # C func returns true if the graphmodel object loock acceptable
         truep = ffi.new("bool*", True)
         return truep[0]
@@ -1092,7 +989,7 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         Check 'grid-type' field in metadata dictionary
         """
 
-        self.mock_lib.gwyfile_object_graphmodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
             self._grid_type)
 
         self.grid_type = 1
@@ -1100,34 +997,146 @@ class GwyGraphModel_get_meta(unittest.TestCase):
         meta = GwyGraphModel._get_meta(self.gwygraphmodel)
         self.assertEqual(meta['grid-type'], self.grid_type)
 
-    def _grid_type(self, *args):
+    def _grid_type(self, gwygraphmodel, c_meta, errorp):
         """
         Write self.grid_type in 'grid-type' field
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
-        arg_dict['grid-type'][0] = self.grid_type
+        c_meta.grid_type = self.grid_type
 
         # C func returns true if the graphmodel object loock acceptable
         truep = ffi.new("bool*", True)
         return truep[0]
 
-    def test_raise_exception_if_graphmodel_object_looks_unacceptable(self):
+    def test_raise_exception_if_graphmodel_looks_unacceptable(self):
         """
-        Raise GwyfileErrorCMsg if gwyfile_object_graphmodel_get returns False
+        Raise GwyfileErrorCMsg if pygwyfile_graphmodel_get_meta
+        returns False
         """
 
         falsep = ffi.new("bool*", False)
-        self.mock_lib.gwyfile_object_graphmodel_get.return_value = (
+        self.mock_lib.pygwyfile_graphmodel_get_meta.return_value = (
             falsep[0])
         self.assertRaises(GwyfileErrorCMsg,
-                          GwyGraphModel.from_gwy,
+                          GwyGraphModel._get_meta,
                           self.gwygraphmodel)
 
+    def test_args_of_libgwyfile_func_call(self):
+        """
+        Pass graphmodel object, metadata struct and error to C function
+        """
+
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
+            self._check_args)
+        GwyGraphModel._get_meta(self.gwygraphmodel)
+
+    def _check_args(self, gwygraphmodel, c_meta, errorp):
+        self.assertEqual(gwygraphmodel, self.gwygraphmodel)
+        self.assertEqual(ffi.typeof(c_meta),
+                         ffi.typeof("PygwyfileGraphModelMeta*"))
+        self.assertEqual(ffi.typeof(errorp),
+                         ffi.typeof("GwyfileError**"))
+        truep = ffi.new("bool*", True)
+        return truep[0]
+
+    def test_returned_metadata(self):
+        """
+        Return metadata dictionary with values from the struct
+        """
+
+        self.mock_lib.pygwyfile_graphmodel_get_meta.side_effect = (
+            self._fill_meta)
+        meta = GwyGraphModel._get_meta(self.gwygraphmodel)
+        self.assertDictEqual(meta,
+                             {'ncurves': 3,
+                              'title': 'test title',
+                              'top_label': '',
+                              'left_label': '',
+                              'right_label': '',
+                              'bottom_label': '',
+                              'x_unit': 'm',
+                              'y_unit': '',
+                              'x_min': 0.,
+                              'x_min_set': True,
+                              'x_max': None,
+                              'x_max_set': False,
+                              'y_min': None,
+                              'y_min_set': False,
+                              'y_max': 2.,
+                              'y_max_set': True,
+                              'x_is_logarithmic': False,
+                              'y_is_logarithmic': True,
+                              'label.visible': True,
+                              'label.has_frame': False,
+                              'label.reverse': True,
+                              'label.frame_thickness': 1,
+                              'label.position': 2,
+                              'grid-type': 1})
+
+    def _fill_meta(self, gwygraphmodel, c_meta, errorp):
+        c_meta.ncurves = 3
+        c_meta.title = self.title
+        c_meta.x_unit = self.x_unit
+        c_meta.x_min = 0.
+        c_meta.x_min_set = True
+        c_meta.x_max = 1.
+        c_meta.y_max = 2.
+        c_meta.y_max_set = True
+        c_meta.y_is_logarithmic = True
+        c_meta.label_visible = True
+        c_meta.label_reverse = True
+        c_meta.label_frame_thickness = 1
+        c_meta.label_position = 2
+        c_meta.grid_type = 1
+        truep = ffi.new("bool*", True)
+        return truep[0]
+
+
+class GwyGraphModel_get_curves_meta(unittest.TestCase):
+    """Test _get_curves_meta method of GwyGraphModel class
+    """
+
+    def setUp(self):
+        curves = [GwyGraphCurve(np.random.rand(2, n),
+                                meta={'description': 'curve {:d}'.format(n)})
+                  for n in (3, 4)]
+        self.gwygraphmodel = GwyGraphModel(curves).to_gwy()
+        self.addCleanup(lib.gwyfile_object_free, self.gwygraphmodel)
+
+    def test_metadata_of_all_curves(self):
+        """
+        Return metadata of all curves
+        """
+
+        curves_meta = GwyGraphModel._get_curves_meta(self.gwygraphmodel, 2)
+        self.assertEqual([meta['ndata'] for meta in curves_meta], [3, 4])
+        self.assertEqual([meta['description'] for meta in curves_meta],
+                         ['curve 3', 'curve 4'])
+
+    def test_no_curves(self):
+        """
+        Return empty list if there are no curves
+        """
+
+        self.assertEqual(
+            GwyGraphModel._get_curves_meta(self.gwygraphmodel, 0), [])
+
+    @patch('pygwyfile.gwygraph.lib', autospec=True)
+    def test_raise_exception_if_graphmodel_looks_unacceptable(self,
+                                                              mock_lib):
+        """
+        Raise GwyfileErrorCMsg if pygwyfile_graphmodel_get_curves_meta
+        returns False
+        """
+
+        falsep = ffi.new("bool*", False)
+        mock_lib.pygwyfile_graphmodel_get_curves_meta.return_value = (
+            falsep[0])
+        self.assertRaises(GwyfileErrorCMsg,
+                          GwyGraphModel._get_curves_meta,
+                          self.gwygraphmodel,
+                          2)
+
 
 class GwyGraphModel_get_curves(unittest.TestCase):
     """
@@ -1223,6 +1232,15 @@ class GwyGraphModel_to_gwy(unittest.TestCase):
         self.gwygraphmodel.to_gwy = GwyGraphModel.to_gwy
         self.expected_return = Mock()
 
+    @patch('pygwyfile.gwygraph.lib', autospec=True)
+    def test_graph_without_curves(self, mock_lib):
+        """ Do not pass curves array if there are no curves """
+        self.gwygraphmodel.curves = []
+        self.gwygraphmodel.to_gwy(self.gwygraphmodel)
+        args = mock_lib.gwyfile_object_new_graphmodel.call_args[0]
+        self.assertEqual(int(args[0]), 0)
+        self.assertEqual(ffi.string(args[1]), b"title")
+
     @patch('pygwyfile.gwygraph.lib', autospec=True)
     def test_args_of_libgwyfile_func(self, mock_lib):
         """ Test args of gwyfile_object_new_graphmodel """
@@ -1320,5 +1338,16 @@ class GwyGraphModel_to_gwy(unittest.TestCase):
         return self.expected_return
 
 
+class GwyGraphModel_nbytes(unittest.TestCase):
+    """Test nbytes method of GwyGraphModel class"""
+
+    def test_size_of_all_curves(self):
+        """Return sum of sizes of curve data arrays"""
+        curves = [GwyGraphCurve(np.zeros((2, 10))),
+                  GwyGraphCurve(np.zeros((2, 5)))]
+        self.assertEqual(curves[0].nbytes(), 160)
+        self.assertEqual(GwyGraphModel(curves).nbytes(), 240)
+
+
 if __name__ == '__main__':
     unittest.main()
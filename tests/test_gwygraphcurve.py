@@ -3,7 +3,7 @@ from unittest.mock import patch, call, Mock
 
 import numpy as np
 
-from pygwyfile._libgwyfile import ffi
+from pygwyfile._libgwyfile import ffi, lib
 from pygwyfile.gwyfile import GwyfileErrorCMsg
 from pygwyfile.gwygraph import GwyGraphCurve
 
@@ -31,6 +31,77 @@ class GwyGraphCurve_init(unittest.TestCase):
         np.testing.assert_almost_equal(gwycurve.data, self.test_data)
         self.assertDictEqual(gwycurve.meta, self.test_meta)
 
+    def test_rows_of_data_are_not_copied(self):
+        """xdata and ydata are views of the rows of data
+        """
+        gwycurve = GwyGraphCurve(data=self.test_data)
+        self.assertTrue(np.shares_memory(gwycurve.xdata, self.test_data[0]))
+        self.assertTrue(np.shares_memory(gwycurve.ydata, self.test_data[1]))
+
+    def test_set_data(self):
+        """Assigning data replaces xdata, ydata and ndata
+        """
+        gwycurve = GwyGraphCurve(data=self.test_data)
+        new_data = np.random.rand(2, 10)
+        gwycurve.data = new_data
+        self.assertTrue(np.shares_memory(gwycurve.xdata, new_data[0]))
+        np.testing.assert_equal(gwycurve.ydata, new_data[1])
+        np.testing.assert_equal(gwycurve.data, new_data)
+        self.assertEqual(gwycurve.meta['ndata'], 10)
+
+    def test_raise_ValueError_if_set_data_shape_is_wrong(self):
+        """Raise ValueError if assigned data is not of shape (2, ndata)
+        """
+        gwycurve = GwyGraphCurve(data=self.test_data)
+        with self.assertRaises(ValueError):
+            gwycurve.data = np.zeros((3, 10))
+        self.assertIs(gwycurve.xdata.base, self.test_data)
+
+    def test_data_is_a_copy(self):
+        """Changes of the stacked data do not change xdata
+        """
+        gwycurve = GwyGraphCurve(data=self.test_data)
+        gwycurve.data[0][0] = -1.
+        self.assertEqual(gwycurve.xdata[0], self.test_data[0, 0])
+
+    def test_init_with_xdata_and_ydata(self):
+        """xdata and ydata are kept as they are
+        """
+        xdata = np.arange(256, dtype=np.float32)
+        ydata = self.test_data[:, ::2].ravel()
+        gwycurve = GwyGraphCurve(xdata=xdata, ydata=ydata,
+                                 meta=self.test_meta)
+        self.assertIs(gwycurve.xdata, xdata)
+        self.assertIs(gwycurve.ydata, ydata)
+        self.assertEqual(gwycurve.meta['ndata'], 256)
+        np.testing.assert_equal(gwycurve.data, np.stack((xdata, ydata)))
+
+    def test_raise_ValueError_if_data_and_xdata_are_given(self):
+        """Raise ValueError if data is given with xdata and ydata
+           or if neither of them is given
+        """
+        self.assertRaises(ValueError,
+                          GwyGraphCurve,
+                          data=self.test_data,
+                          xdata=self.test_data[0],
+                          ydata=self.test_data[1])
+        self.assertRaises(ValueError,
+                          GwyGraphCurve,
+                          xdata=self.test_data[0])
+
+    def test_raise_ValueError_if_xdata_and_ydata_sizes_differ(self):
+        """Raise ValueError if xdata and ydata are not 1D arrays
+           of the same size
+        """
+        self.assertRaises(ValueError,
+                          GwyGraphCurve,
+                          xdata=self.test_data[0],
+                          ydata=self.test_data[1, :10])
+        self.assertRaises(ValueError,
+                          GwyGraphCurve,
+                          xdata=self.test_data,
+                          ydata=self.test_data)
+
     def test_init_with_empty_meta(self):
         """Test __init__ with empty meta arg
         """
@@ -86,16 +157,19 @@ class GwyGraphCurve_from_gwy(unittest.TestCase):
         test_meta = {'ndata': 256,
                      'description': "Curve label",
                      'type': 1}
-        test_data = np.random.rand(2, 256)
+        xdata = np.random.rand(256)
+        ydata = np.random.rand(256)
+        owner = Mock()
         mock_get_meta.return_value = test_meta
-        mock_get_data.return_value = test_data
-        gwycurve = GwyGraphCurve.from_gwy(cgwycurve)
+        mock_get_data.return_value = (xdata, ydata)
+        gwycurve = GwyGraphCurve.from_gwy(cgwycurve, owner=owner)
         mock_get_meta.assert_has_calls(
             [call(cgwycurve)])
         mock_get_data.assert_has_calls(
-            [call(cgwycurve, test_meta['ndata'])])
-        self.assertEqual(gwycurve, mock_GwyGraphCurve(data=test_data,
-                                                      meta=test_meta))
+            [call(cgwycurve, test_meta['ndata'], owner=owner)])
+        mock_GwyGraphCurve.assert_has_calls(
+            [call(xdata=xdata, ydata=ydata, meta=test_meta)])
+        self.assertEqual(gwycurve, mock_GwyGraphCurve.return_value)
 
 
 class GwyGraphCurve_get_meta(unittest.TestCase):
@@ -120,47 +194,67 @@ class GwyGraphCurve_get_meta(unittest.TestCase):
         self.color_red = 0.1
         self.color_green = 0.2
         self.color_blue = 0.3
+        self.test_meta = {'ndata': self.ndata,
+                          'description': self.description,
+                          'type': self.curve_type,
+                          'point_type': self.point_type,
+                          'line_style': self.line_style,
+                          'point_size': self.point_size,
+                          'line_size': self.line_size,
+                          'color.red': self.color_red,
+                          'color.green': self.color_green,
+                          'color.blue': self.color_blue}
 
     def test_raise_exception_if_graphcurvemodel_looks_unacceptable(self):
         """
-        Raise GwyfileErrorCMsg if GwyGraphCurveModel looks unacceptable
+        Raise GwyfileErrorCMsg if pygwyfile_graphcurve_get_meta
+        returns False
         """
 
         falsep = ffi.new("bool*", False)
-        self.mock_lib.gwyfile_object_graphcurvemodel_get.return_value = (
+        self.mock_lib.pygwyfile_graphcurve_get_meta.return_value = (
             falsep[0])
         self.assertRaises(GwyfileErrorCMsg,
                           GwyGraphCurve._get_meta,
                           self.gwycurve)
 
-    def test_positional_args_of_libgwyfile_func_call(self):
+    def test_args_of_libgwyfile_func_call(self):
         """
-        Test positional args in gwyfile_object_graphcurvemodel_get call
-
-        First arg is GwyGraphCurveModel*
-        Second arg is GwyfileError**
-        Last arg is NULL
+        Pass curve object, metadata struct and error to C function
         """
 
-        self.mock_lib.gwyfile_object_graphcurvemodel_get.side_effect = (
-            self._positional_args_side_effect)
+        self.mock_lib.pygwyfile_graphcurve_get_meta.side_effect = (
+            self._check_args)
         GwyGraphCurve._get_meta(self.gwycurve)
 
-    def _positional_args_side_effect(self, *args):
+    def _check_args(self, gwycurve, c_meta, errorp):
+        self.assertEqual(gwycurve, self.gwycurve)
+        self.assertEqual(ffi.typeof(c_meta),
+                         ffi.typeof("PygwyfileGraphCurveMeta*"))
+        self.assertEqual(ffi.typeof(errorp),
+                         ffi.typeof("GwyfileError**"))
+        truep = ffi.new("bool*", True)
+        return truep[0]
+
+    def test_returned_metadata(self):
         """
-        Check positional args in gwyfile_object_graphcurvemodel_get call
+        Return metadata dictionary and free the description string
         """
 
-        # first arg is GwyGraphCurveModel
-        self.assertEqual(args[0], self.gwycurve)
-
-        # second arg is GwyfileError**
-        assert ffi.typeof(args[1]) == ffi.typeof(ffi.new("GwyfileError**"))
-
-        # last arg in Null
-        self.assertEqual(args[-1], ffi.NULL)
-
-        # C func returns true if the graphcurvemodel object loock acceptable
+        self.mock_lib.pygwyfile_graphcurve_get_meta.side_effect = (
+            self._fill_meta)
+        meta = GwyGraphCurve._get_meta(self.gwycurve)
+        self.assertDictEqual(meta, self.test_meta)
+        self.assertEqual(
+            self.mock_lib.pygwyfile_graphcurve_meta_free.call_count, 1)
+
+    def _fill_meta(self, gwycurve, c_meta, errorp):
+        for key, value in self.test_meta.items():
+            if key == 'description':
+                self.c_description = ffi.new("char[]", value.encode('utf-8'))
+                c_meta.description = self.c_description
+            else:
+                setattr(c_meta, key.replace('.', '_'), value)
         truep = ffi.new("bool*", True)
         return truep[0]
 
@@ -169,22 +263,17 @@ class GwyGraphCurve_get_meta(unittest.TestCase):
         Test getting 'ndata' field from GwyGraphCurveModel object
         """
 
-        self.mock_lib.gwyfile_object_graphcurvemodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphcurve_get_meta.side_effect = (
             self._getting_number_of_points_side_effect)
         meta = GwyGraphCurve._get_meta(self.gwycurve)
         self.assertEqual(meta['ndata'], self.ndata)
 
-    def _getting_number_of_points_side_effect(self, *args):
+    def _getting_number_of_points_side_effect(self, gwycurve, c_meta, errorp):
         """
         Write self.ndata in 'ndata' field and return True
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
-        arg_dict['ndata'][0] = self.ndata
+        c_meta.ndata = self.ndata
 
         # C func returns true if the graphcurvemodel object loock acceptable
         truep = ffi.new("bool*", True)
@@ -195,23 +284,22 @@ class GwyGraphCurve_get_meta(unittest.TestCase):
         Test getting 'description' field from GwyGraphCurveModel object
         """
 
-        self.mock_lib.gwyfile_object_graphcurvemodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphcurve_get_meta.side_effect = (
             self._getting_description_of_curve)
         meta = GwyGraphCurve._get_meta(self.gwycurve)
         self.assertEqual(meta['description'], self.description)
+        self.assertEqual(
+            self.mock_lib.pygwyfile_graphcurve_meta_free.call_count, 1)
 
-    def _getting_description_of_curve(self, *args):
+    def _getting_description_of_curve(self, gwycurve, c_meta, errorp):
         """
         Write self.description in 'description' field and return True
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
-        arg_dict['description'][0] = ffi.new("char[]",
-                                             self.description.encode('utf-8'))
+        # keep C string alive until it is read
+        self.c_description = ffi.new("char[]",
+                                     self.description.encode('utf-8'))
+        c_meta.description = self.c_description
 
         # C func returns true if the graphcurvemodel object loock acceptable
         truep = ffi.new("bool*", True)
@@ -222,22 +310,23 @@ class GwyGraphCurve_get_meta(unittest.TestCase):
         Test getting NULL in 'description' field from GwyGraphCurveModel
         """
 
-        self.mock_lib.gwyfile_object_graphcurvemodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphcurve_get_meta.side_effect = (
             self._getting_null_description_of_curve)
         meta = GwyGraphCurve._get_meta(self.gwycurve)
         self.assertEqual(meta['description'], '')
+        free = self.mock_lib.pygwyfile_graphcurve_meta_free
+        c_meta = free.call_args[0][0]
+        self.assertEqual(c_meta.description, ffi.NULL)
+
+        # the struct is freed by C function, which skips NULL strings
+        lib.pygwyfile_graphcurve_meta_free(c_meta)
 
-    def _getting_null_description_of_curve(self, *args):
+    def _getting_null_description_of_curve(self, gwycurve, c_meta, errorp):
         """
         Write Null in 'description' field and return True
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
-        arg_dict['description'][0] = ffi.NULL
+        c_meta.description = ffi.NULL
 
         # C func returns true if the graphcurvemodel object loock acceptable
         truep = ffi.new("bool*", True)
@@ -248,22 +337,17 @@ class GwyGraphCurve_get_meta(unittest.TestCase):
         Test getting 'type' field from GwyGraphCurveModel
         """
 
-        self.mock_lib.gwyfile_object_graphcurvemodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphcurve_get_meta.side_effect = (
             self._getting_type_of_curve_side_effect)
         meta = GwyGraphCurve._get_meta(self.gwycurve)
         self.assertEqual(meta['type'], self.curve_type)
 
-    def _getting_type_of_curve_side_effect(self, *args):
+    def _getting_type_of_curve_side_effect(self, gwycurve, c_meta, errorp):
         """
         Write self.curve_type in 'type' field and return True
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
-        arg_dict['type'][0] = self.curve_type
+        c_meta.type = self.curve_type
 
         # C func returns true if the graphcurvemodel object loock acceptable
         truep = ffi.new("bool*", True)
@@ -274,22 +358,17 @@ class GwyGraphCurve_get_meta(unittest.TestCase):
         Test getting 'point_type' field from GwyGraphCurveModel
         """
 
-        self.mock_lib.gwyfile_object_graphcurvemodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphcurve_get_meta.side_effect = (
             self._getting_point_type_side_effect)
         meta = GwyGraphCurve._get_meta(self.gwycurve)
         self.assertEqual(meta['point_type'], self.point_type)
 
-    def _getting_point_type_side_effect(self, *args):
+    def _getting_point_type_side_effect(self, gwycurve, c_meta, errorp):
         """
         Write self.point_type in 'point_type' field and return True
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
-        arg_dict['point_type'][0] = self.point_type
+        c_meta.point_type = self.point_type
 
         # C func returns true if the graphcurvemodel object loock acceptable
         truep = ffi.new("bool*", True)
@@ -300,22 +379,17 @@ class GwyGraphCurve_get_meta(unittest.TestCase):
         Test getting 'line_style' field from GwyGraphCurveModel
         """
 
-        self.mock_lib.gwyfile_object_graphcurvemodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphcurve_get_meta.side_effect = (
             self._getting_line_style_side_effect)
         meta = GwyGraphCurve._get_meta(self.gwycurve)
         self.assertEqual(meta['line_style'], self.line_style)
 
-    def _getting_line_style_side_effect(self, *args):
+    def _getting_line_style_side_effect(self, gwycurve, c_meta, errorp):
         """
         Write self.line_style in 'line_style' field and return True
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
-        arg_dict['line_style'][0] = self.line_style
+        c_meta.line_style = self.line_style
 
         # C func returns true if the graphcurvemodel object loock acceptable
         truep = ffi.new("bool*", True)
@@ -326,22 +400,17 @@ class GwyGraphCurve_get_meta(unittest.TestCase):
         Test getting 'point_size' field from GwyGraphCurveModel
         """
 
-        self.mock_lib.gwyfile_object_graphcurvemodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphcurve_get_meta.side_effect = (
             self._getting_point_size_side_effect)
         meta = GwyGraphCurve._get_meta(self.gwycurve)
         self.assertEqual(meta['point_size'], self.point_size)
 
-    def _getting_point_size_side_effect(self, *args):
+    def _getting_point_size_side_effect(self, gwycurve, c_meta, errorp):
         """
         Write self.point_size in 'point_size' field and return True
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
-        arg_dict['point_size'][0] = self.point_size
+        c_meta.point_size = self.point_size
 
         # C func returns true if the graphcurvemodel object loock acceptable
         truep = ffi.new("bool*", True)
@@ -352,22 +421,17 @@ class GwyGraphCurve_get_meta(unittest.TestCase):
         Test getting 'line_size' field from GwyGraphCurveModel
         """
 
-        self.mock_lib.gwyfile_object_graphcurvemodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphcurve_get_meta.side_effect = (
             self._getting_line_size_side_effect)
         meta = GwyGraphCurve._get_meta(self.gwycurve)
         self.assertEqual(meta['line_size'], self.point_size)
 
-    def _getting_line_size_side_effect(self, *args):
+    def _getting_line_size_side_effect(self, gwycurve, c_meta, errorp):
         """
         Write self.line_size in 'line_size' field and return True
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
-        arg_dict['line_size'][0] = self.line_size
+        c_meta.line_size = self.line_size
 
         # C func returns true if the graphcurvemodel object loock acceptable
         truep = ffi.new("bool*", True)
@@ -378,27 +442,22 @@ class GwyGraphCurve_get_meta(unittest.TestCase):
         Test getting 'color.red', 'color.green', 'color.blue' fields
         """
 
-        self.mock_lib.gwyfile_object_graphcurvemodel_get.side_effect = (
+        self.mock_lib.pygwyfile_graphcurve_get_meta.side_effect = (
             self._getting_color_side_effect)
         meta = GwyGraphCurve._get_meta(self.gwycurve)
         self.assertEqual(meta['color.red'], self.color_red)
         self.assertEqual(meta['color.green'], self.color_green)
         self.assertEqual(meta['color.blue'], self.color_blue)
 
-    def _getting_color_side_effect(self, *args):
+    def _getting_color_side_effect(self, gwycurve, c_meta, errorp):
         """
         Write self.color_red, self.color_green, self.color_blue in
         'color.red', 'color.green', 'color.blue' fields and return True
         """
 
-        # combine fields names and fields pointers in one dictionary
-        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
-        arg_pointers = [pointer for pointer in args[3:-1:2]]
-        arg_dict = dict(zip(arg_keys, arg_pointers))
-
-        arg_dict['color.red'][0] = self.color_red
-        arg_dict['color.green'][0] = self.color_green
-        arg_dict['color.blue'][0] = self.color_blue
+        c_meta.color_red = self.color_red
+        c_meta.color_green = self.color_green
+        c_meta.color_blue = self.color_blue
 
         # C func returns true if the graphcurvemodel object loock acceptable
         truep = ffi.new("bool*", True)
@@ -473,9 +532,38 @@ class GwyGraphCurve_get_data(unittest.TestCase):
         self.mock_lib.gwyfile_object_graphcurvemodel_get.side_effect = (
             self._returned_value_side_effect)
 
-        data = GwyGraphCurve._get_data(self.gwycurve, self.npoints)
-        np.testing.assert_almost_equal(self.xdata, data[0])
-        np.testing.assert_almost_equal(self.ydata, data[1])
+        xdata, ydata = GwyGraphCurve._get_data(self.gwycurve, self.npoints)
+        np.testing.assert_equal(xdata, self.xdata)
+        np.testing.assert_equal(ydata, self.ydata)
+        self.assertFalse(np.shares_memory(xdata, self.xdata))
+        self.assertFalse(np.shares_memory(ydata, self.ydata))
+
+    def test_returned_views_of_owner(self):
+        """
+        Return arrays created by owner.view_double_array if owner is given
+        """
+        self.mock_lib.gwyfile_object_graphcurvemodel_get.side_effect = (
+            self._returned_value_side_effect)
+        owner = Mock()
+        owner.view_double_array.side_effect = [Mock(), Mock()]
+        xdata, ydata = GwyGraphCurve._get_data(self.gwycurve, self.npoints,
+                                               owner=owner)
+        owner.view_double_array.assert_has_calls(
+            [call(ffi.cast("double*", self.xdata.ctypes.data),
+                  (self.npoints,)),
+             call(ffi.cast("double*", self.ydata.ctypes.data),
+                  (self.npoints,))])
+        self.assertIsNot(xdata, ydata)
+
+    def test_curve_without_points(self):
+        """
+        Return empty arrays if the curve has no points
+        """
+        self.mock_lib.gwyfile_object_graphcurvemodel_get.side_effect = (
+            self._positional_args_side_effect)
+        xdata, ydata = GwyGraphCurve._get_data(self.gwycurve, 0)
+        self.assertEqual(xdata.shape, (0,))
+        self.assertEqual(ydata.shape, (0,))
 
     def _returned_value_side_effect(self, *args):
         """
@@ -518,12 +606,12 @@ class GwyGraphCurve_to_gwy(unittest.TestCase):
 
     def _side_effect(self, *args):
         self.assertEqual(int(args[0]), self.ndata)
-        self.assertEqual(ffi.string(args[1]), b"xdata")
+        self.assertEqual(ffi.string(args[1]), b"xdata(copy)")
         self.assertEqual(args[2], ffi.cast("double*",
-                                           self.curve.data[0].ctypes.data))
-        self.assertEqual(ffi.string(args[3]), b"ydata")
+                                           self.data[0].ctypes.data))
+        self.assertEqual(ffi.string(args[3]), b"ydata(copy)")
         self.assertEqual(args[4], ffi.cast("double*",
-                                           self.curve.data[1].ctypes.data))
+                                           self.data[1].ctypes.data))
         self.assertEqual(ffi.string(args[5]), b"description")
         self.assertEqual(ffi.string(args[6]), self.description.encode('utf-8'))
         self.assertEqual(ffi.string(args[7]), b"type")
@@ -546,5 +634,56 @@ class GwyGraphCurve_to_gwy(unittest.TestCase):
         return self.gwycurve
 
 
+class GwyGraphCurve_round_trip(unittest.TestCase):
+    """Test writing and reading of GwyGraphCurve data"""
+
+    def test_convert_strided_and_float32_data(self):
+        """Strided and float32 data are converted on write
+        """
+        xdata = np.arange(10, dtype=np.float32)
+        ydata = np.random.rand(20)[::2]
+        for keepalive in (None, []):
+            curve = GwyGraphCurve(xdata=xdata, ydata=ydata)
+            curve = GwyGraphCurve.from_gwy(curve.to_gwy(keepalive))
+            np.testing.assert_equal(curve.xdata, xdata)
+            np.testing.assert_equal(curve.ydata, ydata)
+            self.assertEqual(curve.xdata.dtype, np.float64)
+
+    def test_write_replaced_data(self):
+        """Number of points is taken from replaced xdata and ydata
+        """
+        curve = GwyGraphCurve(np.random.rand(2, 3))
+        curve.xdata = np.arange(5.)
+        curve.ydata = np.arange(5.) * 2
+        curve = GwyGraphCurve.from_gwy(curve.to_gwy())
+        np.testing.assert_equal(curve.ydata, np.arange(5.) * 2)
+        self.assertEqual(curve.meta['ndata'], 5)
+
+    def test_raise_ValueError_if_data_sizes_differ(self):
+        """Raise ValueError if ydata is replaced by array of other size
+        """
+        curve = GwyGraphCurve(np.random.rand(2, 3))
+        curve.ydata = np.arange(1.)
+        self.assertRaises(ValueError, curve.to_gwy)
+        curve.ydata = np.zeros((3, 1))
+        self.assertRaises(ValueError, curve.to_gwy)
+
+    def test_borrow_contiguous_data(self):
+        """Contiguous float64 data are borrowed
+        """
+        curve = GwyGraphCurve(np.random.rand(2, 10))
+        keepalive = []
+        curve.to_gwy(keepalive)
+        self.assertIs(keepalive[0], curve.xdata)
+        self.assertIs(keepalive[1], curve.ydata)
+
+    def test_nbytes(self):
+        """Return size of xdata and ydata in bytes
+        """
+        curve = GwyGraphCurve(xdata=np.zeros(10, dtype=np.float32),
+                              ydata=np.zeros(10))
+        self.assertEqual(curve.nbytes(), 120)
+
+
 if __name__ == '__main__':
     unittest.main()
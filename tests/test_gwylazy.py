@@ -0,0 +1,179 @@
+import types
+import unittest
+from unittest.mock import Mock, call
+
+import numpy as np
+
+from pygwyfile.gwylazy import GwyDecodedCache, GwyLazySequence
+from pygwyfile.gwylazy import _get_nbytes
+
+
+class GwyDecodedCache_init(unittest.TestCase):
+    """Test constructor of GwyDecodedCache class"""
+
+    def test_raise_ValueError_if_max_bytes_is_negative(self):
+        """Raise ValueError if max_bytes is negative"""
+        self.assertRaises(ValueError, GwyDecodedCache, max_bytes=-1)
+
+    def test_empty_cache(self):
+        """New cache is empty"""
+        cache = GwyDecodedCache(max_bytes=1024)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.nbytes, 0)
+        self.assertEqual(cache.max_bytes, 1024)
+
+
+class GwyDecodedCache_put_get(unittest.TestCase):
+    """Test put and get methods of GwyDecodedCache class"""
+
+    def setUp(self):
+        # each array is 800 bytes
+        self.arrays = [np.zeros(100) for i in range(3)]
+
+    def test_get_returns_put_value(self):
+        """Return the object put in the cache"""
+        cache = GwyDecodedCache()
+        cache.put('key', self.arrays[0])
+        self.assertIs(cache.get('key'), self.arrays[0])
+        self.assertEqual(cache.nbytes, 800)
+
+    def test_raise_KeyError_if_object_is_not_cached(self):
+        """Raise KeyError if object is not in the cache"""
+        cache = GwyDecodedCache()
+        self.assertRaises(KeyError, cache.get, 'key')
+
+    def test_unlimited_cache_keeps_all_objects(self):
+        """Cache without byte budget keeps all objects"""
+        cache = GwyDecodedCache()
+        for key, array in enumerate(self.arrays):
+            cache.put(key, array)
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.nbytes, 2400)
+
+    def test_evict_least_recently_used_object(self):
+        """Evict least recently used objects if budget is exceeded"""
+        cache = GwyDecodedCache(max_bytes=1600)
+        cache.put(0, self.arrays[0])
+        cache.put(1, self.arrays[1])
+        cache.get(0)
+        cache.put(2, self.arrays[2])
+        self.assertIn(0, cache)
+        self.assertNotIn(1, cache)
+        self.assertIn(2, cache)
+        self.assertEqual(cache.nbytes, 1600)
+
+    def test_keep_last_object_even_if_it_exceeds_budget(self):
+        """The most recently used object is never evicted"""
+        cache = GwyDecodedCache(max_bytes=100)
+        cache.put(0, self.arrays[0])
+        cache.put(1, self.arrays[1])
+        self.assertNotIn(0, cache)
+        self.assertIn(1, cache)
+        self.assertEqual(cache.nbytes, 800)
+
+    def test_replace_object_with_same_key(self):
+        """Replace object with the same key and update nbytes"""
+        cache = GwyDecodedCache()
+        cache.put(0, self.arrays[0])
+        cache.put(0, np.zeros(10))
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.nbytes, 80)
+
+    def test_clear(self):
+        """Remove all objects from the cache"""
+        cache = GwyDecodedCache()
+        cache.put(0, self.arrays[0])
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.nbytes, 0)
+
+
+class GwyLazySequence_getitem(unittest.TestCase):
+    """Test element access of GwyLazySequence class"""
+
+    def setUp(self):
+        self.keys = [0, 2, 5]
+        self.loader = Mock()
+        self.loader.side_effect = lambda key: np.full(100, key)
+
+    def test_len(self):
+        """Length is equal to the number of keys"""
+        sequence = GwyLazySequence(self.keys, self.loader)
+        self.assertEqual(len(sequence), 3)
+
+    def test_elements_are_not_decoded_on_init(self):
+        """Loader is not called before element is accessed"""
+        GwyLazySequence(self.keys, self.loader)
+        self.loader.assert_not_called()
+
+    def test_decode_element_by_its_key(self):
+        """Call loader with the key of accessed element"""
+        sequence = GwyLazySequence(self.keys, self.loader)
+        element = sequence[1]
+        self.loader.assert_has_calls([call(2)])
+        self.assertEqual(element[0], 2)
+
+    def test_decode_element_only_once(self):
+        """Decoded element is taken from the cache"""
+        sequence = GwyLazySequence(self.keys, self.loader)
+        first = sequence[-1]
+        second = sequence[-1]
+        self.assertIs(first, second)
+        self.assertEqual(self.loader.call_count, 1)
+
+    def test_decode_evicted_element_again(self):
+        """Evicted element is decoded again on the next access"""
+        cache = GwyDecodedCache(max_bytes=800)
+        sequence = GwyLazySequence(self.keys, self.loader, cache)
+        sequence[0]
+        sequence[1]
+        self.assertFalse(sequence.is_decoded(0))
+        self.assertTrue(sequence.is_decoded(1))
+        sequence[0]
+        self.assertEqual(self.loader.call_count, 3)
+
+    def test_slice(self):
+        """Slice returns list of decoded elements"""
+        sequence = GwyLazySequence(self.keys, self.loader)
+        elements = sequence[1:]
+        self.assertEqual([element[0] for element in elements], [2, 5])
+
+    def test_raise_IndexError_if_index_is_out_of_range(self):
+        """Raise IndexError if index is out of range"""
+        sequence = GwyLazySequence(self.keys, self.loader)
+        self.assertRaises(IndexError, sequence.__getitem__, 3)
+
+    def test_iteration(self):
+        """Iterate over decoded elements"""
+        sequence = GwyLazySequence(self.keys, self.loader)
+        self.assertEqual([element[0] for element in sequence], self.keys)
+
+    def test_sequences_with_shared_cache(self):
+        """Sequences with the same keys do not mix up in shared cache"""
+        cache = GwyDecodedCache()
+        first = GwyLazySequence([0], Mock(return_value='first'), cache)
+        second = GwyLazySequence([0], Mock(return_value='second'), cache)
+        self.assertEqual(first[0], 'first')
+        self.assertEqual(second[0], 'second')
+        self.assertEqual(len(cache), 2)
+
+
+class Func_get_nbytes(unittest.TestCase):
+    """Test _get_nbytes function"""
+
+    def test_nested_objects(self):
+        """Sum sizes of arrays referenced by nested objects"""
+        holder = types.SimpleNamespace()
+        holder.data = np.zeros(10)
+        holder.meta = {'xres': 10}
+        holder.items = [np.zeros(5), (np.zeros(5), None)]
+        self.assertEqual(_get_nbytes(holder), 160)
+
+    def test_count_shared_array_once(self):
+        """Array referenced twice is counted once"""
+        array = np.zeros(10)
+        self.assertEqual(_get_nbytes([array, array]), 80)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,386 @@
+import os
+import struct
+import tempfile
+import unittest
+import weakref
+
+import numpy as np
+
+from pygwyfile.gwyfile import Gwyfile, GwyfileError
+from pygwyfile.gwybrick import GwyBrick
+from pygwyfile.gwychannel import GwyChannel
+from pygwyfile.gwycontainer import GwyContainer
+from pygwyfile.gwydatafield import GwyDataField
+from pygwyfile.gwysurface import GwySurface
+from pygwyfile.gwymmap import GwyMmapFile, GwyItemIndex
+
+
+def _serialize_object(name, items):
+    """Serialize GWY object with already serialized items"""
+    data = b''.join(items)
+    return name + b'\0' + struct.pack('<I', len(data)) + data
+
+
+def _write_file(content):
+    """Write content to a temporary file and return its name"""
+    fd, filename = tempfile.mkstemp(suffix='.gwy')
+    with os.fdopen(fd, 'wb') as fileobj:
+        fileobj.write(content)
+    return filename
+
+
+class GwyMmapFile_from_gwy(unittest.TestCase):
+    """Test index built by GwyMmapFile.from_gwy method"""
+
+    def setUp(self):
+        unit = _serialize_object(b'GwySIUnit',
+                                 [b'unitstr\0s' + b'm\0'])
+        self.content = b'GWYP' + _serialize_object(
+            b'GwyContainer',
+            [b'/0/data/title\0s' + b'Topo\0',
+             b'/0/data/visible\0b' + b'\x01',
+             b'/0/data/range\0d' + struct.pack('<d', 1.5),
+             b'/0/data/n\0i' + struct.pack('<i', -3),
+             b'/0/data/array\0D' + struct.pack('<I3d', 3, 1., 2., 3.),
+             b'/0/data/strings\0S' + struct.pack('<I', 2) + b'a\0bc\0',
+             b'/unit\0o' + unit,
+             b'/units\0O' + struct.pack('<I', 2) + unit + unit])
+        self.filename = _write_file(self.content)
+        self.gwymmap = GwyMmapFile.from_gwy(self.filename)
+
+    def tearDown(self):
+        self.gwymmap.close()
+        os.remove(self.filename)
+
+    def test_index_of_scalar_item(self):
+        """Index offset points to the value of the scalar item"""
+        item = self.gwymmap.index[('/0/data/range',)]
+        self.assertEqual(item.type, 'd')
+        self.assertEqual(item.length, 8)
+        self.assertEqual(self.content[item.offset:item.offset + 8],
+                         struct.pack('<d', 1.5))
+
+    def test_index_of_array_item(self):
+        """Index offset points to the first element of the array"""
+        item = self.gwymmap.index[('/0/data/array',)]
+        self.assertEqual(item, GwyItemIndex('D',
+                                            self.content.index(
+                                                struct.pack('<3d',
+                                                            1., 2., 3.)),
+                                            24))
+
+    def test_index_items_of_nested_objects(self):
+        """Items of nested objects and object arrays are indexed"""
+        self.assertIn(('/unit', 'unitstr'), self.gwymmap.index)
+        self.assertIn(('/units', '0', 'unitstr'), self.gwymmap.index)
+        self.assertIn(('/units', '1', 'unitstr'), self.gwymmap.index)
+
+    def test_get_value(self):
+        """Get values of scalar and string items"""
+        self.assertEqual(self.gwymmap.get_value('/0/data/title'), 'Topo')
+        self.assertIs(self.gwymmap.get_value('/0/data/visible'), True)
+        self.assertEqual(self.gwymmap.get_value('/0/data/range'), 1.5)
+        self.assertEqual(self.gwymmap.get_value('/0/data/n'), -3)
+        self.assertEqual(self.gwymmap.get_value(('/unit', 'unitstr')), 'm')
+
+    def test_get_value_of_missing_item(self):
+        """Return None if the item is not found"""
+        self.assertIsNone(self.gwymmap.get_value('/1/data/title'))
+
+    def test_raise_GwyfileError_if_item_is_not_scalar(self):
+        """Raise GwyfileError if get_value is called for array"""
+        self.assertRaises(GwyfileError,
+                          self.gwymmap.get_value,
+                          '/0/data/array')
+
+    def test_get_double_array_is_readonly_view(self):
+        """Return read-only numpy array with item data"""
+        array = self.gwymmap.get_double_array('/0/data/array')
+        np.testing.assert_equal(array, [1., 2., 3.])
+        self.assertFalse(array.flags.writeable)
+        self.assertFalse(array.flags.owndata)
+
+    def test_get_object_name(self):
+        """Get type name of the object item"""
+        self.assertEqual(self.gwymmap.get_object_name('/unit'), 'GwySIUnit')
+        self.assertEqual(self.gwymmap.get_object_name(('/units', '1')),
+                         'GwySIUnit')
+
+    def test_contains(self):
+        """Check whether the item is in the file"""
+        self.assertIn('/0/data/title', self.gwymmap)
+        self.assertNotIn('/0/data/mask', self.gwymmap)
+
+    def test_close_with_alive_arrays(self):
+        """Arrays stay valid after close()"""
+        array = self.gwymmap.get_double_array('/0/data/array')
+        self.gwymmap.close()
+        np.testing.assert_equal(array, [1., 2., 3.])
+
+    def test_close_mapping_with_last_array(self):
+        """Mapping is closed when the last alive array is deleted"""
+        array = self.gwymmap.get_double_array('/0/data/array')
+        buf = array.base.obj
+        self.gwymmap.close()
+        self.assertFalse(buf.closed)
+        self.assertRaises(ValueError, self.gwymmap.get_value,
+                          '/0/data/title')
+        del array
+        buf = weakref.ref(buf)
+        self.assertIsNone(buf())
+
+
+class GwyMmapFile_invalid_file(unittest.TestCase):
+    """Test GwyMmapFile.from_gwy with invalid files"""
+
+    def _assert_raises_GwyfileError(self, content):
+        filename = _write_file(content)
+        try:
+            self.assertRaises(GwyfileError, GwyMmapFile.from_gwy, filename)
+        finally:
+            os.remove(filename)
+
+    def test_raise_GwyfileError_if_magic_header_is_wrong(self):
+        """Raise GwyfileError if the file is not a GWY file"""
+        self._assert_raises_GwyfileError(
+            b'GWYO' + _serialize_object(b'GwyContainer', []))
+
+    def test_raise_GwyfileError_if_top_level_object_is_not_container(self):
+        """Raise GwyfileError if the top-level object is not GwyContainer"""
+        self._assert_raises_GwyfileError(
+            b'GWYP' + _serialize_object(b'GwySIUnit', []))
+
+    def test_raise_GwyfileError_if_file_is_truncated(self):
+        """Raise GwyfileError if the data size exceeds the file size"""
+        content = b'GWYP' + _serialize_object(
+            b'GwyContainer',
+            [b'/0/data/array\0D' + struct.pack('<I3d', 3, 1., 2., 3.)])
+        self._assert_raises_GwyfileError(content[:-8])
+
+    def test_raise_GwyfileError_if_item_type_is_invalid(self):
+        """Raise GwyfileError if the item type is unknown"""
+        self._assert_raises_GwyfileError(
+            b'GWYP' + _serialize_object(b'GwyContainer',
+                                        [b'/0/data/title\0x' + b'Topo\0']))
+
+
+class GwyMmapFile_datafield(unittest.TestCase):
+    """Test reading of files written by GwyContainer.to_gwyfile"""
+
+    def setUp(self):
+        self.data = np.arange(12, dtype=np.float64).reshape((3, 4))
+        datafield = GwyDataField(self.data,
+                                 meta={'xreal': 2., 'xoff': 0.5,
+                                       'si_unit_xy': 'm',
+                                       'si_unit_z': 'A'})
+        container = GwyContainer(channels=[GwyChannel('Topo', datafield),
+                                           GwyChannel('Phase', datafield)])
+        fd, self.filename = tempfile.mkstemp(suffix='.gwy')
+        os.close(fd)
+        container.to_gwyfile(self.filename)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_get_channel_ids(self):
+        """Get ids of all channels in the file"""
+        with GwyMmapFile.from_gwy(self.filename) as gwymmap:
+            self.assertEqual(gwymmap.get_channel_ids(), [0, 1])
+
+    def test_get_datafield(self):
+        """Get GwyDataField with data viewing the mapping"""
+        with GwyMmapFile.from_gwy(self.filename) as gwymmap:
+            datafield = gwymmap.get_datafield('/1/data')
+            self.assertEqual(gwymmap.get_value('/1/data/title'), 'Phase')
+        np.testing.assert_equal(datafield.data, self.data)
+        self.assertFalse(datafield.data.flags.writeable)
+        self.assertEqual(datafield.meta,
+                         {'xres': 3, 'yres': 4,
+                          'xreal': 2., 'yreal': 1.,
+                          'xoff': 0.5, 'yoff': 0.,
+                          'si_unit_xy': 'm', 'si_unit_z': 'A'})
+
+    def test_get_missing_datafield(self):
+        """Return None if the datafield is not found"""
+        with GwyMmapFile.from_gwy(self.filename) as gwymmap:
+            self.assertIsNone(gwymmap.get_datafield('/2/data'))
+
+
+class GwyMmapFile_invalid_datafield(unittest.TestCase):
+    """Test GwyMmapFile.get_datafield with invalid datafields"""
+
+    def test_raise_GwyfileError_if_dimensions_are_missing(self):
+        """Raise GwyfileError if xres or yres is missing"""
+        content = b'GWYP' + _serialize_object(
+            b'GwyContainer',
+            [b'/0/data\0o' + _serialize_object(
+                b'GwyDataField',
+                [b'xres\0i' + struct.pack('<i', 2),
+                 b'data\0D' + struct.pack('<I2d', 2, 1., 2.)])])
+        filename = _write_file(content)
+        self.addCleanup(os.remove, filename)
+        with GwyMmapFile.from_gwy(filename) as gwymmap:
+            self.assertRaises(GwyfileError, gwymmap.get_datafield,
+                              '/0/data')
+
+
+class GwyMmapFile_brick(unittest.TestCase):
+    """Test reading of volume data written by GwyContainer.to_gwyfile"""
+
+    def setUp(self):
+        self.data = np.arange(24, dtype=np.float64).reshape((4, 3, 2))
+        brick = GwyBrick(self.data,
+                         meta={'zreal': 2., 'zoff': 0.5,
+                               'si_unit_x': 'm', 'si_unit_w': 'A'},
+                         title='Spectra')
+        container = GwyContainer(volumes=[brick, brick])
+        fd, self.filename = tempfile.mkstemp(suffix='.gwy')
+        os.close(fd)
+        container.to_gwyfile(self.filename)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_get_volume_ids(self):
+        """Get ids of all volumes in the file"""
+        with GwyMmapFile.from_gwy(self.filename) as gwymmap:
+            self.assertEqual(gwymmap.get_volume_ids(), [0, 1])
+
+    def test_get_brick(self):
+        """Get GwyBrick with data viewing the mapping"""
+        with GwyMmapFile.from_gwy(self.filename) as gwymmap:
+            brick = gwymmap.get_brick('/brick/1')
+        np.testing.assert_equal(brick.data, self.data)
+        self.assertFalse(brick.data.flags.writeable)
+        self.assertEqual(brick.title, 'Spectra')
+        self.assertEqual(brick.meta,
+                         {'xres': 2, 'yres': 3, 'zres': 4,
+                          'xreal': 1., 'yreal': 1., 'zreal': 2.,
+                          'xoff': 0., 'yoff': 0., 'zoff': 0.5,
+                          'si_unit_x': 'm', 'si_unit_y': '',
+                          'si_unit_z': '', 'si_unit_w': 'A'})
+        np.testing.assert_equal(brick.get_xy_plane(2), self.data[2])
+
+    def test_get_missing_brick(self):
+        """Return None if the brick is not found"""
+        with GwyMmapFile.from_gwy(self.filename) as gwymmap:
+            self.assertIsNone(gwymmap.get_brick('/brick/2'))
+
+    def test_raise_GwyfileError_if_item_is_not_brick(self):
+        """Raise GwyfileError if the object is not a GwyBrick"""
+        with GwyMmapFile.from_gwy(self.filename) as gwymmap:
+            self.assertRaises(GwyfileError, gwymmap.get_brick,
+                              ('/brick/0', 'si_unit_x'))
+
+
+class GwyMmapFile_surface(unittest.TestCase):
+    """Test reading of XYZ data written by GwyContainer.to_gwyfile"""
+
+    def setUp(self):
+        self.data = np.arange(15, dtype=np.float64).reshape((5, 3))
+        surface = GwySurface(self.data,
+                             meta={'si_unit_xy': 'm', 'si_unit_z': 'A'},
+                             title='Points')
+        container = GwyContainer(surfaces=[surface])
+        fd, self.filename = tempfile.mkstemp(suffix='.gwy')
+        os.close(fd)
+        container.to_gwyfile(self.filename)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_get_surface_ids(self):
+        """Get ids of all surfaces in the file"""
+        with GwyMmapFile.from_gwy(self.filename) as gwymmap:
+            self.assertEqual(gwymmap.get_surface_ids(), [0])
+
+    def test_get_surface(self):
+        """Get GwySurface with data viewing the mapping"""
+        with GwyMmapFile.from_gwy(self.filename) as gwymmap:
+            surface = gwymmap.get_surface('/xyz/0')
+        np.testing.assert_equal(surface.data, self.data)
+        self.assertFalse(surface.data.flags.writeable)
+        self.assertEqual(surface.title, 'Points')
+        self.assertEqual(surface.meta,
+                         {'n': 5, 'si_unit_xy': 'm', 'si_unit_z': 'A'})
+
+    def test_get_missing_surface(self):
+        """Return None if the surface is not found"""
+        with GwyMmapFile.from_gwy(self.filename) as gwymmap:
+            self.assertIsNone(gwymmap.get_surface('/xyz/1'))
+
+
+class GwyMmapFile_libgwyfile_path(unittest.TestCase):
+    """Test that GwyMmapFile returns the same data as libgwyfile"""
+
+    def setUp(self):
+        data = np.random.rand(3, 4)
+        datafield = GwyDataField(data,
+                                 meta={'xreal': 2., 'yreal': 3.,
+                                       'xoff': 0.5, 'yoff': -1.,
+                                       'si_unit_xy': 'm',
+                                       'si_unit_z': 'A'})
+        mask = GwyDataField(np.round(data))
+        channels = [GwyChannel('Topo', datafield, mask=mask),
+                    GwyChannel('Phase', GwyDataField(data.T),
+                               show=datafield)]
+        volume = GwyBrick(np.random.rand(4, 3, 2),
+                          meta={'zreal': 2., 'si_unit_w': 'A'},
+                          title='Spectra')
+        surface = GwySurface(np.random.rand(5, 3),
+                             meta={'si_unit_xy': 'm'},
+                             title='Points')
+        container = GwyContainer(channels=channels,
+                                 volumes=[volume],
+                                 surfaces=[surface])
+        fd, self.filename = tempfile.mkstemp(suffix='.gwy')
+        os.close(fd)
+        self.addCleanup(os.remove, self.filename)
+        container.to_gwyfile(self.filename)
+
+        self.gwyfile = Gwyfile.from_gwy(self.filename)
+        self.container = GwyContainer.from_gwy(self.gwyfile)
+        self.gwymmap = GwyMmapFile.from_gwy(self.filename)
+        self.addCleanup(self.gwymmap.close)
+
+    def test_object_ids(self):
+        """Same ids of channels, volumes and surfaces"""
+        self.assertEqual(self.gwymmap.get_channel_ids(),
+                         GwyContainer._get_channel_ids(self.gwyfile))
+        self.assertEqual(self.gwymmap.get_volume_ids(),
+                         GwyContainer._get_volume_ids(self.gwyfile))
+        self.assertEqual(self.gwymmap.get_surface_ids(),
+                         GwyContainer._get_surface_ids(self.gwyfile))
+
+    def test_datafields(self):
+        """Same data and metadata of data, mask and show datafields"""
+        for channel_id, channel in enumerate(self.container.channels):
+            for key in ('data', 'mask', 'show'):
+                expected = getattr(channel, key)
+                datafield = self.gwymmap.get_datafield(
+                    '/{:d}/{}'.format(channel_id, key))
+                if expected is None:
+                    self.assertIsNone(datafield)
+                else:
+                    np.testing.assert_equal(datafield.data, expected.data)
+                    self.assertEqual(datafield.meta, expected.meta)
+
+    def test_brick(self):
+        """Same data, metadata and title of volume"""
+        expected = self.container.volumes[0]
+        brick = self.gwymmap.get_brick('/brick/0')
+        np.testing.assert_equal(brick.data, expected.data)
+        self.assertEqual(brick.meta, expected.meta)
+        self.assertEqual(brick.title, expected.title)
+
+    def test_surface(self):
+        """Same data, metadata and title of surface"""
+        expected = self.container.surfaces[0]
+        surface = self.gwymmap.get_surface('/xyz/0')
+        np.testing.assert_equal(surface.data, expected.data)
+        self.assertEqual(surface.meta, expected.meta)
+        self.assertEqual(surface.title, expected.title)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+import gzip
+import mmap
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from pygwyfile.gwyfile import GwyfileError
+from pygwyfile.gwychannel import GwyChannel
+from pygwyfile.gwycontainer import GwyContainer
+from pygwyfile.gwydatafield import GwyDataField
+from pygwyfile.gwygraph import GwyGraphModel
+from pygwyfile.gwygraphcurve import GwyGraphCurve
+from pygwyfile.gwymmap import GwyMmapFile
+from pygwyfile.gwyscan import GwyChannelInfo, GwyGraphInfo
+from pygwyfile.gwyscan import scan_gwyfile, scan_directory
+
+
+def _write_container(filename):
+    """Write container with two channels and a graph to file"""
+    datafield = GwyDataField(np.zeros((3, 4)),
+                             meta={'xreal': 2., 'yreal': 3.,
+                                   'si_unit_xy': 'm',
+                                   'si_unit_z': 'A'})
+    curve = GwyGraphCurve(np.zeros((2, 5)))
+    container = GwyContainer(
+        channels=[GwyChannel('Topo', datafield, palette='Gray',
+                             mask=datafield),
+                  GwyChannel('Phase', datafield)],
+        graphs=[GwyGraphModel([curve, curve], meta={'title': 'Profiles'})])
+    container.to_gwyfile(filename)
+
+
+class Func_scan_gwyfile(unittest.TestCase):
+    """Test scan_gwyfile function"""
+
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix='.gwy')
+        os.close(fd)
+        self.addCleanup(os.remove, self.filename)
+        _write_container(self.filename)
+
+    def test_channels_metadata(self):
+        """Get metadata of all channels"""
+        info = scan_gwyfile(self.filename)
+        self.assertEqual(info.filename, self.filename)
+        self.assertEqual(info.channels,
+                         [GwyChannelInfo(id=0, title='Topo',
+                                         xres=3, yres=4,
+                                         xreal=2., yreal=3.,
+                                         si_unit_xy='m', si_unit_z='A',
+                                         palette='Gray',
+                                         has_mask=True, has_show=False),
+                          GwyChannelInfo(id=1, title='Phase',
+                                         xres=3, yres=4,
+                                         xreal=2., yreal=3.,
+                                         si_unit_xy='m', si_unit_z='A',
+                                         palette=None,
+                                         has_mask=False, has_show=False)])
+
+    def test_graphs_metadata(self):
+        """Get titles and numbers of curves of all graphs"""
+        info = scan_gwyfile(self.filename)
+        self.assertEqual(info.graphs,
+                         [GwyGraphInfo(id=1, title='Profiles', ncurves=2)])
+
+
+class Func_scan_compressed_gwyfile(unittest.TestCase):
+    """Test scan_gwyfile function with compressed files"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def test_scan_compressed_files(self):
+        """Compressed files are detected and decompressed"""
+        for name in ('test.gwy.gz', 'test.gwy.zst'):
+            filename = os.path.join(self.root, name)
+            _write_container(filename)
+            info = scan_gwyfile(filename)
+            self.assertEqual([channel.title for channel in info.channels],
+                             ['Topo', 'Phase'])
+            self.assertEqual(info.graphs[0].ncurves, 2)
+
+    def test_detect_compression_by_magic(self):
+        """Compression is detected regardless of file name"""
+        filename = os.path.join(self.root, 'test.gwy')
+        _write_container(filename)
+        with open(filename, 'rb') as fileobj:
+            data = gzip.compress(fileobj.read())
+        with open(filename, 'wb') as fileobj:
+            fileobj.write(data)
+        self.assertEqual(len(scan_gwyfile(filename).channels), 2)
+
+    def test_decompress_in_chunks_to_mapped_file(self):
+        """Decompressed file is mapped instead of being held in memory"""
+        filename = os.path.join(self.root, 'test.gwy.gz')
+        _write_container(filename)
+        with patch('pygwyfile.gwyscan._COPY_CHUNK_SIZE', 64), \
+                patch('pygwyfile.gwyscan.GwyMmapFile',
+                      wraps=GwyMmapFile) as mock_GwyMmapFile:
+            info = scan_gwyfile(filename)
+        self.assertEqual(len(info.channels), 2)
+        buf = mock_GwyMmapFile.call_args[0][1]
+        self.assertIsInstance(buf, mmap.mmap)
+        self.assertTrue(buf.closed)
+
+    def test_raise_GwyfileError_if_compressed_data_are_corrupted(self):
+        """Raise GwyfileError if the file cannot be decompressed"""
+        filename = os.path.join(self.root, 'test.gwy.gz')
+        _write_container(filename)
+        with open(filename, 'r+b') as fileobj:
+            fileobj.truncate(os.path.getsize(filename) // 2)
+        self.assertRaises(GwyfileError, scan_gwyfile, filename)
+
+
+class Func_scan_directory(unittest.TestCase):
+    """Test scan_directory function"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        os.mkdir(os.path.join(self.root, 'sub'))
+        self.filenames = [os.path.join(self.root, 'a.gwy'),
+                          os.path.join(self.root, 'c.gwy.gz'),
+                          os.path.join(self.root, 'sub', 'b.gwy.zst')]
+        for filename in self.filenames:
+            _write_container(filename)
+        with open(os.path.join(self.root, 'notes.txt'), 'w') as fileobj:
+            fileobj.write('not a gwy file')
+
+    def test_scan_all_gwy_files(self):
+        """Scan gwy files in directory tree"""
+        infos = list(scan_directory(self.root))
+        self.assertEqual([info.filename for info in infos], self.filenames)
+
+    def test_scan_files_matching_pattern(self):
+        """Scan only files matching the given pattern"""
+        infos = list(scan_directory(self.root, pattern='*.gwy'))
+        self.assertEqual([info.filename for info in infos],
+                         self.filenames[:1])
+
+    def test_raise_GwyfileError_if_file_is_invalid(self):
+        """Raise GwyfileError if a file cannot be read"""
+        self.assertRaises(GwyfileError,
+                          list,
+                          scan_directory(self.root, pattern='*'))
+
+    def test_ignore_errors(self):
+        """Skip files which cannot be read if ignore_errors is True"""
+        infos = list(scan_directory(self.root, pattern='*',
+                                    ignore_errors=True))
+        self.assertEqual([info.filename for info in infos], self.filenames)
+
+
+if __name__ == '__main__':
+    unittest.main()
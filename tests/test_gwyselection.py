@@ -1,6 +1,8 @@
 import unittest
 from unittest.mock import patch, call, Mock
 
+import numpy as np
+
 from pygwyfile._libgwyfile import ffi, lib
 from pygwyfile.gwyfile import GwyfileErrorCMsg
 from pygwyfile.gwyselection import (GwySelection,
@@ -91,7 +93,6 @@ class GwySelection_get_selection_points(unittest.TestCase):
     def setUp(self):
         self.gwysel = Mock()
         self.nsel = 2
-        self.points = [(0., 0.), (1., 1.)]
         self.cpoints = ffi.new("double[]", [0., 0., 1., 1.])
         patcher = patch.object(GwySelection, '_get_sel_func')
         self.get_sel_func = patcher.start()
@@ -119,12 +120,12 @@ class GwySelection_get_selection_points(unittest.TestCase):
         self.assertIsNone(points)
 
     def test_return_points_if_nsel_is_not_zero(self):
-        """Return list of points if number of selections is not zero
+        """Return array of points if number of selections is not zero
         """
         self.get_sel_func.side_effect = self._get_points_side_effect
         points = GwySelection._get_selection_points(self.gwysel,
                                                     self.nsel)
-        self.assertListEqual(self.points, points)
+        np.testing.assert_equal(points, [[[0., 0.]], [[1., 1.]]])
 
     def _get_points_side_effect(self, *args):
         """ Write self.cpoints in 'data' field  and return True
@@ -141,26 +142,6 @@ class GwySelection_get_selection_points(unittest.TestCase):
         return truep[0]
 
 
-class GwySelection__combine_points_in_pairs(unittest.TestCase):
-    """Test _combine_points_in_pair method of GwySelection
-    """
-
-    def test__combine_ponts_in_pairs_non_empty_arg(self):
-        """Combine points in pairs if points list is not empty
-        """
-        points = [(0., 0.), (1., 1.), (2., 2.), (3., 3.)]
-        pairs = GwySelection._combine_points_in_pair(points)
-        self.assertListEqual(pairs, [((0., 0.), (1., 1.)),
-                                     ((2., 2.), (3., 3.))])
-
-    def test__combine_ponts_in_pairs_empty_arg(self):
-        """Return empty list if points list is empty
-        """
-        points = []
-        pairs = GwySelection._combine_points_in_pair(points)
-        self.assertListEqual(pairs, [])
-
-
 class GwyPointSelection_init(unittest.TestCase):
     """Test constructor of GwyPointSelection class
     """
@@ -204,6 +185,7 @@ class GwyPointSelection_from_gwy(unittest.TestCase):
         patcher_points = patch.object(GwyPointSelection,
                                       '_get_selection_points')
         self.get_points = patcher_points.start()
+        self.get_points.return_value = self.points
         self.addCleanup(patcher_points.stop)
 
     def test_getting_number_of_selections(self):
@@ -232,24 +214,26 @@ class GwyPointSelection_from_gwy(unittest.TestCase):
         self.assertIsNone(point_sel)
 
 
-class GwyPointSelection_cdata(unittest.TestCase):
-    """ Test _cdata property of GwyPointSelection class """
+class GwyPointSelection_points(unittest.TestCase):
+    """ Test points array of GwyPointSelection class """
 
     def setUp(self):
-        self.points = [(0., 0.), (1., 1.)]
-        self.cdata = ffi.cast("double*", ffi.new("double[]", [0., 0., 1., 1.]))
-        self.pointsel = GwyPointSelection(points=self.points)
+        self.data = [(0., 0.), (1., 1.)]
+        self.sel = GwyPointSelection(self.data)
 
-    def test_return_None_if_data_list_is_empty(self):
-        """Return None if point selection data list is empty"""
-        self.pointsel.data = []
-        cdata = self.pointsel._cdata
-        self.assertIsNone(cdata)
+    def test_points_array(self):
+        """Store selections as float64 array (nsel, npoints, 2)"""
+        self.assertEqual(self.sel.points.dtype, np.float64)
+        np.testing.assert_equal(self.sel.points, [[[0., 0.]], [[1., 1.]]])
+
+    def test_data_view(self):
+        """Return selections as list of tuples"""
+        self.assertListEqual(self.sel.data, self.data)
 
-    def test_return_value_if_data_list_is_not_empty(self):
-        """Return C array if selection data list is not empty"""
-        cdata = self.pointsel._cdata
-        self.assertAlmostEqual(cdata, self.cdata)
+    def test_set_empty_data(self):
+        """Set empty points if empty list is assigned to data"""
+        self.sel.data = []
+        self.assertEqual(len(self.sel.points), 0)
 
 
 class GwyPointSelection_to_gwy(unittest.TestCase):
@@ -273,6 +257,65 @@ class GwyPointSelection_to_gwy(unittest.TestCase):
         self.assertEqual(actual_return, expected_return)
 
 
+class GwySelection_round_trip(unittest.TestCase):
+    """ Test conversion of selections to gwy objects and back """
+
+    def _round_trip(self, sel, keepalive=None):
+        gwysel = sel.to_gwy(keepalive)
+        self.addCleanup(lib.gwyfile_object_free, gwysel)
+        return type(sel).from_gwy(gwysel)
+
+    def test_copy_points(self):
+        """Points are copied if keepalive is None"""
+        points = np.random.rand(5, 2, 2)
+        sel = self._round_trip(GwyLineSelection(points))
+        np.testing.assert_equal(sel.points, points)
+
+    def test_borrow_points(self):
+        """Points array is borrowed and appended to keepalive"""
+        points = np.random.rand(5, 1, 2)
+        keepalive = []
+        sel = self._round_trip(GwyPointSelection(points), keepalive)
+        np.testing.assert_equal(sel.points, points)
+        self.assertEqual(len(keepalive), 1)
+        self.assertIs(keepalive[0], points)
+
+    def test_raise_ValueError_if_shape_is_wrong(self):
+        """Raise ValueError if points cannot form selections"""
+        self.assertRaises(ValueError,
+                          GwyLineSelection,
+                          [(0., 0.), (1., 1.), (2., 2.)])
+
+    def test_raise_ValueError_if_points_are_not_pairs(self):
+        """Raise ValueError if last dimension of points is not 2"""
+        self.assertRaises(ValueError,
+                          GwyPointSelection,
+                          [(0., 0., 1., 1.)])
+        self.assertRaises(ValueError,
+                          GwyLineSelection,
+                          [(0., 0., 1., 1.)])
+
+    def test_raise_ValueError_if_number_of_points_is_wrong(self):
+        """Raise ValueError if selections do not have npoints points"""
+        self.assertRaises(ValueError,
+                          GwyLineSelection,
+                          [(0., 0.), (1., 1.)])
+        self.assertRaises(ValueError,
+                          GwyPointSelection,
+                          [((0., 0.), (1., 1.))])
+
+
+class GwySelection_nbytes(unittest.TestCase):
+    """ Test nbytes method of GwySelection class """
+
+    def test_size_of_points_array(self):
+        """Size is the size of the array of points"""
+        small = GwyLineSelection([((0., 1.), (2., 3.))])
+        large = GwyLineSelection([((0., 1.), (2., 3.))] * 2)
+        self.assertEqual(small.nbytes(), 4 * 8)
+        self.assertEqual(large.nbytes(), 8 * 8)
+
+
 class GwyPointerSelection_init(unittest.TestCase):
     """Test constructor of GwyPointerSelection class """
 
@@ -310,6 +353,7 @@ class GwyPointerSelection_from_gwy(unittest.TestCase):
         patcher = patch.object(GwySelection,
                                'from_gwy')
         self.from_gwy_parent = patcher.start()
+        self.from_gwy_parent.return_value = self.points
         self.addCleanup(patcher.stop)
 
     def test_arg_of_parent_from_gwy_method(self):
@@ -333,24 +377,26 @@ class GwyPointerSelection_from_gwy(unittest.TestCase):
         self.assertIsNone(pointer_sel)
 
 
-class GwyPointerSelection_cdata(unittest.TestCase):
-    """ Test _cdata property of GwyPointerSelection class """
+class GwyPointerSelection_points(unittest.TestCase):
+    """ Test points array of GwyPointerSelection class """
 
     def setUp(self):
-        self.points = [(0., 0.), (1., 1.)]
-        self.cdata = ffi.cast("double*", ffi.new("double[]", [0., 0., 1., 1.]))
-        self.pointersel = GwyPointerSelection(points=self.points)
+        self.data = [(0., 0.), (1., 1.)]
+        self.sel = GwyPointerSelection(self.data)
 
-    def test_return_None_if_data_list_is_empty(self):
-        """Return None if point selection data list is empty"""
-        self.pointersel.data = []
-        cdata = self.pointersel._cdata
-        self.assertIsNone(cdata)
+    def test_points_array(self):
+        """Store selections as float64 array (nsel, npoints, 2)"""
+        self.assertEqual(self.sel.points.dtype, np.float64)
+        np.testing.assert_equal(self.sel.points, [[[0., 0.]], [[1., 1.]]])
 
-    def test_return_value_if_data_list_is_not_empty(self):
-        """Return C array if selection data list is not empty"""
-        cdata = self.pointersel._cdata
-        self.assertAlmostEqual(cdata, self.cdata)
+    def test_data_view(self):
+        """Return selections as list of tuples"""
+        self.assertListEqual(self.sel.data, self.data)
+
+    def test_set_empty_data(self):
+        """Set empty points if empty list is assigned to data"""
+        self.sel.data = []
+        self.assertEqual(len(self.sel.points), 0)
 
 
 class GwyLineSelections_init(unittest.TestCase):
@@ -397,6 +443,7 @@ class GwyLineSelection_from_gwy(unittest.TestCase):
         patcher = patch.object(GwySelection,
                                'from_gwy')
         self.from_gwy_parent = patcher.start()
+        self.from_gwy_parent.return_value = self.points
         self.addCleanup(patcher.stop)
 
     def test_arg_of_parent_from_gwy_method(self):
@@ -421,26 +468,27 @@ class GwyLineSelection_from_gwy(unittest.TestCase):
         self.assertIsNone(line_sel)
 
 
-class GwyLineSelection_cdata(unittest.TestCase):
-    """ Test _cdata property of GwyLineSelection class """
+class GwyLineSelection_points(unittest.TestCase):
+    """ Test points array of GwyLineSelection class """
 
     def setUp(self):
-        self.point_pairs = [((0., 0.), (1., 1.)), ((2., 2.), (3., 3.))]
-        self.cdata = ffi.cast("double*", ffi.new("double[]",
-                                                 [0., 0., 1., 1.,
-                                                  2., 2., 3., 3.]))
-        self.linesel = GwyLineSelection(point_pairs=self.point_pairs)
+        self.data = [((0., 0.), (1., 1.)), ((2., 2.), (3., 3.))]
+        self.sel = GwyLineSelection(self.data)
+
+    def test_points_array(self):
+        """Store selections as float64 array (nsel, npoints, 2)"""
+        self.assertEqual(self.sel.points.dtype, np.float64)
+        np.testing.assert_equal(self.sel.points,
+                                [[[0., 0.], [1., 1.]], [[2., 2.], [3., 3.]]])
 
-    def test_return_None_if_data_list_is_empty(self):
-        """Return None if line selection data list is empty"""
-        self.linesel.data = []
-        cdata = self.linesel._cdata
-        self.assertIsNone(cdata)
+    def test_data_view(self):
+        """Return selections as list of tuples"""
+        self.assertListEqual(self.sel.data, self.data)
 
-    def test_return_value_if_data_list_is_not_empty(self):
-        """Return C array if selection data list is not empty"""
-        cdata = self.linesel._cdata
-        self.assertAlmostEqual(cdata, self.cdata)
+    def test_set_empty_data(self):
+        """Set empty points if empty list is assigned to data"""
+        self.sel.data = []
+        self.assertEqual(len(self.sel.points), 0)
 
 
 class GwyRectangleSelection_init(unittest.TestCase):
@@ -487,6 +535,7 @@ class GwyRectangleSelection_from_gwy(unittest.TestCase):
         patcher = patch.object(GwySelection,
                                'from_gwy')
         self.from_gwy_parent = patcher.start()
+        self.from_gwy_parent.return_value = self.points
         self.addCleanup(patcher.stop)
 
     def test_arg_of_parent_from_gwy_method(self):
@@ -511,26 +560,27 @@ class GwyRectangleSelection_from_gwy(unittest.TestCase):
         self.assertIsNone(rectangle_sel)
 
 
-class GwyRectangleSelection_cdata(unittest.TestCase):
-    """ Test _cdata property of GwyRectangleSelection class """
+class GwyRectangleSelection_points(unittest.TestCase):
+    """ Test points array of GwyRectangleSelection class """
+
     def setUp(self):
-        self.point_pairs = [((0., 0.), (1., 1.)), ((2., 2.), (3., 3.))]
-        self.cdata = ffi.cast("double*", ffi.new("double[]",
-                                                 [0., 0., 1., 1.,
-                                                  2., 2., 3., 3.]))
-        self.rectanglesel = GwyRectangleSelection(
-            point_pairs=self.point_pairs)
+        self.data = [((0., 0.), (1., 1.)), ((2., 2.), (3., 3.))]
+        self.sel = GwyRectangleSelection(self.data)
+
+    def test_points_array(self):
+        """Store selections as float64 array (nsel, npoints, 2)"""
+        self.assertEqual(self.sel.points.dtype, np.float64)
+        np.testing.assert_equal(self.sel.points,
+                                [[[0., 0.], [1., 1.]], [[2., 2.], [3., 3.]]])
 
-    def test_return_None_if_data_list_is_empty(self):
-        """Return None if rectangle selection data list is empty"""
-        self.rectanglesel.data = []
-        cdata = self.rectanglesel._cdata
-        self.assertIsNone(cdata)
+    def test_data_view(self):
+        """Return selections as list of tuples"""
+        self.assertListEqual(self.sel.data, self.data)
 
-    def test_return_value_if_data_list_is_not_empty(self):
-        """Return C array if selection data list is not empty"""
-        cdata = self.rectanglesel._cdata
-        self.assertAlmostEqual(cdata, self.cdata)
+    def test_set_empty_data(self):
+        """Set empty points if empty list is assigned to data"""
+        self.sel.data = []
+        self.assertEqual(len(self.sel.points), 0)
 
 
 class GwyEllipseSelection_init(unittest.TestCase):
@@ -576,6 +626,7 @@ class GwyEllipseSelection_from_gwy(unittest.TestCase):
         patcher = patch.object(GwySelection,
                                'from_gwy')
         self.from_gwy_parent = patcher.start()
+        self.from_gwy_parent.return_value = self.points
         self.addCleanup(patcher.stop)
 
     def test_arg_of_parent_from_gwy_method(self):
@@ -600,25 +651,27 @@ class GwyEllipseSelection_from_gwy(unittest.TestCase):
         self.assertIsNone(ellipse_sel)
 
 
-class GwyEllipseSelection_cdata(unittest.TestCase):
-    """ Test _cdata property of GwyEllipseSelection class """
+class GwyEllipseSelection_points(unittest.TestCase):
+    """ Test points array of GwyEllipseSelection class """
+
     def setUp(self):
-        self.point_pairs = [((0., 0.), (1., 1.)), ((2., 2.), (3., 3.))]
-        self.cdata = ffi.cast("double*", ffi.new("double[]",
-                                                 [0., 0., 1., 1.,
-                                                  2., 2., 3., 3.]))
-        self.ellipsesel = GwyEllipseSelection(point_pairs=self.point_pairs)
-
-    def test_return_None_if_data_list_is_empty(self):
-        """Return None if ellipse selection data list is empty"""
-        self.ellipsesel.data = []
-        cdata = self.ellipsesel._cdata
-        self.assertIsNone(cdata)
-
-    def test_return_value_if_data_list_is_not_empty(self):
-        """Return C array if selection data list is not empty"""
-        cdata = self.ellipsesel._cdata
-        self.assertAlmostEqual(cdata, self.cdata)
+        self.data = [((0., 0.), (1., 1.)), ((2., 2.), (3., 3.))]
+        self.sel = GwyEllipseSelection(self.data)
+
+    def test_points_array(self):
+        """Store selections as float64 array (nsel, npoints, 2)"""
+        self.assertEqual(self.sel.points.dtype, np.float64)
+        np.testing.assert_equal(self.sel.points,
+                                [[[0., 0.], [1., 1.]], [[2., 2.], [3., 3.]]])
+
+    def test_data_view(self):
+        """Return selections as list of tuples"""
+        self.assertListEqual(self.sel.data, self.data)
+
+    def test_set_empty_data(self):
+        """Set empty points if empty list is assigned to data"""
+        self.sel.data = []
+        self.assertEqual(len(self.sel.points), 0)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,415 @@
+import unittest
+from unittest.mock import patch, call, Mock
+
+import numpy as np
+
+from pygwyfile._libgwyfile import ffi, lib
+from pygwyfile.gwyfile import GwyfileErrorCMsg
+from pygwyfile.gwyspectra import GwySpectra
+
+
+class GwySpectra_init(unittest.TestCase):
+    """Test constructor of GwySpectra class
+    """
+
+    def setUp(self):
+        self.values = np.random.rand(7)
+        self.offsets = np.array([0, 4, 7])
+        self.coords = np.random.rand(2, 2)
+        self.test_meta = {'ncurves': 2,
+                          'spec_xlabel': 'Distance',
+                          'spec_ylabel': 'Force',
+                          'si_unit_xy': 'm',
+                          'si_unit_x': 'm',
+                          'si_unit_y': 'N'}
+
+    def test_init_with_test_data(self):
+        """Test __init__ with all args
+        """
+        spectra = GwySpectra(self.values, self.offsets, self.coords,
+                             real=[1., 2.], off=[0., 1.],
+                             selected=[True, False],
+                             meta=self.test_meta, title='Force map')
+        self.assertIs(spectra.values, self.values)
+        np.testing.assert_equal(spectra.offsets, self.offsets)
+        self.assertEqual(spectra.offsets.dtype, np.int64)
+        self.assertIs(spectra.coords, self.coords)
+        np.testing.assert_equal(spectra.real, [1., 2.])
+        np.testing.assert_equal(spectra.off, [0., 1.])
+        np.testing.assert_equal(spectra.selected, [True, False])
+        self.assertDictEqual(spectra.meta, self.test_meta)
+        self.assertEqual(spectra.title, 'Force map')
+
+    def test_init_with_empty_meta(self):
+        """Curves have unit length, zero offset, no selection
+           and empty labels and units
+        """
+        spectra = GwySpectra(self.values, self.offsets, self.coords)
+        np.testing.assert_equal(spectra.real, [1., 1.])
+        np.testing.assert_equal(spectra.off, [0., 0.])
+        np.testing.assert_equal(spectra.selected, [False, False])
+        self.assertDictEqual(spectra.meta,
+                             {'ncurves': 2,
+                              'spec_xlabel': '',
+                              'spec_ylabel': '',
+                              'si_unit_xy': '',
+                              'si_unit_x': '',
+                              'si_unit_y': ''})
+        self.assertIsNone(spectra.title)
+
+    def test_raise_ValueError_if_offsets_do_not_match_values(self):
+        """Raise ValueError if offsets do not span values
+        """
+        self.assertRaises(ValueError, GwySpectra,
+                          self.values, [1, 4, 7], self.coords)
+        self.assertRaises(ValueError, GwySpectra,
+                          self.values, [0, 4, 6], self.coords)
+        self.assertRaises(ValueError, GwySpectra,
+                          self.values, [], np.zeros((0, 2)))
+
+    def test_raise_ValueError_if_curve_is_empty(self):
+        """Raise ValueError if offsets are not increasing
+        """
+        self.assertRaises(ValueError, GwySpectra,
+                          self.values, [0, 7, 7], self.coords)
+
+    def test_raise_ValueError_if_shapes_do_not_match_ncurves(self):
+        """Raise ValueError if coords, real, off, selected or
+           meta['ncurves'] do not match number of curves
+        """
+        self.assertRaises(ValueError, GwySpectra,
+                          self.values, self.offsets, np.zeros((3, 2)))
+        self.assertRaises(ValueError, GwySpectra,
+                          self.values, self.offsets, self.coords,
+                          real=[1.])
+        self.assertRaises(ValueError, GwySpectra,
+                          self.values, self.offsets, self.coords,
+                          selected=[True, False, True])
+        self.test_meta['ncurves'] = 3
+        self.assertRaises(ValueError, GwySpectra,
+                          self.values, self.offsets, self.coords,
+                          meta=self.test_meta)
+
+
+class GwySpectra_from_curves(unittest.TestCase):
+    """Test from_curves method of GwySpectra class
+    """
+
+    def test_concatenate_curves(self):
+        """Values of curves are concatenated, offsets are their bounds
+        """
+        curves = [np.arange(3.), np.arange(2.), np.arange(4.)]
+        spectra = GwySpectra.from_curves(curves, np.zeros((3, 2)),
+                                         title='Force map')
+        np.testing.assert_equal(spectra.values, np.concatenate(curves))
+        np.testing.assert_equal(spectra.offsets, [0, 3, 5, 9])
+        self.assertEqual(spectra.title, 'Force map')
+
+    def test_no_curves(self):
+        """Spectra without curves have empty values
+        """
+        spectra = GwySpectra.from_curves([], np.zeros((0, 2)))
+        self.assertEqual(spectra.values.size, 0)
+        self.assertEqual(spectra.meta['ncurves'], 0)
+
+
+class GwySpectra_from_gwy(unittest.TestCase):
+    """Test from_gwy method of GwySpectra class
+    """
+
+    @patch('pygwyfile.gwyspectra.GwySpectra', autospec=True)
+    @patch.object(GwySpectra, '_get_coords')
+    @patch.object(GwySpectra, '_get_values')
+    @patch.object(GwySpectra, '_get_curves_meta')
+    @patch.object(GwySpectra, '_get_meta')
+    def test_GwySpectra_from_gwy(self,
+                                 mock_get_meta,
+                                 mock_get_curves_meta,
+                                 mock_get_values,
+                                 mock_get_coords,
+                                 mock_GwySpectra):
+        """Get metadata, curves and coordinates and create
+           GwySpectra instance
+        """
+        gwyspectra = Mock()
+        owner = Mock()
+        mock_get_meta.return_value = {'ncurves': 2, 'title': 'Force map'}
+        res = np.array([3, 2], dtype=np.int32)
+        real, off, selected = Mock(), Mock(), Mock()
+        mock_get_curves_meta.return_value = (res, real, off, selected)
+        spectra = GwySpectra.from_gwy(gwyspectra, owner=owner)
+        mock_get_meta.assert_has_calls([call(gwyspectra)])
+        mock_get_curves_meta.assert_has_calls([call(gwyspectra, 2)])
+        offsets = mock_get_values.call_args[0][1]
+        np.testing.assert_equal(offsets, [0, 3, 5])
+        mock_get_coords.assert_has_calls(
+            [call(gwyspectra, 2, owner=owner)])
+        mock_GwySpectra.assert_has_calls(
+            [call(values=mock_get_values.return_value,
+                  offsets=offsets,
+                  coords=mock_get_coords.return_value,
+                  real=real, off=off, selected=selected,
+                  meta={'ncurves': 2}, title='Force map')])
+        self.assertEqual(spectra, mock_GwySpectra.return_value)
+
+
+class GwySpectra_get_meta(unittest.TestCase):
+    """Test _get_meta method of GwySpectra
+    """
+
+    def setUp(self):
+        self.cgwyspectra = Mock()
+
+        patcher_lib = patch('pygwyfile.gwyspectra.lib',
+                            autospec=True)
+        self.addCleanup(patcher_lib.stop)
+        self.mock_lib = patcher_lib.start()
+
+        self.falsep = ffi.new("bool*", False)
+        self.truep = ffi.new("bool*", True)
+
+    def test_raise_exception_if_spectra_looks_unacceptable(self):
+        """Raise GwyfileErrorCMsg if pygwyfile_spectra_get_meta
+        returns False
+        """
+        self.mock_lib.pygwyfile_spectra_get_meta.return_value = (
+            self.falsep[0])
+        self.assertRaises(GwyfileErrorCMsg,
+                          GwySpectra._get_meta,
+                          self.cgwyspectra)
+
+    def test_returned_metadata_dict(self):
+        """Return metadata dictionary and free the strings
+        """
+        self.mock_lib.pygwyfile_spectra_get_meta.side_effect = (
+            self._side_effect)
+        meta = GwySpectra._get_meta(self.cgwyspectra)
+        self.assertDictEqual(meta,
+                             {'ncurves': 3,
+                              'title': 'Force map',
+                              'spec_xlabel': '',
+                              'spec_ylabel': '',
+                              'si_unit_xy': 'm',
+                              'si_unit_x': '',
+                              'si_unit_y': 'N'})
+        self.mock_lib.pygwyfile_spectra_meta_free.assert_called_once()
+
+    def _side_effect(self, cgwyspectra, c_meta, errorp):
+        self.assertEqual(cgwyspectra, self.cgwyspectra)
+
+        # keep C strings alive until they are read
+        self.strings = [ffi.new("char[]", b'Force map'),
+                        ffi.new("char[]", b'm'),
+                        ffi.new("char[]", b'N')]
+        c_meta.ncurves = 3
+        c_meta.title = self.strings[0]
+        c_meta.si_unit_xy = self.strings[1]
+        c_meta.si_unit_y = self.strings[2]
+        return self.truep[0]
+
+
+class GwySpectra_get_coords(unittest.TestCase):
+    """Test _get_coords method of GwySpectra class
+    """
+
+    def setUp(self):
+        self.cgwyspectra = Mock()
+
+        patcher_lib = patch('pygwyfile.gwyspectra.lib',
+                            autospec=True)
+        self.addCleanup(patcher_lib.stop)
+        self.mock_lib = patcher_lib.start()
+
+        self.falsep = ffi.new("bool*", False)
+        self.truep = ffi.new("bool*", True)
+        self.coords = np.random.rand(5, 2)
+
+    def test_raise_exception_if_spectra_looks_unacceptable(self):
+        """Raise GwyfileErrorCMsg if gwyfile_object_spectra_get
+        returns False
+        """
+        self.mock_lib.gwyfile_object_spectra_get.return_value = (
+            self.falsep[0])
+        self.assertRaises(GwyfileErrorCMsg,
+                          GwySpectra._get_coords,
+                          self.cgwyspectra,
+                          5)
+
+    def test_returned_coords_are_a_copy(self):
+        """Return copy of the coordinates if owner is None
+        """
+        self.mock_lib.gwyfile_object_spectra_get.side_effect = (
+            self._side_effect)
+        coords = GwySpectra._get_coords(self.cgwyspectra, 5)
+        np.testing.assert_equal(coords, self.coords)
+        self.assertFalse(np.shares_memory(coords, self.coords))
+
+    def test_returned_coords_are_a_view_of_owner(self):
+        """Return array created by owner.view_double_array if owner is given
+        """
+        self.mock_lib.gwyfile_object_spectra_get.side_effect = (
+            self._side_effect)
+        owner = Mock()
+        coords = GwySpectra._get_coords(self.cgwyspectra, 5, owner=owner)
+        owner.view_double_array.assert_has_calls(
+            [call(ffi.cast("double*", self.coords.ctypes.data), (5, 2))])
+        self.assertIs(coords, owner.view_double_array.return_value)
+
+    def test_no_curves(self):
+        """Return empty array without calling libgwyfile
+        """
+        coords = GwySpectra._get_coords(self.cgwyspectra, 0)
+        self.assertEqual(coords.shape, (0, 2))
+        self.mock_lib.gwyfile_object_spectra_get.assert_not_called()
+
+    def _side_effect(self, *args):
+        self.assertEqual(args[0], self.cgwyspectra)
+        self.assertEqual(args[-1], ffi.NULL)
+        self.assertEqual(ffi.string(args[2]), b'coords')
+        args[3][0] = ffi.cast("double*", self.coords.ctypes.data)
+        return self.truep[0]
+
+
+class GwySpectra_to_gwy(unittest.TestCase):
+    """Test to_gwy method of GwySpectra class
+    """
+
+    def setUp(self):
+        self.curves = [np.random.rand(4), np.random.rand(1),
+                       np.random.rand(3)]
+        self.spectra = GwySpectra.from_curves(
+            self.curves, np.random.rand(3, 2),
+            real=[1., 2., 3.], off=[0., -1., 1.],
+            selected=[False, True, True],
+            meta={'spec_xlabel': 'Distance',
+                  'si_unit_xy': 'm',
+                  'si_unit_x': 'm',
+                  'si_unit_y': 'N'},
+            title='Force map')
+
+    def test_round_trip(self):
+        """Read the same data and metadata as written
+        """
+        spectra = GwySpectra.from_gwy(self.spectra.to_gwy())
+        np.testing.assert_equal(spectra.values, self.spectra.values)
+        np.testing.assert_equal(spectra.offsets, self.spectra.offsets)
+        np.testing.assert_equal(spectra.coords, self.spectra.coords)
+        np.testing.assert_equal(spectra.real, self.spectra.real)
+        np.testing.assert_equal(spectra.off, self.spectra.off)
+        np.testing.assert_equal(spectra.selected, self.spectra.selected)
+        self.assertDictEqual(spectra.meta, self.spectra.meta)
+        self.assertEqual(spectra.title, 'Force map')
+
+    def test_round_trip_of_selection_of_many_curves(self):
+        """Selection bits of all curves are written and read
+        """
+        selected = np.random.rand(70) > 0.5
+        spectra = GwySpectra(np.zeros(70), np.arange(71),
+                             np.zeros((70, 2)), selected=selected)
+        spectra = GwySpectra.from_gwy(spectra.to_gwy())
+        np.testing.assert_equal(spectra.selected, selected)
+
+    def test_borrow_data(self):
+        """Values of curves are borrowed and appended to keepalive
+        """
+        keepalive = []
+        self.spectra.to_gwy(keepalive)
+        for curve in keepalive[:3]:
+            self.assertTrue(np.shares_memory(curve, self.spectra.values))
+        self.assertIs(keepalive[3], self.spectra.coords)
+
+    def test_convert_float32_values(self):
+        """float32 values are written correctly
+        """
+        spectra = GwySpectra(self.spectra.values.astype(np.float32),
+                             self.spectra.offsets, self.spectra.coords)
+        spectra = GwySpectra.from_gwy(spectra.to_gwy([]))
+        np.testing.assert_allclose(spectra.values, self.spectra.values,
+                                   rtol=1e-6)
+
+    def test_raise_ValueError_if_there_are_no_curves(self):
+        """Raise ValueError if spectra have no curves
+        """
+        spectra = GwySpectra.from_curves([], np.zeros((0, 2)))
+        self.assertRaises(ValueError, spectra.to_gwy)
+
+    def test_free_curves_if_curve_cannot_be_created(self):
+        """Free created curves and their array if a curve fails
+        """
+        curve_to_gwy = self.spectra._curve_to_gwy
+        side_effect = [curve_to_gwy, ValueError]
+
+        def fail_second_curve(*args):
+            effect = side_effect.pop(0)
+            if effect is ValueError:
+                raise ValueError
+            return effect(*args)
+
+        with patch.object(GwySpectra, '_curve_to_gwy',
+                          side_effect=fail_second_curve), \
+                patch('pygwyfile.gwyspectra.lib', wraps=lib) as mock_lib:
+            self.assertRaises(ValueError, self.spectra.to_gwy)
+        self.assertEqual(mock_lib.gwyfile_object_free.call_count, 1)
+        self.assertEqual(mock_lib.free.call_count, 1)
+
+    def test_free_curves_if_spectra_cannot_be_created(self):
+        """Free all curves and their array if spectra object fails
+        """
+        self.spectra.title = b'not a string'
+        with patch('pygwyfile.gwyspectra.lib', wraps=lib) as mock_lib:
+            self.assertRaises(AttributeError, self.spectra.to_gwy, [])
+        self.assertEqual(mock_lib.gwyfile_object_free.call_count, 3)
+        self.assertEqual(mock_lib.free.call_count, 1)
+
+
+class GwySpectra_curves(unittest.TestCase):
+    """Test get_curve, get_abscissa and to_padded methods of GwySpectra
+    """
+
+    def setUp(self):
+        self.spectra = GwySpectra.from_curves(
+            [np.array([1., 2., 3.]), np.array([4.])],
+            np.zeros((2, 2)), real=[3., 2.], off=[0., 1.])
+
+    def test_get_curve(self):
+        """Return view of values of the curve
+        """
+        curve = self.spectra.get_curve(-2)
+        np.testing.assert_equal(curve, [1., 2., 3.])
+        self.assertTrue(np.shares_memory(curve, self.spectra.values))
+        np.testing.assert_equal(self.spectra.get_curve(1), [4.])
+        self.assertRaises(IndexError, self.spectra.get_curve, 2)
+
+    def test_get_abscissa(self):
+        """Return positions of values in physical units
+        """
+        np.testing.assert_equal(self.spectra.get_abscissa(0), [0., 1., 2.])
+        np.testing.assert_equal(self.spectra.get_abscissa(1), [1.])
+
+    def test_to_padded(self):
+        """Return rows of curves padded by fill_value
+        """
+        np.testing.assert_equal(self.spectra.to_padded(fill_value=-1.),
+                                [[1., 2., 3.], [4., -1., -1.]])
+        self.assertTrue(np.isnan(self.spectra.to_padded()[1, 1]))
+
+    def test_to_padded_without_curves(self):
+        """Return empty array if there are no curves
+        """
+        spectra = GwySpectra.from_curves([], np.zeros((0, 2)))
+        self.assertEqual(spectra.to_padded().shape, (0, 0))
+
+
+class GwySpectra_nbytes(unittest.TestCase):
+    """Test nbytes method of GwySpectra
+    """
+
+    def test_size_of_values_and_coords(self):
+        """Return size of the values and coordinates in bytes
+        """
+        spectra = GwySpectra(np.zeros(5), [0, 2, 5], np.zeros((2, 2)))
+        self.assertEqual(spectra.nbytes(), 72)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,321 @@
+import unittest
+from unittest.mock import patch, call, Mock
+
+import numpy as np
+
+from pygwyfile._libgwyfile import ffi
+from pygwyfile.gwyfile import GwyfileErrorCMsg
+from pygwyfile.gwydatafield import GwyDataField
+from pygwyfile.gwysurface import GwySurface, XYZ_DTYPE
+
+
+class GwySurface_init(unittest.TestCase):
+    """Test constructor of GwySurface class
+    """
+
+    def setUp(self):
+        self.test_data = np.random.rand(10, 3)
+        self.test_meta = {'n': 10,
+                          'si_unit_xy': 'm',
+                          'si_unit_z': 'A'}
+
+    def test_init_with_test_data(self):
+        """Test __init__ with data, meta and title args
+        """
+        surface = GwySurface(data=self.test_data, meta=self.test_meta,
+                             title='Points')
+        self.assertIs(surface.data, self.test_data)
+        self.assertDictEqual(surface.meta, self.test_meta)
+        self.assertEqual(surface.title, 'Points')
+
+    def test_init_with_empty_meta(self):
+        """Number of points is taken from data shape, units are empty
+        """
+        surface = GwySurface(data=self.test_data)
+        self.assertDictEqual(surface.meta,
+                             {'n': 10,
+                              'si_unit_xy': '',
+                              'si_unit_z': ''})
+        self.assertIsNone(surface.title)
+
+    def test_init_with_structured_array(self):
+        """Structured array is viewed as (n, 3) array
+        """
+        points = self.test_data.view(XYZ_DTYPE).reshape(-1)
+        surface = GwySurface(data=points)
+        self.assertEqual(surface.data.shape, (10, 3))
+        self.assertTrue(np.shares_memory(surface.data, self.test_data))
+        np.testing.assert_equal(surface.data, self.test_data)
+
+    def test_raise_ValueError_if_data_shape_is_wrong(self):
+        """Raise ValueError if data is not an array of triplets
+        """
+        self.assertRaises(ValueError, GwySurface, np.zeros((10, 2)))
+        self.assertRaises(ValueError, GwySurface, np.zeros(30))
+
+    def test_raise_ValueError_if_mismatched_data_shape_and_n(self):
+        """Raise ValueError if meta['n'] does not match data
+        """
+        self.test_meta['n'] = 9
+        self.assertRaises(ValueError,
+                          GwySurface,
+                          data=self.test_data,
+                          meta=self.test_meta)
+
+
+class GwySurface_from_gwy(unittest.TestCase):
+    """Test from_gwy method of GwySurface class
+    """
+
+    @patch('pygwyfile.gwysurface.GwySurface', autospec=True)
+    @patch.object(GwySurface, '_get_data')
+    @patch.object(GwySurface, '_get_meta')
+    def test_GwySurface_from_gwy(self,
+                                 mock_get_meta,
+                                 mock_get_data,
+                                 mock_GwySurface):
+        """Get metadata and data and create GwySurface instance
+        """
+        gwysurface = Mock()
+        owner = Mock()
+        meta = {'n': 10}
+        mock_get_meta.return_value = meta
+        surface = GwySurface.from_gwy(gwysurface, owner=owner)
+        mock_get_meta.assert_has_calls([call(gwysurface)])
+        mock_get_data.assert_has_calls(
+            [call(gwysurface, 10, owner=owner)])
+        mock_GwySurface.assert_has_calls(
+            [call(data=mock_get_data.return_value, meta=meta)])
+        self.assertEqual(surface, mock_GwySurface.return_value)
+
+
+class GwySurface_get_meta(unittest.TestCase):
+    """Test _get_meta method of GwySurface
+    """
+
+    def setUp(self):
+        self.cgwysurface = Mock()
+
+        patcher_lib = patch('pygwyfile.gwysurface.lib',
+                            autospec=True)
+        self.addCleanup(patcher_lib.stop)
+        self.mock_lib = patcher_lib.start()
+
+        self.falsep = ffi.new("bool*", False)
+        self.truep = ffi.new("bool*", True)
+
+    def test_raise_exception_if_surface_looks_unacceptable(self):
+        """Raise GwyfileErrorCMsg if gwyfile_object_surface_get
+        returns False
+        """
+        self.mock_lib.gwyfile_object_surface_get.return_value = (
+            self.falsep[0])
+        self.assertRaises(GwyfileErrorCMsg,
+                          GwySurface._get_meta,
+                          self.cgwysurface)
+
+    def test_returned_metadata_dict(self):
+        """Return metadata dictionary and free unit strings
+        """
+        self.mock_lib.gwyfile_object_surface_get.side_effect = (
+            self._side_effect)
+        meta = GwySurface._get_meta(self.cgwysurface)
+        self.assertDictEqual(meta,
+                             {'n': 10,
+                              'si_unit_xy': 'm',
+                              'si_unit_z': ''})
+        self.assertEqual(self.mock_lib.free.call_count, 2)
+
+    def _side_effect(self, *args):
+        self.assertEqual(args[0], self.cgwysurface)
+        self.assertEqual(args[-1], ffi.NULL)
+
+        arg_keys = [ffi.string(key).decode('utf-8') for key in args[2:-1:2]]
+        arg_dict = dict(zip(arg_keys, args[3:-1:2]))
+
+        # keep C string alive until it is read
+        self.si_unit_xy = ffi.new("char[]", b'm')
+        arg_dict['n'][0] = 10
+        arg_dict['si_unit_xy'][0] = self.si_unit_xy
+        arg_dict['si_unit_z'][0] = ffi.NULL
+        return self.truep[0]
+
+
+class GwySurface_get_data(unittest.TestCase):
+    """Test _get_data method of GwySurface class
+    """
+
+    def setUp(self):
+        self.cgwysurface = Mock()
+
+        patcher_lib = patch('pygwyfile.gwysurface.lib',
+                            autospec=True)
+        self.addCleanup(patcher_lib.stop)
+        self.mock_lib = patcher_lib.start()
+
+        self.falsep = ffi.new("bool*", False)
+        self.truep = ffi.new("bool*", True)
+        self.data = np.random.rand(10, 3)
+
+    def test_raise_exception_if_surface_looks_unacceptable(self):
+        """Raise GwyfileErrorCMsg if gwyfile_object_surface_get
+        returns False
+        """
+        self.mock_lib.gwyfile_object_surface_get.return_value = (
+            self.falsep[0])
+        self.assertRaises(GwyfileErrorCMsg,
+                          GwySurface._get_data,
+                          self.cgwysurface,
+                          10)
+
+    def test_returned_data_is_a_copy(self):
+        """Return copy of the data if owner is None
+        """
+        self.mock_lib.gwyfile_object_surface_get.side_effect = (
+            self._side_effect)
+        data = GwySurface._get_data(self.cgwysurface, 10)
+        np.testing.assert_equal(data, self.data)
+        self.assertFalse(np.shares_memory(data, self.data))
+
+    def test_returned_data_is_a_view_of_owner(self):
+        """Return array created by owner.view_double_array if owner is given
+        """
+        self.mock_lib.gwyfile_object_surface_get.side_effect = (
+            self._side_effect)
+        owner = Mock()
+        data = GwySurface._get_data(self.cgwysurface, 10, owner=owner)
+        owner.view_double_array.assert_has_calls(
+            [call(ffi.cast("double*", self.data.ctypes.data), (10, 3))])
+        self.assertIs(data, owner.view_double_array.return_value)
+
+    def _side_effect(self, *args):
+        self.assertEqual(args[0], self.cgwysurface)
+        self.assertEqual(args[-1], ffi.NULL)
+        self.assertEqual(ffi.string(args[2]), b'data')
+        args[3][0] = ffi.cast("double*", self.data.ctypes.data)
+        return self.truep[0]
+
+
+class GwySurface_to_gwy(unittest.TestCase):
+    """Test to_gwy method of GwySurface class
+    """
+
+    def setUp(self):
+        self.data = np.random.rand(10, 3)
+        self.surface = GwySurface(self.data, meta={'si_unit_xy': 'm',
+                                                   'si_unit_z': 'A'})
+
+    def test_round_trip(self):
+        """Read the same data and metadata as written
+        """
+        surface = GwySurface.from_gwy(self.surface.to_gwy())
+        np.testing.assert_equal(surface.data, self.data)
+        self.assertDictEqual(surface.meta, self.surface.meta)
+
+    def test_borrow_data(self):
+        """Data array is borrowed and appended to keepalive
+        """
+        keepalive = []
+        self.surface.to_gwy(keepalive)
+        self.assertIs(keepalive[0], self.data)
+
+    def test_convert_non_contiguous_data(self):
+        """Non-contiguous data are written correctly
+        """
+        data = np.random.rand(3, 10).T
+        surface = GwySurface.from_gwy(GwySurface(data).to_gwy())
+        np.testing.assert_equal(surface.data, data)
+
+
+class GwySurface_as_structured(unittest.TestCase):
+    """Test as_structured method of GwySurface
+    """
+
+    def test_view_of_contiguous_data(self):
+        """Return structured view of the data array
+        """
+        data = np.random.rand(10, 3)
+        points = GwySurface(data).as_structured()
+        self.assertEqual(points.dtype, XYZ_DTYPE)
+        self.assertEqual(points.shape, (10,))
+        self.assertTrue(np.shares_memory(points, data))
+        np.testing.assert_equal(points['z'], data[:, 2])
+
+    def test_copy_of_non_contiguous_data(self):
+        """Return structured copy of non-contiguous data
+        """
+        data = np.random.rand(3, 10).T
+        points = GwySurface(data).as_structured()
+        np.testing.assert_equal(points['y'], data[:, 1])
+
+
+class GwySurface_regularize(unittest.TestCase):
+    """Test regularize method of GwySurface
+    """
+
+    def setUp(self):
+        self.surface = GwySurface(np.array([[0., 0., 1.],
+                                            [0.1, 0.2, 3.],
+                                            [0.9, 0.2, 7.],
+                                            [1., 1., 5.]]),
+                                  meta={'si_unit_xy': 'm',
+                                        'si_unit_z': 'A'})
+
+    def test_average_points_in_pixels(self):
+        """Pixels are averages of their points in row-major order
+        """
+        datafield = self.surface.regularize(2, 2, fill_value=-1.)
+        self.assertIsInstance(datafield, GwyDataField)
+        np.testing.assert_equal(datafield.data.ravel(),
+                                [2., 7., -1., 5.])
+        self.assertDictEqual(datafield.meta,
+                             {'xres': 2, 'yres': 2,
+                              'xreal': 1., 'yreal': 1.,
+                              'xoff': 0., 'yoff': 0.,
+                              'si_unit_xy': 'm', 'si_unit_z': 'A'})
+
+    def test_empty_pixels_are_nan(self):
+        """Pixels without points are NaN by default
+        """
+        datafield = self.surface.regularize(2, 2)
+        self.assertTrue(np.isnan(datafield.data.ravel()[2]))
+
+    def test_ignore_points_out_of_ranges(self):
+        """Points out of explicit ranges are ignored
+        """
+        datafield = self.surface.regularize(1, 1, xrange=(0., 0.5),
+                                            yrange=(0., 0.5))
+        np.testing.assert_equal(datafield.data, [[2.]])
+        self.assertEqual(datafield.meta['xreal'], 0.5)
+
+    @patch('pygwyfile.gwysurface._CHUNK_SIZE', 3)
+    def test_points_in_several_chunks(self):
+        """Points of all chunks are averaged together
+        """
+        datafield = self.surface.regularize(1, 1)
+        np.testing.assert_equal(datafield.data, [[4.]])
+
+    def test_raise_ValueError_if_range_is_empty(self):
+        """Raise ValueError if range of coordinates is empty
+        """
+        surface = GwySurface(np.array([[1., 0., 0.], [1., 1., 0.]]))
+        self.assertRaises(ValueError, surface.regularize, 2, 2)
+        self.assertRaises(ValueError, self.surface.regularize, 2, 2,
+                          yrange=(1., 0.))
+        self.assertRaises(ValueError, GwySurface(np.zeros((0, 3))).regularize,
+                          2, 2)
+
+
+class GwySurface_nbytes(unittest.TestCase):
+    """Test nbytes method of GwySurface
+    """
+
+    def test_size_of_data_array(self):
+        """Return size of the data array in bytes
+        """
+        surface = GwySurface(np.zeros((4, 3)))
+        self.assertEqual(surface.nbytes(), 96)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from pygwyfile.gwybrick import GwyBrick
+from pygwyfile.gwychannel import GwyChannel
+from pygwyfile.gwycontainer import GwyContainer, read_gwyfile
+from pygwyfile.gwydatafield import GwyDataField
+from pygwyfile.gwyfile import GwyfileError
+from pygwyfile.gwygraph import GwyGraphModel
+from pygwyfile.gwygraphcurve import GwyGraphCurve
+from pygwyfile.gwyselection import GwyPointSelection
+from pygwyfile.gwyspectra import GwySpectra
+from pygwyfile.gwysurface import GwySurface
+from pygwyfile.gwywriter import GwyWriter
+
+
+def _make_channels():
+    return [GwyChannel('Topo{:d}'.format(i),
+                       GwyDataField(np.full((4, 3), float(i))),
+                       mask=GwyDataField(np.zeros((4, 3))),
+                       point_sel=GwyPointSelection([(1., 2.)]))
+            for i in range(3)]
+
+
+def _make_graphs():
+    return [GwyGraphModel([GwyGraphCurve(np.random.rand(2, 5))],
+                          visible=True)]
+
+
+class GwyWriter_write(unittest.TestCase):
+    """Test writing of gwy files by GwyWriter"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.filename = os.path.join(self.root, 'test.gwy')
+        self.channels = _make_channels()
+        self.graphs = _make_graphs()
+        self.volumes = [GwyBrick(np.random.rand(3, 2, 4), title='Spectra')]
+        self.surfaces = [GwySurface(np.random.rand(6, 3), title='Points')]
+        self.spectra = [GwySpectra.from_curves(
+            [np.random.rand(4), np.random.rand(2)], np.random.rand(2, 2),
+            title='Force map')]
+        self.container = GwyContainer(channels=self.channels,
+                                      graphs=self.graphs,
+                                      volumes=self.volumes,
+                                      surfaces=self.surfaces,
+                                      spectra=self.spectra)
+
+    def test_same_file_as_container(self):
+        """Write the same file as GwyContainer.to_gwyfile"""
+        with GwyWriter(self.filename) as writer:
+            for channel in self.channels:
+                writer.add_channel(channel)
+            for graph in self.graphs:
+                writer.add_graph(graph)
+            for volume in self.volumes:
+                writer.add_volume(volume)
+            for surface in self.surfaces:
+                writer.add_surface(surface)
+            for spectra in self.spectra:
+                writer.add_spectra(spectra)
+        container = read_gwyfile(self.filename)
+        self.assertEqual(len(container.channels), 3)
+        self.assertEqual(len(container.graphs), 1)
+        self.assertEqual(len(container.volumes), 1)
+        self.assertEqual(len(container.surfaces), 1)
+        self.assertEqual(len(container.spectra), 1)
+        self.assertEqual(container.filename,
+                         os.path.basename(self.filename))
+        self.assertEqual(container.to_bytes(), self.container.to_bytes())
+
+    def test_write_to_fileobj(self):
+        """Write to seekable file object at its current position"""
+        fileobj = io.BytesIO()
+        fileobj.write(b"prefix")
+        with GwyWriter(fileobj) as writer:
+            for channel in self.channels:
+                writer.add_channel(channel)
+            for graph in self.graphs:
+                writer.add_graph(graph)
+            for volume in self.volumes:
+                writer.add_volume(volume)
+            for surface in self.surfaces:
+                writer.add_surface(surface)
+            for spectra in self.spectra:
+                writer.add_spectra(spectra)
+        self.assertFalse(fileobj.closed)
+        data = fileobj.getvalue()
+        self.assertEqual(data[:6], b"prefix")
+        self.assertEqual(data[6:], self.container.to_bytes())
+
+    def test_return_ids(self):
+        """Graphs are numbered from 1, other items from 0"""
+        with GwyWriter(io.BytesIO()) as writer:
+            self.assertEqual(writer.add_channel(self.channels[0]), 0)
+            self.assertEqual(writer.add_channel(self.channels[1]), 1)
+            self.assertEqual(writer.add_graph(self.graphs[0]), 1)
+            self.assertEqual(writer.add_volume(self.volumes[0]), 0)
+            self.assertEqual(writer.add_surface(self.surfaces[0]), 0)
+            self.assertEqual(writer.add_spectra(self.spectra[0]), 0)
+            self.assertEqual(writer.nchannels, 2)
+            self.assertEqual(writer.ngraphs, 1)
+            self.assertEqual(writer.nvolumes, 1)
+            self.assertEqual(writer.nsurfaces, 1)
+            self.assertEqual(writer.nspectra, 1)
+
+    def test_empty_file(self):
+        """Write empty container if nothing is added"""
+        fileobj = io.BytesIO()
+        GwyWriter(fileobj).close()
+        self.assertEqual(fileobj.getvalue(), GwyContainer().to_bytes())
+
+    def test_incomplete_header_after_exception(self):
+        """Header is not completed if with block raises exception"""
+        fileobj = io.BytesIO()
+        with self.assertRaises(RuntimeError):
+            with GwyWriter(fileobj) as writer:
+                writer.add_channel(self.channels[0])
+                raise RuntimeError
+        self.assertEqual(fileobj.getvalue()[17:21], b"\0\0\0\0")
+
+    def test_raise_TypeError_if_arg_has_wrong_type(self):
+        """Raise TypeError if added item has wrong type"""
+        with GwyWriter(io.BytesIO()) as writer:
+            self.assertRaises(TypeError, writer.add_channel, self.graphs[0])
+            self.assertRaises(TypeError, writer.add_graph, self.channels[0])
+            self.assertRaises(TypeError, writer.add_volume, self.channels[0])
+            self.assertRaises(TypeError, writer.add_surface, self.volumes[0])
+            self.assertRaises(TypeError, writer.add_spectra,
+                              self.surfaces[0])
+
+    def test_raise_ValueError_if_writer_is_closed(self):
+        """Raise ValueError if items are added to closed writer"""
+        writer = GwyWriter(io.BytesIO())
+        writer.close()
+        writer.close()
+        self.assertRaises(ValueError, writer.add_channel, self.channels[0])
+
+    def test_raise_ValueError_if_fileobj_is_not_seekable(self):
+        """Raise ValueError if file object is not seekable"""
+        fileobj = io.BytesIO()
+        with patch.object(fileobj, 'seekable', return_value=False):
+            self.assertRaises(ValueError, GwyWriter, fileobj)
+
+    @patch('pygwyfile.gwywriter._MAX_SIZE', 100)
+    def test_raise_GwyfileError_if_file_is_too_large(self):
+        """Raise GwyfileError if size does not fit into the header"""
+        with GwyWriter(io.BytesIO()) as writer:
+            self.assertRaises(GwyfileError,
+                              writer.add_channel,
+                              self.channels[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import concurrent.futures
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from pygwyfile import gwyfile, stats
+from pygwyfile._libgwyfile import lib
+from pygwyfile.gwychannel import GwyChannel
+from pygwyfile.gwycontainer import GwyContainer
+from pygwyfile.gwydatafield import GwyDataField
+from pygwyfile.gwyfile import Gwyfile
+from pygwyfile.gwyselection import GwyPointSelection
+
+
+class Func_timed(unittest.TestCase):
+    """Test timed decorator"""
+
+    def setUp(self):
+        patcher = patch('pygwyfile.stats.time.perf_counter')
+        self.addCleanup(patcher.stop)
+        self.mock_clock = patcher.start()
+
+    def test_exclusive_times_of_nested_stages(self):
+        """Time of inner stage is not accounted to outer stage"""
+        self.mock_clock.side_effect = [0., 1., 3., 10.]
+
+        @stats.timed('parse')
+        def inner():
+            pass
+
+        @stats.timed('decode')
+        def outer():
+            inner()
+
+        with stats.collect() as collected:
+            outer()
+        self.assertEqual(collected.times['parse'], 2.)
+        self.assertEqual(collected.times['decode'], 8.)
+        self.assertEqual(collected.calls['parse'], 1)
+        self.assertEqual(collected.calls['decode'], 1)
+        self.assertEqual(collected.total_time(), 10.)
+
+    def test_exception_stops_stage(self):
+        """Stage is stopped if function raises exception"""
+        self.mock_clock.side_effect = [0., 1.]
+
+        @stats.timed('parse')
+        def fail():
+            raise ValueError
+
+        with stats.collect() as collected:
+            self.assertRaises(ValueError, fail)
+        self.assertEqual(collected.times['parse'], 1.)
+        self.assertEqual(collected._stack, [])
+
+    def test_no_collection(self):
+        """Clock is not read if statistics are not collected"""
+
+        @stats.timed('parse')
+        def func(arg, kwarg=None):
+            return arg, kwarg
+
+        self.assertEqual(func(1, kwarg=2), (1, 2))
+        self.mock_clock.assert_not_called()
+
+    def test_raise_ValueError_if_stage_is_unknown(self):
+        """Raise ValueError for unknown stage name"""
+        self.assertRaises(ValueError, stats.timed, 'unknown')
+
+
+class Func_collect(unittest.TestCase):
+    """Test collection of statistics of real operations"""
+
+    def setUp(self):
+        data = np.zeros((4, 8))
+        self.container = GwyContainer(
+            channels=[GwyChannel('Topo', GwyDataField(data),
+                                 mask=GwyDataField(data))])
+        self.nbytes = 2 * data.nbytes
+
+    def test_write_and_read(self):
+        """Count stages, libgwyfile calls and copied bytes"""
+        with stats.collect() as collected:
+            contents = self.container.to_bytes()
+        self.assertEqual(collected.calls['construct'], 2)
+        self.assertEqual(collected.calls['serialize'], 2)
+        self.assertGreater(collected.cffi_calls, 0)
+        # data arrays are borrowed, only the contents are copied
+        self.assertEqual(collected.bytes_copied, len(contents))
+
+        with stats.collect() as collected:
+            GwyContainer.from_gwy(Gwyfile.from_bytes(contents))
+        self.assertEqual(collected.calls['parse'], 1)
+        self.assertEqual(collected.calls['lookup'], 1)
+        self.assertEqual(collected.calls['datafield_copy'], 2)
+        self.assertEqual(collected.bytes_copied, self.nbytes)
+        self.assertIn('datafield_copy', collected.report())
+
+    def test_count_calls_of_current_context_only(self):
+        """Calls are counted only in the context of the collection"""
+        point = np.zeros(2)
+        selection = GwyPointSelection([point])
+        with stats.collect() as collected:
+            # selection constructors are bound at import time
+            gwysel = selection.to_gwy()
+            self.assertEqual(collected.cffi_calls, 1)
+            with concurrent.futures.ThreadPoolExecutor(1) as executor:
+                executor.submit(selection.to_gwy).result()
+            self.assertEqual(collected.cffi_calls, 1)
+        lib.gwyfile_object_free(gwysel)
+        self.assertEqual(collected.cffi_calls, 1)
+
+    def test_library_is_wrapped_while_collecting_only(self):
+        """Modules call libgwyfile directly if nothing is collected"""
+        self.assertIs(gwyfile.lib, lib)
+        with stats.collect():
+            with stats.collect():
+                pass
+            self.assertIsNot(gwyfile.lib, lib)
+        self.assertIs(gwyfile.lib, lib)
+
+    def test_nested_collections(self):
+        """Inner block is collected by the inner collection only"""
+        with stats.collect() as outer:
+            with stats.collect() as inner:
+                stats.add_bytes_copied(1)
+            stats.add_bytes_copied(2)
+        self.assertEqual(inner.bytes_copied, 1)
+        self.assertEqual(outer.bytes_copied, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from pygwyfile.gwycontainer import read_gwyfile
+from pygwyfile.synth import make_container, write_synth_gwyfile
+from pygwyfile.synth import write_synth_corpus, main
+
+
+class Func_make_container(unittest.TestCase):
+    """Test make_container function"""
+
+    def test_components(self):
+        """Channels have datafields, selections of all kinds and graphs
+        have requested number of curves and points
+        """
+        container = make_container(nchannels=2, resolution=(8, 6),
+                                   nselections=3, ngraphs=2,
+                                   ncurves=4, npoints=5)
+        self.assertEqual(len(container.channels), 2)
+        for channel in container.channels:
+            for datafield in (channel.data, channel.mask, channel.show):
+                self.assertEqual(datafield.data.shape, (8, 6))
+            for selection in (channel.point_selections,
+                              channel.pointer_selections,
+                              channel.line_selections,
+                              channel.rectangle_selections,
+                              channel.ellipse_selections):
+                self.assertEqual(len(selection.data), 3)
+        self.assertEqual(len(container.graphs), 2)
+        for graph in container.graphs:
+            self.assertEqual(len(graph.curves), 4)
+            self.assertEqual(graph.curves[0].data.shape, (2, 5))
+
+    def test_optional_components(self):
+        """No masks, presentations and selections if not requested"""
+        container = make_container(resolution=4, mask=False, show=False,
+                                   nselections=0, ngraphs=0)
+        channel = container.channels[0]
+        self.assertIsNone(channel.mask)
+        self.assertIsNone(channel.show)
+        self.assertIsNone(channel.point_selections)
+        self.assertEqual(container.graphs, [])
+
+    def test_deterministic(self):
+        """Same seed gives same data regardless of chunk size"""
+        first = make_container(resolution=(9, 7), seed=5, chunk_rows=2)
+        second = make_container(resolution=(9, 7), seed=5, chunk_rows=100)
+        np.testing.assert_equal(first.channels[0].data.data,
+                                second.channels[0].data.data)
+        self.assertEqual(first.channels[0].line_selections.data,
+                         second.channels[0].line_selections.data)
+        np.testing.assert_equal(first.graphs[0].curves[0].data,
+                                second.graphs[0].curves[0].data)
+
+    def test_different_seeds(self):
+        """Different seeds give different data"""
+        first = make_container(resolution=4, seed=1)
+        second = make_container(resolution=4, seed=2)
+        self.assertFalse(np.array_equal(first.channels[0].data.data,
+                                        second.channels[0].data.data))
+
+    def test_raise_ValueError_if_resolution_is_not_positive(self):
+        """Raise ValueError if resolution is zero"""
+        self.assertRaises(ValueError, make_container, resolution=(4, 0))
+
+    @patch('pygwyfile.synth.MEMMAP_MIN_BYTES', 0)
+    def test_memmap_large_fields(self):
+        """Datafields are memory-mapped in tmpdir"""
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        container = make_container(resolution=4, tmpdir=tmpdir)
+        self.assertIsInstance(container.channels[0].data.data, np.memmap)
+        self.assertEqual(len(os.listdir(tmpdir)), 3)
+
+
+class Func_write_synth(unittest.TestCase):
+    """Test writing of synthetic files"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+    @patch('pygwyfile.synth.MEMMAP_MIN_BYTES', 0)
+    def test_write_gwyfile(self):
+        """Written file is read back and temporary files are removed"""
+        filename = os.path.join(self.root, 'test.gwy')
+        write_synth_gwyfile(filename, resolution=(6, 5), seed=3)
+        self.assertEqual(os.listdir(self.root), ['test.gwy'])
+        container = read_gwyfile(filename)
+        expected = make_container(resolution=(6, 5), seed=3)
+        np.testing.assert_equal(container.channels[0].data.data,
+                                expected.channels[0].data.data)
+        np.testing.assert_equal(container.channels[0].mask.data,
+                                expected.channels[0].mask.data)
+
+    def test_write_corpus(self):
+        """File i is generated with seed + i"""
+        filenames = write_synth_corpus(os.path.join(self.root, 'corpus'),
+                                       2, seed=10, resolution=4)
+        self.assertEqual([os.path.basename(name) for name in filenames],
+                         ['synth_00000.gwy', 'synth_00001.gwy'])
+        container = read_gwyfile(filenames[1])
+        expected = make_container(resolution=4, seed=11)
+        np.testing.assert_equal(container.channels[0].data.data,
+                                expected.channels[0].data.data)
+
+    def test_command_line(self):
+        """Write corpus from the command line"""
+        directory = os.path.join(self.root, 'corpus')
+        main([directory, '--files', '3', '--channels', '2',
+              '--resolution', '8', '4', '--graphs', '0'])
+        self.assertEqual(len(os.listdir(directory)), 3)
+        container = read_gwyfile(os.path.join(directory, 'synth_00000.gwy'))
+        self.assertEqual(len(container.channels), 2)
+        self.assertEqual(container.channels[1].data.data.shape, (8, 4))
+
+
+if __name__ == '__main__':
+    unittest.main()